@@ -3,6 +3,16 @@ import subprocess
 import os
 
 def main():
+    # --scheduler vlag = enkel de scheduler-daemon (geen interface)
+    if "--scheduler" in sys.argv:
+        from regian.core.daemon import serve
+        sys.exit(serve())
+
+    # --workflow-worker vlag = enkel achtergrondworkers voor workflow-runs
+    if "--workflow-worker" in sys.argv:
+        from regian.core.runqueue import serve as serve_workers
+        sys.exit(serve_workers())
+
     # --cli vlag = terminal interface, anders Streamlit dashboard
     if "--cli" in sys.argv:
         from regian.interface.cli import start_cli
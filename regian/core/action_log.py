@@ -38,7 +38,30 @@ def _get_log_file() -> Path:
         return Path(__file__).parent.parent.parent / "regian_action_log.jsonl"
 
 
+def _take_profile(tool: str) -> Optional[str]:
+    """Koppel een net bewaard profiel van deze tool (zie core/profiling.py) aan de entry."""
+    try:
+        from regian.core.profiling import take_pending_profile
+        return take_pending_profile("tool", tool)
+    except Exception:
+        return None
+
+
 _lock = threading.Lock()
+# Aantal threads dat wacht op (of bezig is met) een schrijfactie — zie core/metrics.py
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def pending_writes() -> int:
+    """Geeft het aantal log-schrijfacties dat momenteel wacht of loopt."""
+    return _pending
+
+
+def _track_pending(delta: int):
+    global _pending
+    with _pending_lock:
+        _pending += delta
 
 
 def log_action(
@@ -56,6 +79,8 @@ def log_action(
     :param result:   resultaat (eerste 300 tekens)
     :param source:   'chat', 'cron', 'cli' of 'direct'
     :param group_id: optionele UUID-string die verwante entries koppelt
+
+    Werd de tool net geprofileerd, dan krijgt de entry een 'profile_id'.
     """
     entry = {
         "ts": datetime.now().isoformat(timespec="seconds"),
@@ -66,11 +91,20 @@ def log_action(
     }
     if group_id:
         entry["group_id"] = group_id
+    profile_id = _take_profile(tool)
+    if profile_id:
+        entry["profile_id"] = profile_id
     line = json.dumps(entry, ensure_ascii=False)
-    with _lock:
-        with open(_get_log_file(), "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-        _trim()
+    _track_pending(1)
+    try:
+        with _lock:
+            with open(_get_log_file(), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            _trim()
+    finally:
+        _track_pending(-1)
+    from regian.core.metrics import inc
+    inc("regian_action_log_writes_total", source=source)
 
 
 def get_log_grouped(limit_groups: int = 100) -> list[dict]:
@@ -0,0 +1,154 @@
+# regian/core/admission.py
+"""
+Toegangscontrole met prioriteitsklassen voor gedeelde capaciteit.
+
+Chat, geplande taken, workflows en onderhoud delen dezelfde LLM-quota, CPU en
+schijf. Elke LLM-aanroep (invoke_llm) en elke run_shell/run_python (en shell-taak)
+vraagt daarom eerst een plaats aan een poort:
+
+  "llm"   → ADMISSION_LLM_SLOTS plaatsen   (standaard 4)
+  "exec"  → ADMISSION_EXEC_SLOTS plaatsen  (standaard 4)
+
+Wachtenden worden bediend in volgorde van klasse, daarna van aankomst:
+
+  interactive (0) > workflow (1) > cron (2) > maintenance (3)
+
+Achtergrondwerk (alles behalve interactive) mag bovendien de laatste plaats van
+een poort niet innemen, zodat een chatvraag nooit achter lopende cron-aanroepen
+hoeft te wachten. Lopende aanroepen worden niet onderbroken.
+
+De klasse volgt uit de usage-scope (bron chat/cli → interactive, workflow,
+cron); priority_scope() legt ze expliciet vast, bv. voor onderhoudstaken.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+CLASSES = ("interactive", "workflow", "cron", "maintenance")
+_RANK = {name: i for i, name in enumerate(CLASSES)}
+
+# Bron (usage-scope) → klasse; 'skill' erft van de omsluitende scope
+_SOURCE_CLASS = {"chat": "interactive", "cli": "interactive", "direct": "interactive",
+                 "workflow": "workflow", "cron": "cron"}
+
+# Plaatsen die enkel interactieve aanvragen mogen innemen
+_INTERACTIVE_RESERVE = 1
+
+_class: ContextVar[Optional[str]] = ContextVar("regian_admission_class", default=None)
+
+
+@contextmanager
+def priority_scope(name: str):
+    """Leg de prioriteitsklasse vast voor alle aanvragen binnen het blok."""
+    if name not in _RANK:
+        raise ValueError(f"Onbekende prioriteitsklasse: '{name}'. Kies uit {', '.join(CLASSES)}.")
+    token = _class.set(name)
+    try:
+        yield name
+    finally:
+        _class.reset(token)
+
+
+def current_class() -> str:
+    """De klasse van de huidige context (standaard interactive, zoals de bron 'chat')."""
+    explicit = _class.get()
+    if explicit:
+        return explicit
+    from regian.core.usage import source_chain
+    for source in source_chain():
+        if source in _SOURCE_CLASS:
+            return _SOURCE_CLASS[source]
+    return "interactive"
+
+
+class Gate:
+    """Een poort met `size` plaatsen en een prioriteitswachtrij."""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = max(1, int(size))
+        self._cond = threading.Condition()
+        self._waiting: list[tuple[int, int]] = []   # heap van (rang, volgnummer)
+        self._seq = itertools.count()
+        self._active = {name: 0 for name in CLASSES}
+
+    def _limit(self, rank: int) -> int:
+        if rank == 0 or self.size <= _INTERACTIVE_RESERVE:
+            return self.size
+        return self.size - _INTERACTIVE_RESERVE
+
+    def resize(self, size: int) -> None:
+        with self._cond:
+            self.size = max(1, int(size))
+            self._cond.notify_all()
+
+    def acquire(self, cls: str) -> float:
+        """Wacht op een plaats; geeft de wachttijd in seconden."""
+        ticket = (_RANK[cls], next(self._seq))
+        t0 = time.perf_counter()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while not (self._waiting[0] == ticket and sum(self._active.values()) < self._limit(ticket[0])):
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._active[cls] += 1
+            # De volgende in de rij kan misschien ook al binnen
+            self._cond.notify_all()
+        return time.perf_counter() - t0
+
+    def release(self, cls: str) -> None:
+        with self._cond:
+            self._active[cls] -= 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        """Plaatsen, actieve aanvragen en wachtenden per klasse."""
+        with self._cond:
+            waiting = {name: 0 for name in CLASSES}
+            for rank, _ in self._waiting:
+                waiting[CLASSES[rank]] += 1
+            return {"size": self.size, "active": dict(self._active), "waiting": waiting}
+
+
+_gates: dict[str, Gate] = {}
+_gates_lock = threading.Lock()
+
+
+def _gate_size(resource: str) -> int:
+    from regian.settings import get_admission_llm_slots, get_admission_exec_slots
+    return get_admission_llm_slots() if resource == "llm" else get_admission_exec_slots()
+
+
+def get_gate(resource: str) -> Gate:
+    """De poort voor 'llm' of 'exec' (volgt de ingestelde grootte)."""
+    size = _gate_size(resource)
+    with _gates_lock:
+        gate = _gates.get(resource)
+        if gate is None:
+            gate = _gates[resource] = Gate(resource, size)
+    if gate.size != size:
+        gate.resize(size)
+    return gate
+
+
+@contextmanager
+def admit(resource: str, cls: Optional[str] = None):
+    """Neem een plaats in op de poort van `resource` voor de huidige klasse. Yieldt de wachttijd."""
+    from regian.core import metrics
+    cls = cls or current_class()
+    gate = get_gate(resource)
+    wait = gate.acquire(cls)
+    metrics.observe("regian_admission_wait_seconds", wait, resource=resource, **{"class": cls})
+    try:
+        yield wait
+    finally:
+        gate.release(cls)
+
+
+def status() -> dict[str, dict]:
+    """Snapshot van alle poorten: resource → {size, active, waiting}."""
+    return {resource: get_gate(resource).snapshot() for resource in ("llm", "exec")}
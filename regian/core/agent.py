@@ -1,11 +1,16 @@
 import os
 import json
+import hashlib
 import re
+import time
 import inspect
 import importlib
 import pkgutil
 from dotenv import load_dotenv
 from regian.core.action_log import log_action
+from regian.core.usage import invoke_llm
+from regian.core.profiling import is_profiled, profile_scope
+from regian.core import metrics
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
@@ -102,6 +107,24 @@ class SkillRegistry:
         tool = self.tool_map.get(name)
         if not tool:
             return f"❌ Onbekende skill: '{name}'. Gebruik /get_help voor een overzicht."
+        start = time.perf_counter()
+        if is_profiled("tool", name):
+            with profile_scope("tool", name):
+                result = self._invoke(name, tool, args)
+        else:
+            result = self._invoke(name, tool, args)
+        return self._record(name, result, start)
+
+    @staticmethod
+    def _record(name: str, result: str, start: float) -> str:
+        """Registreer aantal en duur van een skill-aanroep (zie core/metrics.py)."""
+        status = "error" if result.startswith("❌") else "ok"
+        metrics.inc("regian_tool_calls_total", tool=name, status=status)
+        metrics.observe("regian_tool_duration_seconds", time.perf_counter() - start, tool=name)
+        return result
+
+    @staticmethod
+    def _invoke(name: str, tool, args: dict) -> str:
         try:
             return str(tool.invoke(args))
         except Exception as e:
@@ -116,6 +139,15 @@ class SkillRegistry:
         if not tool:
             available = ", ".join(sorted(self._functions.keys()))
             return f"❌ Onbekende skill: '{name}'.\nBeschikbaar: {available}"
+        start = time.perf_counter()
+        if is_profiled("tool", name):
+            with profile_scope("tool", name):
+                result = self._invoke_by_string(name, tool, raw_args)
+        else:
+            result = self._invoke_by_string(name, tool, raw_args)
+        return self._record(name, result, start)
+
+    def _invoke_by_string(self, name: str, tool, raw_args: str) -> str:
         try:
             try:
                 args = json.loads(raw_args) if raw_args.strip() else {}
@@ -278,7 +310,7 @@ class OrchestratorAgent:
             tool_catalog=catalog,
             project_context=project_section,
         )
-        response = self.base_llm.invoke([
+        response = invoke_llm(self.base_llm, [
             SystemMessage(content=system),
             HumanMessage(content=prompt),
         ])
@@ -298,42 +330,69 @@ class OrchestratorAgent:
 
     def execute_plan(self, plan: list, source: str = "chat", group_id: str | None = None) -> str:
         """Fase 2: voer een takenlijst deterministisch uit en geef resultaten terug."""
-        results = []
-        for step in plan:
-            tool_name = step.get("tool", "")
-            args = step.get("args", {})
-            result = registry.call(tool_name, args)
-            log_action(tool_name, args, result, source=source, group_id=group_id)
-            results.append(f"✅ **{tool_name}**: {result}")
-        return "\n\n".join(results) if results else "Geen taken uitgevoerd."
+        return execute_plan(plan, source=source, group_id=group_id)
+
+    def answer(self, prompt: str) -> str:
+        """Beantwoord een opdracht zonder tools rechtstreeks via de LLM."""
+        ctx = _get_project_context()
+        ctx_block = _project_context_block(ctx)
+        base_system = (
+            "Je bent Regian, een AI-assistent van AethronTech. Antwoord bondig in het Nederlands.\n"
+            "Als er CSV-data aanwezig is in de context, analyseer die direct en geef concrete antwoorden.\n"
+            "ING-bankbestanden: puntkomma-gescheiden, Bedrag-kolom met komma als decimaalteken, Boekingsdatum in DD/MM/YYYY-formaat.\n"
+            "Omzet/inkomsten = positieve Bedrag-waarden; uitgaven = negatieve waarden."
+        )
+        system = f"{base_system}\n\n{ctx_block}" if ctx_block else base_system
+        response = invoke_llm(self.base_llm, [
+            SystemMessage(content=system),
+            HumanMessage(content=prompt),
+        ])
+        content = response.content
+        if isinstance(content, list):
+            content = " ".join(str(c) for c in content if c)
+        return str(content).strip()
 
     def run(self, prompt: str) -> str:
         """Plan + execute in één stap (enkel voor taken zonder HITL-tools)."""
         try:
             plan = self.plan(prompt)
             if not plan:
-                ctx = _get_project_context()
-                ctx_block = _project_context_block(ctx)
-                base_system = (
-                    "Je bent Regian, een AI-assistent van AethronTech. Antwoord bondig in het Nederlands.\n"
-                    "Als er CSV-data aanwezig is in de context, analyseer die direct en geef concrete antwoorden.\n"
-                    "ING-bankbestanden: puntkomma-gescheiden, Bedrag-kolom met komma als decimaalteken, Boekingsdatum in DD/MM/YYYY-formaat.\n"
-                    "Omzet/inkomsten = positieve Bedrag-waarden; uitgaven = negatieve waarden."
-                )
-                system = f"{base_system}\n\n{ctx_block}" if ctx_block else base_system
-                response = self.base_llm.invoke([
-                    SystemMessage(content=system),
-                    HumanMessage(content=prompt),
-                ])
-                content = response.content
-                if isinstance(content, list):
-                    content = " ".join(str(c) for c in content if c)
-                return str(content).strip()
+                return self.answer(prompt)
             return self.execute_plan(plan)
         except Exception as e:
             return f"Orchestrator Fout: {str(e)}"
 
 
+def execute_plan(plan: list, source: str = "chat", group_id: str | None = None) -> str:
+    """Voer een takenlijst deterministisch uit, zonder LLM (ook voor bevroren plannen)."""
+    results = []
+    for step in plan:
+        tool_name = step.get("tool", "")
+        args = step.get("args", {})
+        result = registry.call(tool_name, args)
+        log_action(tool_name, args, result, source=source, group_id=group_id)
+        results.append(f"✅ **{tool_name}**: {result}")
+    return "\n\n".join(results) if results else "Geen taken uitgevoerd."
+
+
+def plan_fingerprint(prompt: str) -> str:
+    """
+    Vingerafdruk van alles waar een plan van afhangt: de opdracht, de
+    beschikbare tools (naam + signatuur) en het actieve project.
+    Wijzigt één ervan, dan is een bevroren plan verouderd.
+    """
+    ctx = _get_project_context()
+    project_type = ctx["type"] if ctx else None
+    allowed_tools = ctx.get("allowed_tools") or None if ctx else None
+    tools = sorted(
+        f"{t.name}{inspect.signature(registry._functions[t.name])}"
+        for t in registry.tools_for_project(project_type, allowed_tools)
+    )
+    project = {k: ctx.get(k) for k in ("name", "type", "path", "allowed_tools")} if ctx else None
+    payload = json.dumps({"prompt": prompt, "tools": tools, "project": project}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
 # ── REGIAN AGENT ───────────────────────────────────────────────────────────────
 
 _AGENT_PROMPT_BASE = (
@@ -382,7 +441,7 @@ class RegianAgent:
                 HumanMessage(content=prompt),
             ]
             for _ in range(max_iter):
-                response = self.llm.invoke(messages)
+                response = invoke_llm(self.llm, messages)
                 messages.append(response)
                 if response.tool_calls:
                     seen = set()
@@ -0,0 +1,234 @@
+# regian/core/blobstore.py
+"""
+Content-adresseerbare, gecomprimeerde opslag voor workflow-uitvoer.
+
+Een fase-uitvoer stond tot nu toe twee keer in de run-state (artifacts[output_key]
+en phase_log[...]["output"]), en elke revisie bewaarde een volledig document.
+Grote teksten (> _INLINE_MAX tekens) gaan nu één keer naar een blob:
+
+  <project>/.regian_workflow_blobs/<sha[:2]>/<sha256>.gz
+
+en de run-state bewaart enkel een referentie {"$blob": sha, "size": n}. Dezelfde
+inhoud (artifact en log-entry, of een ongewijzigde revisie) deelt één blob.
+
+BlobDict is een dict die referenties pas oplost bij het lezen ([] / get / items /
+values); zo laden templates, de UI en skills enkel de blobs die ze nodig hebben.
+Opgeloste blobs blijven in een kleine LRU-cache (inhoud op basis van de hash
+verandert nooit).
+
+collect_garbage() verwijdert blobs waar geen enkele run van de state-map nog naar
+verwijst. Blobs jonger dan _GC_GRACE_S blijven staan, zodat een blob die net
+geschreven is maar nog niet in de state staat niet verdwijnt; put() van een
+bestaande blob ververst haar mtime.
+"""
+import functools
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Kortere teksten blijven inline in de run-state
+_INLINE_MAX = 1024
+# Blobs jonger dan dit worden nooit opgeruimd
+_GC_GRACE_S = 3600
+
+REF_KEY = "$blob"
+
+
+def is_ref(value: Any) -> bool:
+    """Is value een blob-referentie?"""
+    return isinstance(value, dict) and REF_KEY in value
+
+
+@functools.lru_cache(maxsize=32)
+def _read_blob(path: str) -> str:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+class BlobStore:
+    """Blobs van één project (of de werkmap)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, sha: str) -> Path:
+        return self.root / sha[:2] / f"{sha}.gz"
+
+    def put(self, text: str) -> dict:
+        """Bewaar text (als ze nog niet bestaat) en geef de referentie terug."""
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.path(sha)
+        if path.exists():
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{sha}.{threading.get_ident()}.tmp")
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return {REF_KEY: sha, "size": len(text)}
+
+    def get(self, ref: dict) -> str:
+        """De tekst achter een referentie."""
+        try:
+            return _read_blob(str(self.path(ref[REF_KEY])))
+        except OSError as e:
+            logger.warning(f"[Blobs] Blob {ref[REF_KEY][:12]} niet leesbaar: {e}")
+            return f"❌ Blob {ref[REF_KEY][:12]} ontbreekt"
+
+    def externalize(self, value: Any) -> Any:
+        """Lange tekst → referentie; al het andere blijft ongewijzigd."""
+        if isinstance(value, str) and len(value) > _INLINE_MAX:
+            return self.put(value)
+        return value
+
+
+class BlobDict(dict):
+    """
+    Dict waarvan waarden blob-referenties mogen zijn; lezen lost ze op.
+    raw() geeft de opgeslagen vorm (met referenties) voor de run-state.
+    """
+
+    def __init__(self, *args, store: Optional[BlobStore] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+
+    def _resolve(self, value):
+        if is_ref(value) and self.store is not None:
+            return self.store.get(value)
+        return value
+
+    def __getitem__(self, key):
+        return self._resolve(super().__getitem__(key))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    # Een eigen __iter__ zorgt dat dict(x) en {**x} via __getitem__ lopen
+    def __iter__(self):
+        return super().__iter__()
+
+    def items(self):
+        return [(k, self._resolve(v)) for k, v in super().items()]
+
+    def values(self):
+        return [self._resolve(v) for v in super().values()]
+
+    def pop(self, key, *default):
+        return self._resolve(super().pop(key, *default))
+
+    def __reduce_ex__(self, protocol):
+        # copy/deepcopy/pickle bewaren de referenties, niet de opgeloste tekst
+        return (_rebuild, (self.raw(), self.store))
+
+    def raw(self) -> dict:
+        """De opgeslagen waarden (referenties of korte tekst) als gewone dict."""
+        return dict(super().items())
+
+    def set_raw(self, key, value) -> None:
+        """Zet een opgeslagen waarde zonder ze op te lossen."""
+        super().__setitem__(key, value)
+
+
+def _rebuild(raw: dict, store: Optional[BlobStore]) -> "BlobDict":
+    return BlobDict(raw, store=store)
+
+
+def wrap_entry(entry: dict, store: BlobStore) -> BlobDict:
+    """Een phase_log-entry (met eventuele takken) als BlobDict."""
+    wrapped = BlobDict(entry if not isinstance(entry, BlobDict) else entry.raw(), store=store)
+    branches = wrapped.raw().get("branches")
+    if isinstance(branches, list):
+        wrapped.set_raw("branches", [wrap_entry(b, store) if isinstance(b, dict) else b for b in branches])
+    return wrapped
+
+
+def externalize_map(values: BlobDict) -> dict:
+    """
+    Zet lange waarden van een BlobDict om naar referenties (in place, zodat de
+    tekst uit het geheugen kan) en geef de opslagvorm terug.
+    """
+    out = {}
+    for key, value in values.raw().items():
+        if isinstance(value, list):
+            value = [externalize_entry(v, values.store) if isinstance(v, BlobDict) else v for v in value]
+            out[key] = value
+            continue
+        stored = values.store.externalize(value) if values.store is not None else value
+        if stored is not value:
+            values.set_raw(key, stored)
+        out[key] = stored
+    return out
+
+
+def externalize_entry(entry: BlobDict, store: BlobStore) -> dict:
+    """Opslagvorm van een phase_log-entry; lange velden en takken worden blobs."""
+    if entry.store is None:
+        entry.store = store
+    return externalize_map(entry)
+
+
+def refs_in(value: Any, found: Optional[set] = None) -> set:
+    """Alle blob-hashes waarnaar een (geneste) run-state verwijst."""
+    found = set() if found is None else found
+    if is_ref(value):
+        found.add(value[REF_KEY])
+    elif isinstance(value, dict):
+        for v in value.values():
+            refs_in(v, found)
+    elif isinstance(value, list):
+        for v in value:
+            refs_in(v, found)
+    return found
+
+
+def collect_garbage(store: BlobStore, states: Iterable[dict]) -> tuple[int, int]:
+    """
+    Verwijder blobs waarnaar geen van de gegeven run-states (opslagvorm) verwijst.
+    Geeft (aantal verwijderd, vrijgekomen bytes) terug.
+    """
+    referenced: set = set()
+    for state in states:
+        refs_in(state, referenced)
+    removed = freed = 0
+    cutoff = time.time() - _GC_GRACE_S
+    for path in store.root.glob("*/*.gz"):
+        if path.stem in referenced:
+            continue
+        try:
+            stat = path.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            path.unlink()
+        except OSError:
+            continue
+        removed += 1
+        freed += stat.st_size
+    return removed, freed
+
+
+_stores: dict[str, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(root: Path) -> BlobStore:
+    """De BlobStore voor een blob-map (gedeeld per pad)."""
+    key = str(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BlobStore(root)
+        return store
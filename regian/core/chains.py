@@ -0,0 +1,197 @@
+# regian/core/chains.py
+"""
+Afhankelijkheden tussen geplande taken: een taak die start zodra andere taken
+klaar zijn, in plaats van met een gegokte tijdsverschuiving ("backup om 02:00,
+push om 02:15, samenvatting om 02:30").
+
+Een taak heeft twee soorten randen in haar definitie:
+  after:         [job_ids]  → start als álle ouders geslaagd zijn (fan-in)
+  after_failure: [job_ids]  → start zodra één van deze ouders faalt
+
+Schema: 'na <job_id>[, <job_id>…]' (of 'after …') plant een taak die enkel via
+haar ouders vuurt; 'na mislukking van <job_id>' (of 'after failure of …')
+idem voor de foutrand. Een taak met een gewoon tijdschema kan daarnaast ook
+ouders hebben (zie chain_job).
+
+Na elke run meldt de scheduler de uitkomst aan de Chains-tracker. Die houdt per
+afhankelijke taak bij welke ouders sinds haar vorige start geslaagd zijn en vuurt
+ze zodra de set volledig is — via next_run_time = nu, zodat pools,
+max_instances, leases en historiek gewoon gelden. Onafhankelijke takken lopen
+zo parallel in hun pools. De voortgang van een fan-in leeft enkel in het geheugen.
+"""
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from apscheduler.triggers.base import BaseTrigger
+
+logger = logging.getLogger(__name__)
+
+AFTER_PATTERN = re.compile(
+    r"^(?:na|after)\s+(?:(?:mislukking|falen|failure)\s+(?:van|of)\s+)?(.+)$", re.I
+)
+_FAILURE_PATTERN = re.compile(r"^(?:na|after)\s+(?:mislukking|falen|failure)\s+(?:van|of)\s+", re.I)
+
+# Een afhankelijke taak vuurt nooit vanzelf
+_IDLE = timedelta(days=365 * 100)
+
+
+def parse_parents(text: str) -> list[str]:
+    """'a, b en c' / 'a,b' → ['a', 'b', 'c'] (volgorde behouden, zonder dubbels)."""
+    parts = re.split(r"\s*(?:,|\ben\b|\band\b)\s*", text.strip())
+    return list(dict.fromkeys(p.strip() for p in parts if p.strip()))
+
+
+class AfterTrigger(BaseTrigger):
+    """APScheduler-trigger voor een afhankelijke taak; het vuren gebeurt door de ouders."""
+
+    def __init__(self, parents: Iterable[str], on_failure: bool = False):
+        self.parents = list(parents)
+        self.on_failure = on_failure
+
+    @property
+    def field(self) -> str:
+        """Het taakveld waarin deze randen bewaard worden."""
+        return "after_failure" if self.on_failure else "after"
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        return now + _IDLE
+
+    def __str__(self):
+        return ("na mislukking van " if self.on_failure else "na ") + ", ".join(self.parents)
+
+    def __repr__(self):
+        return f"<AfterTrigger (parents={self.parents}, on_failure={self.on_failure})>"
+
+
+def parse_after(schedule_str: str) -> Optional[AfterTrigger]:
+    """AfterTrigger voor een 'na …'-schema, of None als het geen afhankelijkheid is."""
+    m = AFTER_PATTERN.match(schedule_str.strip())
+    if not m:
+        return None
+    parents = parse_parents(m.group(1))
+    if not parents:
+        return None
+    return AfterTrigger(parents, on_failure=bool(_FAILURE_PATTERN.match(schedule_str.strip())))
+
+
+def _edges(job: dict) -> list[str]:
+    return list(job.get("after") or []) + list(job.get("after_failure") or [])
+
+
+def find_cycle(jobs: dict, job_id: str, parents: Iterable[str]) -> Optional[list[str]]:
+    """
+    Zou job_id met deze extra ouders een cyclus vormen? Geeft de kring terug
+    (job_id → ouder → … → job_id, telkens 'wacht op'), of None.
+    """
+    for parent in parents:
+        stack = [[parent]]
+        seen = set()
+        while stack:
+            path = stack.pop()
+            current = path[-1]
+            if current == job_id:
+                return [job_id] + path
+            if current in seen:
+                continue
+            seen.add(current)
+            for grand in _edges(jobs.get(current) or {}):
+                stack.append(path + [grand])
+    return None
+
+
+def dependents(jobs: dict, job_id: str) -> dict[str, list[str]]:
+    """Taken die op job_id wachten: job_id → ['succes'] / ['mislukking'] / beide."""
+    result = {}
+    for dep_id, job in jobs.items():
+        kinds = []
+        if job_id in (job.get("after") or []):
+            kinds.append("succes")
+        if job_id in (job.get("after_failure") or []):
+            kinds.append("mislukking")
+        if kinds:
+            result[dep_id] = kinds
+    return result
+
+
+class Chains:
+    """Houdt de fan-in per afhankelijke taak bij en vuurt taken waarvan de ouders klaar zijn."""
+
+    def __init__(self, on_fire: Callable[[str], None]):
+        self._on_fire = on_fire
+        self._done: dict[str, set] = {}   # afhankelijke taak → geslaagde ouders sinds vorige start
+        self._firings: dict[str, str] = {}   # afgevuurde taak → '<ouder>:<run-id>' dat haar startte
+        self._lock = threading.Lock()
+
+    def pending(self, job_id: str) -> set:
+        """Ouders van job_id die al geslaagd zijn in de lopende fan-in."""
+        with self._lock:
+            return set(self._done.get(job_id, ()))
+
+    def finished(self, job_id: str, ok: bool, jobs: dict, run_id: str = "") -> list[str]:
+        """
+        Meld de uitkomst van een run. Geeft de taken terug die afgevuurd werden;
+        hun firing-id (ouder + run_id) is op te halen met take_firing().
+        """
+        ready = []
+        with self._lock:
+            for dep_id, job in jobs.items():
+                if dep_id == job_id or not job.get("enabled", True):
+                    continue
+                after = list(job.get("after") or [])
+                if job_id in after:
+                    done = self._done.setdefault(dep_id, set())
+                    if ok:
+                        done.add(job_id)
+                        if done >= set(after):
+                            done.clear()
+                            ready.append(dep_id)
+                            continue
+                    else:
+                        # Een gefaalde ouder blokkeert de succesrand tot hij opnieuw slaagt
+                        done.discard(job_id)
+                if not ok and job_id in (job.get("after_failure") or []):
+                    ready.append(dep_id)
+            for dep_id in ready:
+                self._firings[dep_id] = f"{job_id}:{run_id}"
+        for dep_id in ready:
+            try:
+                self._on_fire(dep_id)
+            except Exception as e:
+                logger.warning(f"[Chain] Kon taak '{dep_id}' niet starten na '{job_id}': {e}")
+        return ready
+
+    def take_firing(self, job_id: str) -> str:
+        """Het firing-id van de laatste start door een ouder (en vergeet het); leeg als er geen is."""
+        with self._lock:
+            return self._firings.pop(job_id, "")
+
+    def forget(self, job_id: str) -> None:
+        """Vergeet de fan-in van een taak (en haar rol als ouder)."""
+        with self._lock:
+            self._done.pop(job_id, None)
+            self._firings.pop(job_id, None)
+            for done in self._done.values():
+                done.discard(job_id)
+
+
+_chains: Optional[Chains] = None
+_chains_lock = threading.Lock()
+
+
+def _fire_now(job_id: str) -> None:
+    """Zet de volgende run van de APScheduler-job op nu."""
+    from regian.core.scheduler import get_scheduler
+    scheduler = get_scheduler()
+    scheduler.modify_job(job_id, next_run_time=datetime.now(scheduler.timezone))
+
+
+def get_chains() -> Chains:
+    """De procesbrede Chains-tracker."""
+    global _chains
+    with _chains_lock:
+        if _chains is None:
+            _chains = Chains(_fire_now)
+        return _chains
@@ -0,0 +1,222 @@
+# regian/core/daemon.py
+"""
+Scheduler-daemon: één proces dat de geplande taken uitvoert.
+
+Zonder daemon start elk proces dat de scheduler aanraakt (dashboard, CLI)
+zijn eigen BackgroundScheduler, waardoor een taak eenmaal per proces vuurt.
+Met `python main.py --scheduler` draait de scheduler in één daemonproces
+dat luistert op een Unix-socket (standaard .regian_scheduler.sock naast het
+jobs-bestand, of SCHEDULER_SOCKET).
+
+Protocol: één JSON-regel per verbinding, {"op", "args", "kwargs"} →
+{"ok": true, "result": ...} of {"ok": false, "error": "..."}.
+De publieke functies in core/scheduler.py (add/remove/toggle/update/
+run_job_now_by_id/get_next_run/get_job_stats/get_queue_depth) sturen hun
+aanroep door naar de daemon als die bereikbaar is, en werken anders
+gewoon in-process zoals voorheen.
+"""
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Hoe lang het resultaat van een beschikbaarheidscheck geldig blijft
+_AVAILABILITY_TTL = 2.0
+_CONNECT_TIMEOUT = 1.0
+_CALL_TIMEOUT = 10.0
+
+# True in het daemonproces zelf: daar wordt nooit doorgestuurd
+_is_daemon = False
+_availability: dict = {"path": None, "checked": 0.0, "up": False}
+_availability_lock = threading.Lock()
+
+
+class DaemonUnavailable(Exception):
+    """De scheduler-daemon is niet bereikbaar."""
+
+
+class DaemonOutcomeUnknown(RuntimeError):
+    """Het verzoek is (mogelijk) bij de daemon aangekomen, maar er kwam geen antwoord."""
+
+
+def _get_socket_path() -> Path:
+    from regian.settings import get_scheduler_socket
+    custom = get_scheduler_socket()
+    if custom:
+        return Path(custom).expanduser()
+    from regian.core.scheduler import _get_jobs_file
+    return _get_jobs_file().parent / ".regian_scheduler.sock"
+
+
+def is_daemon_process() -> bool:
+    """True als dit proces zelf de scheduler-daemon is."""
+    return _is_daemon
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+def _request(path: Path, payload: dict, timeout: Optional[float]) -> dict:
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError) as e:   # bv. geen AF_UNIX op dit platform
+        raise DaemonUnavailable(str(e))
+    try:
+        sock.settimeout(_CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except OSError as e:
+            raise DaemonUnavailable(str(e))
+        sock.settimeout(timeout)
+        try:
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        except OSError as e:   # ook socket.timeout: de daemon hangt of viel weg
+            # De daemon kan het verzoek al uitgevoerd hebben: niet opnieuw proberen
+            raise DaemonOutcomeUnknown(f"Geen antwoord van de daemon; uitkomst onbekend: {e}")
+    finally:
+        sock.close()
+    if not line:
+        raise DaemonOutcomeUnknown("Verbinding gesloten zonder antwoord; uitkomst onbekend.")
+    return json.loads(line.decode("utf-8"))
+
+
+def call(op: str, *args, timeout: Optional[float] = _CALL_TIMEOUT, **kwargs):
+    """
+    Voer een operatie uit in de daemon en geef het resultaat terug.
+    Gooit DaemonUnavailable als er geen daemon luistert, DaemonOutcomeUnknown als
+    het antwoord uitblijft na het versturen, RuntimeError bij een fout in de daemon.
+    """
+    response = _request(_get_socket_path(), {"op": op, "args": list(args), "kwargs": kwargs}, timeout)
+    if not response.get("ok"):
+        raise RuntimeError(f"Scheduler-daemon: {response.get('error', 'onbekende fout')}")
+    return response.get("result")
+
+
+def daemon_available(refresh: bool = False) -> bool:
+    """
+    True als een scheduler-daemon bereikbaar is (nooit in de daemon zelf).
+    Het resultaat wordt kort gecachet zodat een UI-rerun niet telkens verbindt.
+    """
+    if _is_daemon:
+        return False
+    path = _get_socket_path()
+    now = time.monotonic()
+    with _availability_lock:
+        cached = _availability["path"] == path and now - _availability["checked"] < _AVAILABILITY_TTL
+        if cached and not refresh:
+            return _availability["up"]
+    up = False
+    if path.exists():
+        try:
+            up = _request(path, {"op": "ping"}, _CONNECT_TIMEOUT).get("ok", False)
+        except (DaemonUnavailable, DaemonOutcomeUnknown, OSError, ValueError):
+            up = False
+    with _availability_lock:
+        _availability.update(path=path, checked=now, up=up)
+    return up
+
+
+def mark_unavailable() -> None:
+    """Vergeet het gecachete resultaat (bv. na een mislukte aanroep)."""
+    with _availability_lock:
+        _availability.update(path=None, checked=0.0, up=False)
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line.decode("utf-8"))
+            op = request.get("op")
+            if op == "ping":
+                result = os.getpid()
+            else:
+                from regian.core.scheduler import _RPC_OPS
+                func = _RPC_OPS.get(op)
+                if func is None:
+                    raise ValueError(f"Onbekende operatie '{op}'.")
+                result = func(*request.get("args", []), **request.get("kwargs", {}))
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            logger.warning(f"[Daemon] Aanroep faalde: {e}")
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def start_server(socket_path: Optional[Path] = None) -> Optional[_Server]:
+    """
+    Bind de IPC-socket en bedien aanroepen in een achtergrondthread.
+    Geeft None als er al een daemon op deze socket luistert.
+    """
+    path = Path(socket_path) if socket_path else _get_socket_path()
+    if path.exists():
+        try:
+            _request(path, {"op": "ping"}, _CONNECT_TIMEOUT)
+            return None
+        except (DaemonUnavailable, DaemonOutcomeUnknown, OSError, ValueError):
+            path.unlink()   # achtergebleven socket van een gecrasht proces
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = _Server(str(path), _Handler)
+    os.chmod(path, 0o600)
+    thread = threading.Thread(target=server.serve_forever, name="regian-scheduler-ipc", daemon=True)
+    thread.start()
+    return server
+
+
+def stop_server(server: _Server) -> None:
+    """Stop de IPC-server en ruim de socket op."""
+    path = server.server_address
+    server.shutdown()
+    server.server_close()
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def serve(socket_path: Optional[Path] = None) -> int:
+    """
+    Draai als scheduler-daemon tot SIGINT/SIGTERM. Geeft een exitcode terug
+    (1 als er al een daemon actief is).
+    """
+    global _is_daemon
+    from regian.core import scheduler
+    from regian.core.jobstore import flush_all
+
+    server = start_server(socket_path)
+    if server is None:
+        print(f"⚠️  Er draait al een scheduler-daemon op {socket_path or _get_socket_path()}.")
+        return 1
+    _is_daemon = True
+    sched = scheduler.get_scheduler()
+    print(f"⏰ Scheduler-daemon actief ({len(sched.get_jobs())} taken) op {server.server_address}")
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    try:
+        stop.wait()
+    finally:
+        stop_server(server)
+        sched.shutdown(wait=False)
+        flush_all()
+        _is_daemon = False
+        print("👋 Scheduler-daemon gestopt.")
+    return 0
@@ -0,0 +1,359 @@
+# regian/core/jobstore.py
+"""
+In-memory job-tabel voor de scheduler met write-through naar schijf.
+
+Definities (task, type, schedule, enabled, ...) en run-state
+(last_run, last_status, last_output) worden apart bewaard:
+
+  regian_jobs.json         → definities; enkel herschreven bij een wijziging
+  regian_jobs.state.json   → run-state; gebundeld weggeschreven (coalesced)
+  regian_jobs.history.json → ringbuffer van de laatste N runs per job; idem
+
+Lezen gebeurt uit het geheugen. Elke schrijfactie is atomair (tijdelijk
+bestand + fsync + os.replace). Wordt een bestand buiten Regian om gewijzigd
+(andere mtime/grootte), dan wordt het bij de volgende toegang herladen.
+Lezers kunnen zich via subscribe() laten verwittigen van wijzigingen.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Velden die bij elke run veranderen en dus niet in de definities thuishoren
+RUN_STATE_FIELDS = {
+    "last_run", "last_status", "last_output",
+    "last_output_hash", "last_change", "unchanged_runs",
+}
+
+# Hoe lang run-state-wijzigingen gebundeld worden vóór ze naar schijf gaan
+_STATE_FLUSH_DELAY = 1.0
+
+
+def _atomic_write(path: Path, data: dict) -> None:
+    """Schrijf JSON atomair en duurzaam: tijdelijk bestand → fsync → os.replace."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _signature(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _split(job: dict) -> tuple[dict, dict]:
+    """Splits een samengevoegde job in (definitie, run-state)."""
+    definition = {k: v for k, v in job.items() if k not in RUN_STATE_FIELDS}
+    state = {k: v for k, v in job.items() if k in RUN_STATE_FIELDS}
+    return definition, state
+
+
+class JobStore:
+    """Thread-veilige job-tabel met gescheiden definities en run-state."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.state_path = self.path.with_name(f"{self.path.stem}.state{self.path.suffix or '.json'}")
+        self.history_path = self.path.with_name(f"{self.path.stem}.history{self.path.suffix or '.json'}")
+        self._lock = threading.RLock()
+        self._defs: dict[str, dict] = {}
+        self._state: dict[str, dict] = {}
+        self._def_sig: Optional[tuple] = None
+        self._state_sig: Optional[tuple] = None
+        self._history: dict[str, list[dict]] = {}
+        self._history_sig: Optional[tuple] = None
+        self._state_dirty = False
+        self._history_dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._listeners: list[Callable[[str, Optional[str]], None]] = []
+        self.version = 0
+        self._load()
+        self._load_history()
+
+    # ── Laden ─────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        defs = _read_json(self.path)
+        state = _read_json(self.state_path)
+        # Oudere bestanden bewaarden run-state in de definities: overnemen
+        for job_id, job in list(defs.items()):
+            if not isinstance(job, dict):
+                defs.pop(job_id)
+                continue
+            definition, legacy = _split(job)
+            defs[job_id] = definition
+            if legacy:
+                state.setdefault(job_id, legacy)
+        self._defs = defs
+        if not self._state_dirty:
+            self._state = {k: v for k, v in state.items() if isinstance(v, dict)}
+        self._def_sig = _signature(self.path)
+        self._state_sig = _signature(self.state_path)
+
+    def _load_history(self) -> None:
+        self._history = {
+            k: v for k, v in _read_json(self.history_path).items() if isinstance(v, list)
+        }
+        self._history_sig = _signature(self.history_path)
+
+    def _check_external(self) -> bool:
+        """Herlaad als een bestand buiten deze store om gewijzigd werd."""
+        if _signature(self.path) == self._def_sig and (
+            self._state_dirty or _signature(self.state_path) == self._state_sig
+        ):
+            return False
+        self._load()
+        self.version += 1
+        return True
+
+    # ── Lezen ─────────────────────────────────────────────────
+
+    def all(self) -> dict[str, dict]:
+        """Alle jobs (definitie + run-state samengevoegd), als kopie per job."""
+        with self._lock:
+            reloaded = self._check_external()
+            result = {job_id: {**d, **self._state.get(job_id, {})} for job_id, d in self._defs.items()}
+        if reloaded:
+            self._notify("reloaded", None)
+        return result
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Eén job (samengevoegd), of None."""
+        with self._lock:
+            reloaded = self._check_external()
+            d = self._defs.get(job_id)
+            result = {**d, **self._state.get(job_id, {})} if d is not None else None
+        if reloaded:
+            self._notify("reloaded", None)
+        return result
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            self._check_external()
+            return job_id in self._defs
+
+    # ── Schrijven: definities (onmiddellijk) ──────────────────
+
+    def _write_defs(self) -> None:
+        _atomic_write(self.path, self._defs)
+        self._def_sig = _signature(self.path)
+        self.version += 1
+
+    def put(self, job_id: str, job: dict) -> None:
+        """Voeg een job toe of vervang hem volledig."""
+        with self._lock:
+            self._check_external()
+            event = "updated" if job_id in self._defs else "added"
+            definition, state = _split(job)
+            self._defs[job_id] = definition
+            if state or job_id not in self._state:
+                self._state[job_id] = state
+            self._write_defs()
+            self._schedule_state_flush()
+        self._notify(event, job_id)
+
+    def update(self, job_id: str, **fields) -> bool:
+        """Werk velden van een job bij; None verwijdert het veld. Geeft False als de job niet bestaat."""
+        with self._lock:
+            self._check_external()
+            if job_id not in self._defs:
+                return False
+            definition, state = _split(fields)
+            for key, value in definition.items():
+                if value is None:
+                    self._defs[job_id].pop(key, None)
+                else:
+                    self._defs[job_id][key] = value
+            if definition:
+                self._write_defs()
+            if state:
+                self._apply_state(job_id, state)
+        self._notify("updated", job_id)
+        return True
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            self._check_external()
+            if job_id not in self._defs:
+                return False
+            del self._defs[job_id]
+            self._state.pop(job_id, None)
+            if self._history.pop(job_id, None) is not None:
+                self._history_dirty = True
+            self._write_defs()
+            self._schedule_state_flush()
+        self._notify("removed", job_id)
+        return True
+
+    def replace_all(self, jobs: dict) -> None:
+        """Vervang de volledige tabel (definities én run-state) en schrijf meteen weg."""
+        with self._lock:
+            self._defs, self._state = {}, {}
+            for job_id, job in jobs.items():
+                self._defs[job_id], self._state[job_id] = _split(job)
+            self._write_defs()
+            self._flush_state_locked()
+        self._notify("reloaded", None)
+
+    # ── Schrijven: run-state (gebundeld) ──────────────────────
+
+    def update_state(self, job_id: str, **fields) -> bool:
+        """
+        Werk run-state bij (last_run, last_status, ...). Wordt gebundeld
+        weggeschreven; de definities worden niet aangeraakt.
+        """
+        with self._lock:
+            if job_id not in self._defs:
+                return False
+            self._apply_state(job_id, fields)
+        self._notify("state", job_id)
+        return True
+
+    def _apply_state(self, job_id: str, fields: dict) -> None:
+        state = self._state.setdefault(job_id, {})
+        for key, value in fields.items():
+            state[key] = value
+        self.version += 1
+        self._schedule_state_flush()
+
+    def _schedule_state_flush(self) -> None:
+        self._state_dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(_STATE_FLUSH_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_state_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        state = {k: v for k, v in self._state.items() if k in self._defs and v}
+        _atomic_write(self.state_path, state)
+        self._state_sig = _signature(self.state_path)
+        self._state_dirty = False
+        if self._history_dirty:
+            history = {k: v for k, v in self._history.items() if k in self._defs and v}
+            _atomic_write(self.history_path, history)
+            self._history_sig = _signature(self.history_path)
+            self._history_dirty = False
+
+    def flush(self) -> None:
+        """Schrijf openstaande run-state en historiek nu weg."""
+        with self._lock:
+            if not (self._state_dirty or self._history_dirty):
+                self._timer = None
+                return
+            try:
+                self._flush_state_locked()
+            except OSError as e:
+                self._timer = None
+                logger.warning(f"[Jobs] Kon run-state niet opslaan naar {self.state_path}: {e}")
+
+    # ── Run-historiek (ringbuffer) ────────────────────────────
+
+    def record_run(self, job_id: str, entry: dict, size: int) -> list[dict]:
+        """
+        Voeg een run toe aan de historiek van een job en houd er hoogstens
+        `size` bij. Wordt gebundeld weggeschreven, net als run-state.
+        Geeft de weggevallen (oudste) runs terug.
+        """
+        with self._lock:
+            if job_id not in self._defs:
+                return []
+            runs = self._history.setdefault(job_id, [])
+            runs.append(dict(entry))
+            dropped = runs[:-size] if size > 0 else []
+            del runs[:len(dropped)]
+            self._history_dirty = True
+            self._schedule_state_flush()
+        return dropped
+
+    def history(self, job_id: str) -> list[dict]:
+        """De bewaarde runs van een job, oudste eerst (kopie)."""
+        with self._lock:
+            # Een ander proces (bv. de scheduler-daemon) kan runs toegevoegd hebben
+            if not self._history_dirty and _signature(self.history_path) != self._history_sig:
+                self._load_history()
+            return [dict(run) for run in self._history.get(job_id, [])]
+
+    # ── Change events ─────────────────────────────────────────
+
+    def subscribe(self, callback: Callable[[str, Optional[str]], None]) -> Callable[[], None]:
+        """
+        Registreer callback(event, job_id) voor 'added', 'updated', 'removed',
+        'state' en 'reloaded' (job_id None). Geeft een functie terug om af te melden.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._listeners:
+                    self._listeners.remove(callback)
+        return unsubscribe
+
+    def _notify(self, event: str, job_id: Optional[str]) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event, job_id)
+            except Exception as e:
+                logger.warning(f"[Jobs] Listener faalde bij '{event}': {e}")
+
+
+# ── Eén store per bestand ─────────────────────────────────────────────────────
+
+_stores: dict[Path, JobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: Path) -> JobStore:
+    """Geeft de (gedeelde) JobStore voor dit jobs-bestand terug."""
+    key = Path(path).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = JobStore(key)
+        return store
+
+
+def flush_all() -> None:
+    """Schrijf openstaande run-state van alle stores weg."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
+
+
+atexit.register(flush_all)
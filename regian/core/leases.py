@@ -0,0 +1,214 @@
+# regian/core/leases.py
+"""
+Leases voor gedistribueerde uitvoering van cron-taken over meerdere Regian-nodes.
+
+Draaien meerdere nodes (hosts of processen) tegen dezelfde werkmap, dan vuurt
+elke taak op elke node. Met SCHEDULER_LEASE_DB (pad naar een gedeeld
+SQLite-bestand) claimt een node eerst een lease voor de taak vóór ze wordt
+uitgevoerd:
+
+- Een lease hoort bij één node en verloopt na LEASE_TTL seconden; zolang de
+  taak loopt, verlengt een heartbeat-thread hem. Crasht de node, dan verloopt
+  de lease en neemt een andere node de volgende firing over.
+- Dezelfde firing wordt niet twee keer uitgevoerd: een claim faalt ook als een
+  andere node de taak minder dan `min_gap` seconden geleden startte (de helft
+  van de kortste periode van het schema). Nodes waarvan de triggers
+  (licht) verschoven vuren, voeren zo samen één run per periode uit.
+- Bestands- en ketentriggers hebben geen periode (min_gap 0): zij geven de
+  firing een eigen id mee (de batch, of de run van de ouder). Een claim met
+  hetzelfde id als de laatste start faalt, dus elke batch loopt één keer, ook
+  als meerdere nodes dezelfde wijziging zien.
+
+Zonder SCHEDULER_LEASE_DB is dit alles uit en voert elke node zelf uit.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_leases (
+    job_id      TEXT PRIMARY KEY,
+    node        TEXT NOT NULL,
+    acquired    REAL NOT NULL,
+    expires     REAL NOT NULL,
+    last_start  REAL NOT NULL,
+    firing      TEXT NOT NULL DEFAULT ''
+)
+"""
+
+_node_id: Optional[str] = None
+
+
+def node_id() -> str:
+    """Identificatie van deze node: REGIAN_NODE_ID, anders '<host>:<pid>'."""
+    global _node_id
+    custom = os.getenv("REGIAN_NODE_ID", "").strip()
+    if custom:
+        return custom
+    if _node_id is None:
+        _node_id = f"{socket.gethostname()}:{os.getpid()}"
+    return _node_id
+
+
+class LeaseDB:
+    """Leases in een (gedeeld) SQLite-bestand. Elke operatie is één korte transactie."""
+
+    def __init__(self, path: Path, node: Optional[str] = None):
+        self.path = Path(path)
+        self.node = node or node_id()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(job_leases)")}
+            if "firing" not in columns:
+                # Bestand van een oudere versie; een andere node kan de kolom net toegevoegd hebben
+                try:
+                    conn.execute("ALTER TABLE job_leases ADD COLUMN firing TEXT NOT NULL DEFAULT ''")
+                except sqlite3.OperationalError:
+                    pass
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transacties expliciet met BEGIN IMMEDIATE
+        return sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+
+    def claim(self, job_id: str, ttl: float, min_gap: float = 0.0, firing: str = "") -> bool:
+        """
+        Claim de lease voor job_id. Faalt (False) als een andere node een
+        geldige lease heeft, als de taak minder dan min_gap seconden geleden
+        gestart werd, of als de laatste start dezelfde firing (niet-leeg id) was.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT node, expires, last_start, firing FROM job_leases WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row:
+                node, expires, last_start, last_firing = row
+                if expires > now and node != self.node:
+                    conn.execute("ROLLBACK")
+                    return False
+                if firing and firing == last_firing:
+                    conn.execute("ROLLBACK")
+                    return False
+                if now - last_start < min_gap:
+                    conn.execute("ROLLBACK")
+                    return False
+            conn.execute(
+                "INSERT INTO job_leases (job_id, node, acquired, expires, last_start, firing) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET node = excluded.node, acquired = excluded.acquired, "
+                "expires = excluded.expires, last_start = excluded.last_start, firing = excluded.firing",
+                (job_id, self.node, now, now + ttl, now, firing),
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def renew(self, job_id: str, ttl: float) -> bool:
+        """Verleng de eigen lease. False als de lease intussen verloren is."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE job_leases SET expires = ? WHERE job_id = ? AND node = ?",
+                (time.time() + ttl, job_id, self.node),
+            )
+            return cur.rowcount == 1
+
+    def release(self, job_id: str) -> None:
+        """Geef de eigen lease vrij; last_start blijft bewaard voor min_gap."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE job_leases SET expires = 0 WHERE job_id = ? AND node = ?",
+                (job_id, self.node),
+            )
+
+    def all(self) -> list[dict]:
+        """Alle leases met node, vervaltijd, laatste start (epoch-seconden) en firing-id."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job_id, node, acquired, expires, last_start, firing FROM job_leases ORDER BY job_id"
+            ).fetchall()
+        now = time.time()
+        return [
+            {"job_id": r[0], "node": r[1], "acquired": r[2], "expires": r[3],
+             "last_start": r[4], "firing": r[5], "active": r[3] > now}
+            for r in rows
+        ]
+
+
+class Lease:
+    """
+    Context manager rond één uitvoering: verlengt de lease periodiek
+    (elke ttl/3 s) en geeft hem vrij bij het verlaten.
+    """
+
+    def __init__(self, db: LeaseDB, job_id: str, ttl: float):
+        self.db = db
+        self.job_id = job_id
+        self.ttl = ttl
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.db.renew(self.job_id, self.ttl)
+            except sqlite3.Error:
+                pass
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._heartbeat, name=f"lease-{self.job_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        try:
+            self.db.release(self.job_id)
+        except sqlite3.Error:
+            pass
+        return False
+
+
+_dbs: dict[tuple, LeaseDB] = {}
+_dbs_lock = threading.Lock()
+
+
+def get_lease_db() -> Optional[LeaseDB]:
+    """De LeaseDB volgens SCHEDULER_LEASE_DB, of None als leases uit staan."""
+    from regian.settings import get_scheduler_lease_db
+    path = get_scheduler_lease_db()
+    if not path:
+        return None
+    key = (str(Path(path).expanduser().resolve()), node_id())
+    with _dbs_lock:
+        db = _dbs.get(key)
+        if db is None:
+            db = _dbs[key] = LeaseDB(Path(key[0]), key[1])
+        return db
+
+
+def acquire(job_id: str, min_gap: float = 0.0, firing: str = "") -> Optional[Lease]:
+    """
+    Claim een lease voor één uitvoering. Geeft een Lease (context manager)
+    terug, of None als een andere node de taak (of dezelfde firing) uitvoert
+    of net uitvoerde (of als leases uit staan — controleer dat vooraf met
+    get_lease_db()).
+    """
+    from regian.settings import get_lease_ttl
+    db = get_lease_db()
+    if db is None:
+        return None
+    ttl = get_lease_ttl()
+    if not db.claim(job_id, ttl, min_gap, firing):
+        return None
+    return Lease(db, job_id, ttl)
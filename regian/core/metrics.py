@@ -0,0 +1,276 @@
+# regian/core/metrics.py
+"""
+Prometheus-compatibele metrics voor Regian OS.
+
+Tellers en histogrammen worden in het geheugen bijgehouden door de scheduler,
+de SkillRegistry, de workflow-engine, de LLM-wrapper en de actie-log.
+Gauges worden pas bij het uitlezen berekend via een callback.
+
+render() geeft alles terug in het tekstformaat van Prometheus (versie 0.0.4).
+Met METRICS_PORT > 0 start get_scheduler() een kleine stdlib-HTTP-server
+die /metrics (en /healthz) serveert, zodat bestaande monitoring de
+dashboard-host kan scrapen. Geen externe afhankelijkheden.
+"""
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# naam → (type, help). Onbekende namen krijgen het type van hun registratie.
+_METRICS: dict[str, tuple[str, str]] = {
+    "regian_job_executions_total":     ("counter",   "Aantal uitgevoerde cron-taken per taak, type en status."),
+    "regian_job_duration_seconds":     ("histogram", "Duur van cron-taken in seconden."),
+    "regian_job_unchanged_total":      ("counter",   "Aantal runs met only_on_change waarvan status en output ongewijzigd bleven."),
+    "regian_job_chain_starts_total":   ("counter",   "Aantal taken gestart doordat hun ouder(s) klaar waren, per taak en ouder."),
+    "regian_job_misfires_total":       ("counter",   "Aantal gemiste cron-triggers (misfire) per taak."),
+    "regian_job_skipped_total":        ("counter",   "Aantal runs overgeslagen omdat max_instances bereikt was."),
+    "regian_job_lease_skips_total":    ("counter",   "Aantal firings overgeslagen omdat een andere node de lease had."),
+    "regian_job_replans_total":        ("counter",   "Aantal keer dat het plan van een prompt-taak met frozen_plan (opnieuw) werd opgesteld, per reden."),
+    "regian_job_frozen_runs_total":    ("counter",   "Aantal prompt-runs uitgevoerd met een bevroren plan (zonder planningsronde)."),
+    "regian_job_wait_seconds":         ("histogram", "Wachttijd van cron-taken tussen trigger en start, per taaktype."),
+    "regian_job_queue_depth":          ("gauge",     "Aantal cron-runs in de wachtrij per taaktype."),
+    "regian_watch_changes_total":      ("counter",   "Aantal door bestandstriggers gedetecteerde gewijzigde of nieuwe bestanden per taak."),
+    "regian_scheduler_jobs":           ("gauge",     "Aantal taken dat in de scheduler is ingepland."),
+    "regian_tool_calls_total":         ("counter",   "Aantal skill-aanroepen via de SkillRegistry per tool en status."),
+    "regian_tool_duration_seconds":    ("histogram", "Duur van skill-aanroepen in seconden."),
+    "regian_workflow_runs":            ("gauge",     "Aantal workflow-runs per status."),
+    "regian_workflow_phases_total":    ("counter",   "Aantal uitgevoerde workflowfasen per fasetype en status."),
+    "regian_llm_calls_total":          ("counter",   "Aantal LLM-aanroepen per model, bron en status."),
+    "regian_llm_duration_seconds":     ("histogram", "Latentie van LLM-aanroepen in seconden."),
+    "regian_llm_tokens_total":         ("counter",   "Aantal verbruikte tokens per model en richting."),
+    "regian_admission_wait_seconds":   ("histogram", "Wachttijd op een plaats in de toegangscontrole, per resource en prioriteitsklasse."),
+    "regian_admission_active":         ("gauge",     "Aantal lopende aanvragen per resource en prioriteitsklasse."),
+    "regian_admission_waiting":        ("gauge",     "Aantal wachtende aanvragen per resource en prioriteitsklasse."),
+    "regian_action_log_pending_writes": ("gauge",    "Aantal schrijfacties dat wacht op de actie-log."),
+    "regian_action_log_writes_total":  ("counter",   "Aantal geschreven actie-log-entries."),
+}
+
+_lock = threading.Lock()
+_counters: dict[str, dict[tuple, float]] = {}
+_histograms: dict[str, dict[tuple, list]] = {}   # labels → [bucket_counts..., sum, count]
+_gauges: dict[str, Callable[[], object]] = {}
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+# ── Registratie ───────────────────────────────────────────────────────────────
+
+def inc(name: str, value: float = 1.0, /, **labels) -> None:
+    """Verhoog een teller."""
+    key = _key(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, /, **labels) -> None:
+    """Registreer een waarneming (meestal seconden) in een histogram."""
+    key = _key(labels)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        row = series.get(key)
+        if row is None:
+            row = series[key] = [0] * len(_DEFAULT_BUCKETS) + [0.0, 0]
+        for i, bound in enumerate(_DEFAULT_BUCKETS):
+            if value <= bound:
+                row[i] += 1
+        row[-2] += value
+        row[-1] += 1
+
+
+def register_gauge(name: str, collect: Callable[[], object], help: str = "") -> None:
+    """
+    Registreer een gauge die bij het uitlezen berekend wordt.
+    collect() geeft een getal terug, of een lijst van (labels-dict, waarde).
+    """
+    if help and name not in _METRICS:
+        _METRICS[name] = ("gauge", help)
+    with _lock:
+        _gauges[name] = collect
+
+
+def _reset() -> None:
+    """Wis alle tellers en histogrammen (voor tests)."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ── Exposition ────────────────────────────────────────────────────────────────
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _header(lines: list, name: str, default_type: str):
+    kind, help_text = _METRICS.get(name, (default_type, ""))
+    if help_text:
+        lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render() -> str:
+    """Geeft alle metrics terug in het Prometheus-tekstformaat."""
+    with _lock:
+        counters = {n: dict(s) for n, s in _counters.items()}
+        histograms = {n: {k: list(v) for k, v in s.items()} for n, s in _histograms.items()}
+        gauges = dict(_gauges)
+
+    lines: list[str] = []
+    for name in sorted(counters):
+        _header(lines, name, "counter")
+        for key, value in sorted(counters[name].items()):
+            lines.append(f"{name}{_fmt_labels(key)} {_fmt_value(value)}")
+
+    for name in sorted(histograms):
+        _header(lines, name, "histogram")
+        for key, row in sorted(histograms[name].items()):
+            for i, bound in enumerate(_DEFAULT_BUCKETS):
+                lines.append(f"{name}_bucket{_fmt_labels(key, (('le', repr(bound)),))} {row[i]}")
+            lines.append(f"{name}_bucket{_fmt_labels(key, (('le', '+Inf'),))} {row[-1]}")
+            lines.append(f"{name}_sum{_fmt_labels(key)} {_fmt_value(round(row[-2], 6))}")
+            lines.append(f"{name}_count{_fmt_labels(key)} {row[-1]}")
+
+    for name in sorted(gauges):
+        try:
+            result = gauges[name]()
+        except Exception as e:
+            logger.debug(f"[Metrics] Gauge '{name}' faalde: {e}")
+            continue
+        _header(lines, name, "gauge")
+        if isinstance(result, (int, float)):
+            lines.append(f"{name} {_fmt_value(result)}")
+        else:
+            for labels, value in result:
+                lines.append(f"{name}{_fmt_labels(_key(labels))} {_fmt_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ── Standaard-gauges ──────────────────────────────────────────────────────────
+
+def _collect_scheduler_jobs():
+    from regian.core import scheduler
+    if scheduler._scheduler is None:
+        return 0
+    return len(scheduler._scheduler.get_jobs())
+
+
+def _collect_job_queue_depth():
+    from regian.core.scheduler import get_queue_depth
+    return [({"type": job_type}, n) for job_type, n in sorted(get_queue_depth().items())]
+
+
+def _collect_workflow_runs():
+    from regian.core.workflow import run_status_counts
+    return [({"status": status}, count) for status, count in sorted(run_status_counts().items())]
+
+
+def _collect_action_log_pending():
+    from regian.core.action_log import pending_writes
+    return pending_writes()
+
+
+def _collect_admission(key: str):
+    from regian.core.admission import status
+    return [
+        ({"resource": resource, "class": cls}, n)
+        for resource, gate in status().items()
+        for cls, n in gate[key].items()
+    ]
+
+
+register_gauge("regian_scheduler_jobs", _collect_scheduler_jobs)
+register_gauge("regian_job_queue_depth", _collect_job_queue_depth)
+register_gauge("regian_workflow_runs", _collect_workflow_runs)
+register_gauge("regian_action_log_pending_writes", _collect_action_log_pending)
+register_gauge("regian_admission_active", lambda: _collect_admission("active"))
+register_gauge("regian_admission_waiting", lambda: _collect_admission("waiting"))
+
+
+# ── HTTP-server ───────────────────────────────────────────────────────────────
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/metrics", "/"):
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/healthz":
+            body = b"ok\n"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        else:
+            body = b"not found\n"
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 — stil, geen stderr-ruis
+        logger.debug("[Metrics] " + format % args)
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[int]:
+    """
+    Start de metrics-server in een daemon-thread (idempotent).
+    Zonder port wordt METRICS_PORT gebruikt (0 = uit); zonder host METRICS_HOST.
+    Geeft de gebonden poort terug, of None als de server niet draait.
+    """
+    global _server
+    from regian.settings import get_metrics_port, get_metrics_host
+    if port is None:
+        port = get_metrics_port()
+        if port <= 0:
+            return None
+    if host is None:
+        host = get_metrics_host()
+    with _server_lock:
+        if _server is not None:
+            return _server.server_address[1]
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"[Metrics] Kon metrics-server niet starten op {host}:{port}: {e}")
+            return None
+        _server.daemon_threads = True
+        thread = threading.Thread(target=_server.serve_forever, name="regian-metrics", daemon=True)
+        thread.start()
+        logger.info(f"[Metrics] Metrics beschikbaar op http://{host}:{_server.server_address[1]}/metrics")
+        return _server.server_address[1]
+
+
+def stop_metrics_server() -> None:
+    """Stop de metrics-server (indien actief)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            return
+        _server.shutdown()
+        _server.server_close()
+        _server = None
+
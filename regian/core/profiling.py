@@ -0,0 +1,241 @@
+# regian/core/profiling.py
+"""
+Profilering op aanvraag voor skill-aanroepen en workflowfasen.
+
+Wanneer een tool (PROFILE_TOOLS) of fase (PROFILE_PHASES) is aangeduid,
+wordt de uitvoering omwikkeld met cProfile (CPU) en tracemalloc (geheugen).
+Het resultaat — top-N hotspots en allocatieplaatsen — wordt als JSON bewaard
+in .regian_profiles/<profile_id>.json. Het profile_id wordt meegegeven aan
+de eerstvolgende log_action()-entry voor dezelfde tool, of aan de phase_log
+van de workflow-run, zodat het profiel naast de actie terug te vinden is.
+
+Profilering is standaard uit en kost niets zolang niets is aangeduid.
+"""
+import cProfile
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+_MAX_PROFILES = 100
+
+
+def _get_profile_dir() -> Path:
+    return Path(__file__).parent.parent.parent / ".regian_profiles"
+
+
+def _get_top_n() -> int:
+    try:
+        from regian.settings import get_profile_top_n
+        return get_profile_top_n()
+    except Exception:
+        return 20
+
+
+# Per thread: actief profiel (geen geneste cProfile) en het laatst bewaarde id
+_local = threading.local()
+
+# tracemalloc is proces-breed: tel hoeveel profielen het nodig hebben
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_owned = False
+
+
+def is_profiled(kind: str, name: str, workflow_id: str = "") -> bool:
+    """
+    Geeft True als een tool ('tool') of fase ('phase') geprofileerd moet worden.
+    Fasen matchen op '<fase_id>', '<workflow_id>:<fase_id>' of '*'.
+    """
+    try:
+        from regian.settings import get_profile_tools, get_profile_phases
+        targets = get_profile_tools() if kind == "tool" else get_profile_phases()
+    except Exception:
+        return False
+    if not targets:
+        return False
+    if "*" in targets or name in targets:
+        return True
+    return bool(workflow_id) and f"{workflow_id}:{name}" in targets
+
+
+def _start_tracing() -> bool:
+    """Start tracemalloc indien nodig. Geeft True als wij het gestart hebben."""
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        _trace_users += 1
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(10)
+        _trace_owned = True
+        return True
+
+
+def _stop_tracing():
+    """Stop tracemalloc als het laatste profiel klaar is (enkel als wij het startten)."""
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        _trace_users = max(0, _trace_users - 1)
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+
+def _hotspots(profiler: cProfile.Profile, top_n: int) -> tuple[list[dict], float]:
+    """Zet cProfile-statistieken om naar een lijst, gesorteerd op eigen tijd."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    total = 0.0
+    for (filename, lineno, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        total += tt
+        rows.append({
+            "function": f"{func} ({Path(filename).name}:{lineno})" if lineno else func,
+            "file": filename,
+            "calls": nc,
+            "self_ms": round(tt * 1000, 3),
+            "cumulative_ms": round(ct * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["self_ms"], reverse=True)
+    return rows[:top_n], round(total * 1000, 3)
+
+
+def _allocations(before, after, top_n: int) -> list[dict]:
+    """Vergelijk twee tracemalloc-snapshots en geef de grootste groeiers terug."""
+    stats = after.compare_to(before, "lineno")
+    rows = []
+    for stat in stats:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        rows.append({
+            "site": f"{Path(frame.filename).name}:{frame.lineno}",
+            "file": frame.filename,
+            "size_kb": round(stat.size_diff / 1024, 2),
+            "count": stat.count_diff,
+        })
+        if len(rows) >= top_n:
+            break
+    return rows
+
+
+def _save(profile: dict):
+    folder = _get_profile_dir()
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{profile['id']}.json"
+    path.write_text(json.dumps(profile, ensure_ascii=False, indent=2), encoding="utf-8")
+    # Oudste profielen opruimen
+    files = sorted(folder.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in files[:-_MAX_PROFILES]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+@contextmanager
+def profile_scope(kind: str, name: str, **context):
+    """
+    Profileer het blok met cProfile en tracemalloc en bewaar het resultaat.
+    Binnen een al geprofileerd blok in dezelfde thread wordt niet opnieuw
+    geprofileerd; het buitenste profiel bevat de geneste aanroepen al.
+    Yieldt een dict waarin na afloop 'id' staat (of None bij overslaan).
+    """
+    holder: dict = {"id": None}
+    if getattr(_local, "active", False):
+        yield holder
+        return
+
+    _local.active = True
+    profiler = cProfile.Profile()
+    started_tracing = _start_tracing()
+    if not started_tracing:
+        tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    error = None
+    t0 = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Een andere profiler is al actief (bv. een debugger) — enkel geheugen meten
+        profiler = None
+    try:
+        yield holder
+    except BaseException as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        wall_ms = round((time.perf_counter() - t0) * 1000, 3)
+        after = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        _stop_tracing()
+        _local.active = False
+
+        top_n = _get_top_n()
+        hotspots, cpu_ms = _hotspots(profiler, top_n) if profiler is not None else ([], 0.0)
+        profile = {
+            "id": f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}",
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "kind": kind,
+            "name": name,
+            "context": {k: v for k, v in context.items() if v},
+            "wall_ms": wall_ms,
+            "cpu_ms": cpu_ms,
+            "peak_kb": round(peak / 1024, 2),
+            "hotspots": hotspots,
+            "allocations": _allocations(before, after, top_n),
+        }
+        if error:
+            profile["error"] = error
+        try:
+            _save(profile)
+            holder["id"] = profile["id"]
+            _local.pending = (kind, name, profile["id"])
+        except OSError:
+            pass
+
+
+def take_pending_profile(kind: str, name: str) -> Optional[str]:
+    """
+    Geeft het id van het laatst bewaarde profiel in deze thread terug als het
+    bij (kind, name) hoort, en wist het. Gebruikt door log_action en de workflow-engine.
+    """
+    pending = getattr(_local, "pending", None)
+    _local.pending = None
+    if pending and pending[0] == kind and pending[1] == name:
+        return pending[2]
+    return None
+
+
+def list_profiles(limit: int = 50) -> list[dict]:
+    """Geeft de meest recente profielen terug (nieuwste eerst), zonder detailtabellen."""
+    folder = _get_profile_dir()
+    if not folder.exists():
+        return []
+    result = []
+    for path in sorted(folder.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        result.append({k: data.get(k) for k in ("id", "ts", "kind", "name", "context", "wall_ms", "cpu_ms", "peak_kb", "error")})
+        if len(result) >= limit:
+            break
+    return result
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    """Laadt één profiel op id, of None als het niet bestaat."""
+    path = _get_profile_dir() / f"{Path(profile_id).name}.json"
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,201 @@
+# regian/core/runindex.py
+"""
+Compacte index van workflow-runs, zodat een overzicht geen run-bestanden opent.
+
+list_runs() parst elke <run_id>.json volledig (met alle artifacts en
+fase-uitvoer) om runs te tonen en te sorteren. De index bewaart per run enkel
+de kerngegevens, in één SQLite-bestand in de werkmap (.regian_workflow_index.db):
+
+  state_dir, run_id, project_path, workflow_id, workflow_name, status,
+  current_phase_index, started_at, updated_at, mtime_ns (van het run-bestand)
+
+save_run() werkt de rij bij meteen nadat de state geschreven is (één
+transactie per run); mtime_ns is de laatste wijziging van snapshot of journaal
+(zie runjournal). Run-bestanden kunnen ook buiten deze process wijzigen
+(een andere node, handmatig verwijderd, rename_project). Daarom vergelijkt een
+query eerst de mtime van de state-map met die van de vorige synchronisatie. Is
+ze gewijzigd, dan worden enkel bestanden met een andere mtime opnieuw gelezen
+en verdwijnen rijen zonder bestand. Runs van alle projecten staan in dezelfde
+index, zodat ook een overzicht over projecten heen één query is.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    state_dir           TEXT NOT NULL,
+    run_id              TEXT NOT NULL,
+    project_path        TEXT NOT NULL DEFAULT '',
+    workflow_id         TEXT NOT NULL DEFAULT '',
+    workflow_name       TEXT NOT NULL DEFAULT '',
+    status              TEXT NOT NULL DEFAULT '',
+    current_phase_index INTEGER NOT NULL DEFAULT 0,
+    started_at          TEXT NOT NULL DEFAULT '',
+    updated_at          TEXT NOT NULL DEFAULT '',
+    mtime_ns            INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (state_dir, run_id)
+);
+CREATE INDEX IF NOT EXISTS workflow_runs_started ON workflow_runs (started_at);
+"""
+
+# Een map-mtime jonger dan dit kan nog binnen dezelfde tik wijzigen (grove
+# bestandssysteemklok); zo'n synchronisatie wordt niet onthouden
+_RACY_NS = 2_000_000_000
+
+_COLUMNS = ("run_id", "project_path", "workflow_id", "workflow_name", "status",
+            "current_phase_index", "started_at", "updated_at")
+
+
+@dataclass
+class RunSummary:
+    """Kerngegevens van een run, zonder artifacts of phase_log."""
+    run_id:              str
+    project_path:        str
+    workflow_id:         str
+    workflow_name:       str
+    status:              str
+    current_phase_index: int
+    started_at:          str
+    updated_at:          str
+
+
+def _key(state_dir: Path) -> str:
+    return str(Path(state_dir).resolve())
+
+
+def _row(data: dict) -> tuple:
+    return (
+        str(data.get("run_id", "")),
+        str(data.get("project_path", "") or ""),
+        str(data.get("workflow_id", "")),
+        str(data.get("workflow_name", "")),
+        str(data.get("status", "")),
+        int(data.get("current_phase_index", 0) or 0),
+        str(data.get("started_at", "")),
+        str(data.get("updated_at", "")),
+    )
+
+
+class RunIndex:
+    """De run-index in één SQLite-bestand. Elke operatie is één korte transactie."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._synced: dict[str, int] = {}   # state-map → mtime_ns bij de vorige synchronisatie
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transacties expliciet met BEGIN IMMEDIATE
+        return sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+
+    def record(self, state_dir: Path, data: dict, mtime_ns: int) -> None:
+        """Voeg een run toe of werk haar rij bij (na het schrijven van het run-bestand)."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workflow_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_key(state_dir), *_row(data), int(mtime_ns)),
+            )
+
+    def sync(self, state_dir: Path) -> None:
+        """
+        Breng de rijen van een state-map in lijn met de bestanden. Gebeurt enkel
+        als de map gewijzigd is sinds de vorige synchronisatie in dit proces, of
+        als het journaal van een lopende run gegroeid is (een append wijzigt de
+        map-mtime niet).
+        """
+        from regian.core.runjournal import read_run_data, run_mtime_ns
+        state_dir = Path(state_dir)
+        key = _key(state_dir)
+        try:
+            dir_mtime = state_dir.stat().st_mtime_ns
+        except OSError:
+            dir_mtime = -1
+        with self._lock:
+            unchanged = self._synced.get(key) == dir_mtime
+        if unchanged:
+            with closing(self._connect()) as conn:
+                active = conn.execute(
+                    "SELECT run_id, mtime_ns FROM workflow_runs WHERE state_dir = ? AND status IN ('running', 'waiting')",
+                    (key,),
+                ).fetchall()
+            if all(run_mtime_ns(state_dir, run_id) == mtime for run_id, mtime in active):
+                return
+        files: dict[str, tuple[Path, int]] = {}
+        if dir_mtime != -1:
+            for f in state_dir.glob("*.json"):
+                files[f.stem] = (f, run_mtime_ns(state_dir, f.stem))
+        with closing(self._connect()) as conn:
+            known = dict(conn.execute(
+                "SELECT run_id, mtime_ns FROM workflow_runs WHERE state_dir = ?", (key,)
+            ).fetchall())
+            changed = []
+            for run_id, (f, mtime) in files.items():
+                if known.get(run_id) == mtime:
+                    continue
+                try:
+                    data = read_run_data(f)
+                except (OSError, ValueError):
+                    continue
+                data.setdefault("run_id", run_id)
+                changed.append((key, *_row(data), mtime))
+            gone = [(key, run_id) for run_id in known if run_id not in files]
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO workflow_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", changed)
+                conn.executemany("DELETE FROM workflow_runs WHERE state_dir = ? AND run_id = ?", gone)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if time.time_ns() - dir_mtime > _RACY_NS:
+            with self._lock:
+                self._synced[key] = dir_mtime
+
+    def summaries(self, state_dirs: Optional[Iterable[Path]] = None, status: str = "") -> list[RunSummary]:
+        """
+        Runs uit de gegeven state-mappen (None = alle geïndexeerde), nieuwste eerst.
+        status: enkel runs met deze status.
+        """
+        query = f"SELECT {', '.join(_COLUMNS)} FROM workflow_runs"
+        clauses, params = [], []
+        if state_dirs is not None:
+            keys = [_key(d) for d in state_dirs]
+            if not keys:
+                return []
+            clauses.append(f"state_dir IN ({', '.join('?' * len(keys))})")
+            params.extend(keys)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY started_at DESC, run_id"
+        with closing(self._connect()) as conn:
+            return [RunSummary(*row) for row in conn.execute(query, params).fetchall()]
+
+
+_indexes: dict[str, RunIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_run_index() -> RunIndex:
+    """De run-index van de huidige werkmap."""
+    from regian.settings import get_root_dir
+    path = Path(get_root_dir()) / ".regian_workflow_index.db"
+    key = str(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = RunIndex(path)
+        return index
@@ -0,0 +1,310 @@
+# regian/core/runjournal.py
+"""
+Append-only journaal voor de state van workflow-runs.
+
+Een run bestaat op schijf uit:
+  <run_id>.json          → snapshot (volledige state + '_seq', het laatst verwerkte event)
+  <run_id>.events.jsonl  → events na die snapshot, één compacte JSON-regel per event
+
+persist() vergelijkt de run met de laatst weggeschreven state van dit proces en
+schrijft enkel het verschil als events:
+
+  artifact_set     {key, value}                            → nieuwe of gewijzigde artifact
+  artifact_deleted {key}
+  phase_finished   {index, entry}                          → nieuwe phase_log-entry
+  phase_revised    {index, entry}                          → vervangen entry (revise_run)
+  status           {status, current_phase_index, updated_at}
+  task_done        {index, value}                          → afgewerkte taak van een task_loop
+  task_state       {value}                                 → nieuw of gewist taak-checkpoint
+
+Zo is de I/O per fase (en per taak) evenredig met de nieuwe uitvoer, niet met de hele run.
+Een compacte snapshot volgt na _SNAPSHOT_EVERY events, als de run afgerond is
+(compact=True) of als er geen eerdere state gekend is (eerste opslag, ander
+proces). De snapshot wordt atomair vervangen; het journaal verdwijnt pas daarna,
+en read_run_data() slaat events met een seq ≤ '_seq' over, zodat een crash
+tussenin niets dubbel toepast. Een afgebroken laatste regel wordt genegeerd.
+
+Meerdere processen (dashboard, workers, skills) kunnen dezelfde run bewaren.
+Elke schrijfbeurt loopt daarom onder een bestandslock (.<run_id>.lock), en de
+basis in het geheugen onthoudt hoe snapshot en journaal er na de eigen laatste
+schrijfbeurt uitzagen. Wijkt dat af, dan heeft een ander proces intussen
+geschreven: de basis wordt eerst van schijf herladen, zodat de nieuwe events
+verder tellen vanaf de seq op schijf.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:   # Windows: enkel de lock binnen het proces
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Na zoveel events wordt een nieuwe snapshot geschreven
+_SNAPSHOT_EVERY = 50
+# Aantal runs waarvan de laatst weggeschreven state in het geheugen blijft
+_MAX_SHADOWS = 64
+
+_STATUS_FIELDS = ("status", "current_phase_index", "updated_at")
+# Velden waarvan _diff() de wijzigingen als eigen events schrijft
+_EVENT_FIELDS = ("artifacts", "phase_log", "task_state")
+
+# (state-map, run_id) → laatst weggeschreven state: {"seq", "pending", "data"}
+_shadows: "OrderedDict[tuple[str, str], dict]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def journal_path(state_dir: Path, run_id: str) -> Path:
+    """Het eventjournaal van een run."""
+    return Path(state_dir) / f"{run_id}.events.jsonl"
+
+
+def _stamp(state_dir: Path, run_id: str) -> tuple:
+    """Identiteit van snapshot en journaal op schijf (inode, mtime, grootte)."""
+    out = []
+    for path in (Path(state_dir) / f"{run_id}.json", journal_path(state_dir, run_id)):
+        try:
+            st = path.stat()
+            out.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+@contextmanager
+def _file_lock(state_dir: Path, run_id: str):
+    """Exclusieve lock op een run over processen heen (no-op zonder fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    with open(Path(state_dir) / f".{run_id}.lock", "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def run_mtime_ns(state_dir: Path, run_id: str) -> int:
+    """Laatste wijziging van snapshot of journaal (0 als geen van beide bestaat)."""
+    mtime = 0
+    for path in (Path(state_dir) / f"{run_id}.json", journal_path(state_dir, run_id)):
+        try:
+            mtime = max(mtime, path.stat().st_mtime_ns)
+        except OSError:
+            continue
+    return mtime
+
+
+def _apply(data: dict, event: dict) -> None:
+    kind = event.get("e")
+    if kind == "artifact_set":
+        data.setdefault("artifacts", {})[event["key"]] = event["value"]
+    elif kind == "artifact_deleted":
+        data.setdefault("artifacts", {}).pop(event["key"], None)
+    elif kind in ("phase_finished", "phase_revised"):
+        log = data.setdefault("phase_log", [])
+        index = event["index"]
+        if index < len(log):
+            log[index] = event["entry"]
+        else:
+            log.append(event["entry"])
+    elif kind == "task_done":
+        data.setdefault("task_state", {}).setdefault("results", {})[event["index"]] = event["value"]
+    elif kind == "task_state":
+        data["task_state"] = event["value"]
+    elif kind == "status":
+        for name in _STATUS_FIELDS:
+            if name in event:
+                data[name] = event[name]
+
+
+def _replay(path: Path) -> tuple[dict, int, int]:
+    """(state, laatste seq, events sinds de snapshot) van een snapshot-pad."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    seq = int(data.pop("_seq", 0) or 0)
+    pending = 0
+    jpath = path.with_name(f"{path.stem}.events.jsonl")
+    try:
+        lines = jpath.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        lines = []
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue   # afgebroken regel na een crash
+        if event.get("seq", 0) <= seq:
+            continue
+        _apply(data, event)
+        seq = event["seq"]
+        pending += 1
+    return data, seq, pending
+
+
+def read_run_data(path: Path) -> dict:
+    """De state van een run: snapshot <run_id>.json plus de events erna."""
+    return _replay(Path(path))[0]
+
+
+def _key(state_dir: Path, run_id: str) -> tuple[str, str]:
+    return (str(Path(state_dir).resolve()), run_id)
+
+
+def _shadow_copy(data: dict) -> dict:
+    # Strings worden gedeeld; enkel de containers worden gekopieerd
+    shadow = dict(data)
+    shadow["artifacts"] = copy.deepcopy(data.get("artifacts", {}))
+    shadow["phase_log"] = copy.deepcopy(data.get("phase_log", []))
+    shadow["task_state"] = copy.deepcopy(data.get("task_state", {}))
+    return shadow
+
+
+def _remember(state_dir: Path, run_id: str, seq: int, pending: int, data: dict) -> None:
+    key = _key(state_dir, run_id)
+    _shadows[key] = {"seq": seq, "pending": pending, "data": _shadow_copy(data),
+                     "stamp": _stamp(state_dir, run_id)}
+    _shadows.move_to_end(key)
+    while len(_shadows) > _MAX_SHADOWS:
+        _shadows.popitem(last=False)
+
+
+def load(state_dir: Path, run_id: str) -> dict:
+    """Lees een run (snapshot + journaal) en onthoud de state als basis voor persist()."""
+    path = Path(state_dir) / f"{run_id}.json"
+    with _lock, _file_lock(state_dir, run_id):
+        data, seq, pending = _replay(path)
+        _remember(state_dir, run_id, seq, pending, data)
+    return data
+
+
+def _diff(old: dict, new: dict) -> Optional[list[dict]]:
+    """Events van old naar new, of None als enkel een snapshot het verschil kan vastleggen."""
+    for name, value in new.items():
+        if name not in _EVENT_FIELDS and name not in _STATUS_FIELDS and old.get(name) != value:
+            return None
+    old_log, new_log = old.get("phase_log", []), new.get("phase_log", [])
+    if len(new_log) < len(old_log):
+        return None
+    events: list[dict] = []
+    old_art, new_art = old.get("artifacts", {}), new.get("artifacts", {})
+    for key, value in new_art.items():
+        if key not in old_art or old_art[key] != value:
+            events.append({"e": "artifact_set", "key": key, "value": value})
+    for key in old_art:
+        if key not in new_art:
+            events.append({"e": "artifact_deleted", "key": key})
+    for index, entry in enumerate(new_log):
+        if index >= len(old_log):
+            events.append({"e": "phase_finished", "index": index, "entry": entry})
+        elif old_log[index] != entry:
+            events.append({"e": "phase_revised", "index": index, "entry": entry})
+    events.extend(_diff_tasks(old.get("task_state") or {}, new.get("task_state") or {}))
+    if any(old.get(name) != new.get(name) for name in _STATUS_FIELDS):
+        events.append({"e": "status", **{name: new.get(name) for name in _STATUS_FIELDS}})
+    return events
+
+
+def _diff_tasks(old: dict, new: dict) -> list[dict]:
+    """Events voor het taak-checkpoint: enkel de nieuwe taken, tenzij het checkpoint vervangen werd."""
+    if old == new:
+        return []
+    old_results, new_results = old.get("results", {}), new.get("results", {})
+    same_loop = bool(old) and bool(new) and all(
+        old.get(k) == new.get(k) for k in set(old) | set(new) if k != "results"
+    )
+    if not same_loop or any(new_results.get(k) != v for k, v in old_results.items()):
+        return [{"e": "task_state", "value": new}]
+    return [{"e": "task_done", "index": k, "value": v} for k, v in new_results.items() if k not in old_results]
+
+
+def _disk_seq(state_dir: Path, run_id: str) -> int:
+    # Zonder gekende basis: verder tellen vanaf wat op schijf staat, zodat een
+    # achtergebleven journaal nooit opnieuw wordt toegepast
+    try:
+        return _replay(Path(state_dir) / f"{run_id}.json")[1]
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_snapshot(state_dir: Path, run_id: str, data: dict, seq: int) -> None:
+    path = Path(state_dir) / f"{run_id}.json"
+    tmp = Path(state_dir) / f".{run_id}.json.tmp"
+    tmp.write_text(json.dumps({**data, "_seq": seq}, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    try:
+        journal_path(state_dir, run_id).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def persist(state_dir: Path, data: dict, compact: bool = False,
+            expect_status: Optional[str] = None) -> bool:
+    """
+    Schrijf de state van een run weg: als events in het journaal, of als nieuwe
+    snapshot (compact=True, geen gekende vorige state, of _SNAPSHOT_EVERY bereikt).
+    Met expect_status wordt enkel geschreven als de status op schijf (onder de
+    lock gelezen) nog die waarde heeft; anders gebeurt er niets en volgt False.
+    """
+    state_dir = Path(state_dir)
+    run_id = data["run_id"]
+    key = _key(state_dir, run_id)
+    with _lock, _file_lock(state_dir, run_id):
+        shadow = _shadows.get(key)
+        if shadow is not None and not (state_dir / f"{run_id}.json").exists():
+            shadow = None   # extern verwijderd: opnieuw beginnen met een snapshot
+        elif shadow is not None and shadow["stamp"] != _stamp(state_dir, run_id):
+            # Een ander proces schreef intussen: verder vanaf de state op schijf
+            logger.warning(f"[Journaal] Run {run_id} werd door een ander proces gewijzigd; basis herladen")
+            disk, seq, pending = _replay(state_dir / f"{run_id}.json")
+            _remember(state_dir, run_id, seq, pending, disk)
+            shadow = _shadows[key]
+        if expect_status is not None:
+            if shadow is not None:
+                on_disk = shadow["data"].get("status")
+            elif (state_dir / f"{run_id}.json").exists():
+                on_disk = _replay(state_dir / f"{run_id}.json")[0].get("status")
+            else:
+                on_disk = expect_status
+            if on_disk != expect_status:
+                return False
+        events = _diff(shadow["data"], data) if shadow is not None else None
+        if (events is None or (compact and (events or shadow["pending"]))
+                or shadow["pending"] + len(events) >= _SNAPSHOT_EVERY):
+            seq = shadow["seq"] + len(events or ()) if shadow is not None else _disk_seq(state_dir, run_id)
+            _write_snapshot(state_dir, run_id, data, seq)
+            _remember(state_dir, run_id, seq, 0, data)
+            return True
+        if not events:
+            _shadows.move_to_end(key)
+            return True
+        seq = shadow["seq"]
+        lines = []
+        for event in events:
+            seq += 1
+            lines.append(json.dumps({"seq": seq, **event}, ensure_ascii=False))
+        with open(journal_path(state_dir, run_id), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        shadow["seq"] = seq
+        shadow["pending"] += len(events)
+        shadow["stamp"] = _stamp(state_dir, run_id)
+        # Enkel het gewijzigde deel van de basis bijwerken
+        base = shadow["data"]
+        for event in events:
+            _apply(base, copy.deepcopy(event))
+        _shadows.move_to_end(key)
+    return True
+
+
+def forget(state_dir: Path, run_id: str) -> None:
+    """Vergeet de in-memory basis van een run (bv. na een externe wijziging)."""
+    with _lock:
+        _shadows.pop(_key(state_dir, run_id), None)
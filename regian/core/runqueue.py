@@ -0,0 +1,302 @@
+# regian/core/runqueue.py
+"""
+Duurzame wachtrij en achtergrondworkers voor workflow-runs.
+
+Zonder wachtrij lopen de fasen van een run in de aanroeper: de Streamlit-
+scriptthread (fase per fase) of de start_workflow-skill. Een lange task_loop
+blokkeert zo de UI, en het werk stopt als de browser de verbinding verbreekt.
+
+Met WORKFLOW_WORKERS > 0 zetten dashboard en skills een lopende run in een
+wachtrij in de werkmap (.regian_workflow_queue.db, SQLite) en voeren
+achtergrondthreads haar uit met advance_one_phase() tot ze wacht, klaar is of
+faalt. De UI leest enkel de status (run-index).
+
+- Een worker claimt een rij met een lease (worker + vervaltijd) en verlengt
+  die met een heartbeat zolang de run loopt (zie core/leases.py). Crasht het
+  proces, dan verloopt de lease en neemt een andere worker (of hetzelfde
+  proces na een herstart) de run over vanaf current_phase_index.
+- Meerdere processen op dezelfde werkmap delen de wachtrij; een claim is één
+  BEGIN IMMEDIATE-transactie, dus een run loopt nooit twee keer tegelijk.
+  `python main.py --workflow-worker` draait een proces met enkel workers.
+- Een run die _MAX_ATTEMPTS keer overgenomen werd na een verlopen lease
+  (telkens een crash tijdens de uitvoering), krijgt status error in plaats van
+  eindeloos opnieuw te starten. Een vrijgegeven claim (release) telt niet mee.
+"""
+import logging
+import signal
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_queue (
+    run_id       TEXT PRIMARY KEY,
+    project_path TEXT NOT NULL DEFAULT '',
+    enqueued     REAL NOT NULL,
+    worker       TEXT NOT NULL DEFAULT '',
+    expires      REAL NOT NULL DEFAULT 0,
+    attempts     INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Hoe vaak een ledige worker de wachtrij opnieuw bekijkt (andere processen)
+_POLL_S = 1.0
+_MAX_ATTEMPTS = 3
+
+
+class RunQueue:
+    """De wachtrij in één SQLite-bestand. Elke operatie is één korte transactie."""
+
+    def __init__(self, path: Path, node: Optional[str] = None):
+        from regian.core.leases import node_id
+        self.path = Path(path)
+        self.node = node or node_id()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transacties expliciet met BEGIN IMMEDIATE
+        return sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+
+    def enqueue(self, run_id: str, project_path: str = "") -> None:
+        """
+        Zet een run in de wachtrij. Staat ze er al (bv. geclaimd door een worker
+        die net afrondt), dan wordt enkel 'enqueued' vernieuwd zodat die worker
+        de rij niet verwijdert maar vrijgeeft.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO workflow_queue (run_id, project_path, enqueued) VALUES (?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET enqueued = excluded.enqueued, "
+                "project_path = excluded.project_path, attempts = 0",
+                (run_id, project_path, time.time()),
+            )
+
+    def claim(self, ttl: float) -> Optional[dict]:
+        """
+        Claim de oudste rij zonder geldige lease. Geeft {run_id, project_path,
+        enqueued, attempts} terug, of None als er niets te doen is. 'attempts'
+        telt enkel overnames van een verlopen lease (worker nog ingevuld).
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT run_id, project_path, enqueued, attempts, worker FROM workflow_queue "
+                "WHERE expires <= ? ORDER BY enqueued LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            attempts = row[3] + (1 if row[4] else 0)
+            conn.execute(
+                "UPDATE workflow_queue SET worker = ?, expires = ?, attempts = ? WHERE run_id = ?",
+                (self.node, now + ttl, attempts, row[0]),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return {"run_id": row[0], "project_path": row[1], "enqueued": row[2], "attempts": attempts}
+
+    def renew(self, run_id: str, ttl: float) -> bool:
+        """Verleng de eigen claim. False als de claim intussen verloren is."""
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "UPDATE workflow_queue SET expires = ? WHERE run_id = ? AND worker = ?",
+                (time.time() + ttl, run_id, self.node),
+            )
+            return cur.rowcount == 1
+
+    def release(self, run_id: str) -> None:
+        """Geef de eigen claim vrij; de rij blijft staan voor een volgende worker."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE workflow_queue SET worker = '', expires = 0 WHERE run_id = ? AND worker = ?",
+                (run_id, self.node),
+            )
+
+    def finish(self, run_id: str, enqueued: float) -> bool:
+        """
+        Verwijder de eigen rij na afloop, tenzij de run intussen opnieuw in de
+        wachtrij kwam (ander 'enqueued'). Geeft True als de rij weg is.
+        """
+        with closing(self._connect()) as conn:
+            cur = conn.execute(
+                "DELETE FROM workflow_queue WHERE run_id = ? AND worker = ? AND enqueued = ?",
+                (run_id, self.node, enqueued),
+            )
+            return cur.rowcount == 1
+
+    def all(self) -> list[dict]:
+        """Alle rijen (oudste eerst), met 'active' = er loopt een worker op."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT run_id, project_path, enqueued, worker, expires, attempts "
+                "FROM workflow_queue ORDER BY enqueued"
+            ).fetchall()
+        now = time.time()
+        return [
+            {"run_id": r[0], "project_path": r[1], "enqueued": r[2], "worker": r[3],
+             "expires": r[4], "attempts": r[5], "active": r[4] > now}
+            for r in rows
+        ]
+
+
+_queues: dict[tuple, RunQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_run_queue() -> RunQueue:
+    """De wachtrij van de huidige werkmap."""
+    from regian.core.leases import node_id
+    from regian.settings import get_root_dir
+    path = Path(get_root_dir()) / ".regian_workflow_queue.db"
+    key = (str(path), node_id())
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = RunQueue(path, key[1])
+        return queue
+
+
+# ── Workers ───────────────────────────────────────────────────────────────────
+
+_workers: list[threading.Thread] = []
+_workers_lock = threading.Lock()
+_wake = threading.Event()
+_stop = threading.Event()
+
+
+def submit(run_id: str, project_path: str = "") -> None:
+    """Zet een lopende run in de wachtrij en wek de workers van dit proces."""
+    get_run_queue().enqueue(run_id, project_path)
+    ensure_workers()
+    _wake.set()
+
+
+def ensure_workers(count: Optional[int] = None) -> int:
+    """
+    Start workerthreads tot er `count` (standaard WORKFLOW_WORKERS) leven.
+    Geeft het aantal levende workers terug.
+    """
+    if count is None:
+        from regian.settings import get_workflow_workers
+        count = get_workflow_workers()
+    with _workers_lock:
+        _workers[:] = [t for t in _workers if t.is_alive()]
+        _stop.clear()
+        while len(_workers) < count:
+            thread = threading.Thread(
+                target=_worker_loop, name=f"regian-workflow-worker-{len(_workers) + 1}", daemon=True
+            )
+            _workers.append(thread)
+            thread.start()
+        return len(_workers)
+
+
+def stop_workers(timeout: float = 5.0) -> None:
+    """Stop de workers van dit proces na hun huidige fase (lopende claims worden vrijgegeven)."""
+    _stop.set()
+    _wake.set()
+    with _workers_lock:
+        threads = list(_workers)
+        _workers.clear()
+    for thread in threads:
+        thread.join(timeout=timeout)
+
+
+def _worker_loop() -> None:
+    while not _stop.is_set():
+        try:
+            worked = run_next(_stop)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"[Workflow] Wachtrij niet bruikbaar: {e}")
+            worked = False
+        if not worked:
+            _wake.wait(_POLL_S)
+            _wake.clear()
+
+
+def run_next(stop: Optional[threading.Event] = None) -> bool:
+    """
+    Claim en voer één run uit (tot ze niet meer 'running' is, of tot `stop`
+    gezet wordt). Geeft False als de wachtrij leeg is.
+    """
+    from regian.core.leases import Lease
+    from regian.settings import get_lease_ttl
+    queue = get_run_queue()
+    ttl = get_lease_ttl()
+    item = queue.claim(ttl)
+    if item is None:
+        return False
+    with Lease(queue, item["run_id"], ttl):
+        if _execute(queue, item, ttl, stop):
+            queue.finish(item["run_id"], item["enqueued"])
+    return True
+
+
+def _execute(queue: RunQueue, item: dict, ttl: float, stop: Optional[threading.Event]) -> bool:
+    """
+    Voer de fasen van een geclaimde run uit. True als de run klaar is met
+    lopen (de rij mag weg); False als de worker stopt of zijn claim verloor.
+    """
+    from regian.core import workflow
+    run_id, project_path = item["run_id"], item["project_path"]
+    if item["attempts"] > _MAX_ATTEMPTS:
+        _fail(run_id, project_path, f"Afgebroken na {_MAX_ATTEMPTS} pogingen (worker gestopt tijdens de uitvoering).")
+        return True
+    while True:
+        try:
+            run = workflow.advance_one_phase(run_id, project_path)
+        except FileNotFoundError:
+            logger.info(f"[Workflow] Run {run_id} bestaat niet meer; uit de wachtrij gehaald.")
+            return True
+        except Exception as e:
+            logger.warning(f"[Workflow] Run {run_id} mislukt in de achtergrond: {e}")
+            _fail(run_id, project_path, str(e))
+            return True
+        if run.status != workflow.STATUS_RUNNING:
+            return True
+        if (stop is not None and stop.is_set()) or not queue.renew(run_id, ttl):
+            return False
+
+
+def _fail(run_id: str, project_path: str, message: str) -> None:
+    """Zet een run op error met een logregel (bv. een template die niet meer laadt)."""
+    from datetime import datetime
+    from regian.core import workflow
+    try:
+        run = workflow.load_run(run_id, project_path)
+    except (FileNotFoundError, ValueError):
+        return
+    if run.status != workflow.STATUS_RUNNING:
+        return
+    now = datetime.now().isoformat(timespec="seconds")
+    run.status = workflow.STATUS_ERROR
+    run.phase_log.append({"phase_id": "", "status": "error", "output": message, "ts": now})
+    run.updated_at = now
+    workflow.save_run(run)
+
+
+def serve() -> int:
+    """Draai enkel workflow-workers tot SIGINT/SIGTERM (`python main.py --workflow-worker`)."""
+    from regian.settings import get_workflow_workers
+    count = ensure_workers(max(1, get_workflow_workers()))
+    print(f"⚙️  Workflow-worker actief ({count} threads) op {get_run_queue().path}")
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    try:
+        stop.wait()
+    finally:
+        stop_workers()
+        print("👋 Workflow-worker gestopt.")
+    return 0
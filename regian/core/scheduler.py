@@ -2,23 +2,40 @@
 """
 Regian Scheduler — APScheduler-gebaseerde taakplanner.
 
-Taken worden opgeslagen in jobs.json in de project root.
-De scheduler draait als achtergrondthread naast Streamlit of CLI.
+Taken worden opgeslagen in jobs.json in de project root, via een
+in-memory JobStore (zie core/jobstore.py) die definities en run-state
+gescheiden en atomair wegschrijft.
+De scheduler draait als achtergrondthread naast Streamlit of CLI, of als
+aparte daemon (zie core/daemon.py); in dat geval sturen de publieke
+functies hieronder hun aanroep door naar de daemon.
 """
-import json
 import logging
 import re
+import shlex
+import shutil
 import subprocess
 import sys
 import threading
-from datetime import datetime
+import functools
+import hashlib
+import json
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.base import BaseTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from regian.core.action_log import log_action
+from regian.core import chains, daemon, leases, metrics, watch
+from regian.core.jobstore import JobStore, get_store
 
 logger = logging.getLogger(__name__)
 
@@ -37,17 +54,67 @@ _lock = threading.Lock()
 
 # ── Opslag ─────────────────────────────────────────────────────────────────────
 
+def _get_store() -> JobStore:
+    """De JobStore voor het huidige jobs-bestand (volgt JOBS_FILE_NAME)."""
+    return get_store(_get_jobs_file())
+
+
 def _load_jobs() -> dict:
-    if _get_jobs_file().exists():
-        try:
-            return json.loads(_get_jobs_file().read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    return {}
+    """Alle taken (definitie + run-state), uit het geheugen."""
+    return _get_store().all()
 
 
 def _save_jobs(jobs: dict):
-    _get_jobs_file().write_text(json.dumps(jobs, indent=2, ensure_ascii=False), encoding="utf-8")
+    """Vervang de volledige takenlijst en schrijf meteen weg."""
+    _get_store().replace_all(jobs)
+
+
+def _get_output_dir() -> Path:
+    """Map met de volledige output per run (naast het jobs-bestand)."""
+    return _get_jobs_file().parent / ".regian_job_outputs"
+
+
+# ── Doorsturen naar de scheduler-daemon ────────────────────────────────────────
+
+# op-naam → lokale implementatie; de daemon voert deze rechtstreeks uit
+_RPC_OPS: dict = {}
+
+
+def _rpc(op: str, timeout: Optional[float] = daemon._CALL_TIMEOUT):
+    """
+    Laat een publieke schedulerfunctie via de daemon lopen als die bereikbaar
+    is, en anders in-process. Is de daemon niet te verbinden, dan ook in-process;
+    blijft het antwoord uit nadat het verzoek verstuurd is, dan niet, want de
+    daemon kan het al uitgevoerd hebben.
+    """
+    def decorator(func):
+        _RPC_OPS[op] = func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if daemon.daemon_available():
+                try:
+                    return daemon.call(op, *args, timeout=timeout, **kwargs)
+                except daemon.DaemonUnavailable:
+                    daemon.mark_unavailable()
+                    logger.warning(f"[Cron] Scheduler-daemon niet bereikbaar; '{op}' loopt in-process.")
+                except daemon.DaemonOutcomeUnknown:
+                    daemon.mark_unavailable()
+                    raise
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def ensure_scheduler() -> Optional[BackgroundScheduler]:
+    """
+    Start de in-process scheduler, tenzij een scheduler-daemon de taken al
+    uitvoert. Geeft de scheduler terug, of None als de daemon actief is.
+    """
+    if daemon.daemon_available():
+        logger.info("[Cron] Scheduler-daemon actief; geen in-process scheduler gestart.")
+        return None
+    return get_scheduler()
 
 
 # ── Schedule parser ────────────────────────────────────────────────────────────
@@ -89,7 +156,7 @@ _CRON_PATTERN = re.compile(
 )
 
 
-def parse_schedule(schedule_str: str):
+def parse_schedule(schedule_str: str, root: Optional[Path] = None):
     """
     Zet een leesbare schedule-string om naar een APScheduler trigger.
 
@@ -99,7 +166,19 @@ def parse_schedule(schedule_str: str):
       "elke maandag om 08:30"   → CronTrigger(day_of_week='mon', hour=8, minute=30)
       "werkdagen om 07:00"      → CronTrigger(day_of_week='mon-fri', hour=7, minute=0)
       "0 9 * * 1-5"             → CronTrigger(minute=0, hour=9, day='*', month='*', day_of_week='1-5')
+      "bij wijziging van uploads/*.csv" → WatchTrigger (relatief t.o.v. root)
+      "na backup, push"         → AfterTrigger(['backup', 'push'])
     """
+    # Bestandstrigger: het patroon behoudt hoofdletters
+    m = watch.WATCH_PATTERN.match(schedule_str.strip())
+    if m:
+        return watch.WatchTrigger(m.group(1), root)
+
+    # Afhankelijke taak: job_ids behouden hun schrijfwijze
+    after = chains.parse_after(schedule_str)
+    if after is not None:
+        return after
+
     s = schedule_str.strip().lower()
 
     # Interval patronen
@@ -146,60 +225,699 @@ def parse_schedule(schedule_str: str):
         "Geldige voorbeelden:\n"
         "  'elke 15 minuten'  |  'dagelijks om 09:00'\n"
         "  'elke maandag om 08:00'  |  'werkdagen om 07:30'\n"
-        "  '0 9 * * 1-5'  (cron expressie)"
+        "  '0 9 * * 1-5'  (cron expressie)  |  'bij wijziging van uploads/*.csv'"
     )
 
 
-# ── Job uitvoering ─────────────────────────────────────────────────────────────
+# ── Concurrency: pools, opties per taak en wachtrij-statistieken ───────────────
 
-def _execute_job(job_id: str):
-    """Callback die APScheduler aanroept bij elke trigger."""
-    jobs = _load_jobs()
+# Standaardopties per taak; overschrijfbaar via de velden van de taakdefinitie
+_JOB_DEFAULTS = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 60}
+_JOB_TYPES = ("shell", "command", "prompt")
+
+_stats_lock = threading.Lock()
+_submitted: dict[str, deque] = {}     # job_id → tijdstippen van indiening, nog niet gestart
+_running: dict[str, int] = {}
+_started_early: dict[str, int] = {}   # job_id → runs gestart vóór hun submit-event binnenkwam
+_job_stats: dict[str, dict] = {}      # job_id → wachttijden en overgeslagen runs
+
+_llm_slots: Optional[threading.BoundedSemaphore] = None
+_llm_slots_size = 0
+
+
+def _build_executors() -> dict:
+    """Eén begrensde threadpool per taaktype, plus een kleine default-pool."""
+    from regian.settings import get_scheduler_pool_sizes
+    sizes = get_scheduler_pool_sizes()
+    executors = {"default": ThreadPoolExecutor(2)}
+    for job_type in _JOB_TYPES:
+        executors[job_type] = ThreadPoolExecutor(max(1, int(sizes.get(job_type, 1))))
+    return executors
+
+
+def _job_options(job: dict) -> dict:
+    """APScheduler-opties voor één taak: pool volgens type, plus per-taak instellingen."""
+    job_type = job.get("type", "command")
+    return {
+        "executor": job_type if job_type in _JOB_TYPES else "default",
+        "max_instances": max(1, int(job.get("max_instances", _JOB_DEFAULTS["max_instances"]))),
+        "coalesce": bool(job.get("coalesce", _JOB_DEFAULTS["coalesce"])),
+        "misfire_grace_time": int(job.get("misfire_grace_time", _JOB_DEFAULTS["misfire_grace_time"])),
+    }
+
+
+def _register(scheduler: BackgroundScheduler, job_id: str, job: dict, trigger=None):
+    """Plan een taak in (of vervang haar) met de juiste pool, opties en spreiding."""
+    trigger = _effective_trigger(job_id, job, base=trigger)
+    if isinstance(trigger, watch.WatchTrigger):
+        watch.get_watcher().add(job_id, trigger)
+    else:
+        watch.get_watcher().remove(job_id)
+    scheduler.add_job(
+        _fire,
+        trigger=trigger,
+        id=job_id,
+        args=[job_id],
+        replace_existing=True,
+        **_job_options(job),
+    )
+
+
+def _unregister(scheduler: BackgroundScheduler, job_id: str):
+    """Haal een taak uit de scheduler (en uit de bestandswatcher)."""
+    watch.get_watcher().remove(job_id)
+    try:
+        scheduler.remove_job(job_id)
+    except Exception:
+        pass
+
+
+# Triggers die nooit vanzelf vuren: bestandswijzigingen en afhankelijkheden
+_EVENT_TRIGGERS = (watch.WatchTrigger, chains.AfterTrigger)
+
+
+# ── Spreiding: deterministische jitter en verdeling over het interval ──────────
+
+# Vast ankerpunt voor interval-taken met spread (een maandag, middernacht),
+# zodat hun fire-tijden niet afhangen van het moment van registreren
+_SPREAD_ANCHOR = datetime(2000, 1, 3)
+
+
+class OffsetTrigger(BaseTrigger):
+    """Verschuift elke fire-tijd van een onderliggende trigger met een vaste offset."""
+
+    def __init__(self, trigger, offset: float):
+        self.trigger = trigger
+        self.offset = timedelta(seconds=offset)
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        previous = previous_fire_time - self.offset if previous_fire_time else None
+        base = self.trigger.get_next_fire_time(previous, now - self.offset)
+        return base + self.offset if base else None
+
+    def __str__(self):
+        return f"{self.trigger} +{self.offset.total_seconds():.0f}s"
+
+    def __repr__(self):
+        return f"<OffsetTrigger ({self.trigger!r}, offset={self.offset.total_seconds():.0f}s)>"
+
+
+def _trigger_period(trigger) -> float:
+    """Tijd (seconden) tussen twee opeenvolgende fire-tijden; 0 als onbekend."""
+    if isinstance(trigger, _EVENT_TRIGGERS):
+        return 0.0
+    if isinstance(trigger, IntervalTrigger):
+        return trigger.interval.total_seconds()
+    now = datetime.now(trigger.timezone)
+    first = trigger.get_next_fire_time(None, now)
+    second = trigger.get_next_fire_time(first, first) if first else None
+    if first is None or second is None:
+        return 0.0
+    return (second - first).total_seconds()
+
+
+def _schedule_key(schedule: str) -> str:
+    return " ".join(schedule.lower().split())
+
+
+def _job_offset(job_id: str, job: dict, trigger, jobs: Optional[dict] = None) -> float:
+    """
+    Offset (seconden) van een taak t.o.v. haar schema:
+    - spread: de ingeschakelde spread-taken met hetzelfde schema krijgen
+      gelijk verdeelde plaatsen over de periode (alfabetisch op job_id);
+    - anders: een vaste jitter uit de hash van job_id, binnen het venster
+      `jitter` van de taak of JOB_JITTER_SECONDS, en hoogstens de halve periode.
+    """
+    period = _trigger_period(trigger)
+    if period <= 0:
+        return 0.0
+    if job.get("spread"):
+        key = _schedule_key(job.get("schedule", ""))
+        jobs = _load_jobs() if jobs is None else jobs
+        peers = sorted(
+            jid for jid, j in jobs.items()
+            if j.get("spread") and j.get("enabled", True) and _schedule_key(j.get("schedule", "")) == key
+        )
+        if job_id not in peers:
+            peers = sorted(peers + [job_id])
+        return float(int(period * peers.index(job_id) / len(peers)))
+    from regian.settings import get_job_jitter_seconds
+    window = job.get("jitter")
+    window = get_job_jitter_seconds() if window is None else max(0, int(window))
+    window = int(min(window, period / 2))
+    if window < 1:
+        return 0.0
+    digest = hashlib.sha256(job_id.encode("utf-8")).hexdigest()
+    return float(int(digest[:8], 16) % window)
+
+
+def _effective_trigger(job_id: str, job: dict, jobs: Optional[dict] = None, base=None):
+    """De trigger zoals ingepland: het schema plus spreiding/jitter."""
+    trigger = base if base is not None else parse_schedule(job["schedule"], job.get("watch_root"))
+    if isinstance(trigger, _EVENT_TRIGGERS):
+        return trigger
+    if job.get("spread") and isinstance(trigger, IntervalTrigger):
+        trigger = IntervalTrigger(
+            seconds=trigger.interval.total_seconds(),
+            start_date=_SPREAD_ANCHOR,
+            timezone=trigger.timezone,
+        )
+    offset = _job_offset(job_id, job, trigger, jobs)
+    return OffsetTrigger(trigger, offset) if offset else trigger
+
+
+def _respread(scheduler: BackgroundScheduler, schedule: str, skip: str = ""):
+    """Herplan de spread-taken met dit schema (hun plaatsen verschuiven mee)."""
+    key = _schedule_key(schedule)
+    for jid, j in _load_jobs().items():
+        if jid == skip or not j.get("spread") or not j.get("enabled", True):
+            continue
+        if _schedule_key(j.get("schedule", "")) != key:
+            continue
+        try:
+            _register(scheduler, jid, j)
+        except Exception as e:
+            logger.warning(f"[Cron] Kon job '{jid}' niet opnieuw spreiden: {e}")
+
+
+def schedule_preview(job_id: str, jobs: dict, count: int = 3) -> dict:
+    """
+    Offset en eerstvolgende fire-tijden van een taak, berekend uit de definities
+    (zonder scheduler). Voor interval-taken zonder spread hangt de fase af van
+    het moment van registreren; dan is enkel de offset bekend (times = []).
+    """
     job = jobs.get(job_id)
+    try:
+        base = parse_schedule(job["schedule"], job.get("watch_root"))
+    except (TypeError, KeyError, ValueError):
+        return {"offset": 0.0, "times": []}
+    trigger = _effective_trigger(job_id, job, jobs, base)
+    offset = trigger.offset.total_seconds() if isinstance(trigger, OffsetTrigger) else 0.0
+    inner = trigger.trigger if isinstance(trigger, OffsetTrigger) else trigger
+    if isinstance(inner, _EVENT_TRIGGERS) or (isinstance(inner, IntervalTrigger) and not job.get("spread")):
+        return {"offset": offset, "times": []}
+    times = []
+    now = datetime.now(inner.timezone)
+    fire = trigger.get_next_fire_time(None, now)
+    while fire is not None and len(times) < count:
+        times.append(fire)
+        fire = trigger.get_next_fire_time(fire, fire)
+    return {"offset": offset, "times": times}
+
+
+@contextmanager
+def _llm_slot():
+    """
+    Globale limiet op gelijktijdige LLM-taken (LLM_JOB_CONCURRENCY), ook voor
+    handmatige runs buiten de pools. Yieldt de wachttijd in seconden.
+    """
+    global _llm_slots, _llm_slots_size
+    from regian.settings import get_llm_job_concurrency
+    size = get_llm_job_concurrency()
+    with _stats_lock:
+        if _llm_slots is None or _llm_slots_size != size:
+            _llm_slots, _llm_slots_size = threading.BoundedSemaphore(size), size
+        slots = _llm_slots
+    t0 = time.perf_counter()
+    slots.acquire()
+    try:
+        yield time.perf_counter() - t0
+    finally:
+        slots.release()
+
+
+def _on_job_submitted(event):
+    """APScheduler-listener: een run staat in de wachtrij van zijn pool."""
+    with _stats_lock:
+        if _started_early.get(event.job_id):
+            # De pool startte de run al vóór dit event: niet meer als wachtend tellen
+            _started_early[event.job_id] -= 1
+            return
+        _submitted.setdefault(event.job_id, deque()).append(time.perf_counter())
+
+
+def _on_job_max_instances(event):
+    """APScheduler-listener: run overgeslagen omdat max_instances al loopt."""
+    with _stats_lock:
+        stats = _job_stats.setdefault(event.job_id, {})
+        stats["skipped"] = stats.get("skipped", 0) + 1
+    metrics.inc("regian_job_skipped_total", job_id=event.job_id)
+    logger.warning(f"[Cron] Run van {event.job_id} overgeslagen: vorige run loopt nog.")
+
+
+def _begin_run(job_id: str, scheduled: bool = False) -> float:
+    """
+    Markeer een run als gestart; geeft de wachttijd in de pool terug.
+    scheduled: de run komt uit de pool (er hoort een submit-event bij).
+    """
+    with _stats_lock:
+        queue = _submitted.get(job_id)
+        if queue:
+            wait = time.perf_counter() - queue.popleft()
+        else:
+            wait = 0.0
+            if scheduled:
+                _started_early[job_id] = _started_early.get(job_id, 0) + 1
+        _running[job_id] = _running.get(job_id, 0) + 1
+    return wait
+
+
+def _drop_submitted(job_id: str) -> None:
+    """
+    Een run uit de pool start niet (overgeslagen: daemon, lease, uitgeschakeld):
+    haal haar uit de wachtrij-telling, net zoals _begin_run(scheduled=True).
+    """
+    with _stats_lock:
+        queue = _submitted.get(job_id)
+        if queue:
+            queue.popleft()
+        else:
+            _started_early[job_id] = _started_early.get(job_id, 0) + 1
+
+
+def _end_run(job_id: str, job_type: str, wait: float):
+    with _stats_lock:
+        _running[job_id] = max(0, _running.get(job_id, 0) - 1)
+        stats = _job_stats.setdefault(job_id, {})
+        stats["runs"] = stats.get("runs", 0) + 1
+        stats["wait_total"] = stats.get("wait_total", 0.0) + wait
+        stats["last_wait"] = wait
+        stats["max_wait"] = max(stats.get("max_wait", 0.0), wait)
+    metrics.observe("regian_job_wait_seconds", wait, type=job_type)
+
+
+@_rpc("job_stats")
+def get_job_stats(job_id: str) -> dict:
+    """
+    Wachtrij- en concurrency-statistieken van een taak sinds de start van het proces:
+    pending (in wachtrij), running, runs, last_wait, avg_wait, max_wait (seconden), skipped.
+    """
+    with _stats_lock:
+        stats = dict(_job_stats.get(job_id, {}))
+        pending = len(_submitted.get(job_id, ()))
+        running = _running.get(job_id, 0)
+    runs = stats.get("runs", 0)
+    return {
+        "pending": pending,
+        "running": running,
+        "runs": runs,
+        "last_wait": stats.get("last_wait", 0.0),
+        "avg_wait": stats.get("wait_total", 0.0) / runs if runs else 0.0,
+        "max_wait": stats.get("max_wait", 0.0),
+        "skipped": stats.get("skipped", 0),
+    }
+
+
+@_rpc("queue_depth")
+def get_queue_depth() -> dict[str, int]:
+    """Aantal runs in de wachtrij per taaktype."""
+    jobs = _load_jobs()
+    depth = {job_type: 0 for job_type in _JOB_TYPES}
+    with _stats_lock:
+        for job_id, queue in _submitted.items():
+            job_type = jobs.get(job_id, {}).get("type", "command")
+            depth[job_type] = depth.get(job_type, 0) + len(queue)
+    return depth
+
+
+# ── Run-historiek ──────────────────────────────────────────────────────────────
+
+# Volledige output per run wordt tot deze lengte bewaard
+_MAX_RUN_OUTPUT_CHARS = 200_000
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def _record_history(store: JobStore, job_id: str, started_at: datetime,
+                    duration: float, wait: float, status: str, output: str, unchanged: bool = False) -> str:
+    """
+    Voeg een run toe aan de ringbuffer en bewaar de volledige output apart.
+    Bij een ongewijzigde run (only_on_change) wordt geen outputbestand geschreven.
+    Geeft het run_id terug.
+    """
+    from regian.settings import get_job_history_size
+    run_id = f"{started_at.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:4]}"
+    output_ref = None
+    if not unchanged:
+        try:
+            folder = _get_output_dir() / job_id
+            folder.mkdir(parents=True, exist_ok=True)
+            (folder / f"{run_id}.log").write_text(output[:_MAX_RUN_OUTPUT_CHARS], encoding="utf-8")
+            output_ref = f"{job_id}/{run_id}.log"
+        except OSError as e:
+            logger.warning(f"[Cron] Kon output van {job_id} niet bewaren: {e}")
+    entry = {
+        "run_id": run_id,
+        "start": started_at.isoformat(timespec="seconds"),
+        "duration": round(duration, 3),
+        "wait": round(wait, 3),
+        "status": status,
+        "output_ref": output_ref,
+    }
+    if unchanged:
+        entry["unchanged"] = True
+    if leases.get_lease_db() is not None:
+        entry["node"] = leases.node_id()
+    dropped = store.record_run(job_id, entry, get_job_history_size())
+    for run in dropped:
+        if run.get("output_ref"):
+            try:
+                (_get_output_dir() / run["output_ref"]).unlink()
+            except OSError:
+                pass
+    return run_id
+
+
+def get_job_history(job_id: str, limit: int = 0) -> list[dict]:
+    """De bewaarde runs van een taak, oudste eerst; limit > 0 geeft enkel de laatste runs."""
+    runs = _get_store().history(job_id)
+    return runs[-limit:] if limit > 0 else runs
+
+
+def get_run_output(job_id: str, run_id: str) -> Optional[str]:
+    """De volledige output van één run, of None als die niet (meer) bestaat."""
+    path = _get_output_dir() / Path(job_id).name / f"{Path(run_id).name}.log"
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def summarize_history(runs: list[dict]) -> dict:
+    """
+    Trendstatistieken over een lijst runs: count, failures, failure_rate,
+    mean, p95, max (seconden) en trend — de relatieve wijziging van de
+    gemiddelde duur van de recentste helft t.o.v. de oudste helft.
+    """
+    durations = [float(r.get("duration", 0.0)) for r in runs]
+    failures = sum(1 for r in runs if r.get("status") != "✅")
+    if not durations:
+        return {"count": 0, "failures": 0, "failure_rate": 0.0, "mean": 0.0, "p95": 0.0, "max": 0.0, "trend": 0.0}
+    ordered = sorted(durations)
+    p95 = ordered[min(len(ordered) - 1, max(0, int(round(0.95 * len(ordered))) - 1))]
+    trend = 0.0
+    half = len(durations) // 2
+    if half:
+        older = sum(durations[:half]) / half
+        newer = sum(durations[-half:]) / half
+        trend = (newer - older) / older if older > 0 else 0.0
+    return {
+        "count": len(durations),
+        "failures": failures,
+        "failure_rate": failures / len(durations),
+        "mean": sum(durations) / len(durations),
+        "p95": p95,
+        "max": ordered[-1],
+        "trend": trend,
+    }
+
+
+def sparkline(runs: list[dict]) -> str:
+    """Compacte duurgrafiek van runs (▁…█); mislukte runs worden als ✗ getoond."""
+    durations = [float(r.get("duration", 0.0)) for r in runs]
+    if not durations:
+        return ""
+    low, high = min(durations), max(durations)
+    span = high - low
+    chars = []
+    for run, d in zip(runs, durations):
+        if run.get("status") != "✅":
+            chars.append("✗")
+        else:
+            idx = int((d - low) / span * (len(_SPARK_CHARS) - 1)) if span > 0 else 0
+            chars.append(_SPARK_CHARS[idx])
+    return "".join(chars)
+
+
+# ── Job uitvoering ─────────────────────────────────────────────────────────────
+
+def _execute_job(job_id: str, scheduled: bool = False):
+    """
+    Voer een taak uit. scheduled: de run komt uit een pool van APScheduler
+    (via _fire), niet uit een rechtstreekse aanroep.
+    """
+    store = _get_store()
+    job = store.get(job_id)
     if not job or not job.get("enabled", True):
+        if scheduled:
+            _drop_submitted(job_id)
         return
 
     job_type = job.get("type", "command")
     task = job.get("task", "")
+    changed = watch.get_watcher().take(job_id)
     output = ""
+    wait = _begin_run(job_id, scheduled)
+    started = time.perf_counter()
+    started_at = datetime.now()
 
-    try:
-        if job_type == "shell":
-            from regian.settings import get_shell_timeout
-            result = subprocess.run(
-                task, shell=True, capture_output=True, text=True, timeout=get_shell_timeout(),
-                cwd=str(Path(__file__).parent.parent.parent),
-            )
-            output = result.stdout.strip() or result.stderr.strip() or "OK"
+    from regian.core.usage import usage_scope
+    from regian.core.admission import admit, priority_scope
+    # Standaard klasse 'cron' (via de bron); 'priority' in de taak kan ze overschrijven
+    priority = priority_scope(job["priority"]) if job.get("priority") else nullcontext()
+    with usage_scope(source="cron", job_id=job_id, budget=job.get("token_budget")) as usage, priority:
+        try:
+            if job_type == "shell":
+                from regian.settings import get_shell_timeout
+                from regian.core.shell import run_streaming, job_log_path
+                timeout = get_shell_timeout()
+                command = task.replace("{files}", " ".join(shlex.quote(p) for p in changed))
+                with admit("exec"):
+                    result = run_streaming(
+                        command, cwd=str(Path(__file__).parent.parent.parent), timeout=timeout,
+                        log_path=job_log_path(job_id),
+                        header=f"\n=== {started_at.isoformat(timespec='seconds')} · {command}\n",
+                        env={"REGIAN_CHANGED_FILES": "\n".join(changed)} if changed else None,
+                    )
+                if result.timed_out:
+                    raise subprocess.TimeoutExpired(task, timeout)
+                output = result.stdout.strip() or result.stderr.strip() or "OK"
 
-        elif job_type == "command":
-            from regian.core.agent import registry
-            parts = task.lstrip("/").split(" ", 1)
-            name = parts[0].strip()
-            raw_args = parts[1].strip() if len(parts) > 1 else ""
-            output = registry.call_by_string(name, raw_args)
+            elif job_type == "command":
+                from regian.core.agent import registry
+                parts = task.lstrip("/").split(" ", 1)
+                name = parts[0].strip()
+                raw_args = parts[1].strip() if len(parts) > 1 else ""
+                output = registry.call_by_string(name, raw_args.replace("{files}", ",".join(changed)))
 
-        elif job_type == "prompt":
-            from regian.core.agent import OrchestratorAgent
-            orch = OrchestratorAgent()
-            output = orch.run(task)
+            elif job_type == "prompt":
+                output, slot_wait = _run_prompt_job(job_id, job, changed)
+                wait += slot_wait
 
-        status = "✅"
-    except Exception as e:
-        output = str(e)
-        status = "❌"
+            status = "✅"
+        except Exception as e:
+            output = str(e)
+            status = "❌"
+        finally:
+            _end_run(job_id, job_type, wait)
+        # Een budgetoverschrijding binnen de run (bv. opgevangen door de orchestrator) telt als fout
+        if usage["exceeded"]:
+            status = "❌"
 
-    # Sla laatste run op
-    jobs = _load_jobs()
-    if job_id in jobs:
-        jobs[job_id]["last_run"] = datetime.now().isoformat(timespec="seconds")
-        jobs[job_id]["last_status"] = status
-        from regian.settings import get_log_result_max_chars
-        jobs[job_id]["last_output"] = output[:get_log_result_max_chars()]
-        _save_jobs(jobs)
-
-    log_action(f"cron:{job_type}", {"job_id": job_id, "task": task}, output, source="cron")
+    # Sla laatste run op (enkel run-state; de definitie blijft onaangeroerd)
+    from regian.settings import get_log_result_max_chars
+    digest = _output_digest(status, output)
+    current = store.get(job_id) or job
+    unchanged = bool(current.get("only_on_change")) and digest == current.get("last_output_hash")
+    if unchanged:
+        # Zelfde status en output als vorige run: enkel tellen, geen volledige entry
+        store.update_state(
+            job_id,
+            last_run=datetime.now().isoformat(timespec="seconds"),
+            unchanged_runs=int(current.get("unchanged_runs") or 0) + 1,
+        )
+    else:
+        store.update_state(
+            job_id,
+            last_run=datetime.now().isoformat(timespec="seconds"),
+            last_status=status,
+            last_output=output[:get_log_result_max_chars()],
+            last_output_hash=digest,
+            last_change=datetime.now().isoformat(timespec="seconds"),
+            unchanged_runs=0,
+        )
+
+    duration = time.perf_counter() - started
+    run_id = _record_history(store, job_id, started_at, duration, wait, status, output, unchanged=unchanged)
+
+    metrics.inc("regian_job_executions_total", job_id=job_id, type=job_type, status="ok" if status == "✅" else "error")
+    metrics.observe("regian_job_duration_seconds", duration, type=job_type)
+    _start_dependents(job_id, status == "✅", run_id)
+    if unchanged:
+        metrics.inc("regian_job_unchanged_total", job_id=job_id)
+        logger.debug(f"[Cron] {status} {job_id}: output ongewijzigd")
+        return
+    log_args = {"job_id": job_id, "task": task}
+    if changed:
+        log_args["changed"] = changed
+    log_action(f"cron:{job_type}", log_args, output, source="cron")
     logger.info(f"[Cron] {status} {job_id}: {output[:100]}")
+    if current.get("only_on_change") and current.get("on_change"):
+        _run_on_change(job_id, current["on_change"], output)
+
+
+def _start_dependents(job_id: str, ok: bool, run_id: str = ""):
+    """Meld de uitkomst aan de afhankelijke taken; wie klaar is om te starten, vuurt meteen."""
+    for dep_id in chains.get_chains().finished(job_id, ok, _load_jobs(), run_id):
+        metrics.inc("regian_job_chain_starts_total", job_id=dep_id, parent=job_id)
+        logger.info(f"[Cron] {dep_id} gestart na {'succes' if ok else 'mislukking'} van {job_id}")
+
+
+def _output_digest(status: str, output: str) -> str:
+    """Hash van status + output, om ongewijzigde runs te herkennen."""
+    return hashlib.sha256(f"{status}\0{output}".encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+def _run_on_change(job_id: str, command: str, output: str):
+    """
+    Vervolgactie van een taak met only_on_change: een slash-command dat enkel
+    loopt als de output wijzigde. {job_id} en {output} worden ingevuld, ook
+    in de waarden van JSON-argumenten.
+    """
+    from regian.core.agent import registry
+    from regian.settings import get_log_result_max_chars
+
+    def fill(text: str) -> str:
+        return text.replace("{job_id}", job_id).replace("{output}", output[:get_log_result_max_chars()])
+
+    parts = command.strip().lstrip("/").split(" ", 1)
+    name = parts[0].strip()
+    raw_args = parts[1].strip() if len(parts) > 1 else ""
+    try:
+        # JSON-args: vul de plaatshouders per waarde in, zodat de output geen JSON breekt
+        args = json.loads(raw_args) if raw_args.startswith("{") else None
+    except ValueError:
+        args = None
+    try:
+        if isinstance(args, dict):
+            result = registry.call(name, {k: fill(v) if isinstance(v, str) else v for k, v in args.items()})
+        else:
+            result = registry.call_by_string(name, fill(raw_args))
+    except Exception as e:
+        result = f"❌ {e}"
+    log_action("cron:on_change", {"job_id": job_id, "command": command}, result, source="cron")
+
+
+def _run_prompt_job(job_id: str, job: dict, changed: Optional[list] = None) -> tuple[str, float]:
+    """
+    Voer een AI-prompt-taak uit; geeft (output, wachttijd op een LLM-plaats).
+    Gewijzigde bestanden (bestandstrigger) worden achteraan de opdracht vermeld.
+    Met frozen_plan wordt het tool-plan één keer opgesteld en in de taakdefinitie
+    bewaard; latere runs voeren het uit zonder LLM-aanroep. Het plan wordt
+    opnieuw opgesteld zodra de opdracht, de skills of het actieve project wijzigen.
+    Plan en vingerafdruk gaan uit van de opdracht zonder gewijzigde bestanden;
+    die vult de run pas bij uitvoering in via {files} in de argumenten.
+    """
+    from regian.core.agent import OrchestratorAgent, execute_plan, plan_fingerprint
+    from regian.core.usage import check_budget
+    base_task = job.get("task", "")
+    task = base_task
+    if changed:
+        task += "\n\nGewijzigde bestanden:\n" + "\n".join(f"- {p}" for p in changed)
+    if not job.get("frozen_plan"):
+        check_budget()
+        with _llm_slot() as wait:
+            return OrchestratorAgent().run(task), wait
+
+    fingerprint = plan_fingerprint(base_task)
+    steps = job.get("plan")
+    wait = 0.0
+    if steps is None or job.get("plan_fingerprint") != fingerprint:
+        reason = "initial" if steps is None else "changed"
+        check_budget()
+        with _llm_slot() as wait:
+            steps = _store_plan(job_id, OrchestratorAgent().plan(base_task), fingerprint)
+        metrics.inc("regian_job_replans_total", job_id=job_id, reason=reason)
+        logger.info(f"[Cron] Plan voor {job_id} opgesteld ({reason}): {len(steps)} stap(pen).")
+    else:
+        metrics.inc("regian_job_frozen_runs_total", job_id=job_id)
+    if steps:
+        return execute_plan(_fill_files(steps, changed or []), source="cron"), wait
+    # Geen tools nodig: het antwoord komt van de LLM, maar de planningsronde valt weg
+    check_budget()
+    with _llm_slot() as slot_wait:
+        return OrchestratorAgent().answer(task), wait + slot_wait
+
+
+def _fill_files(steps: list, changed: list) -> list:
+    """Vervang {files} in de tekstargumenten van een plan door een kommalijst van de gewijzigde paden."""
+    files = ",".join(changed)
+    return [
+        {**step, "args": {
+            k: v.replace("{files}", files) if isinstance(v, str) else v
+            for k, v in (step.get("args") or {}).items()
+        }}
+        for step in steps
+    ]
+
+
+def _store_plan(job_id: str, steps: list, fingerprint: str) -> list:
+    """Bewaar een opgesteld plan in de taakdefinitie."""
+    _get_store().update(
+        job_id,
+        plan=steps,
+        plan_fingerprint=fingerprint,
+        planned_at=datetime.now().isoformat(timespec="seconds"),
+    )
+    return steps
+
+
+def _fire(job_id: str):
+    """
+    Trigger-callback van APScheduler. Draait er intussen een scheduler-daemon,
+    dan voert die de taak uit en slaat deze (oudere) in-process scheduler over.
+    """
+    executed = False
+    firing = _firing_id(job_id)
+    try:
+        if daemon.daemon_available():
+            logger.info(f"[Cron] {job_id} overgeslagen: de scheduler-daemon voert taken uit.")
+            return
+        if leases.get_lease_db() is None:
+            executed = True
+            _execute_job(job_id, scheduled=True)
+            return
+        job = _get_store().get(job_id)
+        if not job:
+            return
+        lease = leases.acquire(job_id, min_gap=_min_gap(job), firing=firing)
+        if lease is None:
+            if firing.startswith("watch:"):
+                # Een andere node verwerkt deze batch; niet opnieuw afvuren
+                watch.get_watcher().take(job_id)
+            metrics.inc("regian_job_lease_skips_total", job_id=job_id)
+            logger.info(f"[Cron] {job_id} overgeslagen: een andere node voert deze firing uit.")
+            return
+        with lease:
+            executed = True
+            _execute_job(job_id, scheduled=True)
+    finally:
+        # Een overgeslagen firing staat niet langer in de wachtrij
+        if not executed:
+            _drop_submitted(job_id)
+
+
+def _firing_id(job_id: str) -> str:
+    """
+    Id van deze firing voor de lease: bij een bestandstrigger de batch, na een
+    ouder diens run. Leeg bij een tijdschema (daar volstaat min_gap).
+    """
+    batch = watch.get_watcher().batch_id(job_id)
+    if batch:
+        return f"watch:{batch}"
+    parent = chains.get_chains().take_firing(job_id)
+    return f"after:{parent}" if parent else ""
+
+
+def _min_gap(job: dict) -> float:
+    """
+    Minimale tijd tussen twee starts over alle nodes heen: de helft van de
+    kortste periode van het schema (twee opeenvolgende fire-tijden).
+    """
+    try:
+        trigger = parse_schedule(job["schedule"], job.get("watch_root"))
+    except (KeyError, ValueError):
+        return 0.0
+    return _trigger_period(trigger) / 2
 
 
 # ── Scheduler beheer ───────────────────────────────────────────────────────────
@@ -209,13 +927,55 @@ def get_scheduler() -> BackgroundScheduler:
     global _scheduler
     with _lock:
         if _scheduler is None or not _scheduler.running:
-            _scheduler = BackgroundScheduler(timezone="Europe/Brussels")
+            _scheduler = BackgroundScheduler(
+                timezone="Europe/Brussels",
+                executors=_build_executors(),
+                job_defaults=_JOB_DEFAULTS,
+            )
+            _scheduler.add_listener(_on_job_missed, EVENT_JOB_MISSED)
+            _scheduler.add_listener(_on_job_submitted, EVENT_JOB_SUBMITTED)
+            _scheduler.add_listener(_on_job_max_instances, EVENT_JOB_MAX_INSTANCES)
             _load_all_jobs(_scheduler)
+            _subscribe_store()
             _scheduler.start()
+            watch.get_watcher().start()
             logger.info(f"[Cron] Scheduler gestart met {len(_scheduler.get_jobs())} taken.")
+            metrics.start_metrics_server()
     return _scheduler
 
 
+_store_subscription: Optional[tuple] = None
+
+
+def _subscribe_store():
+    """Volg externe wijzigingen aan het jobs-bestand zodat de scheduler synchroon blijft."""
+    global _store_subscription
+    store = _get_store()
+    if _store_subscription and _store_subscription[0] is store:
+        return
+    if _store_subscription:
+        _store_subscription[1]()
+    _store_subscription = (store, store.subscribe(_on_store_change))
+
+
+def _on_store_change(event: str, job_id: Optional[str]):
+    """Bij een extern herladen jobs-bestand: ingeplande taken opnieuw synchroniseren."""
+    if event != "reloaded" or _scheduler is None or not _scheduler.running:
+        return
+    jobs = _load_jobs()
+    for job in _scheduler.get_jobs():
+        if job.id in jobs or job.func is not _fire:
+            continue
+        _unregister(_scheduler, job.id)
+    _load_all_jobs(_scheduler)
+
+
+def _on_job_missed(event):
+    """APScheduler-listener: tel gemiste triggers (misfire) per taak."""
+    metrics.inc("regian_job_misfires_total", job_id=event.job_id)
+    logger.warning(f"[Cron] Trigger gemist voor {event.job_id} ({event.scheduled_run_time})")
+
+
 def _load_all_jobs(scheduler: BackgroundScheduler):
     """Laad alle opgeslagen taken in de scheduler."""
     jobs = _load_jobs()
@@ -223,18 +983,12 @@ def _load_all_jobs(scheduler: BackgroundScheduler):
         if not job.get("enabled", True):
             continue
         try:
-            trigger = parse_schedule(job["schedule"])
-            scheduler.add_job(
-                _execute_job,
-                trigger=trigger,
-                id=job_id,
-                args=[job_id],
-                replace_existing=True,
-            )
+            _register(scheduler, job_id, job)
         except Exception as e:
             logger.warning(f"[Cron] Kon job '{job_id}' niet laden: {e}")
 
 
+@_rpc("add")
 def add_scheduled_job(
     job_id: str,
     task: str,
@@ -247,9 +1001,19 @@ def add_scheduled_job(
         trigger = parse_schedule(schedule)
     except ValueError as e:
         return f"❌ {e}"
+    extra = {}
+    store = _get_store()
+    if isinstance(trigger, watch.WatchTrigger):
+        # Relatieve patronen blijven gekoppeld aan het project van het moment van plannen
+        trigger.root = watch.default_root()
+        extra["watch_root"] = str(trigger.root)
+    elif isinstance(trigger, chains.AfterTrigger):
+        error = check_dependencies(job_id, trigger.parents)
+        if error:
+            return error
+        extra[trigger.field] = trigger.parents
 
-    jobs = _load_jobs()
-    jobs[job_id] = {
+    store.put(job_id, {
         "id": job_id,
         "task": task,
         "type": job_type,
@@ -260,61 +1024,116 @@ def add_scheduled_job(
         "last_run": None,
         "last_status": None,
         "last_output": None,
-    }
-    _save_jobs(jobs)
+        **extra,
+    })
 
-    scheduler = get_scheduler()
-    scheduler.add_job(
-        _execute_job,
-        trigger=trigger,
-        id=job_id,
-        args=[job_id],
-        replace_existing=True,
-    )
+    _register(get_scheduler(), job_id, store.get(job_id), trigger)
     return job_id
 
 
+@_rpc("remove")
 def remove_scheduled_job(job_id: str) -> bool:
-    jobs = _load_jobs()
-    if job_id not in jobs:
+    store = _get_store()
+    job = store.get(job_id) or {}
+    if not store.remove(job_id):
         return False
-    del jobs[job_id]
-    _save_jobs(jobs)
-    scheduler = get_scheduler()
-    try:
-        scheduler.remove_job(job_id)
-    except Exception:
-        pass
+    shutil.rmtree(_get_output_dir() / Path(job_id).name, ignore_errors=True)
+    from regian.core.shell import remove_job_logs
+    remove_job_logs(job_id)
+    _unregister(get_scheduler(), job_id)
+    chains.get_chains().forget(job_id)
+    if job.get("spread"):
+        _respread(get_scheduler(), job.get("schedule", ""))
     return True
 
 
+@_rpc("toggle")
 def toggle_scheduled_job(job_id: str, enabled: bool) -> bool:
-    jobs = _load_jobs()
-    if job_id not in jobs:
+    store = _get_store()
+    if not store.update(job_id, enabled=enabled):
         return False
-    jobs[job_id]["enabled"] = enabled
-    _save_jobs(jobs)
     scheduler = get_scheduler()
+    job = store.get(job_id)
     if enabled:
         try:
-            trigger = parse_schedule(jobs[job_id]["schedule"])
-            scheduler.add_job(
-                _execute_job,
-                trigger=trigger,
-                id=job_id,
-                args=[job_id],
-                replace_existing=True,
-            )
+            _register(scheduler, job_id, job)
         except Exception:
             pass
     else:
+        _unregister(scheduler, job_id)
+    if job.get("spread"):
+        _respread(scheduler, job.get("schedule", ""), skip=job_id)
+    return True
+
+
+# Velden die de inplanning in APScheduler beïnvloeden
+_SCHEDULING_FIELDS = {"max_instances", "coalesce", "misfire_grace_time", "spread", "jitter"}
+
+
+@_rpc("update")
+def update_scheduled_job(job_id: str, **fields) -> bool:
+    """
+    Werk extra velden van een taakdefinitie bij (bv. token_budget, max_instances).
+    None verwijdert het veld. Wijzigt een planningsoptie, dan wordt de taak opnieuw ingepland.
+    Gooit ValueError bij een ongeldige planningsoptie; de definitie blijft dan ongewijzigd.
+    """
+    grace = fields.get("misfire_grace_time")
+    if grace is not None and int(grace) <= 0:
+        raise ValueError("misfire_grace_time moet groter dan 0 zijn.")
+    store = _get_store()
+    previous = store.get(job_id)
+    if previous is None or not store.update(job_id, **fields):
+        return False
+    job = store.get(job_id)
+    if _SCHEDULING_FIELDS & fields.keys() and job.get("enabled", True):
         try:
-            scheduler.remove_job(job_id)
-        except Exception:
-            pass
+            _register(get_scheduler(), job_id, job)
+        except Exception as e:
+            # Niet bewaren wat niet in te plannen is: na een herstart zou de taak niet meer laden
+            store.update(job_id, **{name: previous.get(name) for name in fields})
+            raise ValueError(f"Kon taak '{job_id}' niet opnieuw inplannen: {e}") from e
+    if "spread" in fields:
+        _respread(get_scheduler(), job.get("schedule", ""), skip=job_id)
     return True
 
 
+def check_dependencies(job_id: str, parents: list) -> Optional[str]:
+    """Foutmelding ('❌ …') als de ouders niet bestaan of een cyclus vormen, anders None."""
+    jobs = _load_jobs()
+    missing = [p for p in parents if p not in jobs]
+    if missing:
+        return f"❌ Onbekende taak/taken: {', '.join(missing)}"
+    cycle = chains.find_cycle(jobs, job_id, parents)
+    if cycle:
+        return f"❌ Afhankelijkheid vormt een cyclus: {' → '.join(cycle)}"
+    return None
+
+
+@_rpc("replan", timeout=None)
+def replan_prompt_job(job_id: str) -> Optional[list]:
+    """
+    Stel het plan van een AI-prompt-taak nu opnieuw op en bevries het
+    (zet frozen_plan aan). Geeft de stappen, of None als de taak niet bestaat
+    of geen prompt-taak is.
+    """
+    from regian.core.agent import OrchestratorAgent, plan_fingerprint
+    from regian.core.usage import check_budget, usage_scope
+    store = _get_store()
+    job = store.get(job_id)
+    if not job or job.get("type") != "prompt":
+        return None
+    task = job.get("task", "")
+    with usage_scope(source="cron", job_id=job_id, budget=job.get("token_budget")):
+        check_budget()
+        with _llm_slot():
+            steps = OrchestratorAgent().plan(task)
+    store.update(job_id, frozen_plan=True)
+    _store_plan(job_id, steps, plan_fingerprint(task))
+    metrics.inc("regian_job_replans_total", job_id=job_id, reason="manual")
+    return steps
+
+
+@_rpc("run_now", timeout=None)
 def run_job_now_by_id(job_id: str):
     """Voer een taak onmiddellijk uit (buiten het schema)."""
     _execute_job(job_id)
@@ -324,9 +1143,14 @@ def get_all_jobs() -> dict:
     return _load_jobs()
 
 
+@_rpc("next_run")
 def get_next_run(job_id: str) -> Optional[str]:
     scheduler = get_scheduler()
     job = scheduler.get_job(job_id)
+    if job and isinstance(job.trigger, watch.WatchTrigger):
+        return "bij wijziging"
+    if job and isinstance(job.trigger, chains.AfterTrigger):
+        return str(job.trigger)
     if job and job.next_run_time:
         return job.next_run_time.strftime("%d/%m/%Y %H:%M:%S")
     return None
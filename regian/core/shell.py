@@ -0,0 +1,231 @@
+# regian/core/shell.py
+"""
+Shell-uitvoering met streaming naar roterende logbestanden.
+
+subprocess.run(capture_output=True) houdt alle stdout/stderr in het geheugen
+tot het commando klaar is. run_streaming() leest beide stromen in blokken,
+schrijft ze meteen weg naar een logbestand dat roteert bij SHELL_LOG_MAX_BYTES
+(met SHELL_LOG_BACKUPS oude kopieën) en houdt enkel een begrensde staart
+(_TAIL_BYTES per stroom) in het geheugen voor het resultaat.
+
+Logbestanden staan in .regian_shell_logs/:
+  cron/<job_id>.log     → per geplande taak, elke run achter elkaar
+  calls/<id>.log        → per run_shell-aanroep (de oudste worden opgeruimd)
+
+Zolang een commando loopt kan het dashboard de staart van het log tonen
+(tail_log); active_logs() geeft de logs van lopende commando's.
+"""
+import os
+import signal
+import subprocess
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Begrensde staart per stroom die in het geheugen blijft
+_TAIL_BYTES = 64 * 1024
+_CHUNK = 8192
+_MAX_CALL_LOGS = 50
+
+_active: dict[Path, str] = {}      # logpad → commando, zolang het loopt
+_active_lock = threading.Lock()
+
+
+def _get_log_dir() -> Path:
+    return Path(__file__).parent.parent.parent / ".regian_shell_logs"
+
+
+def job_log_path(job_id: str) -> Path:
+    """Logbestand van een geplande shell-taak."""
+    return _get_log_dir() / "cron" / f"{Path(job_id).name}.log"
+
+
+def new_call_log_path() -> Path:
+    """Nieuw logbestand voor één run_shell-aanroep; ruimt de oudste op."""
+    folder = _get_log_dir() / "calls"
+    folder.mkdir(parents=True, exist_ok=True)
+    logs = sorted(folder.glob("*.log*"), key=lambda p: p.stat().st_mtime)
+    for old in logs[:-_MAX_CALL_LOGS]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    return folder / f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}.log"
+
+
+class RotatingWriter:
+    """Thread-veilige schrijver die het bestand roteert (.1, .2, …) bij max_bytes."""
+
+    def __init__(self, path: Path, max_bytes: int, backups: int):
+        self.path = Path(path)
+        self.max_bytes = max(1024, int(max_bytes))
+        self.backups = max(0, int(backups))
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backups:
+            for i in range(self.backups - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        self._file = open(self.path, "wb")
+        self._size = 0
+
+    def write(self, data: bytes):
+        with self._lock:
+            if self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _Tail:
+    """Bewaart enkel de laatste `limit` bytes van een stroom."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+        self.dropped = 0
+
+    def add(self, chunk: bytes):
+        self.data += chunk
+        excess = len(self.data) - self.limit
+        if excess > 0:
+            del self.data[:excess]
+            self.dropped += excess
+
+    def text(self) -> str:
+        return self.data.decode("utf-8", errors="replace")
+
+
+@dataclass
+class ShellResult:
+    returncode: Optional[int]
+    stdout: str               # staart van stdout
+    stderr: str               # staart van stderr
+    timed_out: bool
+    log_path: Optional[Path]
+    truncated: bool           # True als er meer output was dan de staart
+
+
+def _pump(stream, tail: _Tail, writer: Optional[RotatingWriter]):
+    try:
+        while True:
+            chunk = stream.read1(_CHUNK) if hasattr(stream, "read1") else stream.read(_CHUNK)
+            if not chunk:
+                break
+            tail.add(chunk)
+            if writer is not None:
+                writer.write(chunk)
+    finally:
+        stream.close()
+
+
+def run_streaming(command: str, cwd: str, timeout: float, log_path: Optional[Path] = None,
+                  header: str = "", env: Optional[dict] = None) -> ShellResult:
+    """
+    Voer een shell-commando uit en stream stdout/stderr naar log_path (roterend).
+    Bij een timeout wordt de hele procesgroep beëindigd. `env` vult de
+    omgeving van het proces aan.
+    """
+    from regian.settings import get_shell_log_max_bytes, get_shell_log_backups
+    writer = RotatingWriter(log_path, get_shell_log_max_bytes(), get_shell_log_backups()) if log_path else None
+    if writer is not None and header:
+        writer.write(header.encode("utf-8"))
+    out_tail, err_tail = _Tail(_TAIL_BYTES), _Tail(_TAIL_BYTES)
+    try:
+        proc = subprocess.Popen(
+            command, shell=True, cwd=cwd,
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=(os.name == "posix"),
+            env={**os.environ, **env} if env else None,
+        )
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        raise
+    if log_path is not None:
+        with _active_lock:
+            _active[Path(log_path)] = command
+    pumps = [
+        threading.Thread(target=_pump, args=(proc.stdout, out_tail, writer), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, err_tail, writer), daemon=True),
+    ]
+    for t in pumps:
+        t.start()
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill(proc)
+        proc.wait()
+    finally:
+        for t in pumps:
+            t.join(timeout=5)
+        if writer is not None:
+            writer.close()
+        if log_path is not None:
+            with _active_lock:
+                _active.pop(Path(log_path), None)
+    return ShellResult(
+        returncode=proc.returncode,
+        stdout=out_tail.text(),
+        stderr=err_tail.text(),
+        timed_out=timed_out,
+        log_path=Path(log_path) if log_path else None,
+        truncated=bool(out_tail.dropped or err_tail.dropped),
+    )
+
+
+def _kill(proc: subprocess.Popen):
+    """Beëindig het proces (en zijn kinderen via de procesgroep)."""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+def remove_job_logs(job_id: str):
+    """Verwijder het log van een taak, inclusief geroteerde kopieën."""
+    path = job_log_path(job_id)
+    for p in path.parent.glob(f"{path.name}*"):
+        try:
+            p.unlink()
+        except OSError:
+            pass
+
+
+def active_logs() -> dict[Path, str]:
+    """Logbestanden van commando's die nu lopen (pad → commando)."""
+    with _active_lock:
+        return dict(_active)
+
+
+def tail_log(path: Path, max_bytes: int = 8192) -> str:
+    """Laatste max_bytes van een logbestand, of '' als het niet bestaat."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_bytes))
+            data = f.read()
+    except OSError:
+        return ""
+    return data.decode("utf-8", errors="replace")
@@ -0,0 +1,422 @@
+# regian/core/usage.py
+"""
+Token- en kostenboekhouding voor alle LLM-aanroepen van Regian OS.
+
+Elke aanroep via `invoke_llm()` wordt geteld: bij voorkeur met de
+`usage_metadata` die de provider teruggeeft, anders met een lokale schatter
+(±4 tekens per token). De telling wordt toegeschreven aan project, bron
+(chat/cron/workflow/skill), workflow-run en cron-job en weggeschreven naar
+een JSONL-bestand naast het actie-log.
+
+Budgetten:
+  - per project: maximaal aantal tokens per dag (TOKEN_BUDGET_DAILY in .env,
+    overschrijfbaar via 'token_budget' in het projectmanifest)
+  - per scope: `usage_scope(budget=...)` begrenst één cron-run of één
+    workflow-fase; bij overschrijding gooit de volgende LLM-aanroep
+    `TokenBudgetExceeded` nog vóór er een request vertrekt.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+
+_RETENTION_DAYS = 31
+_TRIM_EVERY = 200  # na zoveel schrijfacties wordt de retentie toegepast
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """Wordt gegooid wanneer een LLM-aanroep een token-budget zou overschrijden."""
+
+
+def _get_usage_file() -> Path:
+    return Path(__file__).parent.parent.parent / "regian_usage.jsonl"
+
+
+# ── Attributie (scope) ────────────────────────────────────────────────────────
+
+_scope: ContextVar[Optional[dict]] = ContextVar("regian_usage_scope", default=None)
+
+
+@contextmanager
+def usage_scope(
+    source: Optional[str] = None,
+    project: Optional[str] = None,
+    run_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    budget: Optional[int] = None,
+):
+    """
+    Context manager die alle LLM-aanroepen binnen het blok toeschrijft aan
+    de opgegeven bron/project/run/job. Niet-opgegeven velden erven van de
+    omsluitende scope. `budget` (tokens) begrenst het verbruik binnen dit blok.
+
+    Geeft het scope-dict terug; `scope["used"]` bevat na afloop het verbruik.
+    """
+    parent = _scope.get()
+    inherited = parent or {}
+    scope = {
+        "source":   source or inherited.get("source"),
+        "project":  project if project is not None else inherited.get("project"),
+        "run_id":   run_id or inherited.get("run_id"),
+        "job_id":   job_id or inherited.get("job_id"),
+        "budget":   int(budget) if budget else None,
+        "used":     0,
+        "calls":    0,
+        "exceeded": False,
+        "parent":   parent,
+    }
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def current_attribution() -> dict:
+    """Geeft de actieve toeschrijving terug (bron, project, run_id, job_id)."""
+    scope = _scope.get() or {}
+    project = scope.get("project")
+    if project is None:
+        try:
+            from regian.settings import get_active_project
+            project = get_active_project()
+        except Exception:
+            project = ""
+    return {
+        "source":  scope.get("source") or "chat",
+        "project": project or "",
+        "run_id":  scope.get("run_id") or "",
+        "job_id":  scope.get("job_id") or "",
+    }
+
+
+def source_chain() -> list[str]:
+    """Bronnen van de actieve scope en haar omsluitende scopes (binnenste eerst)."""
+    sources = []
+    scope = _scope.get()
+    while scope is not None:
+        if scope.get("source"):
+            sources.append(scope["source"])
+        scope = scope.get("parent")
+    return sources
+
+
+# ── Schatter ──────────────────────────────────────────────────────────────────
+
+def estimate_tokens(text: Any) -> int:
+    """Ruwe lokale schatting: ±4 tekens per token (minstens 1 voor niet-lege tekst)."""
+    if text is None:
+        return 0
+    if isinstance(text, list):
+        return sum(estimate_tokens(t) for t in text)
+    if hasattr(text, "content"):
+        return estimate_tokens(text.content)
+    s = str(text)
+    if not s:
+        return 0
+    return max(1, (len(s) + 3) // 4)
+
+
+def _extract_usage(response: Any, messages: list) -> tuple[int, int, bool]:
+    """
+    Haal (input_tokens, output_tokens, geschat) uit een LLM-response.
+    Gebruikt `usage_metadata` (LangChain) indien beschikbaar, anders de schatter.
+    """
+    meta = getattr(response, "usage_metadata", None)
+    if isinstance(meta, dict) and ("input_tokens" in meta or "output_tokens" in meta):
+        try:
+            return int(meta.get("input_tokens") or 0), int(meta.get("output_tokens") or 0), False
+        except (TypeError, ValueError):
+            pass
+    return estimate_tokens(messages), estimate_tokens(getattr(response, "content", "")), True
+
+
+def _model_name(llm: Any) -> str:
+    for attr in ("model", "model_name"):
+        val = getattr(llm, attr, None)
+        if isinstance(val, str) and val:
+            return val.split("/")[-1]
+    try:
+        from regian.settings import get_llm_model
+        return get_llm_model()
+    except Exception:
+        return ""
+
+
+# ── Persistente telling ───────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_totals: dict[tuple[str, str], int] = {}   # (project, YYYY-MM-DD) → tokens
+_offset = 0                                 # gelezen bytes van het usage-bestand
+_tracked_file: Optional[Path] = None
+_writes = 0
+
+
+def _refresh_totals() -> None:
+    """Lees enkel de nieuwe regels van het usage-bestand (incrementeel, ook over processen heen)."""
+    global _offset, _tracked_file
+    path = _get_usage_file()
+    if path != _tracked_file:
+        _totals.clear()
+        _offset = 0
+        _tracked_file = path
+    if not path.exists():
+        _totals.clear()
+        _offset = 0
+        return
+    size = path.stat().st_size
+    if size < _offset:  # bestand getrimd of gewist
+        _totals.clear()
+        _offset = 0
+    if size == _offset:
+        return
+    with open(path, "rb") as f:
+        f.seek(_offset)
+        chunk = f.read()
+    # Enkel volledige regels verwerken
+    end = chunk.rfind(b"\n")
+    if end < 0:
+        return
+    for line in chunk[:end].splitlines():
+        try:
+            e = json.loads(line)
+        except (json.JSONDecodeError, ValueError):
+            continue
+        key = (e.get("project", ""), str(e.get("ts", ""))[:10])
+        _totals[key] = _totals.get(key, 0) + int(e.get("total_tokens", 0))
+    _offset += end + 1
+
+
+def _trim() -> None:
+    """Verwijder entries ouder dan de retentieperiode."""
+    global _offset
+    path = _get_usage_file()
+    if not path.exists():
+        return
+    cutoff = (datetime.now() - timedelta(days=_RETENTION_DAYS)).isoformat(timespec="seconds")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    kept = []
+    for line in lines:
+        try:
+            if json.loads(line).get("ts", "") >= cutoff:
+                kept.append(line)
+        except (json.JSONDecodeError, ValueError):
+            continue
+    if len(kept) != len(lines):
+        path.write_text("".join(l + "\n" for l in kept), encoding="utf-8")
+        _totals.clear()
+        _offset = 0
+
+
+def record_usage(
+    input_tokens: int,
+    output_tokens: int,
+    model: str = "",
+    latency_ms: int = 0,
+    estimated: bool = False,
+) -> dict:
+    """Registreer het verbruik van één LLM-aanroep en boek het op alle actieve scopes."""
+    global _writes
+    attribution = current_attribution()
+    total = int(input_tokens) + int(output_tokens)
+    entry = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        **attribution,
+        "model": model,
+        "input_tokens": int(input_tokens),
+        "output_tokens": int(output_tokens),
+        "total_tokens": total,
+        "estimated": estimated,
+        "latency_ms": int(latency_ms),
+    }
+    cost = estimate_cost(model, input_tokens, output_tokens)
+    if cost is not None:
+        entry["cost"] = round(cost, 6)
+
+    # Parallelle workflowtakken boeken gelijktijdig op dezelfde omsluitende scopes
+    with _lock:
+        scope = _scope.get()
+        while scope is not None:
+            scope["used"] += total
+            scope["calls"] += 1
+            scope = scope["parent"]
+
+    line = json.dumps(entry, ensure_ascii=False)
+    with _lock:
+        with open(_get_usage_file(), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        _writes += 1
+        if _writes % _TRIM_EVERY == 0:
+            _trim()
+    return entry
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """Bereken de kost op basis van TOKEN_PRICES (prijs per miljoen tokens), of None."""
+    try:
+        from regian.settings import get_token_prices
+        prices = get_token_prices().get(model)
+    except Exception:
+        return None
+    if not prices:
+        return None
+    return (
+        input_tokens * float(prices.get("input", 0))
+        + output_tokens * float(prices.get("output", 0))
+    ) / 1_000_000
+
+
+def project_usage_today(project: str) -> int:
+    """Geeft het aantal verbruikte tokens van een project vandaag terug."""
+    today = datetime.now().date().isoformat()
+    with _lock:
+        _refresh_totals()
+        return _totals.get((project, today), 0)
+
+
+# ── Budgetten ─────────────────────────────────────────────────────────────────
+
+def project_budget(project: str) -> int:
+    """
+    Daglimiet in tokens voor een project (0 = onbeperkt).
+    Het projectmanifest ('token_budget') heeft voorrang op TOKEN_BUDGET_DAILY.
+    """
+    if project:
+        try:
+            from regian.skills.project import _read_manifest
+            manifest_budget = _read_manifest(project).get("token_budget")
+            if manifest_budget is not None:
+                return int(manifest_budget)
+        except (FileNotFoundError, ValueError, TypeError):
+            pass
+        except Exception:
+            pass
+    try:
+        from regian.settings import get_token_budget_daily
+        return get_token_budget_daily()
+    except Exception:
+        return 0
+
+
+def check_budget() -> None:
+    """
+    Controleer alle actieve budgetten. Gooit TokenBudgetExceeded als een
+    scope-budget of het dagbudget van het project al opgebruikt is.
+    """
+    scope = _scope.get()
+    while scope is not None:
+        budget = scope.get("budget")
+        if budget and scope["used"] >= budget:
+            _mark_exceeded()
+            raise TokenBudgetExceeded(
+                f"Tokenbudget overschreden ({scope['used']}/{budget} tokens"
+                + (f", job '{scope['job_id']}'" if scope.get("job_id") else "")
+                + (f", run '{scope['run_id']}'" if scope.get("run_id") else "")
+                + ")."
+            )
+        scope = scope["parent"]
+
+    project = current_attribution()["project"]
+    limit = project_budget(project)
+    if limit > 0:
+        used = project_usage_today(project)
+        if used >= limit:
+            _mark_exceeded()
+            raise TokenBudgetExceeded(
+                f"Dagbudget van project '{project or '(geen)'}' bereikt ({used}/{limit} tokens)."
+            )
+
+
+def _mark_exceeded() -> None:
+    scope = _scope.get()
+    while scope is not None:
+        scope["exceeded"] = True
+        scope = scope["parent"]
+
+
+# ── LLM-aanroep ───────────────────────────────────────────────────────────────
+
+def invoke_llm(llm: Any, messages: Any) -> Any:
+    """
+    Roep `llm.invoke(messages)` aan met budgetcontrole, toegangscontrole
+    (core/admission.py) en tokenregistratie.
+    Alle LLM-aanroepen in Regian OS lopen via deze functie.
+    """
+    from regian.core import metrics
+    from regian.core.admission import admit
+    check_budget()
+    model = _model_name(llm)
+    source = current_attribution()["source"]
+    # Wacht op een LLM-plaats volgens de prioriteitsklasse (chat vóór achtergrondwerk)
+    with admit("llm"):
+        start = time.monotonic()
+        try:
+            response = llm.invoke(messages)
+        except Exception:
+            metrics.inc("regian_llm_calls_total", model=model, source=source, status="error")
+            metrics.observe("regian_llm_duration_seconds", time.monotonic() - start, model=model)
+            raise
+        elapsed = time.monotonic() - start
+    latency_ms = int(elapsed * 1000)
+    input_tokens, output_tokens, estimated = _extract_usage(response, messages)
+    metrics.inc("regian_llm_calls_total", model=model, source=source, status="ok")
+    metrics.observe("regian_llm_duration_seconds", elapsed, model=model)
+    metrics.inc("regian_llm_tokens_total", input_tokens, model=model, direction="input")
+    metrics.inc("regian_llm_tokens_total", output_tokens, model=model, direction="output")
+    try:
+        record_usage(input_tokens, output_tokens, model, latency_ms, estimated)
+    except OSError:
+        pass  # boekhouding mag een LLM-antwoord nooit blokkeren
+    return response
+
+
+# ── Rapportering ──────────────────────────────────────────────────────────────
+
+def get_usage(days: int = 7) -> list[dict]:
+    """Geeft alle usage-entries van de laatste `days` dagen terug (oudste eerst)."""
+    path = _get_usage_file()
+    with _lock:
+        if not path.exists():
+            return []
+        lines = path.read_text(encoding="utf-8").splitlines()
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat(timespec="seconds")
+    entries = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            e = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if e.get("ts", "") >= cutoff:
+            entries.append(e)
+    return entries
+
+
+def summarize_usage(group_by: str = "project", days: int = 7) -> list[dict]:
+    """
+    Aggregeer verbruik per 'project', 'source', 'run_id', 'job_id' of 'model'.
+    Gesorteerd op totaal aantal tokens (hoogste eerst).
+    """
+    groups: dict[str, dict] = {}
+    for e in get_usage(days):
+        key = e.get(group_by, "") or "—"
+        g = groups.setdefault(key, {
+            "key": key, "calls": 0, "input_tokens": 0, "output_tokens": 0,
+            "total_tokens": 0, "latency_ms": 0, "cost": 0.0, "estimated": 0,
+        })
+        g["calls"] += 1
+        g["input_tokens"] += int(e.get("input_tokens", 0))
+        g["output_tokens"] += int(e.get("output_tokens", 0))
+        g["total_tokens"] += int(e.get("total_tokens", 0))
+        g["latency_ms"] += int(e.get("latency_ms", 0))
+        g["cost"] += float(e.get("cost", 0.0))
+        g["estimated"] += 1 if e.get("estimated") else 0
+    return sorted(groups.values(), key=lambda g: g["total_tokens"], reverse=True)
@@ -0,0 +1,226 @@
+# regian/core/watch.py
+"""
+Bestandstriggers: taken die vuren als bestanden wijzigen, in plaats van te pollen
+met een interval-taak ("elke 1 minuut") die telkens een shell- of LLM-aanroep kost.
+
+Schema: 'bij wijziging van <glob>' (of 'on change of <glob>'), bv.
+'bij wijziging van uploads/*.csv' of 'bij wijziging van docs/**/*.md'.
+Relatieve patronen gelden t.o.v. het projectpad dat actief was bij het plannen
+(anders REGIAN_ROOT_DIR).
+
+Eén Watcher-thread scant alle bestandstriggers elke WATCH_POLL_SECONDS
+(mtime + grootte per bestand, zonder de bestanden te lezen). Gewijzigde of nieuwe
+paden worden per taak verzameld; pas als er WATCH_DEBOUNCE_SECONDS geen nieuwe
+wijzigingen bijkomen, vuurt de taak één keer met de hele batch. De taak haalt
+de batch op met take(job_id).
+
+De APScheduler-job van een bestandstaak vuurt nooit vanzelf (WatchTrigger geeft
+een tijdstip in de verre toekomst); de Watcher zet zijn volgende run op 'nu',
+zodat pools, max_instances, leases en historiek gewoon gelden.
+"""
+import glob
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from apscheduler.triggers.base import BaseTrigger
+
+logger = logging.getLogger(__name__)
+
+WATCH_PATTERN = re.compile(r"^(?:bij\s+wijziging\s+(?:van|in)|on\s+change\s+(?:of|in))\s+(.+)$", re.I)
+
+# Een bestandstaak die nog niet mag vuren, staat zo ver in de toekomst gepland
+_IDLE = timedelta(days=365 * 100)
+# Hoe lang een afgevuurde batch mag wachten op take() vóór opnieuw gevuurd wordt
+_REFIRE_AFTER = 30.0
+
+
+def default_root() -> Path:
+    """Het actieve projectpad, of REGIAN_ROOT_DIR als er geen project actief is."""
+    from regian.settings import get_active_project, get_root_dir
+    name = get_active_project()
+    if name:
+        try:
+            from regian.skills.project import _read_manifest
+            return Path(_read_manifest(name)["path"])
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+    return Path(get_root_dir())
+
+
+class WatchTrigger(BaseTrigger):
+    """APScheduler-trigger voor een bestandstaak; het vuren gebeurt door de Watcher."""
+
+    def __init__(self, pattern: str, root: Optional[Path] = None):
+        self.pattern = pattern.strip()
+        self.root = Path(root) if root else None
+
+    @property
+    def glob(self) -> str:
+        """Absoluut glob-patroon."""
+        path = Path(self.pattern).expanduser()
+        if not path.is_absolute():
+            path = (self.root or default_root()) / path
+        return str(path)
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        return now + _IDLE
+
+    def __str__(self):
+        return f"watch[{self.pattern}]"
+
+    def __repr__(self):
+        return f"<WatchTrigger (pattern='{self.pattern}', root='{self.root}')>"
+
+
+def _scan(pattern: str) -> dict[str, tuple[int, int]]:
+    """Pad → (mtime_ns, grootte) van alle bestanden die op het patroon passen."""
+    result = {}
+    for path in glob.iglob(pattern, recursive=True):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if os.path.isfile(path):
+            result[path] = (st.st_mtime_ns, st.st_size)
+    return result
+
+
+class _Watch:
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.snapshot = _scan(pattern)   # vertrekpunt: bestaande bestanden vuren niet
+        self.pending: dict[str, None] = {}   # geordende set van gewijzigde paden
+        self.last_change = 0.0
+        self.fired_at = 0.0
+
+    def poll(self) -> list[str]:
+        current = _scan(self.pattern)
+        changed = [p for p, sig in current.items() if self.snapshot.get(p) != sig]
+        self.snapshot = current
+        return changed
+
+
+class Watcher:
+    """Scant de bestandstriggers van alle taken en vuurt debounced batches af."""
+
+    def __init__(self, on_fire: Callable[[str], None]):
+        self._on_fire = on_fire
+        self._watches: dict[str, _Watch] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, job_id: str, trigger: WatchTrigger) -> None:
+        """Volg een taak (of vervang haar patroon); de huidige bestanden zijn het vertrekpunt."""
+        pattern = trigger.glob
+        with self._lock:
+            existing = self._watches.get(job_id)
+            if existing and existing.pattern == pattern:
+                return
+            self._watches[job_id] = _Watch(pattern)
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._watches.pop(job_id, None)
+
+    def watched(self) -> dict[str, str]:
+        """job_id → absoluut patroon."""
+        with self._lock:
+            return {job_id: w.pattern for job_id, w in self._watches.items()}
+
+    def take(self, job_id: str) -> list[str]:
+        """Haal de verzamelde gewijzigde paden van een taak op (en leeg de batch)."""
+        with self._lock:
+            watch = self._watches.get(job_id)
+            if watch is None:
+                return []
+            paths = list(watch.pending)
+            watch.pending.clear()
+            watch.fired_at = 0.0
+            return paths
+
+    def batch_id(self, job_id: str) -> str:
+        """
+        Vingerafdruk van de verzamelde batch (paden + mtime/grootte), gelijk op
+        elke node die dezelfde wijzigingen zag; leeg zonder batch.
+        """
+        with self._lock:
+            watch = self._watches.get(job_id)
+            if watch is None or not watch.pending:
+                return ""
+            items = sorted((p, watch.snapshot.get(p)) for p in watch.pending)
+        return hashlib.sha256(repr(items).encode("utf-8")).hexdigest()[:16]
+
+    def check(self, now: Optional[float] = None) -> list[str]:
+        """Eén scanronde. Geeft de taken terug die afgevuurd werden."""
+        from regian.settings import get_watch_debounce_seconds
+        from regian.core import metrics
+        debounce = get_watch_debounce_seconds()
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            watches = list(self._watches.items())
+        ready = []
+        for job_id, watch in watches:
+            changed = watch.poll()
+            with self._lock:
+                if changed:
+                    watch.pending.update(dict.fromkeys(changed))
+                    watch.last_change = now
+                    metrics.inc("regian_watch_changes_total", len(changed), job_id=job_id)
+                if not watch.pending or now - watch.last_change < debounce:
+                    continue
+                if watch.fired_at and now - watch.fired_at < _REFIRE_AFTER:
+                    continue
+                watch.fired_at = now
+            ready.append(job_id)
+        for job_id in ready:
+            try:
+                self._on_fire(job_id)
+            except Exception as e:
+                logger.warning(f"[Watch] Kon taak '{job_id}' niet afvuren: {e}")
+        return ready
+
+    def _loop(self) -> None:
+        from regian.settings import get_watch_poll_seconds
+        while not self._stop.wait(get_watch_poll_seconds()):
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning(f"[Watch] Scan mislukt: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="regian-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_watcher: Optional[Watcher] = None
+_watcher_lock = threading.Lock()
+
+
+def _fire_now(job_id: str) -> None:
+    """Zet de volgende run van de APScheduler-job op nu."""
+    from regian.core.scheduler import get_scheduler
+    scheduler = get_scheduler()
+    scheduler.modify_job(job_id, next_run_time=datetime.now(scheduler.timezone))
+
+
+def get_watcher() -> Watcher:
+    """De procesbrede Watcher (de scanthread start met de scheduler)."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = Watcher(_fire_now)
+        return _watcher
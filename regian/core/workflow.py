@@ -10,22 +10,44 @@ de engine hem uitvoert:
   task_loop        → Takenlijst via planner + executor (agent)
   human_checkpoint → Pauzeer en wacht op gebruikersgoedkeuring
   tool_chain       → Voer een vaste lijst tools deterministisch uit
+  parallel         → Groep llm_prompt/tool_chain-takken die tegelijk lopen
+  map_reduce       → Groot artifact in stukken: map-prompt per stuk, reduce-prompt erover
+
+Een parallelle groep ('phases': [...]) voert onafhankelijke takken gelijktijdig
+uit (fan-out) en voegt hun output_keys daarna samen in artifacts (join). Een
+tak leest de artifacts uit 'inputs' (anders de {{sleutel}}-placeholders); hangt
+ze af van de output van een andere tak, dan loopt ze in een latere golf.
 
 State van een run wordt bijgehouden in:
-  <project>/.regian_workflow_state/<run_id>.json
+  <project>/.regian_workflow_state/<run_id>.json          (snapshot)
+  <project>/.regian_workflow_state/<run_id>.events.jsonl  (events sinds de snapshot)
 
-Zo kan een run na een crash of herstart worden voortgezet.
+Zo kan een run na een crash of herstart worden voortgezet. Met background=True
+(start_workflow, advance_run, rerun_from) gaat een lopende run naar de
+wachtrij van core/runqueue.py en voeren achtergrondworkers haar fasen uit.
 """
 from __future__ import annotations
 
+import collections
+import contextvars
+import functools
+import hashlib
 import json
+import logging
+import os
 import re
+import sqlite3
+import threading
+import time
 import uuid
-from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
 
 # ── Statuswaarden ──────────────────────────────────────────────────────────────
 
@@ -35,6 +57,9 @@ STATUS_DONE      = "done"
 STATUS_CANCELLED = "cancelled"
 STATUS_ERROR     = "error"
 
+# Fase-types die als tak in een parallelle groep mogen lopen
+PARALLEL_BRANCH_TYPES = ("llm_prompt", "tool_chain")
+
 
 # ── WorkflowRun dataklasse ─────────────────────────────────────────────────────
 
@@ -52,6 +77,18 @@ class WorkflowRun:
     phase_log:    list[dict]                   # logboek per fase
     input:        str                          # originele gebruikersinvoer
     project_path: str = ""                     # pad naar actief project (mag leeg)
+    phase_cache:  dict[str, dict] = field(default_factory=dict)  # input_hash → herbruikbare entry (rerun_from)
+    task_state:   dict[str, Any] = field(default_factory=dict)   # checkpoint van de lopende task_loop
+
+    def __post_init__(self):
+        # Lange uitvoer staat als blob-referentie in artifacts en phase_log; lezen laadt ze
+        from regian.core.blobstore import BlobDict, get_store, wrap_entry
+        store = get_store(_blob_dir(self.project_path))
+        if not isinstance(self.artifacts, BlobDict):
+            self.artifacts = BlobDict(self.artifacts, store=store)
+        self.phase_log = [wrap_entry(e, store) if isinstance(e, dict) else e for e in self.phase_log]
+        if self.task_state and not isinstance(self.task_state.get("results"), BlobDict):
+            self.task_state["results"] = BlobDict(self.task_state.get("results", {}), store=store)
 
     # ── Serialisatie ──────────────────────────────────────────
     def to_dict(self) -> dict:
@@ -80,6 +117,14 @@ def _state_dir(project_path: str = "") -> Path:
     return Path(get_root_dir()) / ".regian_workflow_state"
 
 
+def _blob_dir(project_path: str = "") -> Path:
+    """Geeft de map met artifact-blobs (lange fase-uitvoer) terug."""
+    if project_path:
+        return Path(project_path) / ".regian_workflow_blobs"
+    from regian.settings import get_root_dir
+    return Path(get_root_dir()) / ".regian_workflow_blobs"
+
+
 def _builtin_template_dir() -> Path:
     """Geeft de map met ingebouwde workflow-templates (in de package) terug."""
     return Path(__file__).parent.parent / "workflows"
@@ -87,6 +132,64 @@ def _builtin_template_dir() -> Path:
 
 # ── Template laden ────────────────────────────────────────────────────────────
 
+# Pad → ((mtime_ns, grootte), gevalideerde template); een gewijzigd bestand wordt opnieuw gelezen
+_template_cache: dict[str, tuple[tuple[int, int], dict]] = {}
+_template_lock = threading.Lock()
+
+
+def validate_workflow(template: dict, source: str = "") -> None:
+    """
+    Controleer de structuur van een template en compileer alle prompt- en
+    argument-templates vooraf (zie _compile_text).
+    Gooit ValueError bij ontbrekende fasenlijst, dubbele fase-id's of een
+    ongeldige parallelle groep.
+    """
+    label = f"'{source}'" if source else ""
+    phases = template.get("phases", [])
+    if not isinstance(phases, list) or not all(isinstance(p, dict) for p in phases):
+        raise ValueError(f"Ongeldige workflow-template {label}: 'phases' moet een lijst van objecten zijn.")
+    seen: set = set()
+    for phase in phases:
+        group = phase.get("phases", []) if phase.get("type") == "parallel" else []
+        for item in [phase] + list(group):
+            phase_id = item.get("id")
+            if phase_id in seen:
+                raise ValueError(f"Ongeldige workflow-template {label}: fase-id '{phase_id}' komt meer dan één keer voor.")
+            if phase_id:
+                seen.add(phase_id)
+            for text in (item.get("prompt_template"), item.get("prompt"), item.get("map_prompt"), item.get("reduce_prompt")):
+                if text:
+                    _compile_text(text)
+            for step in item.get("steps", []):
+                _compile_text(str(step.get("tool", "")))
+                for value in step.get("args", {}).values():
+                    _compile_text(str(value))
+        if group:
+            try:
+                plan_parallel(group)
+            except ValueError as e:
+                raise ValueError(f"Ongeldige workflow-template {label}: {e}") from e
+
+
+def _read_template(path: Path) -> dict:
+    """
+    Geparste en gevalideerde template uit path, gecachet op mtime en grootte.
+    De teruggegeven dict wordt gedeeld: kopieer hem vóór je hem aanpast.
+    """
+    st = path.stat()
+    signature = (st.st_mtime_ns, st.st_size)
+    key = str(path)
+    with _template_lock:
+        cached = _template_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+    data = json.loads(path.read_text(encoding="utf-8"))
+    validate_workflow(data, source=path.name)
+    with _template_lock:
+        _template_cache[key] = (signature, data)
+    return data
+
+
 def load_workflow(name: str, project_path: str = "") -> dict:
     """
     Laad een workflow-template op naam.
@@ -94,7 +197,10 @@ def load_workflow(name: str, project_path: str = "") -> dict:
       1. <project>/.regian_workflow/<naam>.json
       2. <root>/.regian_workflow/<naam>.json
       3. regian/workflows/<naam>.json  (ingebouwde templates)
-    Gooit FileNotFoundError als de template niet gevonden wordt.
+    Het bestand wordt enkel opnieuw gelezen als het gewijzigd is; het resultaat
+    is gedeeld en mag niet aangepast worden.
+    Gooit FileNotFoundError als de template niet gevonden wordt, ValueError
+    als ze ongeldig is.
     """
     candidates = [
         _workflow_dir(project_path) / f"{name}.json",
@@ -103,7 +209,7 @@ def load_workflow(name: str, project_path: str = "") -> dict:
     ]
     for path in candidates:
         if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
+            return _read_template(path)
     searched = "\n  ".join(str(c) for c in candidates)
     raise FileNotFoundError(
         f"Workflow-template '{name}' niet gevonden. Gezocht in:\n  {searched}"
@@ -126,7 +232,7 @@ def list_workflows(project_path: str = "") -> list[dict]:
             continue
         for f in sorted(d.glob("*.json")):
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
+                data = _read_template(f)
                 wid = data.get("id", f.stem)
                 seen[wid] = {
                     "id":          wid,
@@ -142,20 +248,135 @@ def list_workflows(project_path: str = "") -> list[dict]:
 
 # ── State persistentie ────────────────────────────────────────────────────────
 
-def save_run(run: WorkflowRun) -> None:
-    """Sla de run-state op naar schijf."""
+def save_run(run: WorkflowRun, expect_status: str | None = None) -> bool:
+    """
+    Sla de run-state op: het verschil met de vorige opslag komt als events in
+    het journaal, een afgeronde run krijgt een compacte snapshot (zie
+    runjournal). Daarna wordt de run-index bijgewerkt; een fout in de index
+    breekt de run niet (de volgende query synchroniseert vanaf de bestanden).
+    Met expect_status wordt niets bewaard (False) als de status op schijf
+    intussen een andere is, bv. een run die geannuleerd werd tijdens een fase.
+    """
+    from regian.core import runjournal
+    from regian.core.blobstore import BlobDict, externalize_entry, externalize_map, get_store, wrap_entry
     sdir = _state_dir(run.project_path)
     sdir.mkdir(parents=True, exist_ok=True)
-    path = sdir / f"{run.run_id}.json"
-    path.write_text(json.dumps(run.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+    store = get_store(_blob_dir(run.project_path))
+    # Lange uitvoer gaat naar de blob-store; de state bewaart enkel referenties
+    if not isinstance(run.artifacts, BlobDict):
+        run.artifacts = BlobDict(run.artifacts, store=store)
+    for i, entry in enumerate(run.phase_log):
+        if isinstance(entry, dict) and not isinstance(entry, BlobDict):
+            run.phase_log[i] = wrap_entry(entry, store)
+    data = {f.name: getattr(run, f.name) for f in fields(run)}
+    data["artifacts"] = externalize_map(run.artifacts)
+    data["phase_log"] = [externalize_entry(e, store) if isinstance(e, BlobDict) else e for e in run.phase_log]
+    if run.task_state:
+        results = run.task_state.get("results")
+        if not isinstance(results, BlobDict):
+            results = run.task_state["results"] = BlobDict(results or {}, store=store)
+        data["task_state"] = {**run.task_state, "results": externalize_map(results)}
+    finished = run.status in (STATUS_DONE, STATUS_CANCELLED, STATUS_ERROR)
+    if not runjournal.persist(sdir, data, compact=finished, expect_status=expect_status):
+        return False
+    try:
+        from regian.core.runindex import get_run_index
+        get_run_index().record(sdir, data, runjournal.run_mtime_ns(sdir, run.run_id))
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"[Workflow] Kon run-index niet bijwerken voor {run.run_id}: {e}")
+    with _status_lock:
+        _run_status[run.run_id] = run.status
+    if finished:
+        _maybe_collect_blobs(run.project_path)
+    return True
+
+
+# Blob-map → tijdstip van de laatste opruimronde
+_blob_gc_last: dict[str, float] = {}
+_BLOB_GC_INTERVAL_S = 3600
+
+
+def collect_blob_garbage(project_path: str = "") -> tuple[int, int]:
+    """
+    Verwijder artifact-blobs waar geen run van het project nog naar verwijst.
+    Geeft (aantal verwijderd, vrijgekomen bytes) terug.
+    """
+    from regian.core.blobstore import collect_garbage, get_store
+
+    def states():
+        for f in _state_dir(project_path).glob("*.json"):
+            try:
+                yield read_run_data(f)
+            except (OSError, ValueError):
+                # Onleesbare state: niets opruimen, anders verliest die run haar blobs
+                raise RuntimeError(f"Run-state {f.name} onleesbaar; opruimen afgebroken")
+
+    return collect_garbage(get_store(_blob_dir(project_path)), states())
+
+
+def _maybe_collect_blobs(project_path: str) -> None:
+    """Ruim blobs op na een afgeronde run, hoogstens één keer per _BLOB_GC_INTERVAL_S."""
+    key = str(_blob_dir(project_path))
+    now = time.monotonic()
+    with _status_lock:
+        last = _blob_gc_last.get(key)
+        if last is not None and now - last < _BLOB_GC_INTERVAL_S:
+            return
+        _blob_gc_last[key] = now
+    try:
+        removed, freed = collect_blob_garbage(project_path)
+        if removed:
+            logger.info(f"[Workflow] {removed} ongebruikte blob(s) opgeruimd ({freed} bytes)")
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"[Workflow] Blobs opruimen mislukt: {e}")
+
+
+# Status per run_id voor de metrics-gauge; bij het eerste gebruik één keer van schijf gevuld
+_run_status: dict[str, str] = {}
+_status_seeded = False
+_status_lock = threading.Lock()
+
+
+def run_status_counts() -> dict[str, int]:
+    """
+    Geeft het aantal runs per status terug (werkmap + alle projecten).
+    Schijf wordt één keer gescand; daarna houdt save_run() de tabel bij.
+    """
+    global _status_seeded
+    if not _status_seeded:
+        from regian.settings import get_root_dir
+        root = Path(get_root_dir())
+        seeded: dict[str, str] = {}
+        for f in list(root.glob(".regian_workflow_state/*.json")) + list(root.glob("*/.regian_workflow_state/*.json")):
+            try:
+                data = read_run_data(f)
+                seeded[data["run_id"]] = data["status"]
+            except Exception:
+                continue
+        with _status_lock:
+            for run_id, status in seeded.items():
+                _run_status.setdefault(run_id, status)
+            _status_seeded = True
+    counts: dict[str, int] = {}
+    with _status_lock:
+        for status in _run_status.values():
+            counts[status] = counts.get(status, 0) + 1
+    return counts
 
 
 def load_run(run_id: str, project_path: str = "") -> WorkflowRun:
-    """Laad een run-state van schijf."""
-    path = _state_dir(project_path) / f"{run_id}.json"
-    if not path.exists():
-        raise FileNotFoundError(f"Run '{run_id}' niet gevonden in {_state_dir(project_path)}")
-    return WorkflowRun.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    """Laad een run-state van schijf (snapshot plus de events in het journaal)."""
+    from regian.core import runjournal
+    sdir = _state_dir(project_path)
+    if not (sdir / f"{run_id}.json").exists():
+        raise FileNotFoundError(f"Run '{run_id}' niet gevonden in {sdir}")
+    return WorkflowRun.from_dict(runjournal.load(sdir, run_id))
+
+
+def read_run_data(path: Path) -> dict:
+    """De state van een run-bestand als dict, inclusief de events uit het journaal."""
+    from regian.core.runjournal import read_run_data as _read
+    return _read(path)
 
 
 def list_runs(project_path: str = "") -> list[WorkflowRun]:
@@ -166,23 +387,76 @@ def list_runs(project_path: str = "") -> list[WorkflowRun]:
     runs = []
     for f in sdir.glob("*.json"):
         try:
-            runs.append(WorkflowRun.from_dict(json.loads(f.read_text(encoding="utf-8"))))
+            runs.append(WorkflowRun.from_dict(read_run_data(f)))
         except Exception:
             continue
     return sorted(runs, key=lambda r: r.started_at, reverse=True)
 
 
+def list_run_summaries(project_path: str = "", all_projects: bool = False) -> list:
+    """
+    Geeft RunSummary's (id, workflow, status, fase, tijden, project) terug uit de
+    run-index, nieuwste eerst, zonder artifacts te laden. all_projects: de
+    werkmap plus alle projecten eronder. Valt terug op list_runs() als de index
+    niet bruikbaar is.
+    """
+    from regian.core.runindex import RunSummary, get_run_index
+    if all_projects:
+        from regian.settings import get_root_dir
+        root = Path(get_root_dir())
+        dirs = [root / ".regian_workflow_state"] + sorted(root.glob("*/.regian_workflow_state"))
+    else:
+        dirs = [_state_dir(project_path)]
+    try:
+        index = get_run_index()
+        for d in dirs:
+            index.sync(d)
+        return index.summaries(dirs)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"[Workflow] Run-index niet bruikbaar, runs worden volledig gelezen: {e}")
+    runs = [r for d in dirs for r in list_runs(_project_of(d))]
+    return [
+        RunSummary(r.run_id, r.project_path, r.workflow_id, r.workflow_name, r.status,
+                   r.current_phase_index, r.started_at, r.updated_at)
+        for r in sorted(runs, key=lambda r: r.started_at, reverse=True)
+    ]
+
+
+def _project_of(state_dir: Path) -> str:
+    """Projectpad bij een state-map ('' voor de werkmap)."""
+    from regian.settings import get_root_dir
+    parent = state_dir.parent
+    return "" if parent.resolve() == Path(get_root_dir()).resolve() else str(parent)
+
+
 # ── Template-substitutie ──────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=4096)
+def _compile_text(template: str) -> tuple[str, ...]:
+    """
+    Splits een template-string één keer in stukken: letterlijke tekst op even
+    posities, placeholder-sleutels op oneven posities.
+    """
+    return tuple(re.split(r"\{\{(\w+)\}\}", template))
+
+
 def _render_template(template: str, artifacts: dict) -> str:
     """
     Vervang {{sleutel}} placeholders in een template-string door waarden uit artifacts.
     Onbekende placeholders blijven staan.
     """
-    def replace(match: re.Match) -> str:
-        key = match.group(1).strip()
-        return str(artifacts.get(key, match.group(0)))
-    return re.sub(r"\{\{(\w+)\}\}", replace, template)
+    parts = _compile_text(template)
+    if len(parts) == 1:
+        return template
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2 == 0:
+            out.append(part)
+        elif part in artifacts:
+            out.append(str(artifacts[part]))
+        else:
+            out.append("{{" + part + "}}")
+    return "".join(out)
 
 
 # ── LLM-helper (hergebruik OrchestratorAgent's llm) ──────────────────────────
@@ -201,7 +475,52 @@ def execute_phase(run: WorkflowRun, phase: dict) -> tuple[str, bool]:
     Geeft (output_tekst, needs_approval) terug.
     Bij needs_approval=True moet de aanroeper de run pauzeren.
     Bij type='human_checkpoint' wordt altijd needs_approval=True teruggegeven.
+    LLM-verbruik wordt aan deze run toegeschreven; een optionele 'token_budget'
+    in de fase begrenst het aantal tokens dat de fase mag verbruiken.
+    Staat de fase in PROFILE_PHASES, dan wordt ze geprofileerd (zie core/profiling.py).
+    """
+    from regian.core.usage import usage_scope
+    from regian.core.profiling import is_profiled, profile_scope
+    from regian.core import metrics
+    project = Path(run.project_path).name if run.project_path else None
+    phase_id = phase.get("id", "")
+    with usage_scope(
+        source="workflow",
+        project=project,
+        run_id=run.run_id,
+        budget=phase.get("token_budget"),
+    ):
+        try:
+            if is_profiled("phase", phase_id, run.workflow_id):
+                with profile_scope("phase", phase_id, workflow_id=run.workflow_id, run_id=run.run_id):
+                    result = _dispatch_phase(run, phase)
+            else:
+                result = _dispatch_phase(run, phase)
+        except Exception:
+            metrics.inc("regian_workflow_phases_total", type=phase.get("type", ""), status="error")
+            raise
+    metrics.inc("regian_workflow_phases_total", type=phase.get("type", ""), status="ok")
+    return result
+
+
+def _with_profile(entry: dict, phase: dict) -> dict:
+    """
+    Voeg het profile_id van een net geprofileerde fase toe aan een phase_log-entry,
+    en bij een parallelle groep de entries van haar takken ('branches').
     """
+    from regian.core.profiling import take_pending_profile
+    profile_id = take_pending_profile("phase", phase.get("id", ""))
+    if profile_id:
+        entry["profile_id"] = profile_id
+    pending = getattr(_branch_local, "pending", None)
+    if pending and pending[0] == phase.get("id", ""):
+        entry["branches"] = pending[1]
+        _branch_local.pending = None
+    return entry
+
+
+def _dispatch_phase(run: WorkflowRun, phase: dict) -> tuple[str, bool]:
+    """Kies de handler op basis van het fase-type."""
     phase_type = phase.get("type", "")
     artifacts = run.artifacts
 
@@ -219,19 +538,35 @@ def execute_phase(run: WorkflowRun, phase: dict) -> tuple[str, bool]:
     elif phase_type == "tool_chain":
         return _run_tool_chain(phase, artifacts, run), phase.get("require_approval", False)
 
+    elif phase_type == "map_reduce":
+        return _run_map_reduce(phase, run), phase.get("require_approval", False)
+
+    elif phase_type == "parallel":
+        needs_approval = phase.get("require_approval", False) or any(
+            b.get("require_approval", False) for b in phase.get("phases", [])
+        )
+        return _run_parallel(phase, run), needs_approval
+
     else:
         return f"⚠️ Onbekend fase-type: '{phase_type}'", False
 
 
+_DEFAULT_SYSTEM_PROMPT = "Je bent een AI-assistent van Regian OS. Antwoord bondig in het Nederlands."
+
+
 def _run_llm_prompt(phase: dict, artifacts: dict) -> str:
     """Voer een llm_prompt-fase uit: render template → LLM-aanroep → resultaat."""
-    from langchain_core.messages import HumanMessage, SystemMessage
-
     template = phase.get("prompt_template", "")
     prompt = _render_template(template, artifacts)
-    system = phase.get("system_prompt", "Je bent een AI-assistent van Regian OS. Antwoord bondig in het Nederlands.")
+    return _ask_llm(prompt, phase.get("system_prompt", _DEFAULT_SYSTEM_PROMPT))
+
+
+def _ask_llm(prompt: str, system: str) -> str:
+    """Eén LLM-aanroep (systeem- + gebruikersbericht); geeft de tekst van het antwoord."""
+    from langchain_core.messages import HumanMessage, SystemMessage
+    from regian.core.usage import invoke_llm
     llm = _get_llm()
-    response = llm.invoke([
+    response = invoke_llm(llm, [
         SystemMessage(content=system),
         HumanMessage(content=prompt),
     ])
@@ -245,7 +580,11 @@ def _run_task_loop(phase: dict, artifacts: dict, run: WorkflowRun) -> str:
     """
     Voer een task_loop-fase uit.
     Leest de takenlijst uit artifacts[source_key], maakt een plan per taak
-    en voert ze uit via de OrchestratorAgent.
+    en voert ze uit via de OrchestratorAgent. Met 'parallel': true lopen de
+    plannen gelijktijdig en de uitvoering waar dat veilig is (zie
+    _run_tasks_parallel); de resultaten staan altijd in de volgorde van de lijst.
+    Na elke taak wordt de run bewaard met het resultaat in run.task_state; een
+    hervatte fase (crash, time-out) slaat de al afgewerkte taken over.
     """
     from regian.core.agent import OrchestratorAgent
 
@@ -266,16 +605,209 @@ def _run_task_loop(phase: dict, artifacts: dict, run: WorkflowRun) -> str:
         return "⚠️ Kon geen taken extraheren uit de takenlijst."
 
     orch = OrchestratorAgent()
-    results = []
-    for i, task in enumerate(tasks, 1):
-        plan = orch.plan(task)
-        if plan:
-            result = orch.execute_plan(plan, source=f"workflow:{run.run_id}", group_id=run.run_id)
+    phase_id = phase.get("id", "")
+    done = _task_checkpoint(run, phase, tasks)
+    for i in done:
+        _task_event(run, phase_id, i, len(tasks), "restored")
+    save_lock = threading.Lock()
+
+    def checkpoint(i: int, result: str) -> None:
+        with save_lock:
+            run.task_state["results"][str(i)] = result
+            try:
+                save_run(run, expect_status=STATUS_RUNNING)
+            except OSError as e:
+                logger.warning(f"[Workflow] Taak-checkpoint van {run.run_id} niet bewaard: {e}")
+
+    try:
+        if phase.get("parallel"):
+            results = _run_tasks_parallel(phase, tasks, run, orch, done, checkpoint)
         else:
-            result = orch.run(task)
-        results.append(f"**Taak {i}/{len(tasks)}:** {task}\n{result}")
+            results = []
+            for i, task in enumerate(tasks):
+                if i in done:
+                    results.append(done[i])
+                    continue
+                _task_event(run, phase_id, i, len(tasks), "started")
+                plan = orch.plan(task)
+                if plan:
+                    result = orch.execute_plan(plan, source=f"workflow:{run.run_id}", group_id=run.run_id)
+                else:
+                    result = orch.run(task)
+                checkpoint(i, result)
+                _task_event(run, phase_id, i, len(tasks), "done")
+                results.append(result)
+    finally:
+        with _progress_lock:
+            _task_progress.pop(run.run_id, None)
+    # De fase is klaar: het checkpoint verdwijnt samen met het opslaan van haar uitvoer
+    run.task_state = {}
+
+    return "\n\n---\n\n".join(
+        f"**Taak {i}/{len(tasks)}:** {task}\n{result}"
+        for i, (task, result) in enumerate(zip(tasks, results), 1)
+    )
+
+
+# Argumenten van tools die een pad aanduiden (voor de detectie van disjuncte taken)
+_PATH_ARGS = ("path", "destination", "file_path")
+# Tools waarvan niet te zeggen is wat ze aanraken
+_OPAQUE_TOOLS = ("run_shell", "run_python")
 
-    return "\n\n---\n\n".join(results)
+
+def _plan_paths(plan: list, base: str) -> set | None:
+    """
+    Absolute paden die een plan aanraakt (relatief t.o.v. base), of None als
+    dat niet vast te stellen is (een stap zonder pad-argument, of shell/python).
+    """
+    paths: set = set()
+    for step in plan:
+        args = step.get("args", {}) if isinstance(step, dict) else {}
+        found = [str(args[k]) for k in _PATH_ARGS if args.get(k)]
+        if step.get("tool") in _OPAQUE_TOOLS or not found:
+            return None
+        if args.get("new_name") and args.get("path"):
+            # rename_file: de nieuwe naam staat naast het oude pad
+            found.append(os.path.join(os.path.dirname(str(args["path"])), str(args["new_name"])))
+        paths.update(os.path.normpath(os.path.join(base, p)) for p in found)
+    return paths
+
+
+def _paths_overlap(a: set, b: set) -> bool:
+    """Raken twee padverzamelingen hetzelfde bestand of dezelfde (boven)map?"""
+    return any(p == q or p.startswith(q + os.sep) or q.startswith(p + os.sep) for p in a for q in b)
+
+
+def plan_task_waves(paths: list[set | None], independent: bool = False) -> list[list[int]]:
+    """
+    Verdeel taken (indexen) in golven die tegelijk mogen lopen. Een taak loopt
+    na elke eerdere taak waarmee ze paden deelt; een taak met onbekende paden
+    (None) loopt alleen, na alle eerdere en vóór alle latere taken.
+    independent=True: alle taken in één golf.
+    """
+    if independent:
+        return [list(range(len(paths)))] if paths else []
+    wave_of: list[int] = []
+    for i, mine in enumerate(paths):
+        wave = 0
+        for j in range(i):
+            theirs = paths[j]
+            if mine is None or theirs is None or _paths_overlap(mine, theirs):
+                wave = max(wave, wave_of[j] + 1)
+        wave_of.append(wave)
+    waves: list[list[int]] = [[] for _ in range(max(wave_of, default=-1) + 1)]
+    for i, wave in enumerate(wave_of):
+        waves[wave].append(i)
+    return waves
+
+
+def _task_checkpoint(run: WorkflowRun, phase: dict, tasks: list[str]) -> dict[int, str]:
+    """
+    Al afgewerkte taken (index → resultaat) uit run.task_state, als dat
+    checkpoint bij deze fase hoort: zelfde fase-id, input-hash (definitie,
+    model en takenlijst) en aantal taken. Anders begint een leeg checkpoint.
+    """
+    from regian.core.blobstore import BlobDict
+    key = {"phase_id": phase.get("id", ""), "input_hash": phase_input_hash(run, phase), "total": len(tasks)}
+    state = run.task_state
+    if state and all(state.get(k) == v for k, v in key.items()):
+        results = state.get("results", {})
+        return {int(k): results[k] for k in list(results) if k.isdigit() and int(k) < len(tasks)}
+    run.task_state = {**key, "results": BlobDict({}, store=run.artifacts.store)}
+    return {}
+
+
+def _run_tasks_parallel(
+    phase: dict,
+    tasks: list[str],
+    run: WorkflowRun,
+    orch,
+    done: dict[int, str] | None = None,
+    on_done=None,
+) -> list[str]:
+    """
+    Plan alle taken gelijktijdig (max_parallel van de fase, anders
+    WORKFLOW_MAX_PARALLEL; elke LLM-aanroep gaat bovendien door de
+    admission-poort) en voer ze uit in golven volgens plan_task_waves(): taken
+    die 'independent' verklaard zijn of disjuncte paden aanraken lopen samen.
+    Een taak zonder plan wordt rechtstreeks beantwoord (geen neveneffecten).
+    Taken in `done` (checkpoint) lopen niet opnieuw; on_done(i, resultaat)
+    wordt na elke uitgevoerde taak aangeroepen.
+    """
+    from regian.settings import get_root_dir, get_workflow_max_parallel
+
+    phase_id = phase.get("id", "")
+    total = len(tasks)
+    limit = max(1, int(phase.get("max_parallel") or get_workflow_max_parallel()))
+    base = get_root_dir()   # bestandstools lossen relatieve paden op t.o.v. de werkmap
+
+    def plan_one(i: int) -> list:
+        _task_event(run, phase_id, i, total, "planning")
+        return orch.plan(tasks[i])
+
+    def execute_one(i: int) -> str:
+        _task_event(run, phase_id, i, total, "started")
+        if plans[i]:
+            result = orch.execute_plan(plans[i], source=f"workflow:{run.run_id}", group_id=run.run_id)
+        else:
+            result = orch.answer(tasks[i])
+        if on_done is not None:
+            on_done(i, result)
+        _task_event(run, phase_id, i, total, "done")
+        return result
+
+    done = done or {}
+    results: list[str] = [done.get(i, "") for i in range(total)]
+    pending = [i for i in range(total) if i not in done]
+    if not pending:
+        return results
+    with ThreadPoolExecutor(max_workers=min(limit, len(pending)), thread_name_prefix="regian-task") as pool:
+        # Elke taak erft usage-scope en prioriteit van de fase
+        futures = {i: pool.submit(contextvars.copy_context().run, plan_one, i) for i in pending}
+        plans = {i: future.result() for i, future in futures.items()}
+        paths = [_plan_paths(plans[i], base) if plans[i] else set() for i in pending]
+        for wave in plan_task_waves(paths, bool(phase.get("independent"))):
+            futures = [(pending[j], pool.submit(contextvars.copy_context().run, execute_one, pending[j])) for j in wave]
+            for i, future in futures:
+                results[i] = future.result()
+    return results
+
+
+# Voortgang van lopende task_loops: run_id → {phase_id, total, done, running}
+_task_progress: dict[str, dict] = {}
+_progress_lock = threading.Lock()
+
+
+def _task_event(run: WorkflowRun, phase_id: str, index: int, total: int, status: str) -> None:
+    """
+    Voortgangsevent van één taak (planning / started / done / restored uit
+    het checkpoint): houdt task_progress() bij, telt afgewerkte taken in de
+    metrics en logt.
+    """
+    from regian.core import metrics
+    with _progress_lock:
+        progress = _task_progress.setdefault(
+            run.run_id, {"phase_id": phase_id, "total": total, "done": 0, "running": []}
+        )
+        if status == "started":
+            progress["running"].append(index)
+        elif status in ("done", "restored"):
+            progress["done"] += 1
+            if index in progress["running"]:
+                progress["running"].remove(index)
+    if status in ("done", "restored"):
+        metrics.inc("regian_workflow_tasks_total", status=status)
+    logger.debug(f"[Workflow] {run.run_id} {phase_id}: taak {index + 1}/{total} {status}")
+
+
+def task_progress(run_id: str) -> dict | None:
+    """
+    Voortgang van de task_loop die nu loopt voor run_id (in dit proces):
+    {phase_id, total, done, running: [taakindexen]}, of None.
+    """
+    with _progress_lock:
+        progress = _task_progress.get(run_id)
+        return None if progress is None else {**progress, "running": list(progress["running"])}
 
 
 def _run_tool_chain(phase: dict, artifacts: dict, run: WorkflowRun) -> str:
@@ -298,17 +830,399 @@ def _run_tool_chain(phase: dict, artifacts: dict, run: WorkflowRun) -> str:
     return "\n\n".join(results)
 
 
+# ── Map-reduce ────────────────────────────────────────────────────────────────
+
+# Placeholders die een map_reduce-fase zelf invult (geen artifacts)
+_MAP_REDUCE_VARS = ("chunk", "chunk_index", "chunk_count", "results")
+# Tekens per token, zoals usage.estimate_tokens
+_CHARS_PER_TOKEN = 4
+
+
+def split_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Verdeel text in stukken van hoogstens max_tokens (geschat). Er wordt
+    geknipt tussen alinea's, binnen een te lange alinea tussen regels, en
+    enkel een te lange regel wordt midden in de tekst gesplitst.
+    """
+    limit = max(1, max_tokens) * _CHARS_PER_TOKEN
+    units: list[tuple[str, str]] = []   # (tekst, scheiding ervoor)
+    for para in re.split(r"\n\s*\n", text.strip()):
+        lines = [para] if len(para) <= limit else para.splitlines()
+        for j, line in enumerate(lines):
+            for k in range(0, max(len(line), 1), limit):
+                units.append((line[k:k + limit], ("\n\n" if j == 0 else "\n") if k == 0 else ""))
+    chunks: list[str] = []
+    current = ""
+    for unit, sep in units:
+        if current and len(current) + len(sep) + len(unit) > limit:
+            chunks.append(current)
+            current = unit
+        else:
+            current = current + sep + unit if current else unit
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def _group_results(results: list[str], limit: int) -> list[list[str]]:
+    """
+    Groepeer deelresultaten voor de tussenliggende reduce-aanroepen: elk
+    groepje blijft onder limit tekens, maar telt minstens twee resultaten,
+    zodat elke ronde het aantal resultaten verkleint.
+    """
+    groups: list[list[str]] = []
+    size = 0
+    for result in results:
+        if groups and (len(groups[-1]) < 2 or size + len(result) <= limit):
+            groups[-1].append(result)
+            size += len(result)
+        else:
+            groups.append([result])
+            size = len(result)
+    if len(groups) > 1 and len(groups[-1]) == 1:
+        groups[-2].extend(groups.pop())
+    return groups
+
+
+def _join_results(results: list[str]) -> str:
+    return "\n\n---\n\n".join(f"### Deel {i}/{len(results)}\n{r}" for i, r in enumerate(results, 1))
+
+
+def _run_map_reduce(phase: dict, run: WorkflowRun) -> str:
+    """
+    Voer een map_reduce-fase uit: knip artifacts[source_key] in stukken van
+    hoogstens chunk_tokens (anders WORKFLOW_CHUNK_TOKENS) en stuur map_prompt
+    per stuk ({{chunk}}, {{chunk_index}}, {{chunk_count}}) gelijktijdig naar
+    het LLM (max_parallel, anders WORKFLOW_MAX_PARALLEL; elke aanroep gaat door
+    de admission-poort). reduce_prompt ({{results}}) combineert de
+    deelresultaten; passen die niet samen binnen chunk_tokens, dan wordt eerst
+    per groepje gereduceerd, tot één aanroep volstaat. Zonder reduce_prompt
+    worden de deelresultaten samengevoegd. reduce_revision (bijsturing via
+    revise_run) komt enkel achter de laatste reduce-aanroep en telt niet mee
+    in het budget van de tussenliggende niveaus.
+    """
+    from regian.settings import get_workflow_chunk_tokens, get_workflow_max_parallel
+
+    artifacts = run.artifacts
+    source_key = phase.get("source_key", "input")
+    text = artifacts.get(source_key, "")
+    if not text or not str(text).strip():
+        return f"⚠️ Geen invoer gevonden onder sleutel '{source_key}'."
+    chunk_tokens = max(1, int(phase.get("chunk_tokens") or get_workflow_chunk_tokens()))
+    limit = max(1, int(phase.get("max_parallel") or get_workflow_max_parallel()))
+    system = phase.get("system_prompt", _DEFAULT_SYSTEM_PROMPT)
+    map_template = phase.get("map_prompt", "{{chunk}}")
+    reduce_template = phase.get("reduce_prompt", "")
+
+    def ask(template: str, values: dict) -> str:
+        # De eigen placeholders gaan voor; artifacts worden pas geladen als de template ze noemt
+        return _ask_llm(_render_template(template, collections.ChainMap(values, artifacts)), system)
+
+    chunks = split_chunks(str(text), chunk_tokens)
+    jobs = [
+        (map_template, {"chunk": chunk, "chunk_index": str(i), "chunk_count": str(len(chunks))})
+        for i, chunk in enumerate(chunks, 1)
+    ]
+    with ThreadPoolExecutor(max_workers=min(limit, len(jobs)), thread_name_prefix="regian-map") as pool:
+        def run_all(jobs: list[tuple[str, dict]]) -> list[str]:
+            # Elke aanroep erft usage-scope en prioriteit van de fase
+            futures = [pool.submit(contextvars.copy_context().run, ask, tpl, values) for tpl, values in jobs]
+            return [future.result() for future in futures]
+
+        results = run_all(jobs)
+        if not reduce_template:
+            return "\n\n".join(results)
+        budget = max(1, chunk_tokens * _CHARS_PER_TOKEN - len(reduce_template))
+        level = 0
+        while len(results) > 1 and len(_join_results(results)) > budget:
+            level += 1
+            groups = _group_results(results, budget)
+            logger.debug(f"[Workflow] {run.run_id} {phase.get('id', '')}: reduce-niveau {level}, "
+                         f"{len(results)} → {len(groups)} resultaten")
+            results = run_all([(reduce_template, {"results": _join_results(g)}) for g in groups])
+    logger.info(f"[Workflow] {run.run_id} {phase.get('id', '')}: {len(chunks)} stukken, "
+                f"{level} tussenliggende reduce-niveau(s)")
+    return ask(reduce_template + phase.get("reduce_revision", ""), {"results": _join_results(results)})
+
+
+# ── Parallelle groepen ────────────────────────────────────────────────────────
+
+# Takken-entries van de laatst uitgevoerde groep, tot _with_profile ze ophaalt
+_branch_local = threading.local()
+
+
+def phase_inputs(phase: dict) -> list[str]:
+    """
+    Artifact-sleutels die een fase leest: het veld 'inputs', anders de
+    {{sleutel}}-placeholders in haar prompt(-template) en stappen.
+    """
+    if phase.get("inputs") is not None:
+        return list(phase["inputs"])
+    texts = [phase.get("prompt_template", ""), phase.get("prompt", "")]
+    for step in phase.get("steps", []):
+        texts.append(str(step.get("tool", "")))
+        texts.extend(str(v) for v in step.get("args", {}).values())
+    own: tuple = ()
+    if phase.get("type") == "map_reduce":
+        texts += [phase.get("map_prompt", ""), phase.get("reduce_prompt", "")]
+        own = _MAP_REDUCE_VARS
+    keys = [key for text in texts for key in _compile_text(text)[1::2] if key not in own]
+    return list(dict.fromkeys(keys))
+
+
+def plan_parallel(branches: list[dict]) -> list[list[dict]]:
+    """
+    Verdeel de takken van een parallelle groep in golven: een tak loopt in de
+    eerste golf waarin alle takken klaar zijn waarvan ze een output_key leest.
+    Gooit ValueError bij een niet-toegestaan fase-type of een cyclus.
+    """
+    for branch in branches:
+        if branch.get("type", "") not in PARALLEL_BRANCH_TYPES:
+            raise ValueError(
+                f"Fase-type '{branch.get('type', '')}' (tak '{branch.get('id', '')}') kan niet parallel lopen; "
+                f"toegestaan: {', '.join(PARALLEL_BRANCH_TYPES)}."
+            )
+    produced = {b["output_key"] for b in branches if b.get("output_key")}
+    waves: list[list[dict]] = []
+    done: set = set()
+    remaining = list(branches)
+    while remaining:
+        wave = [b for b in remaining if all(k in done or k not in produced for k in phase_inputs(b))]
+        if not wave:
+            ids = ", ".join(b.get("id", "?") for b in remaining)
+            raise ValueError(f"Cyclische afhankelijkheid tussen takken: {ids}")
+        waves.append(wave)
+        done.update(b["output_key"] for b in wave if b.get("output_key"))
+        remaining = [b for b in remaining if not any(b is w for w in wave)]
+    return waves
+
+
+def _run_branch(run: WorkflowRun, branch: dict) -> dict:
+    """Voer één tak uit (in een werkthread) en geef haar phase_log-entry terug."""
+    branch_id = branch.get("id", "")
+    t0 = time.perf_counter()
+    try:
+        output, _ = execute_phase(run, branch)
+        status = "done"
+    except Exception as exc:
+        output, status = str(exc), "error"
+    return _with_profile({
+        "phase_id": branch_id,
+        "phase_name": branch.get("name", branch_id),
+        "status": status,
+        "output": output,
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "duration_s": round(time.perf_counter() - t0, 3),
+    }, branch)
+
+
+def _run_parallel(phase: dict, run: WorkflowRun) -> str:
+    """
+    Voer een parallelle groep uit: elke golf takken loopt gelijktijdig
+    (max_parallel van de groep, anders WORKFLOW_MAX_PARALLEL); na elke golf
+    komen de output_keys van de geslaagde takken in artifacts (join).
+    Faalt een tak, dan lopen latere golven niet meer en gooit de groep een
+    RuntimeError. De takken-entries komen in de phase_log-entry van de groep.
+    """
+    from regian.settings import get_workflow_max_parallel
+
+    group_id = phase.get("id", "")
+    branches = phase.get("phases", [])
+    if not branches:
+        return "⚠️ Geen takken gedefinieerd in parallelle groep."
+    waves = plan_parallel(branches)
+    limit = max(1, int(phase.get("max_parallel") or get_workflow_max_parallel()))
+
+    entries: dict[int, dict] = {}
+    failed: list[str] = []
+    with ThreadPoolExecutor(
+        max_workers=min(limit, max(len(w) for w in waves)), thread_name_prefix="regian-workflow"
+    ) as pool:
+        for wave in waves:
+            if failed:
+                for branch in wave:
+                    entries[id(branch)] = {
+                        "phase_id": branch.get("id", ""),
+                        "phase_name": branch.get("name", branch.get("id", "")),
+                        "status": "skipped",
+                        "output": "",
+                        "ts": datetime.now().isoformat(timespec="seconds"),
+                    }
+                continue
+            # Elke tak erft usage-scope en prioriteit van de groep
+            futures = [
+                (branch, pool.submit(contextvars.copy_context().run, _run_branch, run, branch))
+                for branch in wave
+            ]
+            results = [(branch, future.result()) for branch, future in futures]
+            for branch, entry in results:
+                entries[id(branch)] = entry
+                if entry["status"] != "done":
+                    failed.append(entry["phase_id"])
+                elif branch.get("output_key"):
+                    run.artifacts[branch["output_key"]] = entry["output"]
+
+    ordered = [entries[id(b)] for b in branches]
+    _branch_local.pending = (group_id, ordered)
+    if failed:
+        raise RuntimeError(f"Parallelle groep '{group_id}': tak(ken) mislukt: {', '.join(failed)}")
+    return "\n\n".join(f"### {e['phase_name']}\n{e['output']}" for e in ordered)
+
+
+# ── Incrementeel herstarten ───────────────────────────────────────────────────
+
+# Velden die de uitvoer van een fase niet beïnvloeden
+_COSMETIC_KEYS = ("name", "icon", "description", "require_approval")
+
+
+def _hash_inputs(phase: dict) -> list[str]:
+    """Artifact-sleutels die de uitvoer van een fase bepalen (ook voor task_loop en groepen)."""
+    if phase.get("type") == "parallel":
+        branches = phase.get("phases", [])
+        produced = {b.get("output_key") for b in branches}
+        keys = [k for b in branches for k in phase_inputs(b) if k not in produced]
+    else:
+        keys = phase_inputs(phase)
+    if phase.get("type") == "task_loop":
+        keys.append(phase.get("source_key", "task_list"))
+    elif phase.get("type") == "map_reduce":
+        keys.append(phase.get("source_key", "input"))
+    return sorted(set(keys))
+
+
+def _strip_cosmetic(phase: dict) -> dict:
+    out = {k: v for k, v in phase.items() if k not in _COSMETIC_KEYS}
+    if isinstance(out.get("phases"), list):
+        out["phases"] = [_strip_cosmetic(b) if isinstance(b, dict) else b for b in out["phases"]]
+    return out
+
+
+def _digest(value: Any) -> str:
+    from regian.core.blobstore import REF_KEY, is_ref
+    if is_ref(value):
+        return value[REF_KEY]   # de blob-hash is al een inhoudshash
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def phase_input_hash(run: WorkflowRun, phase: dict) -> str:
+    """
+    Hash van alles wat de uitvoer van een fase bepaalt: de fase-definitie (zonder
+    naam/icoon), provider en model, en de artifacts die ze leest. Gelijke hash →
+    de vorige uitvoer kan hergebruikt worden.
+    """
+    from regian.settings import get_llm_model, get_llm_provider
+    raw = run.artifacts.raw() if hasattr(run.artifacts, "raw") else dict(run.artifacts)
+    payload = {
+        "phase": _strip_cosmetic(phase),
+        "model": [get_llm_provider(), get_llm_model()],
+        "inputs": {k: _digest(raw[k]) if k in raw else None for k in _hash_inputs(phase)},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def _run_phase(run: WorkflowRun, phase: dict) -> tuple[str, bool, dict]:
+    """
+    Voer een fase uit, of hergebruik de uitvoer uit run.phase_cache als haar
+    input-hash ongewijzigd is. Geeft (output, needs_approval, extra entry-velden).
+    Een hergebruikte fase pauzeert niet: ze was al goedgekeurd.
+    """
+    from regian.core.blobstore import wrap_entry
+    from regian.core import metrics
+    input_hash = phase_input_hash(run, phase)
+    cached = run.phase_cache.get(input_hash)
+    if cached is None:
+        output, needs_approval = execute_phase(run, phase)
+        return output, needs_approval, {"input_hash": input_hash}
+    entry = wrap_entry(cached, run.artifacts.store)
+    extra = {"input_hash": input_hash, "reused": True}
+    if entry.get("branches"):
+        extra["branches"] = entry["branches"]
+        for branch in entry["branches"]:
+            key = next((b.get("output_key") for b in phase.get("phases", []) if b.get("id") == branch["phase_id"]), None)
+            if key and branch["status"] == "done":
+                run.artifacts[key] = branch["output"]
+    metrics.inc("regian_workflow_phases_total", type=phase.get("type", ""), status="reused")
+    return entry["output"], False, extra
+
+
+def rerun_from(
+    run_id: str,
+    phase_id: str = "",
+    project_path: str = "",
+    incremental: bool = True,
+    background: bool = False,
+) -> WorkflowRun:
+    """
+    Voer een run opnieuw uit vanaf phase_id (leeg = eerste fase) met de huidige
+    template en artifacts. incremental=True: fasen waarvan de input-hash gelijk
+    bleef, hergebruiken hun vorige (goedgekeurde) uitvoer; enkel gewijzigde
+    fasen en alles wat daarvan afhangt lopen opnieuw. incremental=False: alles
+    vanaf phase_id loopt opnieuw. background=True: zie _continue().
+    """
+    run = load_run(run_id, project_path)
+    if run.status == STATUS_RUNNING:
+        raise ValueError(f"Run '{run_id}' loopt nog.")
+    template = load_workflow(run.workflow_id, project_path)
+    phases = template.get("phases", [])
+    ids = [p.get("id", str(i)) for i, p in enumerate(phases)]
+    if phase_id and phase_id not in ids:
+        raise ValueError(f"Fase '{phase_id}' bestaat niet in workflow '{run.workflow_id}'.")
+    start = ids.index(phase_id) if phase_id else 0
+
+    from regian.core.blobstore import externalize_entry, wrap_entry
+    store = run.artifacts.store
+    cache: dict[str, dict] = {}
+    if incremental:
+        last = len(run.phase_log) - 1
+        for i, entry in enumerate(run.phase_log):
+            # Een wachtende entry telt enkel als ze goedgekeurd is (er volgde nog iets)
+            approved = entry.get("status") == "done" or (
+                entry.get("status") == "waiting" and (i < last or run.status == STATUS_DONE)
+            )
+            if approved and entry.get("input_hash"):
+                # Opslagvorm: lange uitvoer blijft een blob-referentie
+                cache[entry["input_hash"]] = externalize_entry(wrap_entry(entry, store), store)
+    # Entries van fasen vóór het startpunt blijven; de rest wordt opnieuw opgebouwd
+    kept = []
+    for entry in run.phase_log:
+        if entry.get("phase_id") in ids[:start]:
+            kept.append(entry)
+    run.phase_log = kept
+    run.phase_cache = cache
+    if not incremental:
+        run.task_state = {}
+    run.current_phase_index = start
+    run.status = STATUS_RUNNING
+    run.updated_at = datetime.now().isoformat(timespec="seconds")
+    save_run(run)
+    return _continue(run, template, project_path, background)
+
+
+def set_artifact(run_id: str, key: str, value: str, project_path: str = "") -> WorkflowRun:
+    """Overschrijf een artifact van een run (bv. voor een rerun_from met een aangepast document)."""
+    run = load_run(run_id, project_path)
+    if run.status == STATUS_RUNNING:
+        raise ValueError(f"Run '{run_id}' loopt nog.")
+    run.artifacts[key] = value
+    run.updated_at = datetime.now().isoformat(timespec="seconds")
+    save_run(run)
+    return run
+
+
 # ── Workflow starten ──────────────────────────────────────────────────────────
 
 def start_workflow(
     name: str,
     user_input: str,
     project_path: str = "",
+    background: bool = False,
 ) -> WorkflowRun:
     """
     Start een nieuwe workflow-run.
     Voert de eerste fase uit (tenzij die human_checkpoint is).
     Geeft de WorkflowRun terug (gesaved op schijf).
+    background=True: de fasen lopen in een achtergrondworker (zie _continue()).
     """
     template = load_workflow(name, project_path)
     now = datetime.now().isoformat(timespec="seconds")
@@ -326,13 +1240,19 @@ def start_workflow(
         project_path=project_path,
     )
     save_run(run)
-    return _advance(run, template)
+    return _continue(run, template, project_path, background)
 
 
-def advance_run(run_id: str, user_feedback: str = "", project_path: str = "") -> WorkflowRun:
+def advance_run(
+    run_id: str,
+    user_feedback: str = "",
+    project_path: str = "",
+    background: bool = False,
+) -> WorkflowRun:
     """
     Zet een run voort na menselijke goedkeuring (human_checkpoint).
     user_feedback wordt als artifact 'feedback_<fase_id>' opgeslagen.
+    background=True: de volgende fasen lopen in een achtergrondworker.
     """
     run = load_run(run_id, project_path)
     if run.status != STATUS_WAITING:
@@ -352,6 +1272,23 @@ def advance_run(run_id: str, user_feedback: str = "", project_path: str = "") ->
     save_run(run)
 
     template = load_workflow(run.workflow_id, project_path)
+    return _continue(run, template, project_path, background)
+
+
+def _continue(run: WorkflowRun, template: dict, project_path: str, background: bool) -> WorkflowRun:
+    """
+    Voer de (opgeslagen, lopende) run verder uit: meteen in de aanroeper, of
+    met background=True via de wachtrij (core/runqueue.py). In dat laatste
+    geval komt de run terug met status running; de aanroeper volgt de status.
+    Is de wachtrij niet bruikbaar, dan loopt de run alsnog in de aanroeper.
+    """
+    if background:
+        from regian.core.runqueue import submit
+        try:
+            submit(run.run_id, project_path)
+            return run
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"[Workflow] Wachtrij niet bruikbaar, run {run.run_id} loopt in de aanroeper: {e}")
     return _advance(run, template)
 
 
@@ -401,52 +1338,47 @@ def advance_one_phase(run_id: str, project_path: str = "") -> WorkflowRun:
     phases = template.get("phases", [])
 
     if run.current_phase_index >= len(phases):
-        run.status = STATUS_DONE
-        run.updated_at = datetime.now().isoformat(timespec="seconds")
-        save_run(run)
-        return run
+        return _finish(run)
 
     phase = phases[run.current_phase_index]
     phase_id = phase.get("id", str(run.current_phase_index))
 
     try:
-        output, needs_approval = execute_phase(run, phase)
+        output, needs_approval, extra = _run_phase(run, phase)
     except Exception as exc:
         run.status = STATUS_ERROR
-        run.phase_log.append({
+        run.phase_log.append(_with_profile({
             "phase_id": phase_id,
             "phase_name": phase.get("name", phase_id),
             "status": "error",
             "output": str(exc),
             "ts": datetime.now().isoformat(timespec="seconds"),
-        })
+        }, phase))
         run.updated_at = datetime.now().isoformat(timespec="seconds")
-        save_run(run)
-        return run
+        return _save_phase(run)
 
     output_key = phase.get("output_key")
     if output_key:
         run.artifacts[output_key] = output
 
-    run.phase_log.append({
+    run.phase_log.append(_with_profile({
         "phase_id": phase_id,
         "phase_name": phase.get("name", phase_id),
         "status": "waiting" if needs_approval else "done",
         "output": output,
         "ts": datetime.now().isoformat(timespec="seconds"),
-    })
+        **extra,
+    }, phase))
     run.updated_at = datetime.now().isoformat(timespec="seconds")
 
     if needs_approval:
         run.status = STATUS_WAITING
-        save_run(run)
-        return run
+        return _save_phase(run)
 
     run.current_phase_index += 1
     if run.current_phase_index >= len(phases):
-        run.status = STATUS_DONE
-    save_run(run)
-    return run
+        return _finish(run)
+    return _save_phase(run)
 
 
 def revise_run(run_id: str, feedback: str, project_path: str = "") -> WorkflowRun:
@@ -470,6 +1402,9 @@ def revise_run(run_id: str, feedback: str, project_path: str = "") -> WorkflowRu
             prev_output = entry.get("output", "")
             break
 
+    # Hash van de oorspronkelijke fase: een goedgekeurde revisie is herbruikbaar bij rerun_from
+    input_hash = phase_input_hash(run, phase)
+
     # Bouw aangepaste fase: inject feedback + vorige uitvoer in het prompt
     revised_phase = dict(phase)
     if phase.get("type") == "llm_prompt" and phase.get("prompt_template"):
@@ -481,6 +1416,15 @@ def revise_run(run_id: str, feedback: str, project_path: str = "") -> WorkflowRu
             + feedback
             + "\n\nVerwerk de bijsturing volledig in een herziene versie van het document."
         )
+    elif phase.get("type") == "map_reduce" and phase.get("reduce_prompt"):
+        # De bijsturing gaat naar de laatste reduce-aanroep; de map-stap loopt opnieuw over dezelfde stukken
+        revised_phase["reduce_revision"] = (
+            "\n\n---\n## Vorige uitvoer (ter referentie):\n"
+            + prev_output
+            + "\n\n## Bijsturing van de gebruiker:\n"
+            + feedback
+            + "\n\nVerwerk de bijsturing volledig in een herziene versie van het document."
+        )
     elif phase.get("type") == "human_checkpoint":
         revised_phase = dict(phase)
         run.artifacts["feedback_revision"] = feedback
@@ -502,7 +1446,9 @@ def revise_run(run_id: str, feedback: str, project_path: str = "") -> WorkflowRu
         "ts": datetime.now().isoformat(timespec="seconds"),
         "revised": True,
         "feedback": feedback,
+        "input_hash": input_hash,
     }
+    _with_profile(new_entry, phase)
     if run.phase_log and run.phase_log[-1].get("phase_id") == phase_id:
         run.phase_log[-1] = new_entry
     else:
@@ -519,7 +1465,7 @@ def _get_phases(run: WorkflowRun) -> list[dict]:
     try:
         template = load_workflow(run.workflow_id, run.project_path)
         return template.get("phases", [])
-    except FileNotFoundError:
+    except (FileNotFoundError, ValueError):
         return []
 
 
@@ -536,42 +1482,65 @@ def _advance(run: WorkflowRun, template: dict) -> WorkflowRun:
         phase_id = phase.get("id", str(run.current_phase_index))
 
         try:
-            output, needs_approval = execute_phase(run, phase)
+            output, needs_approval, extra = _run_phase(run, phase)
         except Exception as exc:
             run.status = STATUS_ERROR
-            run.phase_log.append({
+            run.phase_log.append(_with_profile({
                 "phase_id": phase_id,
                 "status": "error",
                 "output": str(exc),
                 "ts": datetime.now().isoformat(timespec="seconds"),
-            })
+            }, phase))
             run.updated_at = datetime.now().isoformat(timespec="seconds")
-            save_run(run)
-            return run
+            return _save_phase(run)
 
         # Sla output op in artifacts
         output_key = phase.get("output_key")
         if output_key:
             run.artifacts[output_key] = output
 
-        run.phase_log.append({
+        run.phase_log.append(_with_profile({
             "phase_id": phase_id,
             "phase_name": phase.get("name", phase_id),
             "status": "waiting" if needs_approval else "done",
             "output": output,
             "ts": datetime.now().isoformat(timespec="seconds"),
-        })
+            **extra,
+        }, phase))
         run.updated_at = datetime.now().isoformat(timespec="seconds")
 
         if needs_approval:
             run.status = STATUS_WAITING
-            save_run(run)
-            return run
+            return _save_phase(run)
 
         run.current_phase_index += 1
+        # Enkel de nieuwe uitvoer gaat naar het journaal; na een crash loopt de run hier verder
+        if not save_run(run, expect_status=STATUS_RUNNING):
+            return _stopped(run)
+
+    return _finish(run)
+
 
-    # Alle fasen doorlopen
+def _finish(run: WorkflowRun) -> WorkflowRun:
+    """Alle fasen doorlopen: zet de run op DONE en ruim de rerun-cache op."""
     run.status = STATUS_DONE
+    run.phase_cache = {}
     run.updated_at = datetime.now().isoformat(timespec="seconds")
-    save_run(run)
-    return run
+    return _save_phase(run)
+
+
+def _save_phase(run: WorkflowRun) -> WorkflowRun:
+    """
+    Bewaar een run na een fase, enkel als ze op schijf nog loopt. Werd ze
+    intussen geannuleerd (of elders gestopt), dan blijft die toestand staan
+    en komt de run van schijf terug.
+    """
+    if save_run(run, expect_status=STATUS_RUNNING):
+        return run
+    return _stopped(run)
+
+
+def _stopped(run: WorkflowRun) -> WorkflowRun:
+    """De run werd tijdens een fase gestopt: geef de toestand van schijf terug."""
+    logger.info(f"[Workflow] Run {run.run_id} werd tijdens de fase gestopt; uitvoer niet bewaard.")
+    return load_run(run.run_id, run.project_path)
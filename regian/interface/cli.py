@@ -22,10 +22,10 @@ import uuid
 
 
 def _ensure_scheduler():
-    """Start de achtergrond-scheduler als hij nog niet loopt."""
+    """Start de achtergrond-scheduler als hij nog niet loopt (niet als de scheduler-daemon draait)."""
     try:
-        from regian.core.scheduler import get_scheduler
-        get_scheduler()
+        from regian.core.scheduler import ensure_scheduler
+        ensure_scheduler()
     except Exception:
         pass
 
@@ -11,9 +11,10 @@ import regian.skills as _skills_pkg
 from regian.core.agent import registry, OrchestratorAgent, RegianAgent, CONFIRM_REQUIRED
 from regian.skills.terminal import is_destructive_shell_command, is_destructive_python_code
 from regian.core.scheduler import (
-    get_scheduler, get_all_jobs, get_next_run,
+    ensure_scheduler, get_all_jobs, get_next_run, get_job_stats,
+    get_job_history, summarize_history, sparkline,
     add_scheduled_job, remove_scheduled_job, toggle_scheduled_job,
-    run_job_now_by_id, parse_schedule,
+    run_job_now_by_id, parse_schedule, replan_prompt_job, schedule_preview,
 )
 from regian import __version__ as _VERSION
 from regian.settings import (
@@ -26,6 +27,8 @@ from regian.settings import (
     get_agent_name, set_agent_name,
     get_active_project, set_active_project, clear_active_project,
     get_shell_timeout, set_shell_timeout,
+    get_shell_log_max_bytes, set_shell_log_max_bytes,
+    get_shell_log_backups, set_shell_log_backups,
     get_log_max_entries, set_log_max_entries,
     get_log_result_max_chars, set_log_result_max_chars,
     get_log_file_name, set_log_file_name,
@@ -36,6 +39,17 @@ from regian.settings import (
     _DEFAULT_GEMINI_MODELS, _DEFAULT_OLLAMA_MODELS,
     get_backup_max_count, set_backup_max_count,
     get_backup_dir, set_backup_dir,
+    get_profile_tools, set_profile_tools,
+    get_profile_phases, set_profile_phases,
+    get_metrics_port, set_metrics_port,
+    get_metrics_host, set_metrics_host,
+    get_scheduler_pool_sizes, set_scheduler_pool_sizes,
+    get_llm_job_concurrency, set_llm_job_concurrency,
+    get_admission_llm_slots, set_admission_llm_slots,
+    get_admission_exec_slots, set_admission_exec_slots,
+    get_workflow_max_parallel, set_workflow_max_parallel,
+    get_workflow_workers, set_workflow_workers,
+    get_workflow_chunk_tokens, set_workflow_chunk_tokens,
 )
 import uuid
 from regian.core.action_log import log_action, get_log, get_log_grouped, clear_log, log_count
@@ -474,10 +488,43 @@ def get_agent(provider: str, model: str, active_project: str = ""):
     return RegianAgent(provider=provider, model=model)
 
 
+@st.fragment(run_every=2)
+def _live_shell_tail(job_id: str):
+    """Staart van het log van een lopende shell-taak; ververst elke 2 seconden."""
+    from regian.core.shell import job_log_path, tail_log
+    st.code(tail_log(job_log_path(job_id), 4000) or "(nog geen output)", language=None)
+
+
 @st.cache_resource
 def _start_scheduler():
-    """Start de achtergrond-scheduler éénmalig bij het laden van de app."""
-    return get_scheduler()
+    """Start de achtergrond-scheduler éénmalig bij het laden van de app (niet als de scheduler-daemon draait)."""
+    return ensure_scheduler()
+
+
+@st.cache_resource
+def _start_workflow_workers():
+    """Start de workflow-workers éénmalig; ze hervatten ook runs die na een crash nog in de wachtrij staan."""
+    from regian.core.runqueue import ensure_workers
+    return ensure_workers()
+
+
+@st.fragment(run_every=2)
+def _wf_poll_runs(project_path: str, snapshot: tuple):
+    """Volg lopende achtergrond-runs; herlaad de tab zodra een status of fase verandert."""
+    from regian.core.workflow import list_run_summaries, task_progress
+    current = tuple((s.run_id, s.status, s.current_phase_index) for s in list_run_summaries(project_path))
+    if current != snapshot:
+        st.rerun()
+    _running = [s[0] for s in current if s[1] == "running"]
+    st.caption(f"⚙️ {len(_running)} run(s) lopen op de achtergrond — deze lijst ververst automatisch.")
+    for _run_id in _running:
+        _tp = task_progress(_run_id)
+        if _tp:
+            st.progress(
+                _tp["done"] / max(1, _tp["total"]),
+                text=f"🧩 `{_run_id[:8]}` · {_tp['phase_id']}: {_tp['done']}/{_tp['total']} taken klaar"
+                     f" · {len(_tp['running'])} bezig",
+            )
 
 
 _TYPE_ICONS_SIDEBAR = {"software": "💻", "docs": "📄", "data": "📊", "generic": "📁"}
@@ -770,6 +817,7 @@ def start_gui():
 
     # ── Sidebar ───────────────────────────────────────────────
     _start_scheduler()  # start achtergrond-scheduler éénmalig
+    _start_workflow_workers()  # en de workers voor workflow-runs
     _active_proj_now = get_active_project()
     _proj_type_icon = ""
     _active_display_name = ""
@@ -1434,6 +1482,8 @@ def start_gui():
 | Dag van week | `elke maandag om 08:00` |
 | Werkdagen | `werkdagen om 07:30` |
 | Cron expressie | `0 9 * * 1-5` |
+| Bij wijziging | `bij wijziging van uploads/*.csv` (gewijzigde paden via `{files}`) |
+| Na andere taak | `na backup, push` · `na mislukking van backup` |
 """)
 
             if st.button("💾 Taak opslaan", key="cron_save"):
@@ -1510,6 +1560,75 @@ def start_gui():
                                 remove_scheduled_job(job_id)
                                 st.rerun()
 
+                    stats = get_job_stats(job_id)
+                    if stats["runs"] or stats["pending"] or stats["running"] or stats["skipped"]:
+                        st.caption(
+                            f"⏳ Wachtrij: {stats['pending']} · actief: {stats['running']} · "
+                            f"wachttijd gem. {stats['avg_wait']:.1f}s (max {stats['max_wait']:.1f}s) · "
+                            f"overgeslagen: {stats['skipped']} · max. gelijktijdig: {job.get('max_instances', 1)}"
+                        )
+
+                    if job.get("only_on_change"):
+                        st.caption(
+                            f"🔁 Enkel bij wijziging · {int(job.get('unchanged_runs') or 0)} run(s) ongewijzigd"
+                            + (f" sinds {job['last_change']}" if job.get("last_change") else "")
+                        )
+
+                    _preview = schedule_preview(job_id, jobs) if enabled else {"offset": 0, "times": []}
+                    if _preview["offset"] or job.get("spread"):
+                        st.caption(
+                            ("🎯 Gespreid" if job.get("spread") else "🎯 Jitter")
+                            + f" +{int(_preview['offset'])}s"
+                            + (" · " + ", ".join(t.strftime("%H:%M:%S") for t in _preview["times"])
+                               if _preview["times"] else "")
+                        )
+
+                    if job.get("after") or job.get("after_failure"):
+                        _deps = []
+                        if job.get("after"):
+                            _deps.append("na " + ", ".join(job["after"]))
+                        if job.get("after_failure"):
+                            _deps.append("na mislukking van " + ", ".join(job["after_failure"]))
+                        st.caption(f"🔗 Start {' · '.join(_deps)}")
+
+                    runs = get_job_history(job_id)
+                    if runs:
+                        hist = summarize_history(runs)
+                        st.caption(
+                            f"📈 `{sparkline(runs[-30:])}` · gem. {hist['mean']:.2f}s · "
+                            f"p95 {hist['p95']:.2f}s · mislukt {hist['failure_rate']:.0%} "
+                            f"({hist['count']} runs)"
+                        )
+
+                    if job_type == "prompt" and job.get("frozen_plan"):
+                        _plan = job.get("plan")
+                        _plan_label = (
+                            f"🧊 Bevroren plan — {len(_plan)} stap(pen), opgesteld {job.get('planned_at')}"
+                            if _plan is not None else "🧊 Bevroren plan — wordt bij de volgende run opgesteld"
+                        )
+                        with st.expander(_plan_label):
+                            if _plan:
+                                st.json(_plan)
+                            elif _plan is not None:
+                                st.caption("Geen tools nodig: elke run vraagt enkel het antwoord aan de LLM.")
+                            if st.button("🔄 Opnieuw plannen", key=f"replan_{job_id}"):
+                                try:
+                                    replan_prompt_job(job_id)
+                                except Exception as e:
+                                    st.error(f"❌ Plannen mislukt: {e}")
+                                else:
+                                    st.toast(f"🧊 Plan voor '{job_id}' opnieuw opgesteld")
+                                    st.rerun()
+
+                    if job_type == "shell":
+                        from regian.core.shell import job_log_path, tail_log
+                        if stats["running"]:
+                            st.caption("📜 Live output")
+                            _live_shell_tail(job_id)
+                        elif job_log_path(job_id).exists():
+                            with st.expander("📜 Shell-log"):
+                                st.code(tail_log(job_log_path(job_id), 8000), language=None)
+
                     # Output van laatste run
                     last_output = job.get("last_output")
                     if last_output:
@@ -1532,7 +1651,7 @@ def start_gui():
 
         log_view = st.radio(
             "Weergave",
-            ["🕐 Chronologisch", "💬 Per opdracht"],
+            ["🕐 Chronologisch", "💬 Per opdracht", "🪙 Tokenverbruik", "🔬 Profielen"],
             horizontal=True,
             key="log_view",
             label_visibility="collapsed",
@@ -1540,7 +1659,96 @@ def start_gui():
 
         _SOURCE_ICONS = {"chat": "💬", "direct": "⚡", "cron": "📅", "cli": "🖥️"}
 
-        if log_view == "💬 Per opdracht":
+        if log_view == "🪙 Tokenverbruik":
+            from regian.core.usage import summarize_usage as _summarize_usage
+            _tu_c1, _tu_c2 = st.columns(2)
+            with _tu_c1:
+                _tu_group = st.selectbox(
+                    "Groeperen per",
+                    ["project", "source", "run_id", "job_id", "model"],
+                    format_func=lambda g: {
+                        "project": "Project", "source": "Bron", "run_id": "Workflow-run",
+                        "job_id": "Cron-taak", "model": "Model",
+                    }[g],
+                    key="usage_group_by",
+                )
+            with _tu_c2:
+                _tu_days = st.number_input("Dagen terug", min_value=1, max_value=31, value=7, key="usage_days")
+            _tu_rows = _summarize_usage(group_by=_tu_group, days=int(_tu_days))
+            if not _tu_rows:
+                st.info("Nog geen LLM-aanroepen geregistreerd.")
+            else:
+                st.caption(f"{sum(r['total_tokens'] for r in _tu_rows)} tokens in {sum(r['calls'] for r in _tu_rows)} aanroepen")
+                st.dataframe(
+                    [
+                        {
+                            "Sleutel": r["key"],
+                            "Tokens": r["total_tokens"],
+                            "In": r["input_tokens"],
+                            "Uit": r["output_tokens"],
+                            "Aanroepen": r["calls"],
+                            "Gem. latency (ms)": r["latency_ms"] // r["calls"] if r["calls"] else 0,
+                            "Kost": round(r["cost"], 4),
+                            "Geschat": r["estimated"],
+                        }
+                        for r in _tu_rows
+                    ],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+
+        elif log_view == "🔬 Profielen":
+            from regian.core.profiling import list_profiles as _list_profiles, load_profile as _load_profile
+            _pf_list = _list_profiles(limit=100)
+            if not _pf_list:
+                st.info("Nog geen profielen. Zet profilering aan via ⚙️ Instellingen of `/enable_profiling`.")
+            else:
+                _pf_id = st.selectbox(
+                    "Profiel",
+                    [p["id"] for p in _pf_list],
+                    format_func=lambda pid: next(
+                        f"{p['ts']}  ·  {p['kind']} {p['name']}  ·  {p['wall_ms']} ms"
+                        for p in _pf_list if p["id"] == pid
+                    ),
+                    key="profile_select",
+                )
+                _pf = _load_profile(_pf_id) or {}
+                _pf_c1, _pf_c2, _pf_c3 = st.columns(3)
+                _pf_c1.metric("Wandkloktijd", f"{_pf.get('wall_ms', 0)} ms")
+                _pf_c2.metric("CPU (eigen tijd)", f"{_pf.get('cpu_ms', 0)} ms")
+                _pf_c3.metric("Piekgeheugen", f"{_pf.get('peak_kb', 0)} KB")
+                if _pf.get("context"):
+                    st.caption("  ·  ".join(f"{k}: {v}" for k, v in _pf["context"].items()))
+                if _pf.get("error"):
+                    st.error(_pf["error"])
+                st.markdown("**Hotspots**")
+                st.dataframe(
+                    [
+                        {
+                            "Functie": h["function"],
+                            "Aanroepen": h["calls"],
+                            "Eigen (ms)": h["self_ms"],
+                            "Totaal (ms)": h["cumulative_ms"],
+                        }
+                        for h in _pf.get("hotspots", [])
+                    ],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                st.markdown("**Allocatieplaatsen**")
+                if _pf.get("allocations"):
+                    st.dataframe(
+                        [
+                            {"Plaats": a["site"], "KB": a["size_kb"], "Objecten": a["count"], "Bestand": a["file"]}
+                            for a in _pf["allocations"]
+                        ],
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                else:
+                    st.caption("(geen netto allocaties)")
+
+        elif log_view == "💬 Per opdracht":
             groups = get_log_grouped(limit_groups=100)
             if not groups:
                 st.info("Nog geen gegroepeerde opdrachten in de log.")
@@ -1600,6 +1808,8 @@ def start_gui():
                             st.json(args)
                         st.markdown("**Resultaat:**")
                         st.code(result, language=None)
+                        if e.get("profile_id"):
+                            st.caption(f"🔬 Profiel: `{e['profile_id']}` — zie weergave 🔬 Profielen")
 
     # ── INSTELLINGEN TAB ──────────────────────────────────────
     with tab_settings:
@@ -1806,6 +2016,31 @@ def start_gui():
             set_shell_timeout(int(new_timeout))
             st.success(f"✅ Shell timeout opgeslagen: {int(new_timeout)}s")
 
+        st.caption("Shell-output wordt gestreamd naar roterende logbestanden in `.regian_shell_logs/`.")
+        col_lb, col_lk = st.columns(2)
+        with col_lb:
+            new_log_kb = st.number_input(
+                "Max. grootte per log (KB)",
+                min_value=1,
+                max_value=1_048_576,
+                value=max(1, get_shell_log_max_bytes() // 1024),
+                step=256,
+                key="settings_shell_log_kb",
+            )
+        with col_lk:
+            new_log_backups = st.number_input(
+                "Aantal oude kopieën",
+                min_value=0,
+                max_value=20,
+                value=get_shell_log_backups(),
+                step=1,
+                key="settings_shell_log_backups",
+            )
+        if st.button("💾 Shell-logs opslaan", key="save_shell_logs"):
+            set_shell_log_max_bytes(int(new_log_kb) * 1024)
+            set_shell_log_backups(int(new_log_backups))
+            st.success("✅ Shell-loginstellingen opgeslagen.")
+
         st.markdown("---")
 
         # 8. Agent iteraties
@@ -1857,6 +2092,134 @@ def start_gui():
 
         st.markdown("---")
 
+        # 9b. Profilering
+        st.markdown("### 🔬 Profilering")
+        st.caption(
+            "Meet CPU-tijd (cProfile) en geheugen (tracemalloc) van specifieke tools of workflowfasen. "
+            "Kommalijst; `*` = alles. Fasen als `fase_id` of `workflow_id:fase_id`. Resultaten in de Log-tab → 🔬 Profielen."
+        )
+        col_pf1, col_pf2 = st.columns(2)
+        with col_pf1:
+            new_profile_tools = st.text_input(
+                "Tools",
+                value=",".join(sorted(get_profile_tools())),
+                placeholder="bijv. run_shell, create_skill",
+                key="settings_profile_tools",
+            )
+        with col_pf2:
+            new_profile_phases = st.text_input(
+                "Workflowfasen",
+                value=",".join(sorted(get_profile_phases())),
+                placeholder="bijv. build, mvp:analyse",
+                key="settings_profile_phases",
+            )
+        if st.button("💾 Profilering opslaan", key="save_profile_settings"):
+            set_profile_tools({x.strip() for x in new_profile_tools.split(",") if x.strip()})
+            set_profile_phases({x.strip() for x in new_profile_phases.split(",") if x.strip()})
+            st.success("✅ Profilering opgeslagen.")
+
+        st.markdown("---")
+
+        # 9c. Metrics-endpoint
+        st.markdown("### 📈 Metrics-endpoint")
+        st.caption(
+            "Prometheus-compatibel endpoint (`/metrics`) voor scheduler, skills, workflows en LLM-aanroepen. "
+            "Poort 0 = uit. Gebruik host `0.0.0.0` om van buitenaf te scrapen. Wordt actief bij de volgende herstart."
+        )
+        col_mt1, col_mt2 = st.columns(2)
+        with col_mt1:
+            new_metrics_port = st.number_input(
+                "Poort",
+                min_value=0,
+                max_value=65535,
+                value=get_metrics_port(),
+                step=1,
+                key="settings_metrics_port",
+            )
+        with col_mt2:
+            new_metrics_host = st.text_input("Host", value=get_metrics_host(), key="settings_metrics_host")
+        if st.button("💾 Metrics opslaan", key="save_metrics_settings"):
+            set_metrics_port(int(new_metrics_port))
+            set_metrics_host(new_metrics_host)
+            st.success(f"✅ Opgeslagen: {new_metrics_host.strip()}:{int(new_metrics_port)} (herstart vereist)")
+
+        st.markdown("---")
+
+        # 9d. Scheduler-concurrency
+        st.markdown("### 🧵 Scheduler-concurrency")
+        st.caption(
+            "Elk taaktype draait in een eigen begrensde threadpool, zodat trage prompt-taken "
+            "shell- en command-taken niet ophouden. De LLM-limiet geldt voor alle prompt-taken samen, "
+            "ook bij handmatig uitvoeren. Poolgroottes worden actief bij de volgende herstart."
+        )
+        pool_sizes = get_scheduler_pool_sizes()
+        col_sc1, col_sc2, col_sc3, col_sc4 = st.columns(4)
+        with col_sc1:
+            new_pool_shell = st.number_input("Shell-pool", min_value=1, max_value=64, value=pool_sizes["shell"], step=1, key="settings_pool_shell")
+        with col_sc2:
+            new_pool_command = st.number_input("Command-pool", min_value=1, max_value=64, value=pool_sizes["command"], step=1, key="settings_pool_command")
+        with col_sc3:
+            new_pool_prompt = st.number_input("Prompt-pool", min_value=1, max_value=64, value=pool_sizes["prompt"], step=1, key="settings_pool_prompt")
+        with col_sc4:
+            new_llm_concurrency = st.number_input("Max. LLM-taken", min_value=1, max_value=32, value=get_llm_job_concurrency(), step=1, key="settings_llm_job_concurrency")
+        if st.button("💾 Concurrency opslaan", key="save_concurrency_settings"):
+            set_scheduler_pool_sizes({
+                "shell": int(new_pool_shell),
+                "command": int(new_pool_command),
+                "prompt": int(new_pool_prompt),
+            })
+            set_llm_job_concurrency(int(new_llm_concurrency))
+            st.success("✅ Concurrency opgeslagen (poolgroottes na herstart).")
+
+        # 9e. Toegangscontrole (prioriteitsklassen)
+        st.markdown("### 🚦 Toegangscontrole")
+        st.caption(
+            "Alle LLM-aanroepen en shell/python-uitvoeringen delen deze plaatsen. Wachtenden worden bediend "
+            "in de volgorde chat > workflow > cron > onderhoud, en achtergrondwerk laat altijd één plaats "
+            "vrij voor de chat. Wijzigingen zijn meteen actief."
+        )
+        col_ad1, col_ad2 = st.columns(2)
+        with col_ad1:
+            new_adm_llm = st.number_input("LLM-plaatsen", min_value=1, max_value=64, value=get_admission_llm_slots(), step=1, key="settings_admission_llm")
+        with col_ad2:
+            new_adm_exec = st.number_input("Shell/Python-plaatsen", min_value=1, max_value=64, value=get_admission_exec_slots(), step=1, key="settings_admission_exec")
+        if st.button("💾 Toegangscontrole opslaan", key="save_admission_settings"):
+            set_admission_llm_slots(int(new_adm_llm))
+            set_admission_exec_slots(int(new_adm_exec))
+            st.success(f"✅ Opgeslagen: {int(new_adm_llm)} LLM- en {int(new_adm_exec)} shell/python-plaatsen.")
+
+        st.markdown("---")
+
+        # 9f. Parallelle workflowtakken
+        st.markdown("### 🔀 Parallelle workflowfasen")
+        st.caption(
+            "Hoeveel takken van een parallelle groep tegelijk lopen (tenzij de groep zelf max_parallel zet)."
+        )
+        new_wf_parallel = st.number_input("Max. gelijktijdige takken", min_value=1, max_value=32, value=get_workflow_max_parallel(), step=1, key="settings_workflow_max_parallel")
+        if st.button("💾 Opslaan", key="save_workflow_parallel"):
+            set_workflow_max_parallel(int(new_wf_parallel))
+            st.success(f"✅ Opgeslagen: {int(new_wf_parallel)} takken tegelijk.")
+        st.caption(
+            "Achtergrondworkers voeren workflow-runs uit buiten de pagina: een lange fase blokkeert het "
+            "dashboard niet en een run loopt door als de browser sluit. 0 = fasen lopen in de pagina zelf."
+        )
+        new_wf_workers = st.number_input("Workflow-workers", min_value=0, max_value=32, value=get_workflow_workers(), step=1, key="settings_workflow_workers")
+        if st.button("💾 Opslaan", key="save_workflow_workers"):
+            set_workflow_workers(int(new_wf_workers))
+            from regian.core.runqueue import ensure_workers
+            ensure_workers()
+            st.success(f"✅ Opgeslagen: {int(new_wf_workers)} workers (minder workers geldt na een herstart).")
+        st.caption(
+            "Een map_reduce-fase verdeelt een groot document in stukken van hoogstens zoveel tokens "
+            "(tenzij de fase zelf chunk_tokens zet). Kleinere stukken lopen meer parallel; grotere geven minder aanroepen."
+        )
+        new_wf_chunk = st.number_input("Stukgrootte map_reduce (tokens)", min_value=100, max_value=200000, value=get_workflow_chunk_tokens(), step=500, key="settings_workflow_chunk_tokens")
+        if st.button("💾 Opslaan", key="save_workflow_chunk_tokens"):
+            set_workflow_chunk_tokens(int(new_wf_chunk))
+            st.success(f"✅ Opgeslagen: stukken van {int(new_wf_chunk)} tokens.")
+
+        st.markdown("---")
+
         # 10. Bestandsnamen
         st.markdown("### 🗂️ Bestandsnamen")
         st.caption("Pas de namen aan van het actie-logbestand en het jobs-bestand.")
@@ -1973,7 +2336,7 @@ def start_gui():
     with tab_workflows:
         from regian.core.workflow import (
             list_workflows as _wf_list_templates,
-            list_runs as _wf_list_runs,
+            list_run_summaries as _wf_list_runs,
             advance_run as _wf_advance,
             cancel_run as _wf_cancel,
             start_workflow as _wf_start,
@@ -1987,6 +2350,7 @@ def start_gui():
         from regian.skills.workflow import _project_path as _wf_proj_path, _format_run_status
 
         _wf_pp = _wf_proj_path()
+        _wf_bg = get_workflow_workers() > 0
         st.subheader("🔄 Workflows")
 
         wf_sub = st.radio(
@@ -2024,7 +2388,7 @@ def start_gui():
                     else:
                         with st.spinner("Workflow wordt gestart..."):
                             try:
-                                _wfrun = _wf_start(_wf_names[_wf_sel_name], _wf_input.strip(), _wf_pp)
+                                _wfrun = _wf_start(_wf_names[_wf_sel_name], _wf_input.strip(), _wf_pp, background=_wf_bg)
                                 st.toast(f"✅ Run `{_wfrun.run_id}` gestart — schakel over naar Actieve runs.")
                             except Exception as _wferr:
                                 st.error(f"❌ {_wferr}")
@@ -2083,13 +2447,26 @@ def start_gui():
             if not _wf_runs:
                 st.info("Geen workflow-runs gevonden voor dit project.")
             else:
-                for _wfr in _wf_runs:
+                # Achtergrond-runs: de pagina leest enkel de status uit de run-index
+                if _wf_bg and any(_wfs.status == STATUS_RUNNING for _wfs in _wf_runs):
+                    _wf_poll_runs(_wf_pp, tuple((_wfs.run_id, _wfs.status, _wfs.current_phase_index) for _wfs in _wf_runs))
+                for _wfs in _wf_runs:
                     _wfbadge = {"running": "🔄", "waiting": "⏸️", "done": "✅",
-                                "cancelled": "❌", "error": "💥"}.get(_wfr.status, "❓")
+                                "cancelled": "❌", "error": "💥"}.get(_wfs.status, "❓")
+                    _wf_active = _wfs.status in (STATUS_WAITING, STATUS_RUNNING)
                     with st.expander(
-                        f"{_wfbadge} **{_wfr.workflow_name}** — {_wfr.started_at[:16]} · `{_wfr.run_id[:8]}`",
-                        expanded=(_wfr.status in (STATUS_WAITING, STATUS_RUNNING)),
+                        f"{_wfbadge} **{_wfs.workflow_name}** — {_wfs.started_at[:16]} · `{_wfs.run_id[:8]}`",
+                        expanded=_wf_active,
                     ):
+                        # Afgeronde runs komen uit de index; het volledige bestand pas op vraag
+                        if not _wf_active and not st.toggle("📂 Details laden", key=f"wf_details_{_wfs.run_id}"):
+                            st.caption(f"Status: {_wfs.status} · laatst bijgewerkt {_wfs.updated_at[:16]}")
+                            continue
+                        try:
+                            _wfr = _wf_load_run(_wfs.run_id, _wf_pp)
+                        except (FileNotFoundError, ValueError) as _wfle:
+                            st.warning(f"⚠️ {_wfle}")
+                            continue
                         _wf_phases = _get_phases(_wfr)
                         _wf_total = len(_wf_phases)
                         _wf_cur = _wfr.current_phase_index
@@ -2114,6 +2491,14 @@ def start_gui():
                                     f"🔄 *Herzien op basis van feedback:* "
                                     f"`{_wf_last_entry.get('feedback', '')[:80]}`"
                                 )
+                            if _wf_last_entry.get("branches"):
+                                st.caption(" · ".join(
+                                    f"{'✅' if _wfb['status'] == 'done' else '⏭️' if _wfb['status'] == 'skipped' else '💥'}"
+                                    f" {_wfb['phase_name']} ({_wfb.get('duration_s', 0):.1f}s)"
+                                    for _wfb in _wf_last_entry["branches"]
+                                ))
+                            if _wf_last_entry.get("reused"):
+                                st.caption("♻️ *Hergebruikt: template en invoer ongewijzigd*")
                             st.markdown(_wf_last_entry.get("output", "")[:3000])
 
                         _wf_art_keys = [k for k in _wfr.artifacts if k != "input"]
@@ -2148,8 +2533,16 @@ def start_gui():
                             with _wfc1:
                                 if st.button("✅ Goedkeuren & doorgaan",
                                              key=f"wf_approve_{_wfr.run_id}", type="primary"):
-                                    st.session_state["_wf_adv_id"] = _wfr.run_id
-                                    st.session_state["_wf_adv_pp"] = _wf_pp
+                                    if _wf_bg:
+                                        try:
+                                            _wf_advance(_wfr.run_id, _wf_feedback.strip(), _wf_pp, background=True)
+                                            st.toast("⚙️ Goedgekeurd — de volgende fasen lopen op de achtergrond.")
+                                        except Exception as _wfe:
+                                            st.error(f"❌ {_wfe}")
+                                            st.stop()
+                                    else:
+                                        st.session_state["_wf_adv_id"] = _wfr.run_id
+                                        st.session_state["_wf_adv_pp"] = _wf_pp
                                     st.rerun()
                             with _wfc2:
                                 if _wf_feedback.strip():
@@ -2176,6 +2569,33 @@ def start_gui():
                                     _wf_cancel(_wfr.run_id, _wf_pp)
                                     st.rerun()
 
+                        if _wfr.status != STATUS_RUNNING and _wf_phases:
+                            st.markdown("---")
+                            _wfrr1, _wfrr2, _wfrr3 = st.columns([2, 1, 1])
+                            with _wfrr1:
+                                _wf_rr_phase = st.selectbox(
+                                    "Opnieuw vanaf fase",
+                                    [_p.get("id", "") for _p in _wf_phases],
+                                    format_func=lambda _pid: next(
+                                        (_p.get("name", _pid) for _p in _wf_phases if _p.get("id") == _pid), _pid),
+                                    key=f"wf_rerun_phase_{_wfr.run_id}",
+                                )
+                            with _wfrr2:
+                                _wf_rr_inc = st.checkbox(
+                                    "♻️ Incrementeel", value=True, key=f"wf_rerun_inc_{_wfr.run_id}",
+                                    help="Hergebruik de uitvoer van fasen waarvan template en invoer niet veranderden",
+                                )
+                            with _wfrr3:
+                                if st.button("🔁 Opnieuw uitvoeren", key=f"wf_rerun_{_wfr.run_id}"):
+                                    with st.spinner("🔁 Fasen opnieuw uitvoeren..."):
+                                        try:
+                                            from regian.core.workflow import rerun_from as _wf_rerun
+                                            _wf_rerun(_wfr.run_id, _wf_rr_phase, _wf_pp, incremental=_wf_rr_inc, background=_wf_bg)
+                                        except Exception as _wfe:
+                                            st.error(f"❌ {_wfe}")
+                                            st.stop()
+                                    st.rerun()
+
         # ── Sectie 3: Templates ────────────────────────────────
         elif wf_sub == "📚 Templates":
             st.markdown("### 📚 Workflow-templates")
@@ -2233,11 +2653,13 @@ def start_gui():
             st.markdown("### ✏️ Visuele workflow-editor")
             import json as _wfjson
 
-            _WFED_TYPES  = ["llm_prompt", "task_loop", "human_checkpoint", "tool_chain"]
+            _WFED_TYPES  = ["llm_prompt", "task_loop", "human_checkpoint", "tool_chain", "parallel", "map_reduce"]
             _WFED_ICONS  = {"llm_prompt": "🧠", "task_loop": "🔄",
-                            "human_checkpoint": "🔍", "tool_chain": "⚙️"}
+                            "human_checkpoint": "🔍", "tool_chain": "⚙️", "parallel": "🔀",
+                            "map_reduce": "🧩"}
             _WFED_COLORS = {"llm_prompt": "lightblue", "task_loop": "lightgreen",
-                            "human_checkpoint": "lightyellow", "tool_chain": "lightgray"}
+                            "human_checkpoint": "lightyellow", "tool_chain": "lightgray",
+                            "parallel": "lavender", "map_reduce": "lightcyan"}
 
             # Template kiezen
             _wfed_all = _wf_list_templates(_wf_pp)
@@ -2301,6 +2723,22 @@ def start_gui():
                     _ecolor = _WFED_COLORS.get(_etype, "white")
                     _eicon  = _WFED_ICONS.get(_etype, "📋")
                     _eappr  = " ⏸️" if _wfeph.get("require_approval") or _etype == "human_checkpoint" else ""
+                    if _etype == "parallel":
+                        # Fan-out naar elke tak, join in een gemeenschappelijk knooppunt
+                        _dot.append(f'  {_eid} [shape=diamond, label="{_eicon}{_eappr}", '
+                                    f'fillcolor="{_ecolor}"];')
+                        _dot.append(f'  {_prev_id} -> {_eid};')
+                        _dot.append(f'  {_eid}_join [shape=diamond, label="{_ename}", fillcolor="{_ecolor}"];')
+                        for _wfbr in _wfeph.get("phases", []):
+                            _brid = f'{_eid}_{re.sub(r"[^a-zA-Z0-9_]", "_", _wfbr.get("id", "tak"))}'
+                            _brname = _wfbr.get("name", _wfbr.get("id", "")).replace('"', "'")
+                            _brtype = _wfbr.get("type", "llm_prompt")
+                            _dot.append(f'  {_brid} [label="{_WFED_ICONS.get(_brtype, "📋")} {_brname}", '
+                                        f'fillcolor="{_WFED_COLORS.get(_brtype, "white")}"];')
+                            _dot.append(f'  {_eid} -> {_brid};')
+                            _dot.append(f'  {_brid} -> {_eid}_join;')
+                        _prev_id = f"{_eid}_join"
+                        continue
                     _dot.append(f'  {_eid} [label="{_eicon} {_ename}\\n({_etype}){_eappr}", '
                                 f'fillcolor="{_ecolor}"];')
                     _dot.append(f'  {_prev_id} -> {_eid};')
@@ -2359,6 +2797,21 @@ def start_gui():
                             "Bron-sleutel (artifact met takenlijst)",
                             value=_wfeph.get("source_key", "task_list"),
                             key=f"wfed_ph_sk_{_wfei}")
+                        _wfed_par = st.checkbox(
+                            "Taken parallel plannen en uitvoeren",
+                            value=_wfeph.get("parallel", False),
+                            key=f"wfed_ph_par_{_wfei}",
+                            help="Taken die andere paden aanraken lopen samen; de resultaten blijven in volgorde")
+                        _wfed_ind = st.checkbox(
+                            "Taken zijn onafhankelijk",
+                            value=_wfeph.get("independent", False),
+                            key=f"wfed_ph_ind_{_wfei}", disabled=not _wfed_par,
+                            help="Alle taken lopen tegelijk, ook als hun paden niet te bepalen zijn")
+                        for _wfed_k, _wfed_v in (("parallel", _wfed_par), ("independent", _wfed_par and _wfed_ind)):
+                            if _wfed_v:
+                                _wfeph[_wfed_k] = True
+                            else:
+                                _wfeph.pop(_wfed_k, None)
                         _wfeph["require_approval"] = st.checkbox(
                             "Vereist goedkeuring na uitvoering",
                             value=_wfeph.get("require_approval", True),
@@ -2381,6 +2834,49 @@ def start_gui():
                             _wfeph["steps"] = _wfjson.loads(_wf_steps_raw)
                         except Exception:
                             st.caption("⚠️ Ongeldige JSON voor stappen")
+                    elif _ept == "parallel":
+                        _wfeph["require_approval"] = st.checkbox(
+                            "Vereist goedkeuring na de hele groep",
+                            value=_wfeph.get("require_approval", False),
+                            key=f"wfed_ph_ra_{_wfei}")
+                        _wf_br_raw = st.text_area(
+                            "Takken (JSON-lijst van llm_prompt/tool_chain-fasen met eigen output_key)",
+                            value=_wfjson.dumps(_wfeph.get("phases", []), indent=2, ensure_ascii=False),
+                            height=160, key=f"wfed_ph_branches_{_wfei}")
+                        try:
+                            _wfeph["phases"] = _wfjson.loads(_wf_br_raw)
+                        except Exception:
+                            st.caption("⚠️ Ongeldige JSON voor takken")
+                    elif _ept == "map_reduce":
+                        _wfeph["source_key"] = st.text_input(
+                            "Bron-sleutel (artifact dat in stukken verdeeld wordt)",
+                            value=_wfeph.get("source_key", "input"),
+                            key=f"wfed_ph_sk_{_wfei}")
+                        _wfeph["map_prompt"] = st.text_area(
+                            "Map-prompt per stuk ({{chunk}}, {{chunk_index}}, {{chunk_count}})",
+                            value=_wfeph.get("map_prompt", "{{chunk}}"),
+                            height=100, key=f"wfed_ph_map_{_wfei}")
+                        _wfeph["reduce_prompt"] = st.text_area(
+                            "Reduce-prompt ({{results}} = de deelresultaten)",
+                            value=_wfeph.get("reduce_prompt", ""),
+                            height=100, key=f"wfed_ph_reduce_{_wfei}",
+                            help="Leeg = de deelresultaten worden enkel samengevoegd")
+                        _wfed_ct = st.number_input(
+                            "Stukgrootte (tokens, 0 = instelling)",
+                            min_value=0, max_value=200000, step=500,
+                            value=int(_wfeph.get("chunk_tokens", 0) or 0),
+                            key=f"wfed_ph_ct_{_wfei}")
+                        if _wfed_ct:
+                            _wfeph["chunk_tokens"] = int(_wfed_ct)
+                        else:
+                            _wfeph.pop("chunk_tokens", None)
+                        _wfeph["output_key"] = st.text_input(
+                            "Output-sleutel", value=_wfeph.get("output_key", ""),
+                            key=f"wfed_ph_ok_{_wfei}")
+                        _wfeph["require_approval"] = st.checkbox(
+                            "Vereist goedkeuring na deze fase",
+                            value=_wfeph.get("require_approval", False),
+                            key=f"wfed_ph_ra_{_wfei}")
 
                     _wfeb1, _wfeb2, _wfeb3 = st.columns(3)
                     with _wfeb1:
@@ -284,3 +284,356 @@ def set_backup_dir(path: str) -> str:
     set_key(str(ENV_FILE), "BACKUP_DIR", resolved)
     os.environ["BACKUP_DIR"] = resolved
     return resolved
+
+
+# ── Token Budget Settings ──────────────────────────────────────
+
+_DEFAULT_TOKEN_BUDGET_DAILY = 0
+
+def get_token_budget_daily() -> int:
+    """Geeft het standaard dagbudget in tokens per project (0 = onbeperkt)."""
+    try:
+        return int(os.getenv("TOKEN_BUDGET_DAILY", str(_DEFAULT_TOKEN_BUDGET_DAILY)))
+    except (ValueError, TypeError):
+        return _DEFAULT_TOKEN_BUDGET_DAILY
+
+def set_token_budget_daily(n: int):
+    """Sla het standaard dagbudget in tokens per project op in .env."""
+    set_key(str(ENV_FILE), "TOKEN_BUDGET_DAILY", str(int(n)))
+    os.environ["TOKEN_BUDGET_DAILY"] = str(int(n))
+
+def get_token_prices() -> dict:
+    """
+    Geeft de tokenprijzen per model terug (JSON in .env), bijv.
+    {"gemini-2.5-flash": {"input": 0.3, "output": 2.5}} — prijs per miljoen tokens.
+    """
+    raw = os.getenv("TOKEN_PRICES", "")
+    if not raw:
+        return {}
+    try:
+        result = _json.loads(raw)
+        if isinstance(result, dict):
+            return result
+    except (_json.JSONDecodeError, ValueError):
+        pass
+    return {}
+
+def set_token_prices(prices: dict):
+    """Sla de tokenprijzen per model op als JSON in .env."""
+    value = _json.dumps(prices)
+    set_key(str(ENV_FILE), "TOKEN_PRICES", value)
+    os.environ["TOKEN_PRICES"] = value
+
+
+# ── Profiling Settings ─────────────────────────────────────────
+
+_DEFAULT_PROFILE_TOP_N = 20
+
+def get_profile_tools() -> set[str]:
+    """Geeft de tools die geprofileerd worden (kommalijst in .env; '*' = alle)."""
+    raw = os.getenv("PROFILE_TOOLS", "")
+    return {x.strip() for x in raw.split(",") if x.strip()}
+
+def set_profile_tools(tools: set[str]):
+    """Sla de te profileren tools op in .env."""
+    value = ",".join(sorted(tools))
+    set_key(str(ENV_FILE), "PROFILE_TOOLS", value)
+    os.environ["PROFILE_TOOLS"] = value
+
+def get_profile_phases() -> set[str]:
+    """Geeft de workflowfasen die geprofileerd worden ('<fase>' of '<workflow>:<fase>'; '*' = alle)."""
+    raw = os.getenv("PROFILE_PHASES", "")
+    return {x.strip() for x in raw.split(",") if x.strip()}
+
+def set_profile_phases(phases: set[str]):
+    """Sla de te profileren workflowfasen op in .env."""
+    value = ",".join(sorted(phases))
+    set_key(str(ENV_FILE), "PROFILE_PHASES", value)
+    os.environ["PROFILE_PHASES"] = value
+
+def get_profile_top_n() -> int:
+    """Geeft het aantal hotspots/allocatieplaatsen per profiel (standaard: 20)."""
+    try:
+        return max(1, int(os.getenv("PROFILE_TOP_N", str(_DEFAULT_PROFILE_TOP_N))))
+    except (ValueError, TypeError):
+        return _DEFAULT_PROFILE_TOP_N
+
+def set_profile_top_n(n: int):
+    """Sla het aantal hotspots per profiel op in .env."""
+    set_key(str(ENV_FILE), "PROFILE_TOP_N", str(int(n)))
+    os.environ["PROFILE_TOP_N"] = str(int(n))
+
+
+# ── Metrics Settings ───────────────────────────────────────────
+
+_DEFAULT_METRICS_PORT = 0
+_DEFAULT_METRICS_HOST = "127.0.0.1"
+
+def get_metrics_port() -> int:
+    """Geeft de poort van het Prometheus metrics-endpoint (0 = uitgeschakeld)."""
+    try:
+        return int(os.getenv("METRICS_PORT", str(_DEFAULT_METRICS_PORT)))
+    except (ValueError, TypeError):
+        return _DEFAULT_METRICS_PORT
+
+def set_metrics_port(port: int):
+    """Sla de poort van het metrics-endpoint op in .env."""
+    set_key(str(ENV_FILE), "METRICS_PORT", str(int(port)))
+    os.environ["METRICS_PORT"] = str(int(port))
+
+def get_metrics_host() -> str:
+    """Geeft het adres waarop het metrics-endpoint luistert (standaard: 127.0.0.1)."""
+    return os.getenv("METRICS_HOST", _DEFAULT_METRICS_HOST).strip() or _DEFAULT_METRICS_HOST
+
+def set_metrics_host(host: str):
+    """Sla het luisteradres van het metrics-endpoint op in .env."""
+    set_key(str(ENV_FILE), "METRICS_HOST", host.strip())
+    os.environ["METRICS_HOST"] = host.strip()
+
+
+# ── Scheduler Concurrency Settings ─────────────────────────────
+
+_DEFAULT_SCHEDULER_POOL_SIZES = {"shell": 4, "command": 4, "prompt": 4}
+_DEFAULT_LLM_JOB_CONCURRENCY = 2
+
+def get_scheduler_pool_sizes() -> dict:
+    """
+    Geeft het aantal worker-threads per taaktype terug (JSON in .env), bijv.
+    {"shell": 4, "command": 4, "prompt": 4}. Ontbrekende types krijgen de standaardwaarde.
+    """
+    sizes = dict(_DEFAULT_SCHEDULER_POOL_SIZES)
+    raw = os.getenv("SCHEDULER_POOL_SIZES", "")
+    if not raw:
+        return sizes
+    try:
+        result = _json.loads(raw)
+        if isinstance(result, dict):
+            for job_type, n in result.items():
+                if job_type in sizes:
+                    sizes[job_type] = max(1, int(n))
+    except (_json.JSONDecodeError, ValueError, TypeError):
+        pass
+    return sizes
+
+def set_scheduler_pool_sizes(sizes: dict):
+    """Sla het aantal worker-threads per taaktype op als JSON in .env (actief na herstart)."""
+    value = _json.dumps({k: int(v) for k, v in sizes.items()})
+    set_key(str(ENV_FILE), "SCHEDULER_POOL_SIZES", value)
+    os.environ["SCHEDULER_POOL_SIZES"] = value
+
+def get_llm_job_concurrency() -> int:
+    """Geeft het maximum aantal gelijktijdige prompt-taken (LLM) terug (standaard: 2)."""
+    try:
+        return max(1, int(os.getenv("LLM_JOB_CONCURRENCY", str(_DEFAULT_LLM_JOB_CONCURRENCY))))
+    except (ValueError, TypeError):
+        return _DEFAULT_LLM_JOB_CONCURRENCY
+
+def set_llm_job_concurrency(n: int):
+    """Sla het maximum aantal gelijktijdige prompt-taken op in .env."""
+    set_key(str(ENV_FILE), "LLM_JOB_CONCURRENCY", str(int(n)))
+    os.environ["LLM_JOB_CONCURRENCY"] = str(int(n))
+
+
+# ── Admission Settings ─────────────────────────────────────────
+
+_DEFAULT_ADMISSION_LLM_SLOTS = 4
+_DEFAULT_ADMISSION_EXEC_SLOTS = 4
+
+def get_admission_llm_slots() -> int:
+    """Geeft het aantal gelijktijdige LLM-aanroepen over alle bronnen heen terug (standaard: 4)."""
+    try:
+        return max(1, int(os.getenv("ADMISSION_LLM_SLOTS", str(_DEFAULT_ADMISSION_LLM_SLOTS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_ADMISSION_LLM_SLOTS
+
+def set_admission_llm_slots(n: int):
+    """Sla het aantal gelijktijdige LLM-aanroepen op in .env."""
+    set_key(str(ENV_FILE), "ADMISSION_LLM_SLOTS", str(max(1, int(n))))
+    os.environ["ADMISSION_LLM_SLOTS"] = str(max(1, int(n)))
+
+def get_admission_exec_slots() -> int:
+    """Geeft het aantal gelijktijdige run_shell/run_python-uitvoeringen en shell-taken terug (standaard: 4)."""
+    try:
+        return max(1, int(os.getenv("ADMISSION_EXEC_SLOTS", str(_DEFAULT_ADMISSION_EXEC_SLOTS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_ADMISSION_EXEC_SLOTS
+
+def set_admission_exec_slots(n: int):
+    """Sla het aantal gelijktijdige shell/python-uitvoeringen op in .env."""
+    set_key(str(ENV_FILE), "ADMISSION_EXEC_SLOTS", str(max(1, int(n))))
+    os.environ["ADMISSION_EXEC_SLOTS"] = str(max(1, int(n)))
+
+
+# ── Job History Settings ───────────────────────────────────────
+
+_DEFAULT_JOB_HISTORY_SIZE = 50
+
+def get_job_history_size() -> int:
+    """Geeft het aantal runs dat per taak in de historiek bewaard wordt (standaard: 50)."""
+    try:
+        return max(1, int(os.getenv("JOB_HISTORY_SIZE", str(_DEFAULT_JOB_HISTORY_SIZE))))
+    except (ValueError, TypeError):
+        return _DEFAULT_JOB_HISTORY_SIZE
+
+def set_job_history_size(n: int):
+    """Sla het aantal te bewaren runs per taak op in .env."""
+    set_key(str(ENV_FILE), "JOB_HISTORY_SIZE", str(int(n)))
+    os.environ["JOB_HISTORY_SIZE"] = str(int(n))
+
+
+_DEFAULT_JOB_JITTER_SECONDS = 30
+
+def get_job_jitter_seconds() -> int:
+    """Geeft het venster (seconden) voor de vaste jitter per taak (standaard: 30, 0 = uit)."""
+    try:
+        return max(0, int(os.getenv("JOB_JITTER_SECONDS", str(_DEFAULT_JOB_JITTER_SECONDS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_JOB_JITTER_SECONDS
+
+def set_job_jitter_seconds(n: int):
+    """Sla het jitter-venster per taak op in .env."""
+    set_key(str(ENV_FILE), "JOB_JITTER_SECONDS", str(max(0, int(n))))
+    os.environ["JOB_JITTER_SECONDS"] = str(max(0, int(n)))
+
+
+# ── Scheduler Daemon Settings ──────────────────────────────────
+
+def get_scheduler_socket() -> str:
+    """Geeft het pad van de IPC-socket van de scheduler-daemon ('' = naast het jobs-bestand)."""
+    return os.getenv("SCHEDULER_SOCKET", "").strip()
+
+def set_scheduler_socket(path: str):
+    """Sla het pad van de IPC-socket van de scheduler-daemon op in .env."""
+    set_key(str(ENV_FILE), "SCHEDULER_SOCKET", path.strip())
+    os.environ["SCHEDULER_SOCKET"] = path.strip()
+
+
+# ── Distributed Lease Settings ─────────────────────────────────
+
+_DEFAULT_LEASE_TTL = 60
+
+def get_scheduler_lease_db() -> str:
+    """Geeft het pad van de gedeelde SQLite-leasedatabase ('' = leases uit, enkel-node)."""
+    return os.getenv("SCHEDULER_LEASE_DB", "").strip()
+
+def set_scheduler_lease_db(path: str):
+    """Sla het pad van de gedeelde leasedatabase op in .env ('' = uit)."""
+    set_key(str(ENV_FILE), "SCHEDULER_LEASE_DB", path.strip())
+    os.environ["SCHEDULER_LEASE_DB"] = path.strip()
+
+def get_lease_ttl() -> int:
+    """Geeft de geldigheidsduur van een lease in seconden (standaard: 60)."""
+    try:
+        return max(3, int(os.getenv("LEASE_TTL", str(_DEFAULT_LEASE_TTL))))
+    except (ValueError, TypeError):
+        return _DEFAULT_LEASE_TTL
+
+def set_lease_ttl(seconds: int):
+    """Sla de geldigheidsduur van een lease op in .env."""
+    set_key(str(ENV_FILE), "LEASE_TTL", str(int(seconds)))
+    os.environ["LEASE_TTL"] = str(int(seconds))
+
+
+# ── Shell Log Settings ─────────────────────────────────────────
+
+_DEFAULT_SHELL_LOG_MAX_BYTES = 1_048_576
+_DEFAULT_SHELL_LOG_BACKUPS = 3
+
+def get_shell_log_max_bytes() -> int:
+    """Geeft de maximale grootte van een shell-logbestand vóór rotatie (standaard: 1 MB)."""
+    try:
+        return max(1024, int(os.getenv("SHELL_LOG_MAX_BYTES", str(_DEFAULT_SHELL_LOG_MAX_BYTES))))
+    except (ValueError, TypeError):
+        return _DEFAULT_SHELL_LOG_MAX_BYTES
+
+def set_shell_log_max_bytes(n: int):
+    """Sla de maximale grootte van een shell-logbestand op in .env."""
+    set_key(str(ENV_FILE), "SHELL_LOG_MAX_BYTES", str(int(n)))
+    os.environ["SHELL_LOG_MAX_BYTES"] = str(int(n))
+
+def get_shell_log_backups() -> int:
+    """Geeft het aantal bewaarde geroteerde shell-logbestanden (standaard: 3)."""
+    try:
+        return max(0, int(os.getenv("SHELL_LOG_BACKUPS", str(_DEFAULT_SHELL_LOG_BACKUPS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_SHELL_LOG_BACKUPS
+
+def set_shell_log_backups(n: int):
+    """Sla het aantal bewaarde geroteerde shell-logbestanden op in .env."""
+    set_key(str(ENV_FILE), "SHELL_LOG_BACKUPS", str(int(n)))
+    os.environ["SHELL_LOG_BACKUPS"] = str(int(n))
+
+
+# ── File Watch Settings ────────────────────────────────────────
+
+_DEFAULT_WATCH_POLL_SECONDS = 2.0
+_DEFAULT_WATCH_DEBOUNCE_SECONDS = 2.0
+
+def get_watch_poll_seconds() -> float:
+    """Geeft het interval (seconden) waarmee bestandstriggers de schijf scannen (standaard: 2)."""
+    try:
+        return max(0.2, float(os.getenv("WATCH_POLL_SECONDS", str(_DEFAULT_WATCH_POLL_SECONDS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_WATCH_POLL_SECONDS
+
+def set_watch_poll_seconds(seconds: float):
+    """Sla het scaninterval van bestandstriggers op in .env."""
+    set_key(str(ENV_FILE), "WATCH_POLL_SECONDS", str(float(seconds)))
+    os.environ["WATCH_POLL_SECONDS"] = str(float(seconds))
+
+def get_watch_debounce_seconds() -> float:
+    """Geeft hoe lang (seconden) het stil moet blijven vóór een bestandstrigger vuurt (standaard: 2)."""
+    try:
+        return max(0.0, float(os.getenv("WATCH_DEBOUNCE_SECONDS", str(_DEFAULT_WATCH_DEBOUNCE_SECONDS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_WATCH_DEBOUNCE_SECONDS
+
+def set_watch_debounce_seconds(seconds: float):
+    """Sla de debounce-tijd van bestandstriggers op in .env."""
+    set_key(str(ENV_FILE), "WATCH_DEBOUNCE_SECONDS", str(float(seconds)))
+    os.environ["WATCH_DEBOUNCE_SECONDS"] = str(float(seconds))
+
+
+# ── Workflow Settings ──────────────────────────────────────────
+
+_DEFAULT_WORKFLOW_MAX_PARALLEL = 4
+
+def get_workflow_max_parallel() -> int:
+    """Geeft het maximum aantal takken van een parallelle workflowgroep dat tegelijk loopt (standaard: 4)."""
+    try:
+        return max(1, int(os.getenv("WORKFLOW_MAX_PARALLEL", str(_DEFAULT_WORKFLOW_MAX_PARALLEL))))
+    except (ValueError, TypeError):
+        return _DEFAULT_WORKFLOW_MAX_PARALLEL
+
+def set_workflow_max_parallel(n: int):
+    """Sla het maximum aantal gelijktijdige takken per parallelle groep op in .env."""
+    set_key(str(ENV_FILE), "WORKFLOW_MAX_PARALLEL", str(max(1, int(n))))
+    os.environ["WORKFLOW_MAX_PARALLEL"] = str(max(1, int(n)))
+
+_DEFAULT_WORKFLOW_WORKERS = 2
+
+def get_workflow_workers() -> int:
+    """Geeft het aantal achtergrondworkers voor workflow-runs (standaard: 2; 0 = fasen lopen in de aanroeper)."""
+    try:
+        return max(0, int(os.getenv("WORKFLOW_WORKERS", str(_DEFAULT_WORKFLOW_WORKERS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_WORKFLOW_WORKERS
+
+def set_workflow_workers(n: int):
+    """Sla het aantal achtergrondworkers voor workflow-runs op in .env."""
+    set_key(str(ENV_FILE), "WORKFLOW_WORKERS", str(max(0, int(n))))
+    os.environ["WORKFLOW_WORKERS"] = str(max(0, int(n)))
+
+_DEFAULT_WORKFLOW_CHUNK_TOKENS = 3000
+
+def get_workflow_chunk_tokens() -> int:
+    """Geeft de maximale grootte (tokens) van één stuk invoer in een map_reduce-fase (standaard: 3000)."""
+    try:
+        return max(100, int(os.getenv("WORKFLOW_CHUNK_TOKENS", str(_DEFAULT_WORKFLOW_CHUNK_TOKENS))))
+    except (ValueError, TypeError):
+        return _DEFAULT_WORKFLOW_CHUNK_TOKENS
+
+def set_workflow_chunk_tokens(n: int):
+    """Sla de maximale stukgrootte (tokens) van map_reduce-fasen op in .env."""
+    set_key(str(ENV_FILE), "WORKFLOW_CHUNK_TOKENS", str(max(100, int(n))))
+    os.environ["WORKFLOW_CHUNK_TOKENS"] = str(max(100, int(n)))
@@ -44,12 +44,14 @@ def schedule_shell(job_id: str, command: str, schedule: str, description: str =
     return result
 
 
-def schedule_prompt(job_id: str, prompt: str, schedule: str, description: str = "") -> str:
+def schedule_prompt(job_id: str, prompt: str, schedule: str, description: str = "", frozen: bool = False) -> str:
     """
     Plant een AI-prompt op een schema. De OrchestratorAgent voert de prompt uit op het opgegeven tijdstip.
     Voorbeeld: 'Controleer open issues en stuur een samenvatting'.
+    frozen: True = het tool-plan wordt bij de eerste run één keer opgesteld en daarna
+    zonder LLM-planning hergebruikt (opnieuw plannen met /replan_job).
     """
-    from regian.core.scheduler import add_scheduled_job
+    from regian.core.scheduler import add_scheduled_job, update_scheduled_job
     result = add_scheduled_job(
         job_id=job_id,
         task=prompt,
@@ -58,10 +60,41 @@ def schedule_prompt(job_id: str, prompt: str, schedule: str, description: str =
         description=description or f"Prompt: {prompt[:60]}",
     )
     if result == job_id:
+        if _truthy(frozen):
+            update_scheduled_job(job_id, frozen_plan=True)
+            return f"✅ Taak '{job_id}' gepland: AI-prompt met bevroren plan — {schedule}"
         return f"✅ Taak '{job_id}' gepland: AI-prompt — {schedule}"
     return result
 
 
+def _truthy(value) -> bool:
+    return str(value).strip().lower() in ("ja", "true", "yes", "1")
+
+
+def replan_job(job_id: str) -> str:
+    """
+    Stelt het tool-plan van een AI-prompt-taak nu opnieuw op en bevriest het:
+    volgende runs voeren dit plan uit zonder LLM-planning.
+    Gebeurt ook automatisch als de skills of het actieve project wijzigen.
+    """
+    from regian.core.scheduler import get_all_jobs, replan_prompt_job
+    job = get_all_jobs().get(job_id)
+    if not job:
+        return f"❌ Taak '{job_id}' niet gevonden."
+    if job.get("type") != "prompt":
+        return f"❌ Taak '{job_id}' is geen AI-prompt-taak."
+    try:
+        steps = replan_prompt_job(job_id)
+    except Exception as e:
+        return f"❌ Plannen mislukt: {e}"
+    if steps is None:
+        return f"❌ Taak '{job_id}' niet gevonden."
+    if not steps:
+        return f"✅ Plan voor '{job_id}' bevroren: geen tools nodig (elke run vraagt enkel het antwoord aan de LLM)."
+    chain = " → ".join(step.get("tool", "?") for step in steps)
+    return f"✅ Plan voor '{job_id}' bevroren ({len(steps)} stap(pen)): {chain}"
+
+
 def remove_job(job_id: str) -> str:
     """
     Verwijdert een geplande taak op basis van de job_id.
@@ -108,7 +141,7 @@ def list_jobs() -> str:
     """
     Toont alle geplande taken met status, schema en laatste uitvoering.
     """
-    from regian.core.scheduler import get_all_jobs, get_next_run
+    from regian.core.scheduler import get_all_jobs, get_next_run, get_job_stats, schedule_preview
 
     jobs = get_all_jobs()
     if not jobs:
@@ -126,31 +159,112 @@ def list_jobs() -> str:
         last_run = job.get("last_run") or "—"
         last_status = job.get("last_status") or ""
         next_run = get_next_run(job_id) if enabled else "—"
+        stats = get_job_stats(job_id)
 
+        queue = ""
+        if stats["runs"] or stats["pending"] or stats["running"] or stats["skipped"]:
+            queue = (
+                f"   ⏳ Wachtrij: {stats['pending']} · actief: {stats['running']} · "
+                f"wachttijd gem. {stats['avg_wait']:.1f}s (max {stats['max_wait']:.1f}s)"
+                + (f" · overgeslagen: {stats['skipped']}" if stats["skipped"] else "")
+                + "\n"
+            )
+        if job.get("only_on_change"):
+            unchanged = int(job.get("unchanged_runs") or 0)
+            queue += (
+                f"   🔁 Enkel bij wijziging · {unchanged} run(s) ongewijzigd"
+                + (f" sinds {job['last_change']}" if job.get("last_change") else "")
+                + "\n"
+            )
+        if enabled:
+            preview = schedule_preview(job_id, jobs)
+            if preview["offset"] or job.get("spread"):
+                times = ", ".join(t.strftime("%H:%M:%S") for t in preview["times"])
+                queue += (
+                    ("   🎯 Gespreid" if job.get("spread") else "   🎯 Jitter")
+                    + f" +{int(preview['offset'])}s"
+                    + (f" · volgende: {times}" if times else "")
+                    + "\n"
+                )
+        if job.get("after") or job.get("after_failure"):
+            deps = []
+            if job.get("after"):
+                deps.append("na " + ", ".join(
+                    p + ("" if p in jobs else " ⚠️") for p in job["after"]
+                ))
+            if job.get("after_failure"):
+                deps.append("na mislukking van " + ", ".join(
+                    p + ("" if p in jobs else " ⚠️") for p in job["after_failure"]
+                ))
+            queue += f"   🔗 Start {' · '.join(deps)}\n"
+        frozen = ""
+        if job.get("frozen_plan"):
+            steps = job.get("plan")
+            frozen = (
+                f"   🧊 Bevroren plan: {len(steps)} stap(pen), opgesteld {job.get('planned_at')}\n"
+                if steps is not None else "   🧊 Bevroren plan: wordt bij de volgende run opgesteld\n"
+            )
         lines.append(
             f"{status_icon} **{job_id}** {type_icon} `{task}`\n"
             f"   📌 {description}\n"
             f"   ⏰ Schema: `{schedule}`\n"
             f"   ▶️  Volgende run: {next_run}  |  Laatste run: {last_run} {last_status}\n"
+            + queue + frozen
         )
     return "\n".join(lines)
 
 
-def job_output(job_id: str) -> str:
+def job_output(job_id: str, run_id: str = "") -> str:
     """
     Toont de output van de laatste uitvoering van een taak.
+    run_id: optioneel; toont dan de volledige output van die run (zie /job_history).
     """
-    from regian.core.scheduler import get_all_jobs
+    from regian.core.scheduler import get_all_jobs, get_run_output
     jobs = get_all_jobs()
     job = jobs.get(job_id)
     if not job:
         return f"❌ Taak '{job_id}' niet gevonden."
+    if run_id:
+        output = get_run_output(job_id, run_id)
+        if output is None:
+            return f"❌ Run '{run_id}' van '{job_id}' niet gevonden."
+        return f"**{job_id}** — run {run_id}\n\n```\n{output or '(geen output)'}\n```"
     last_run = job.get("last_run") or "nog niet uitgevoerd"
     last_status = job.get("last_status") or ""
     last_output = job.get("last_output") or "(geen output)"
     return f"**{job_id}** — laatste run: {last_run} {last_status}\n\n```\n{last_output}\n```"
 
 
+def job_history(job_id: str, limit: int = 20) -> str:
+    """
+    Toont de run-historiek van een taak met trendstatistieken:
+    gemiddelde en p95-duur, foutpercentage en een duurgrafiek van de laatste runs.
+    limit: aantal recente runs in de lijst (standaard: 20).
+    """
+    from regian.core.scheduler import get_all_jobs, get_job_history, summarize_history, sparkline
+    if job_id not in get_all_jobs():
+        return f"❌ Taak '{job_id}' niet gevonden."
+    runs = get_job_history(job_id)
+    if not runs:
+        return f"📭 Taak '{job_id}' heeft nog geen runs."
+    stats = summarize_history(runs)
+    trend = f"{stats['trend']:+.0%}" if stats["count"] > 1 else "—"
+    lines = [
+        f"📈 **{job_id}** — {stats['count']} run(s)",
+        f"   ⏱️ Duur gem. {stats['mean']:.2f}s · p95 {stats['p95']:.2f}s · max {stats['max']:.2f}s · trend {trend}",
+        f"   ❌ Mislukt: {stats['failures']}/{stats['count']} ({stats['failure_rate']:.0%})",
+        f"   `{sparkline(runs)}`\n",
+    ]
+    for run in reversed(runs[-int(limit):]):
+        lines.append(
+            f"- {run['start']} {run['status']} {run['duration']:.2f}s"
+            + (f" (wacht {run['wait']:.2f}s)" if run.get("wait") else "")
+            + (" · ongewijzigd" if run.get("unchanged") else "")
+            + f" · `{run['run_id']}`"
+        )
+    return "\n".join(lines)
+
+
 def list_schedule_examples() -> str:
     """
     Toont voorbeelden van geldige schedule-formaten voor het plannen van taken.
@@ -173,4 +287,187 @@ def list_schedule_examples() -> str:
   `0 9 * * 1-5`   (werkdagen om 09:00)
   `*/15 * * * *`  (elke 15 minuten)
   `0 0 * * 0`     (elke zondag om middernacht)
+
+**Bij wijziging van bestanden (glob, t.o.v. het actieve project):**
+  `bij wijziging van uploads/*.csv`   `on change of docs/**/*.md`
+  Gebruik `{files}` in het commando voor de gewijzigde paden.
+
+**Na andere taken (start zodra alle ouders geslaagd zijn):**
+  `na backup`   `na backup, push`   `after backup`
+  `na mislukking van backup`   `after failure of backup`
 """
+
+
+def set_job_budget(job_id: str, tokens: int) -> str:
+    """
+    Stelt een tokenbudget per uitvoering in voor een geplande taak (vooral AI-prompt taken).
+    Een run die het budget overschrijdt wordt afgebroken en als mislukt (❌) gemarkeerd.
+    tokens: maximum aantal tokens per run; 0 verwijdert het budget.
+    """
+    from regian.core.scheduler import update_scheduled_job
+    tokens = int(tokens)
+    if not update_scheduled_job(job_id, token_budget=tokens if tokens > 0 else None):
+        return f"❌ Taak '{job_id}' niet gevonden."
+    if tokens > 0:
+        return f"✅ Tokenbudget voor '{job_id}': {tokens} tokens per run."
+    return f"✅ Tokenbudget voor '{job_id}' verwijderd."
+
+
+def configure_job(
+    job_id: str,
+    max_instances: int = 0,
+    coalesce: str = "",
+    misfire_grace_seconds: int = -1,
+    frozen_plan: str = "",
+    priority: str = "",
+) -> str:
+    """
+    Stelt de concurrency-opties van een geplande taak in. Lege/standaardwaarden laten een optie ongewijzigd.
+    max_instances: hoeveel runs van deze taak tegelijk mogen lopen (standaard 1; een extra trigger wordt overgeslagen).
+    coalesce: 'ja' = gemiste runs samenvoegen tot één run, 'nee' = elke gemiste run apart inhalen.
+    misfire_grace_seconds: hoe lang (seconden, > 0) een te laat gestarte run nog mag uitvoeren; -1 laat de waarde ongewijzigd.
+    frozen_plan: 'ja' = AI-prompt-taak plant één keer en hergebruikt het plan, 'nee' = elke run opnieuw plannen.
+    priority: prioriteitsklasse voor LLM- en shell-capaciteit: 'cron' (standaard) of 'maintenance' (wijkt voor al het andere).
+    """
+    from regian.core.admission import CLASSES
+    from regian.core.scheduler import update_scheduled_job
+    fields: dict = {}
+    if str(priority).strip():
+        if priority.strip().lower() not in CLASSES:
+            return f"❌ Ongeldige prioriteit: '{priority}'. Kies uit {', '.join(CLASSES)}."
+        fields["priority"] = priority.strip().lower()
+    if int(max_instances) > 0:
+        fields["max_instances"] = int(max_instances)
+    for name, raw in (("coalesce", coalesce), ("frozen_plan", frozen_plan)):
+        if str(raw).strip():
+            value = str(raw).strip().lower()
+            if value not in ("ja", "nee", "true", "false", "yes", "no", "1", "0"):
+                return f"❌ Ongeldige waarde voor {name}: '{raw}'. Gebruik 'ja' of 'nee'."
+            fields[name] = _truthy(value)
+    grace = int(misfire_grace_seconds)
+    if grace > 0:
+        fields["misfire_grace_time"] = grace
+    elif grace != -1:
+        return f"❌ Ongeldige misfire_grace_seconds: {grace}. Geef een aantal seconden groter dan 0."
+    if not fields:
+        return "❌ Geef minstens één optie op (max_instances, coalesce, misfire_grace_seconds, frozen_plan of priority)."
+    changes = dict(fields)
+    if changes.get("priority") == "cron":
+        changes["priority"] = None   # standaardklasse van geplande taken
+    if changes.get("frozen_plan") is False:
+        # Bevroren plan weggooien: elke run plant opnieuw
+        changes.update(frozen_plan=None, plan=None, plan_fingerprint=None, planned_at=None)
+    try:
+        if not update_scheduled_job(job_id, **changes):
+            return f"❌ Taak '{job_id}' niet gevonden."
+    except (ValueError, RuntimeError) as e:
+        return f"❌ {e}"
+    summary = ", ".join(f"{k}={v}" for k, v in fields.items())
+    return f"✅ Taak '{job_id}' bijgewerkt: {summary}"
+
+
+def set_only_on_change(job_id: str, enabled: str = "ja", on_change: str = "") -> str:
+    """
+    Schakelt 'enkel bij wijziging' in voor een geplande taak: runs met dezelfde status en
+    output als de vorige run verhogen enkel een teller, zonder log-entry of nieuwe last_output.
+    enabled: 'ja' of 'nee'.
+    on_change: optioneel slash-command dat enkel loopt als de output wijzigde;
+    {job_id} en {output} worden ingevuld
+    (bv. '/write_file {"path": "rapport.txt", "content": "{output}"}').
+    """
+    from regian.core.scheduler import update_scheduled_job
+    value = str(enabled).strip().lower()
+    if value not in ("ja", "nee", "true", "false", "yes", "no", "1", "0"):
+        return f"❌ Ongeldige waarde voor enabled: '{enabled}'. Gebruik 'ja' of 'nee'."
+    if _truthy(value):
+        fields = {"only_on_change": True, "on_change": on_change.strip() or None}
+    else:
+        fields = {"only_on_change": None, "on_change": None}
+    if not update_scheduled_job(job_id, **fields):
+        return f"❌ Taak '{job_id}' niet gevonden."
+    if not _truthy(value):
+        return f"✅ Taak '{job_id}' logt weer elke run."
+    follow_up = f" Vervolgactie bij wijziging: `{on_change.strip()}`." if on_change.strip() else ""
+    return f"✅ Taak '{job_id}' logt enkel nog bij gewijzigde output.{follow_up}"
+
+
+def set_job_spread(job_id: str, spread: str = "ja", jitter_seconds: int = -1) -> str:
+    """
+    Spreidt taken met hetzelfde schema: met spread='ja' krijgen alle gespreide taken
+    met dat schema een vaste, gelijk verdeelde plaats binnen het interval in plaats
+    van samen te vuren. jitter_seconds: eigen jitter-venster voor deze taak
+    (0 = geen jitter, -1 = JOB_JITTER_SECONDS behouden).
+    """
+    from regian.core.scheduler import update_scheduled_job, get_all_jobs, schedule_preview
+    value = str(spread).strip().lower()
+    if value not in ("ja", "nee", "true", "false", "yes", "no", "1", "0"):
+        return f"❌ Ongeldige waarde voor spread: '{spread}'. Gebruik 'ja' of 'nee'."
+    try:
+        jitter = int(jitter_seconds)
+    except (TypeError, ValueError):
+        return f"❌ Ongeldige jitter: '{jitter_seconds}'. Geef een aantal seconden."
+    fields = {"spread": True if _truthy(value) else None}
+    if jitter >= 0:
+        fields["jitter"] = jitter
+    try:
+        if not update_scheduled_job(job_id, **fields):
+            return f"❌ Taak '{job_id}' niet gevonden."
+    except (ValueError, RuntimeError) as e:
+        return f"❌ {e}"
+    preview = schedule_preview(job_id, get_all_jobs())
+    times = ", ".join(t.strftime("%H:%M:%S") for t in preview["times"])
+    mode = "gespreid" if fields["spread"] else "niet gespreid"
+    return (
+        f"✅ Taak '{job_id}' {mode}, offset +{int(preview['offset'])}s."
+        + (f" Volgende: {times}." if times else "")
+    )
+
+
+def chain_job(job_id: str, after: str = "", on: str = "succes") -> str:
+    """
+    Laat een geplande taak starten zodra andere taken klaar zijn, zonder gegokte tijden.
+    after: komma-gescheiden job_ids (leeg = afhankelijkheden van deze soort wissen).
+    on: 'succes' (start als álle ouders geslaagd zijn) of 'mislukking' (start zodra één ouder faalt).
+    Het eigen schema van de taak blijft gelden; plan met schema 'na <job_id>' voor een taak die enkel na haar ouders loopt.
+    """
+    from regian.core.chains import parse_parents
+    from regian.core.scheduler import update_scheduled_job, check_dependencies
+    kind = str(on).strip().lower()
+    if kind in ("succes", "success", "ok"):
+        field = "after"
+    elif kind in ("mislukking", "failure", "fout", "falen"):
+        field = "after_failure"
+    else:
+        return f"❌ Ongeldige waarde voor on: '{on}'. Gebruik 'succes' of 'mislukking'."
+    parents = parse_parents(after)
+    if parents:
+        error = check_dependencies(job_id, parents)
+        if error:
+            return error
+    if not update_scheduled_job(job_id, **{field: parents or None}):
+        return f"❌ Taak '{job_id}' niet gevonden."
+    if not parents:
+        return f"✅ Afhankelijkheden ({kind}) van '{job_id}' gewist."
+    if field == "after":
+        return f"✅ '{job_id}' start zodra {', '.join(parents)} geslaagd {'is' if len(parents) == 1 else 'zijn'}."
+    return f"✅ '{job_id}' start zodra {' of '.join(parents)} faalt."
+
+
+def job_leases() -> str:
+    """
+    Toont de leases van geplande taken bij uitvoering over meerdere nodes
+    (SCHEDULER_LEASE_DB): welke node een taak laatst startte en of die nog loopt.
+    """
+    from regian.core.leases import get_lease_db, node_id
+    db = get_lease_db()
+    if db is None:
+        return "ℹ️ Leases staan uit (enkel-node). Stel SCHEDULER_LEASE_DB in om taken over meerdere nodes te verdelen."
+    rows = db.all()
+    lines = [f"🔒 **Leases** — deze node: `{node_id()}`\n"]
+    if not rows:
+        lines.append("📭 Nog geen taken geclaimd.")
+    for row in rows:
+        state = "🟢 loopt" if row["active"] else "⚪ vrij"
+        started = datetime.fromtimestamp(row["last_start"]).isoformat(timespec="seconds")
+        lines.append(f"- **{row['job_id']}** {state} · node `{row['node']}` · laatste start {started}")
+    return "\n".join(lines)
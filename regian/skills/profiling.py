@@ -0,0 +1,100 @@
+# regian/skills/profiling.py
+"""
+Profiling-skills: CPU- en geheugenprofilering van tools en workflowfasen aan/uit zetten
+en de bewaarde profielen bekijken.
+"""
+
+_KINDS = ("tool", "phase")
+
+
+def _targets(kind: str) -> set[str]:
+    from regian.settings import get_profile_tools, get_profile_phases
+    return get_profile_tools() if kind == "tool" else get_profile_phases()
+
+
+def _store(kind: str, targets: set[str]):
+    from regian.settings import set_profile_tools, set_profile_phases
+    if kind == "tool":
+        set_profile_tools(targets)
+    else:
+        set_profile_phases(targets)
+
+
+def enable_profiling(target: str, kind: str = "tool") -> str:
+    """
+    Zet profilering (cProfile + tracemalloc) aan voor een tool of workflowfase.
+    target: toolnaam, fase-id, '<workflow_id>:<fase_id>' of '*' voor alles.
+    kind: 'tool' (standaard) of 'phase'.
+    """
+    if kind not in _KINDS:
+        return f"❌ Ongeldig soort '{kind}'. Kies 'tool' of 'phase'."
+    target = target.strip()
+    if not target:
+        return "❌ Geef een tool- of fasenaam op."
+    targets = _targets(kind)
+    targets.add(target)
+    _store(kind, targets)
+    return f"🔬 Profilering aan voor {kind} '{target}'. Bekijk resultaten met /list_profiles."
+
+
+def disable_profiling(target: str = "", kind: str = "tool") -> str:
+    """
+    Zet profilering uit voor een tool of workflowfase.
+    target: naam zoals bij enable_profiling; leeg = alles van deze soort uitzetten.
+    kind: 'tool' (standaard) of 'phase'.
+    """
+    if kind not in _KINDS:
+        return f"❌ Ongeldig soort '{kind}'. Kies 'tool' of 'phase'."
+    targets = _targets(kind)
+    if not target:
+        _store(kind, set())
+        return f"✅ Profilering uit voor alle {kind}s."
+    if target not in targets:
+        return f"❌ {kind} '{target}' wordt niet geprofileerd."
+    targets.discard(target)
+    _store(kind, targets)
+    return f"✅ Profilering uit voor {kind} '{target}'."
+
+
+def list_profiles(limit: int = 20) -> str:
+    """Toont de meest recente CPU/geheugen-profielen met duur en piekgeheugen."""
+    from regian.core.profiling import list_profiles as _list
+    profiles = _list(limit=int(limit))
+    if not profiles:
+        return "📭 Nog geen profielen. Zet profilering aan met /enable_profiling."
+    lines = [f"🔬 **{len(profiles)} profiel(en):**\n"]
+    for p in profiles:
+        err = " ❌" if p.get("error") else ""
+        lines.append(
+            f"- `{p['id']}` · {p['kind']} **{p['name']}** · {p['wall_ms']} ms "
+            f"(cpu {p['cpu_ms']} ms) · piek {p['peak_kb']} KB · {p['ts']}{err}"
+        )
+    return "\n".join(lines)
+
+
+def show_profile(profile_id: str, top: int = 10) -> str:
+    """
+    Toont de hotspots (eigen tijd) en grootste allocatieplaatsen van één profiel.
+    profile_id: id uit /list_profiles.
+    top: aantal regels per tabel (standaard: 10).
+    """
+    from regian.core.profiling import load_profile
+    profile = load_profile(profile_id)
+    if not profile:
+        return f"❌ Profiel '{profile_id}' niet gevonden."
+    top = int(top)
+    lines = [
+        f"🔬 **{profile['kind']} {profile['name']}** — {profile['wall_ms']} ms "
+        f"(cpu {profile['cpu_ms']} ms), piek {profile['peak_kb']} KB",
+    ]
+    if profile.get("error"):
+        lines.append(f"❌ {profile['error']}")
+    lines.append("\n**Hotspots (eigen tijd):**")
+    for h in profile.get("hotspots", [])[:top]:
+        lines.append(f"- {h['self_ms']} ms eigen / {h['cumulative_ms']} ms totaal · {h['calls']}× · `{h['function']}`")
+    allocs = profile.get("allocations", [])[:top]
+    if allocs:
+        lines.append("\n**Allocaties:**")
+        for a in allocs:
+            lines.append(f"- {a['size_kb']} KB · {a['count']} objecten · `{a['site']}`")
+    return "\n".join(lines)
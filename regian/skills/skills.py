@@ -62,7 +62,9 @@ Schrijf nu de volledige Python module. Enkel code, geen uitleg, geen markdown co
             google_api_key=os.getenv("GEMINI_API_KEY"),
             model_kwargs={"thinking": {"thinking_budget": 0}},
         )
-        response = llm.invoke([HumanMessage(content=prompt)])
+        from regian.core.usage import invoke_llm, usage_scope
+        with usage_scope(source="skill"):
+            response = invoke_llm(llm, [HumanMessage(content=prompt)])
         code = response.content
         if isinstance(code, list):
             code = " ".join(str(c) for c in code if c)
@@ -122,7 +124,9 @@ Enkel code, geen uitleg, geen markdown code blocks."""
             google_api_key=os.getenv("GEMINI_API_KEY"),
             model_kwargs={"thinking": {"thinking_budget": 0}},
         )
-        response = llm.invoke([HumanMessage(content=prompt)])
+        from regian.core.usage import invoke_llm, usage_scope
+        with usage_scope(source="skill"):
+            response = invoke_llm(llm, [HumanMessage(content=prompt)])
         code = response.content
         if isinstance(code, list):
             code = " ".join(str(c) for c in code if c)
@@ -79,23 +79,20 @@ def run_shell(command: str, cwd: str = "") -> str:
         return str(e)
     try:
         from regian.settings import get_shell_timeout
+        from regian.core.admission import admit
+        from regian.core.shell import run_streaming, new_call_log_path
         timeout = get_shell_timeout()
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=str(work_dir),
-        )
+        # Output wordt naar een logbestand gestreamd; enkel de staart blijft in het geheugen
+        with admit("exec"):
+            result = run_streaming(command, str(work_dir), timeout, new_call_log_path(), header=f"$ {command}\n")
+        if result.timed_out:
+            return f"❌ Timeout: commando duurde langer dan {timeout} seconden."
         output = result.stdout.strip()
         errors = result.stderr.strip()
+        note = f"… (ingekort, volledige output in {result.log_path})\n" if result.truncated else ""
         if result.returncode != 0:
-            return f"⚠️ Exit code {result.returncode}\n{errors or output}"
-        return output or "✅ Commando uitgevoerd (geen output)"
-    except subprocess.TimeoutExpired:
-        from regian.settings import get_shell_timeout
-        return f"❌ Timeout: commando duurde langer dan {get_shell_timeout()} seconden."
+            return f"⚠️ Exit code {result.returncode}\n{note}{errors or output}"
+        return f"{note}{output}" if output else "✅ Commando uitgevoerd (geen output)"
     except Exception as e:
         return f"❌ Fout: {str(e)}"
 
@@ -119,19 +116,21 @@ def run_python(code: str, cwd: str = "") -> str:
         import os
         import sys
         from contextlib import redirect_stdout, redirect_stderr
+        from regian.core.admission import admit
         buf_out = io.StringIO()
         buf_err = io.StringIO()
-        prev_cwd = os.getcwd()
-        prev_path = sys.path[:]
-        os.chdir(str(work_dir))
-        sys.path.insert(0, str(work_dir))
         exec_globals = {"__name__": "__main__"}
-        try:
-            with redirect_stdout(buf_out), redirect_stderr(buf_err):
-                exec(compile(code, "<regian>", "exec"), exec_globals)
-        finally:
-            os.chdir(prev_cwd)
-            sys.path = prev_path
+        with admit("exec"):
+            prev_cwd = os.getcwd()
+            prev_path = sys.path[:]
+            os.chdir(str(work_dir))
+            sys.path.insert(0, str(work_dir))
+            try:
+                with redirect_stdout(buf_out), redirect_stderr(buf_err):
+                    exec(compile(code, "<regian>", "exec"), exec_globals)
+            finally:
+                os.chdir(prev_cwd)
+                sys.path = prev_path
         output = buf_out.getvalue().strip()
         errors = buf_err.getvalue().strip()
         if errors:
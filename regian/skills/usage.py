@@ -0,0 +1,102 @@
+# regian/skills/usage.py
+"""
+Usage-skills: tokenverbruik van LLM-aanroepen opvragen, budgetten instellen en
+de toegangscontrole bekijken.
+"""
+
+_GROUP_LABELS = {
+    "project": "Project",
+    "source":  "Bron",
+    "run_id":  "Workflow-run",
+    "job_id":  "Cron-taak",
+    "model":   "Model",
+}
+
+
+def token_usage(group_by: str = "project", days: int = 7) -> str:
+    """
+    Toont het tokenverbruik van alle LLM-aanroepen, gegroepeerd per project, bron, workflow-run, cron-taak of model.
+    group_by: 'project' | 'source' | 'run_id' | 'job_id' | 'model' (standaard: project).
+    days: aantal dagen terug (standaard: 7).
+    """
+    from regian.core.usage import summarize_usage
+    if group_by not in _GROUP_LABELS:
+        return f"❌ Ongeldige groepering '{group_by}'. Kies uit: {', '.join(_GROUP_LABELS)}."
+    rows = summarize_usage(group_by=group_by, days=int(days))
+    if not rows:
+        return f"📭 Geen LLM-aanroepen geregistreerd in de laatste {days} dagen."
+
+    total = sum(r["total_tokens"] for r in rows)
+    lines = [f"🪙 **Tokenverbruik per {_GROUP_LABELS[group_by].lower()}** (laatste {days} dagen, {total} tokens):\n"]
+    for r in rows:
+        avg_ms = r["latency_ms"] // r["calls"] if r["calls"] else 0
+        cost = f" · kost {r['cost']:.4f}" if r["cost"] else ""
+        est = f" · {r['estimated']} geschat" if r["estimated"] else ""
+        lines.append(
+            f"- **{r['key']}** — {r['total_tokens']} tokens "
+            f"({r['input_tokens']} in / {r['output_tokens']} uit) · "
+            f"{r['calls']} aanroepen · gem. {avg_ms} ms{cost}{est}"
+        )
+    return "\n".join(lines)
+
+
+def set_token_budget(tokens: int, project: str = "") -> str:
+    """
+    Stelt een dagbudget in tokens in voor LLM-aanroepen.
+    project: projectnaam; leeg = standaardbudget voor alle projecten (TOKEN_BUDGET_DAILY).
+    tokens: maximum aantal tokens per dag; 0 = onbeperkt.
+    """
+    tokens = int(tokens)
+    if not project:
+        from regian.settings import set_token_budget_daily
+        set_token_budget_daily(tokens)
+        if tokens > 0:
+            return f"✅ Standaard dagbudget: {tokens} tokens per project."
+        return "✅ Standaard dagbudget verwijderd (onbeperkt)."
+
+    from regian.skills.project import _read_manifest, _write_manifest
+    try:
+        manifest = _read_manifest(project)
+    except FileNotFoundError as e:
+        return f"❌ {e}"
+    manifest["token_budget"] = tokens
+    _write_manifest(manifest)
+    if tokens > 0:
+        return f"✅ Dagbudget voor project '{project}': {tokens} tokens."
+    return f"✅ Project '{project}' heeft geen dagbudget meer (onbeperkt)."
+
+
+def token_budget_status(project: str = "") -> str:
+    """
+    Toont het verbruik van vandaag t.o.v. het dagbudget van een project.
+    project: projectnaam; leeg = het actieve project.
+    """
+    from regian.core.usage import project_budget, project_usage_today
+    if not project:
+        from regian.settings import get_active_project
+        project = get_active_project()
+    used = project_usage_today(project)
+    limit = project_budget(project)
+    label = project or "(geen project)"
+    if limit <= 0:
+        return f"🪙 {label}: {used} tokens vandaag — geen dagbudget ingesteld."
+    pct = min(100, used * 100 // limit)
+    return f"🪙 {label}: {used}/{limit} tokens vandaag ({pct}%)."
+
+
+def admission_status() -> str:
+    """
+    Toont de toegangscontrole van LLM-aanroepen en shell/python-uitvoering:
+    plaatsen, lopende en wachtende aanvragen per prioriteitsklasse
+    (interactive > workflow > cron > maintenance).
+    """
+    from regian.core.admission import CLASSES, status
+    lines = ["🚦 **Toegangscontrole**\n"]
+    for resource, gate in status().items():
+        label = "LLM-aanroepen" if resource == "llm" else "Shell/Python"
+        busy = sum(gate["active"].values())
+        lines.append(f"- **{label}** — {busy}/{gate['size']} bezet")
+        for cls in CLASSES:
+            if gate["active"][cls] or gate["waiting"][cls]:
+                lines.append(f"  - {cls}: {gate['active'][cls]} actief · {gate['waiting'][cls]} wachtend")
+    return "\n".join(lines)
@@ -29,6 +29,12 @@ def _project_path() -> str:
         return ""
 
 
+def _background() -> bool:
+    """Lopen de fasen in achtergrondworkers (WORKFLOW_WORKERS > 0) in plaats van in de skill zelf?"""
+    from regian.settings import get_workflow_workers
+    return get_workflow_workers() > 0
+
+
 # ── Overzicht ─────────────────────────────────────────────────────────────────
 
 def list_workflows() -> str:
@@ -43,17 +49,22 @@ def list_workflows() -> str:
     return "\n".join(lines)
 
 
-def list_workflow_runs() -> str:
-    """Toont alle workflow-runs van het actieve project (actief en afgerond)."""
-    from regian.core.workflow import list_runs, STATUS_WAITING, STATUS_RUNNING
-    runs = list_runs(_project_path())
+def list_workflow_runs(all_projects: bool = False) -> str:
+    """
+    Toont alle workflow-runs van het actieve project (actief en afgerond).
+    all_projects: toon de runs van de werkmap en van alle projecten samen.
+    """
+    from pathlib import Path
+    from regian.core.workflow import list_run_summaries, STATUS_WAITING, STATUS_RUNNING
+    runs = list_run_summaries(_project_path(), all_projects=all_projects)
     if not runs:
         return "Geen workflow-runs gevonden."
     lines = ["**Workflow-runs:**\n"]
     for r in runs:
         badge = {"running": "🔄", "waiting": "⏸️", "done": "✅", "cancelled": "❌", "error": "💥"}.get(r.status, "❓")
         phase_info = f"fase {r.current_phase_index + 1}" if r.status in (STATUS_WAITING, STATUS_RUNNING) else r.status
-        lines.append(f"- `{r.run_id}` {badge} **{r.workflow_name}** — {phase_info} — gestart {r.started_at[:16]}")
+        project = f" [{Path(r.project_path).name or 'werkmap'}]" if all_projects else ""
+        lines.append(f"- `{r.run_id}` {badge} **{r.workflow_name}**{project} — {phase_info} — gestart {r.started_at[:16]}")
     return "\n".join(lines)
 
 
@@ -83,8 +94,8 @@ def start_workflow(name: str, input: str) -> str:
         auto_project_msg = f"📁 Nieuw project aangemaakt en geactiveerd: `{auto_name}`\n\n"
 
     try:
-        run = _start(name, input, pp)
-    except FileNotFoundError as e:
+        run = _start(name, input, pp, background=_background())
+    except (FileNotFoundError, ValueError) as e:
         return f"❌ {e}"
 
     return auto_project_msg + _format_run_status(run)
@@ -108,12 +119,43 @@ def approve_workflow(run_id: str, feedback: str = "") -> str:
     """
     from regian.core.workflow import advance_run
     try:
-        run = advance_run(run_id, feedback, _project_path())
+        run = advance_run(run_id, feedback, _project_path(), background=_background())
     except (FileNotFoundError, ValueError) as e:
         return f"❌ {e}"
     return _format_run_status(run)
 
 
+def rerun_workflow(run_id: str, phase_id: str = "", incremental: bool = True) -> str:
+    """
+    Voer een workflow-run opnieuw uit vanaf een fase, met de huidige template en artifacts.
+    run_id: ID van de run.
+    phase_id: fase waarvanaf opnieuw uitgevoerd wordt (leeg = eerste fase).
+    incremental: hergebruik de uitvoer van fasen waarvan de invoer niet veranderde (standaard ja).
+    """
+    from regian.core.workflow import rerun_from
+    try:
+        run = rerun_from(run_id, phase_id, _project_path(), incremental=incremental, background=_background())
+    except (FileNotFoundError, ValueError) as e:
+        return f"❌ {e}"
+    reused = sum(1 for e in run.phase_log if e.get("reused"))
+    return _format_run_status(run) + (f"\n♻️ {reused} fase(n) hergebruikt." if reused else "")
+
+
+def set_workflow_artifact(run_id: str, key: str, value: str) -> str:
+    """
+    Overschrijf een artifact van een workflow-run, bv. om daarna met /rerun_workflow enkel de afhankelijke fasen opnieuw te laten lopen.
+    run_id: ID van de run.
+    key: naam van het artifact (output_key van een fase).
+    value: nieuwe inhoud.
+    """
+    from regian.core.workflow import set_artifact
+    try:
+        set_artifact(run_id, key, value, _project_path())
+    except (FileNotFoundError, ValueError) as e:
+        return f"❌ {e}"
+    return f"✅ Artifact `{key}` van run `{run_id}` bijgewerkt."
+
+
 def cancel_workflow(run_id: str) -> str:
     """Annuleert een actieve of wachtende workflow-run."""
     from regian.core.workflow import cancel_run
@@ -124,6 +166,18 @@ def cancel_workflow(run_id: str) -> str:
         return f"❌ {e}"
 
 
+def cleanup_workflow_blobs() -> str:
+    """Verwijdert opgeslagen fase-uitvoer (blobs) waar geen workflow-run van het actieve project nog naar verwijst."""
+    from regian.core.workflow import collect_blob_garbage
+    try:
+        removed, freed = collect_blob_garbage(_project_path())
+    except (OSError, RuntimeError) as e:
+        return f"❌ {e}"
+    if not removed:
+        return "✅ Geen ongebruikte blobs gevonden."
+    return f"✅ {removed} ongebruikte blob(s) verwijderd ({freed / 1024:.1f} KB vrijgemaakt)."
+
+
 # ── Template-beheer ───────────────────────────────────────────────────────────
 
 def create_workflow_template(name: str, description: str) -> str:
@@ -152,16 +206,20 @@ Gebruik uitsluitend deze fase-types:
 - task_loop: itereert over een takenlijst uit artifacts[source_key], require_approval (bool)
 - human_checkpoint: pauzeer voor menselijke beoordeling, prompt-veld met context
 - tool_chain: vaste lijst steps met tool en args
+- map_reduce: verwerkt een groot artifact (source_key) in stukken: map_prompt per stuk ({{{{chunk}}}}), reduce_prompt combineert ({{{{results}}}}), output_key, require_approval (bool)
+- parallel: groep onafhankelijke llm_prompt/tool_chain-fasen in 'phases' die tegelijk lopen; elke tak met eigen output_key en optioneel inputs (lijst artifact-sleutels), require_approval (bool) pauzeert na de hele groep
 
 Voorbeeld template:
 {example}
 
 Geef ENKEL de JSON terug, geen uitleg, geen markdown-blokken."""
 
-    response = llm.invoke([
-        SystemMessage(content="Je bent een expert in het ontwerpen van Regian OS workflows. Genereer valide JSON."),
-        HumanMessage(content=prompt),
-    ])
+    from regian.core.usage import invoke_llm, usage_scope
+    with usage_scope(source="skill"):
+        response = invoke_llm(llm, [
+            SystemMessage(content="Je bent een expert in het ontwerpen van Regian OS workflows. Genereer valide JSON."),
+            HumanMessage(content=prompt),
+        ])
     content = response.content
     if isinstance(content, list):
         content = " ".join(str(c) for c in content if c)
@@ -191,7 +249,7 @@ def import_bpmn(xml_path: str) -> str:
     xml_path: pad naar het .bpmn XML-bestand (relatief aan projectpad of absoluut).
     """
     from regian.skills.files import _resolve
-    from regian.core.workflow import _workflow_dir
+    from regian.core.workflow import _workflow_dir, validate_workflow, PARALLEL_BRANCH_TYPES
 
     src = _resolve(xml_path)
     if not src.exists():
@@ -226,6 +284,7 @@ def import_bpmn(xml_path: str) -> str:
         "scriptTask":   "tool_chain",
         "callActivity": "task_loop",
         "task":         "llm_prompt",
+        "subProcess":   "parallel",
     }
 
     # Bouw een id→element map
@@ -266,13 +325,63 @@ def import_bpmn(xml_path: str) -> str:
                 ordered_ids.append(current_id)
             current_id = sequence_flows.get(current_id)
 
-    for eid in ordered_ids:
-        elem = elements.get(eid)
-        if elem is None:
-            continue
-        local_tag = tag_map.get(eid, "")
+    def _local(elem) -> str:
+        return elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+
+    def _inner_order(elem) -> list | None:
+        """
+        Activiteiten van een subproces in flow-volgorde, of None als er geen
+        flows tussen zitten (dan lopen ze tegelijk). Flows via gateways en
+        events binnen het subproces tellen mee. Gooit ValueError bij een cyclus.
+        """
+        children = [c for c in elem if c.get("id")]
+        activities = [c for c in children if _local(c) in _BPMN_TYPE_MAP]
+        activity_ids = {c.get("id") for c in activities}
+        targets: dict[str, list] = {}
+        for c in elem:
+            if _local(c) == "sequenceFlow":
+                targets.setdefault(c.get("sourceRef", ""), []).append(c.get("targetRef", ""))
+
+        def reachable(start: str) -> set:
+            # Volgende activiteiten, door niet-activiteiten (gateways, events) heen
+            found, stack, seen = set(), list(targets.get(start, [])), set()
+            while stack:
+                node = stack.pop()
+                if node in seen:
+                    continue
+                seen.add(node)
+                if node in activity_ids:
+                    found.add(node)
+                else:
+                    stack.extend(targets.get(node, []))
+            return found
+
+        successors = {c.get("id"): reachable(c.get("id")) for c in activities}
+        if not any(successors.values()):
+            return None
+        incoming = {aid: 0 for aid in activity_ids}
+        for nexts in successors.values():
+            for aid in nexts:
+                incoming[aid] += 1
+        ordered = []
+        ready = [c for c in activities if incoming[c.get("id")] == 0]
+        while ready:
+            current = ready.pop(0)
+            ordered.append(current)
+            for aid in successors[current.get("id")]:
+                incoming[aid] -= 1
+                if incoming[aid] == 0:
+                    ready.append(next(c for c in activities if c.get("id") == aid))
+        if len(ordered) < len(activities):
+            raise ValueError(f"Subproces '{elem.get('name', elem.get('id', ''))}' bevat een cyclus in zijn flows.")
+        return ordered
+
+    def _to_phase(elem, local_tag: str) -> dict:
         phase_type = _BPMN_TYPE_MAP.get(local_tag, "llm_prompt")
-        elem_name = elem.get("name", eid)
+        elem_name = elem.get("name", elem.get("id", ""))
+        # Een multi-instance servicetaak (parallel per stuk) is een map_reduce-fase
+        if phase_type == "llm_prompt" and any(_local(c) == "multiInstanceLoopCharacteristics" for c in elem):
+            phase_type = "map_reduce"
 
         # Documentatie of extensie-elementen uitlezen als prompt
         doc = ""
@@ -286,13 +395,26 @@ def import_bpmn(xml_path: str) -> str:
             "id":   re.sub(r"[^a-z0-9_]", "_", elem_name.lower()),
             "name": elem_name,
             "type": phase_type,
-            "icon": {"human_checkpoint": "🔍", "llm_prompt": "🧠", "tool_chain": "⚙️", "task_loop": "🔄"}.get(phase_type, "📋"),
+            "icon": {"human_checkpoint": "🔍", "llm_prompt": "🧠", "tool_chain": "⚙️", "task_loop": "🔄",
+                     "parallel": "🔀", "map_reduce": "🧩"}.get(phase_type, "📋"),
         }
 
-        if phase_type == "llm_prompt":
+        if phase_type == "parallel":
+            # Activiteiten in een subproces zonder onderlinge flows starten tegelijk;
+            # filter op het fasetype na omzetting (een multi-instance taak wordt map_reduce)
+            branches = [_to_phase(child, _local(child)) for child in elem if _local(child) in _BPMN_TYPE_MAP]
+            phase["phases"] = [b for b in branches if b["type"] in PARALLEL_BRANCH_TYPES]
+            phase["require_approval"] = False
+        elif phase_type == "llm_prompt":
             phase["prompt_template"] = doc or f"Voer uit: {elem_name}\n\nContext: {{{{input}}}}"
             phase["output_key"] = re.sub(r"[^a-z0-9_]", "_", elem_name.lower()) + "_output"
             phase["require_approval"] = False
+        elif phase_type == "map_reduce":
+            phase["source_key"] = "input"
+            phase["map_prompt"] = doc or f"{elem_name} — deel {{{{chunk_index}}}}/{{{{chunk_count}}}}:\n\n{{{{chunk}}}}"
+            phase["reduce_prompt"] = f"Combineer deze deelresultaten ({elem_name}):\n\n{{{{results}}}}"
+            phase["output_key"] = re.sub(r"[^a-z0-9_]", "_", elem_name.lower()) + "_output"
+            phase["require_approval"] = False
         elif phase_type == "human_checkpoint":
             phase["prompt"] = doc or f"Controleer: {elem_name}"
         elif phase_type == "task_loop":
@@ -301,8 +423,22 @@ def import_bpmn(xml_path: str) -> str:
         elif phase_type == "tool_chain":
             phase["steps"] = []
             phase["require_approval"] = False
+        return phase
 
-        phases.append(phase)
+    for eid in ordered_ids:
+        elem = elements.get(eid)
+        if elem is None:
+            continue
+        if tag_map.get(eid) == "subProcess":
+            # Een subproces met flows tussen zijn activiteiten is een reeks, geen parallelle groep
+            try:
+                inner = _inner_order(elem)
+            except ValueError as e:
+                return f"❌ {e}"
+            if inner is not None:
+                phases.extend(_to_phase(child, _local(child)) for child in inner)
+                continue
+        phases.append(_to_phase(elem, tag_map.get(eid, "")))
 
     workflow = {
         "id":          re.sub(r"[^a-z0-9_-]", "_", process_name.lower()),
@@ -311,6 +447,11 @@ def import_bpmn(xml_path: str) -> str:
         "version":     "1.0",
         "phases":      phases,
     }
+    # Niets wegschrijven wat load_workflow daarna zou weigeren
+    try:
+        validate_workflow(workflow, source=src.name)
+    except ValueError as e:
+        return f"❌ {e}"
 
     wdir = _workflow_dir(_project_path())
     wdir.mkdir(parents=True, exist_ok=True)
@@ -332,7 +473,7 @@ def export_bpmn(workflow_name: str) -> str:
 
     try:
         wf = load_workflow(workflow_name, _project_path())
-    except FileNotFoundError as e:
+    except (FileNotFoundError, ValueError) as e:
         return f"❌ {e}"
 
     phases = wf.get("phases", [])
@@ -345,6 +486,8 @@ def export_bpmn(workflow_name: str) -> str:
         "llm_prompt":       "bpmn:serviceTask",
         "tool_chain":       "bpmn:scriptTask",
         "task_loop":        "bpmn:callActivity",
+        "parallel":         "bpmn:subProcess",
+        "map_reduce":       "bpmn:serviceTask",
     }
     _DI_Y_START = 100
     _DI_X_START = 180
@@ -369,12 +512,24 @@ def export_bpmn(workflow_name: str) -> str:
         pname = phase.get("name", pid)
         ptype = phase.get("type", "llm_prompt")
         btype = _TYPE_TO_BPMN.get(ptype, "bpmn:task")
-        doc   = phase.get("prompt_template") or phase.get("prompt") or ""
+        doc   = phase.get("prompt_template") or phase.get("prompt") or phase.get("map_prompt") or ""
         x     = _DI_X_START + (i + 1) * _DI_STEP
 
         node = f'<{btype} id="{pid}" name="{pname}">'
         if doc:
             node += f'<bpmn:documentation>{_xml_escape(doc[:200])}</bpmn:documentation>'
+        # Takken van een parallelle groep: activiteiten zonder onderlinge flows
+        for branch in phase.get("phases", []) if ptype == "parallel" else []:
+            bbtype = _TYPE_TO_BPMN.get(branch.get("type", "llm_prompt"), "bpmn:task")
+            bid = branch.get("id", "tak")
+            node += f'<{bbtype} id="{pid}_{bid}" name="{branch.get("name", bid)}">'
+            bdoc = branch.get("prompt_template") or ""
+            if bdoc:
+                node += f'<bpmn:documentation>{_xml_escape(bdoc[:200])}</bpmn:documentation>'
+            node += f'</{bbtype}>'
+        if ptype == "map_reduce":
+            # Eén instantie per stuk, gelijktijdig
+            node += '<bpmn:multiInstanceLoopCharacteristics isSequential="false"/>'
         node += f'</{btype}>'
         nodes.append(node)
 
@@ -443,7 +598,7 @@ def _xml_escape(text: str) -> str:
 # ── Format helper ─────────────────────────────────────────────────────────────
 
 def _format_run_status(run, verbose: bool = False) -> str:
-    from regian.core.workflow import STATUS_WAITING, STATUS_DONE, STATUS_ERROR, _get_phases
+    from regian.core.workflow import STATUS_WAITING, STATUS_DONE, STATUS_ERROR, STATUS_RUNNING, _get_phases
 
     badge = {"running": "🔄", "waiting": "⏸️", "done": "✅", "cancelled": "❌", "error": "💥"}.get(run.status, "❓")
     phases = _get_phases(run)
@@ -464,6 +619,9 @@ def _format_run_status(run, verbose: bool = False) -> str:
             lines.append(f"\n{output[:2000]}")
         lines.append(f"\nGebruik: `/approve_workflow {run.run_id}` om door te gaan (optioneel met feedbacktekst).")
 
+    elif run.status == STATUS_RUNNING and not verbose:
+        lines.append(f"\n⚙️ De fasen lopen op de achtergrond. Volg de voortgang met `/workflow_status {run.run_id}`.")
+
     elif run.status == STATUS_DONE:
         lines.append("\n✅ Workflow afgerond.")
         if verbose and run.artifacts:
@@ -479,6 +637,10 @@ def _format_run_status(run, verbose: bool = False) -> str:
         lines.append("\n**Fase-log:**")
         for entry in run.phase_log:
             icon = "✅" if entry["status"] == "done" else "⏸️" if entry["status"] == "waiting" else "💥"
-            lines.append(f"- {icon} `{entry['phase_id']}` — {entry['ts'][:16]}")
+            reused = " ♻️ hergebruikt" if entry.get("reused") else ""
+            lines.append(f"- {icon} `{entry['phase_id']}` — {entry['ts'][:16]}{reused}")
+            for branch in entry.get("branches", []):
+                icon = {"done": "✅", "skipped": "⏭️"}.get(branch["status"], "💥")
+                lines.append(f"  - {icon} `{branch['phase_id']}` — {branch.get('duration_s', 0):.1f}s")
 
     return "\n".join(lines)
@@ -19,6 +19,46 @@ def isolate_env(monkeypatch, tmp_path):
     monkeypatch.setenv("LLM_MODEL", "gemini-2.5-flash")
     monkeypatch.setenv("CONFIRM_REQUIRED", "repo_delete,delete_file,delete_directory")
     monkeypatch.delenv("DANGEROUS_PATTERNS", raising=False)
+    monkeypatch.delenv("TOKEN_BUDGET_DAILY", raising=False)
+    monkeypatch.delenv("TOKEN_PRICES", raising=False)
+    # Tokenboekhouding nooit naar het echte usage-bestand laten schrijven
+    import regian.core.usage as usage_mod
+    monkeypatch.setattr(usage_mod, "_get_usage_file", lambda: tmp_path / "usage.jsonl")
+    monkeypatch.delenv("PROFILE_TOOLS", raising=False)
+    monkeypatch.delenv("PROFILE_PHASES", raising=False)
+    monkeypatch.delenv("METRICS_PORT", raising=False)
+    monkeypatch.delenv("SCHEDULER_POOL_SIZES", raising=False)
+    monkeypatch.delenv("LLM_JOB_CONCURRENCY", raising=False)
+    monkeypatch.delenv("JOB_HISTORY_SIZE", raising=False)
+    monkeypatch.delenv("JOB_JITTER_SECONDS", raising=False)
+    monkeypatch.delenv("ADMISSION_LLM_SLOTS", raising=False)
+    monkeypatch.delenv("ADMISSION_EXEC_SLOTS", raising=False)
+    monkeypatch.delenv("WORKFLOW_MAX_PARALLEL", raising=False)
+    monkeypatch.delenv("WORKFLOW_CHUNK_TOKENS", raising=False)
+    # Workflow-fasen lopen in tests in de aanroeper, niet in achtergrondworkers
+    monkeypatch.setenv("WORKFLOW_WORKERS", "0")
+    monkeypatch.delenv("SCHEDULER_SOCKET", raising=False)
+    monkeypatch.delenv("SCHEDULER_LEASE_DB", raising=False)
+    monkeypatch.delenv("LEASE_TTL", raising=False)
+    monkeypatch.delenv("REGIAN_NODE_ID", raising=False)
+    monkeypatch.delenv("SHELL_LOG_MAX_BYTES", raising=False)
+    monkeypatch.delenv("SHELL_LOG_BACKUPS", raising=False)
+    monkeypatch.delenv("WATCH_POLL_SECONDS", raising=False)
+    monkeypatch.delenv("WATCH_DEBOUNCE_SECONDS", raising=False)
+    # Nooit een echte scheduler-daemon aanspreken
+    import regian.core.daemon as daemon_mod
+    monkeypatch.setattr(daemon_mod, "_get_socket_path", lambda: tmp_path / "sched.sock")
+    daemon_mod.mark_unavailable()
+    import regian.core.watch as watch_mod
+    monkeypatch.setattr(watch_mod, "_watcher", None)
+    import regian.core.chains as chains_mod
+    monkeypatch.setattr(chains_mod, "_chains", None)
+    import regian.core.admission as admission_mod
+    monkeypatch.setattr(admission_mod, "_gates", {})
+    import regian.core.shell as shell_mod
+    monkeypatch.setattr(shell_mod, "_get_log_dir", lambda: tmp_path / "shell_logs")
+    import regian.core.profiling as profiling_mod
+    monkeypatch.setattr(profiling_mod, "_get_profile_dir", lambda: tmp_path / "profiles")
     yield
 
 
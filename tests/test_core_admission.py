@@ -0,0 +1,129 @@
+# tests/test_core_admission.py
+"""Tests voor regian/core/admission.py — prioriteitsklassen voor LLM- en shell-capaciteit."""
+import threading
+import time
+
+import pytest
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestCurrentClass:
+    def test_default_is_interactive(self):
+        from regian.core.admission import current_class
+        assert current_class() == "interactive"
+
+    def test_follows_usage_source(self):
+        from regian.core.admission import current_class
+        from regian.core.usage import usage_scope
+        with usage_scope(source="cron"):
+            assert current_class() == "cron"
+            with usage_scope(source="skill"):
+                assert current_class() == "cron"
+        with usage_scope(source="workflow"):
+            assert current_class() == "workflow"
+
+    def test_explicit_priority_wins(self):
+        from regian.core.admission import current_class, priority_scope
+        from regian.core.usage import usage_scope
+        with usage_scope(source="cron"), priority_scope("maintenance"):
+            assert current_class() == "maintenance"
+
+    def test_unknown_class_rejected(self):
+        from regian.core.admission import priority_scope
+        with pytest.raises(ValueError):
+            with priority_scope("dringend"):
+                pass
+
+
+class TestGate:
+    def test_background_keeps_last_slot_free(self):
+        from regian.core.admission import Gate
+        gate = Gate("llm", 2)
+        gate.acquire("cron")
+        entered = threading.Event()
+
+        def second_cron():
+            gate.acquire("cron")
+            entered.set()
+        t = threading.Thread(target=second_cron, daemon=True)
+        t.start()
+        assert _wait_for(lambda: gate.snapshot()["waiting"]["cron"] == 1)
+        assert not entered.is_set()
+        # Een chatvraag krijgt de vrijgehouden plaats meteen
+        assert gate.acquire("interactive") < 1.0
+        gate.release("interactive")
+        gate.release("cron")
+        assert entered.wait(5)
+        gate.release("cron")
+        t.join(5)
+
+    def test_waiters_served_by_class(self):
+        from regian.core.admission import Gate
+        gate = Gate("exec", 1)
+        gate.acquire("interactive")
+        order = []
+
+        def worker(cls):
+            gate.acquire(cls)
+            order.append(cls)
+            gate.release(cls)
+        threads = []
+        for cls in ("maintenance", "cron", "workflow"):
+            t = threading.Thread(target=worker, args=(cls,), daemon=True)
+            t.start()
+            threads.append(t)
+            assert _wait_for(lambda c=cls: gate.snapshot()["waiting"][c] == 1)
+        late = threading.Thread(target=worker, args=("interactive",), daemon=True)
+        late.start()
+        assert _wait_for(lambda: gate.snapshot()["waiting"]["interactive"] == 1)
+        gate.release("interactive")
+        for t in threads + [late]:
+            t.join(5)
+        assert order == ["interactive", "workflow", "cron", "maintenance"]
+
+    def test_single_slot_gate_serves_background(self):
+        from regian.core.admission import Gate
+        gate = Gate("llm", 1)
+        assert gate.acquire("cron") < 1.0
+        gate.release("cron")
+        assert gate.snapshot()["active"]["cron"] == 0
+
+
+class TestAdmit:
+    def test_gate_follows_setting(self, monkeypatch):
+        from regian.core.admission import get_gate
+        monkeypatch.setenv("ADMISSION_LLM_SLOTS", "3")
+        assert get_gate("llm").size == 3
+        monkeypatch.setenv("ADMISSION_LLM_SLOTS", "6")
+        assert get_gate("llm").size == 6
+
+    def test_admit_counts_active_and_records_wait(self):
+        from regian.core import metrics
+        from regian.core.admission import admit, status
+        metrics._reset()
+        with admit("exec", "cron"):
+            assert status()["exec"]["active"]["cron"] == 1
+        assert status()["exec"]["active"]["cron"] == 0
+        assert "regian_admission_wait_seconds_count" in metrics.render()
+
+    def test_invoke_llm_goes_through_gate(self, monkeypatch):
+        from unittest.mock import MagicMock
+        from regian.core import usage
+        from regian.core.admission import status
+        seen = []
+        llm = MagicMock()
+        llm.invoke.side_effect = lambda messages: seen.append(status()["llm"]["active"]["workflow"]) or MagicMock(
+            usage_metadata={"input_tokens": 1, "output_tokens": 1}, content="ok")
+        monkeypatch.setattr(usage, "record_usage", lambda *a, **kw: None)
+        with usage.usage_scope(source="workflow"):
+            usage.invoke_llm(llm, "hallo")
+        assert seen == [1]
+        assert status()["llm"]["active"]["workflow"] == 0
@@ -222,3 +222,31 @@ class TestOrchestratorAgent:
         catalog = orch._tool_catalog()
         assert isinstance(catalog, str)
         assert len(catalog) > 0
+
+
+class TestPlanFingerprint:
+    def test_stable_for_same_prompt(self):
+        from regian.core.agent import plan_fingerprint
+        assert plan_fingerprint("doe iets") == plan_fingerprint("doe iets")
+        assert plan_fingerprint("doe iets") != plan_fingerprint("doe iets anders")
+
+    def test_changes_with_registry(self, monkeypatch):
+        from regian.core.agent import plan_fingerprint, registry
+        before = plan_fingerprint("doe iets")
+        monkeypatch.setattr(registry, "_tools", registry._tools[1:])
+        assert plan_fingerprint("doe iets") != before
+
+    def test_changes_with_active_project(self, monkeypatch):
+        import regian.core.agent as agent
+        before = agent.plan_fingerprint("doe iets")
+        monkeypatch.setattr(agent, "_get_project_context",
+                            lambda: {"name": "p", "type": "docs", "path": "/tmp/p"})
+        assert agent.plan_fingerprint("doe iets") != before
+
+    def test_module_execute_plan_runs_without_llm(self, tmp_root, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        from regian.core.agent import execute_plan
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        result = execute_plan([{"tool": "write_file", "args": {"path": "f.txt", "content": "x"}}], source="cron")
+        assert "write_file" in result
+        assert (tmp_root / "f.txt").exists()
@@ -0,0 +1,143 @@
+# tests/test_core_blobstore.py
+"""Tests voor regian/core/blobstore.py — content-adresseerbare opslag van fase-uitvoer."""
+import json
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path):
+    from regian.core.blobstore import BlobStore
+    return BlobStore(tmp_path / "blobs")
+
+
+@pytest.fixture
+def wf(tmp_path, monkeypatch):
+    from regian.core import workflow as wf_mod
+    sdir = tmp_path / "state"
+    monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": sdir)
+    monkeypatch.setattr(wf_mod, "_blob_dir", lambda pp="": tmp_path / "blobs")
+    return wf_mod, sdir, tmp_path / "blobs"
+
+
+def _age(path, seconds=7200):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+class TestBlobStore:
+    def test_put_is_content_addressed(self, store):
+        a = store.put("hallo " * 1000)
+        b = store.put("hallo " * 1000)
+        assert a == b and a["size"] == 6000
+        assert len(list(store.root.glob("*/*.gz"))) == 1
+        assert store.path(a["$blob"]).stat().st_size < 6000
+        assert store.get(a) == "hallo " * 1000
+
+    def test_short_text_stays_inline(self, store):
+        assert store.externalize("kort") == "kort"
+        assert store.externalize(42) == 42
+
+    def test_missing_blob(self, store):
+        assert store.get({"$blob": "ab" * 32}).startswith("❌")
+
+    def test_blobdict_resolves_lazily(self, store):
+        from regian.core.blobstore import BlobDict, externalize_map
+        values = BlobDict({"doc": "x" * 5000, "kort": "y"}, store=store)
+        raw = externalize_map(values)
+        assert raw["doc"]["$blob"] and raw["kort"] == "y"
+        assert values.raw()["doc"] == raw["doc"]
+        assert values["doc"] == "x" * 5000
+        assert values.get("doc") == "x" * 5000
+        assert dict(values)["doc"] == "x" * 5000
+        assert dict(values.items())["doc"] == "x" * 5000
+
+
+class TestGarbage:
+    def test_unreferenced_old_blobs_are_removed(self, store):
+        from regian.core.blobstore import collect_garbage
+        keep = store.put("a" * 2000)
+        drop = store.put("b" * 2000)
+        fresh = store.put("c" * 2000)
+        _age(store.path(keep["$blob"]))
+        _age(store.path(drop["$blob"]))
+        removed, freed = collect_garbage(store, [{"artifacts": {"k": keep}}])
+        assert removed == 1 and freed > 0
+        assert not store.path(drop["$blob"]).exists()
+        assert store.path(keep["$blob"]).exists() and store.path(fresh["$blob"]).exists()
+
+
+class TestWorkflowIntegration:
+    def _run(self, wf_mod):
+        return wf_mod.WorkflowRun(
+            run_id="r1", workflow_id="wf", workflow_name="Wf",
+            started_at="2026-01-01T10:00:00", updated_at="2026-01-01T10:00:00",
+            status="running", current_phase_index=0,
+            artifacts={"input": "idee"}, phase_log=[], input="idee", project_path="",
+        )
+
+    def test_output_stored_once_as_reference(self, wf):
+        wf_mod, sdir, blobs = wf
+        run = self._run(wf_mod)
+        doc = "## Specificatie\n" + "regel\n" * 2000
+        run.artifacts["spec"] = doc
+        run.phase_log.append({"phase_id": "spec", "status": "done", "output": doc})
+        run.status = "done"
+        wf_mod.save_run(run)
+        data = json.loads((sdir / "r1.json").read_text(encoding="utf-8"))
+        assert data["artifacts"]["spec"] == data["phase_log"][0]["output"]
+        assert "$blob" in data["artifacts"]["spec"]
+        assert len(list(blobs.glob("*/*.gz"))) == 1
+        loaded = wf_mod.load_run("r1")
+        assert loaded.artifacts["spec"] == doc
+        assert loaded.phase_log[0].get("output") == doc
+        assert wf_mod._render_template("{{spec}}", loaded.artifacts) == doc
+
+    def test_branch_outputs_are_externalized(self, wf):
+        wf_mod, sdir, _ = wf
+        run = self._run(wf_mod)
+        run.phase_log.append({"phase_id": "g", "status": "done", "output": "kort",
+                              "branches": [{"phase_id": "a", "status": "done", "output": "z" * 3000}]})
+        wf_mod.save_run(run)
+        data = json.loads((sdir / "r1.json").read_text(encoding="utf-8"))
+        assert "$blob" in data["phase_log"][0]["branches"][0]["output"]
+        assert wf_mod.load_run("r1").phase_log[0]["branches"][0]["output"] == "z" * 3000
+
+    def test_revisions_collect_garbage(self, wf):
+        wf_mod, sdir, blobs = wf
+        run = self._run(wf_mod)
+        run.artifacts["spec"] = "v1 " * 1000
+        wf_mod.save_run(run)
+        for path in blobs.glob("*/*.gz"):
+            _age(path)
+        run.artifacts["spec"] = "v2 " * 1000
+        run.status = "done"
+        wf_mod.save_run(run)
+        # Een afgeronde run ruimt de blobs van de vorige versie meteen op
+        assert len(list(blobs.glob("*/*.gz"))) == 1
+        assert wf_mod.collect_blob_garbage() == (0, 0)
+        assert wf_mod.load_run("r1").artifacts["spec"] == "v2 " * 1000
+
+    def test_unreadable_state_aborts_gc(self, wf):
+        wf_mod, sdir, blobs = wf
+        run = self._run(wf_mod)
+        run.artifacts["spec"] = "v1 " * 1000
+        wf_mod.save_run(run)
+        (sdir / "kapot.json").write_text("{", encoding="utf-8")
+        with pytest.raises(RuntimeError):
+            wf_mod.collect_blob_garbage()
+
+    def test_cleanup_skill(self, wf, monkeypatch):
+        wf_mod, sdir, blobs = wf
+        from regian.skills.workflow import cleanup_workflow_blobs
+        assert "Geen" in cleanup_workflow_blobs()
+        run = self._run(wf_mod)
+        run.artifacts["spec"] = "oud " * 1000
+        wf_mod.save_run(run)
+        for path in blobs.glob("*/*.gz"):
+            _age(path)
+        run.artifacts["spec"] = "kort"
+        wf_mod.save_run(run)
+        assert "1 ongebruikte blob" in cleanup_workflow_blobs()
@@ -0,0 +1,177 @@
+# tests/test_core_chains.py
+"""Tests voor regian/core/chains.py — afhankelijkheden tussen geplande taken."""
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def tracker():
+    from regian.core.chains import Chains
+    fired = []
+    return Chains(fired.append), fired
+
+
+class TestParse:
+    def test_after_schedule(self):
+        from regian.core.chains import parse_after
+        trigger = parse_after("na Backup, push en samenvatting")
+        assert trigger.parents == ["Backup", "push", "samenvatting"]
+        assert trigger.field == "after"
+
+    def test_failure_schedule(self):
+        from regian.core.chains import parse_after
+        for text in ("na mislukking van backup", "after failure of backup"):
+            trigger = parse_after(text)
+            assert trigger.parents == ["backup"] and trigger.field == "after_failure"
+
+    def test_not_a_dependency(self):
+        from regian.core.chains import parse_after
+        assert parse_after("elke 5 minuten") is None
+
+    def test_parse_schedule_returns_after_trigger(self):
+        from regian.core.chains import AfterTrigger
+        from regian.core.scheduler import parse_schedule
+        assert isinstance(parse_schedule("after backup"), AfterTrigger)
+
+
+class TestFindCycle:
+    def test_detects_indirect_cycle(self):
+        from regian.core.chains import find_cycle
+        jobs = {"a": {}, "b": {"after": ["a"]}, "c": {"after_failure": ["b"]}}
+        assert find_cycle(jobs, "a", ["c"]) == ["a", "c", "b", "a"]
+
+    def test_self_dependency(self):
+        from regian.core.chains import find_cycle
+        assert find_cycle({"a": {}}, "a", ["a"]) == ["a", "a"]
+
+    def test_dag_without_cycle(self):
+        from regian.core.chains import find_cycle
+        jobs = {"a": {}, "b": {"after": ["a"]}, "c": {"after": ["a"]}}
+        assert find_cycle(jobs, "d", ["b", "c"]) is None
+
+
+class TestChains:
+    def test_fan_in_waits_for_all_parents(self, tracker):
+        chains, fired = tracker
+        jobs = {"a": {}, "b": {}, "d": {"after": ["a", "b"]}}
+        assert chains.finished("a", True, jobs) == []
+        assert chains.pending("d") == {"a"}
+        assert chains.finished("b", True, jobs) == ["d"]
+        assert fired == ["d"]
+        assert chains.pending("d") == set()
+
+    def test_failed_parent_blocks_success_edge(self, tracker):
+        chains, fired = tracker
+        jobs = {"a": {}, "b": {}, "d": {"after": ["a", "b"]}}
+        chains.finished("a", True, jobs)
+        chains.finished("a", False, jobs)
+        chains.finished("b", True, jobs)
+        assert fired == []
+
+    def test_failure_edge(self, tracker):
+        chains, fired = tracker
+        jobs = {"a": {}, "alarm": {"after_failure": ["a"]}, "next": {"after": ["a"]}}
+        assert chains.finished("a", False, jobs) == ["alarm"]
+        assert chains.finished("a", True, jobs) == ["next"]
+
+    def test_disabled_dependent_is_skipped(self, tracker):
+        chains, fired = tracker
+        jobs = {"a": {}, "b": {"after": ["a"], "enabled": False}}
+        assert chains.finished("a", True, jobs) == []
+
+    def test_fire_error_is_contained(self):
+        from regian.core.chains import Chains
+
+        def boom(job_id):
+            raise RuntimeError("weg")
+        chains = Chains(boom)
+        assert chains.finished("a", True, {"a": {}, "b": {"after": ["a"]}}) == ["b"]
+
+
+class TestSchedulerIntegration:
+    @pytest.fixture
+    def sched(self, tmp_path, monkeypatch):
+        import regian.core.scheduler as sched
+        import regian.core.action_log as al
+        mock_scheduler = MagicMock()
+        mock_scheduler.timezone = None
+        monkeypatch.setattr(sched, "_get_jobs_file", lambda: tmp_path / "jobs.json")
+        monkeypatch.setattr(sched, "get_scheduler", lambda: mock_scheduler)
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        return sched, mock_scheduler
+
+    def _fired(self, mock_scheduler):
+        return [c.args[0] for c in mock_scheduler.modify_job.call_args_list]
+
+    def test_add_stores_edges(self, sched):
+        sched, _ = sched
+        sched.add_scheduled_job("backup", "echo b", "shell", "dagelijks om 02:00")
+        sched.add_scheduled_job("push", "echo p", "shell", "na backup")
+        sched.add_scheduled_job("alarm", "echo a", "shell", "na mislukking van backup")
+        jobs = sched.get_all_jobs()
+        assert jobs["push"]["after"] == ["backup"]
+        assert jobs["alarm"]["after_failure"] == ["backup"]
+
+    def test_unknown_parent_rejected(self, sched):
+        sched, _ = sched
+        assert "❌" in sched.add_scheduled_job("push", "echo", "shell", "na bestaat_niet")
+        assert "push" not in sched.get_all_jobs()
+
+    def test_parent_run_starts_dependents(self, sched):
+        sched, mock_scheduler = sched
+        sched.add_scheduled_job("backup", "echo b", "shell", "dagelijks om 02:00")
+        sched.add_scheduled_job("push", "echo p", "shell", "na backup")
+        sched.add_scheduled_job("alarm", "echo a", "shell", "na mislukking van backup")
+        sched._execute_job("backup")
+        assert self._fired(mock_scheduler) == ["push"]
+        run_id = sched.get_job_history("backup")[-1]["run_id"]
+        assert sched._firing_id("push") == f"after:backup:{run_id}"
+        assert sched._firing_id("push") == ""
+
+    def test_failed_parent_starts_failure_edge(self, sched, monkeypatch):
+        import regian.core.shell as shell
+
+        def broken(*args, **kwargs):
+            raise OSError("schijf vol")
+        sched, mock_scheduler = sched
+        monkeypatch.setattr(shell, "run_streaming", broken)
+        sched.add_scheduled_job("backup", "echo b", "shell", "dagelijks om 02:00")
+        sched.add_scheduled_job("push", "echo p", "shell", "na backup")
+        sched.add_scheduled_job("alarm", "echo a", "shell", "na mislukking van backup")
+        sched._execute_job("backup")
+        assert self._fired(mock_scheduler) == ["alarm"]
+
+    def test_next_run_and_min_gap(self, sched):
+        from regian.core.chains import AfterTrigger
+        sched, mock_scheduler = sched
+        mock_scheduler.get_job.return_value = MagicMock(trigger=AfterTrigger(["a", "b"]))
+        assert sched.get_next_run("x") == "na a, b"
+        assert sched._min_gap({"schedule": "na a"}) == 0.0
+
+
+class TestWithAPScheduler:
+    def test_pipeline_runs_in_order(self, tmp_path, monkeypatch):
+        import regian.core.scheduler as sched
+        import regian.core.action_log as al
+        monkeypatch.setattr(sched, "_get_jobs_file", lambda: tmp_path / "jobs.json")
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        monkeypatch.setattr(sched, "_scheduler", None)
+        marker = tmp_path / "volgorde.txt"
+        scheduler = sched.get_scheduler()
+        try:
+            sched.add_scheduled_job("a", f"echo a >> {marker}", "shell", "dagelijks om 03:00")
+            sched.add_scheduled_job("b", f"sleep 0.2; echo b >> {marker}", "shell", "na a")
+            sched.add_scheduled_job("c", f"echo c >> {marker}", "shell", "na a")
+            sched.add_scheduled_job("d", f"echo d >> {marker}", "shell", "na b, c")
+            sched.run_job_now_by_id("a")
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and not sched.get_all_jobs()["d"].get("last_run"):
+                time.sleep(0.05)
+            lines = marker.read_text(encoding="utf-8").split()
+            assert lines[0] == "a" and lines[-1] == "d"
+            assert sorted(lines[1:3]) == ["b", "c"]
+            assert scheduler.get_job("d") is not None
+        finally:
+            scheduler.shutdown(wait=True)
@@ -0,0 +1,148 @@
+# tests/test_core_daemon.py
+"""Tests voor regian/core/daemon.py — scheduler-daemon met Unix-socket IPC."""
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def sock_path(monkeypatch):
+    """Kort socketpad (AF_UNIX-paden zijn beperkt tot ~100 tekens)."""
+    import regian.core.daemon as daemon
+    folder = Path(tempfile.mkdtemp(prefix="rgd"))
+    path = folder / "s.sock"
+    monkeypatch.setattr(daemon, "_get_socket_path", lambda: path)
+    daemon.mark_unavailable()
+    yield path
+    daemon.mark_unavailable()
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+@pytest.fixture
+def server(sock_path):
+    import regian.core.daemon as daemon
+    srv = daemon.start_server(sock_path)
+    yield srv
+    daemon.stop_server(srv)
+
+
+@pytest.fixture
+def isolated_scheduler(tmp_path, monkeypatch):
+    import regian.core.scheduler as sched
+    monkeypatch.setattr(sched, "_get_jobs_file", lambda: tmp_path / "jobs.json")
+    mock_scheduler = MagicMock()
+    monkeypatch.setattr(sched, "get_scheduler", lambda: mock_scheduler)
+    return sched, mock_scheduler
+
+
+class TestAvailability:
+    def test_no_socket_means_unavailable(self, sock_path):
+        import regian.core.daemon as daemon
+        assert daemon.daemon_available(refresh=True) is False
+
+    def test_running_server_is_available(self, server):
+        import os
+        import regian.core.daemon as daemon
+        assert daemon.daemon_available(refresh=True) is True
+        assert daemon.call("ping") == os.getpid()
+
+    def test_second_server_refused(self, server, sock_path):
+        import regian.core.daemon as daemon
+        assert daemon.start_server(sock_path) is None
+
+    def test_stale_socket_file_replaced(self, sock_path):
+        import regian.core.daemon as daemon
+        sock_path.write_text("", encoding="utf-8")
+        srv = daemon.start_server(sock_path)
+        try:
+            assert daemon.daemon_available(refresh=True) is True
+        finally:
+            daemon.stop_server(srv)
+        assert not sock_path.exists()
+
+    def test_never_forwards_inside_daemon(self, server, monkeypatch):
+        import regian.core.daemon as daemon
+        monkeypatch.setattr(daemon, "_is_daemon", True)
+        assert daemon.daemon_available(refresh=True) is False
+
+
+class TestRpc:
+    def test_public_functions_go_through_daemon(self, server, isolated_scheduler, monkeypatch):
+        import regian.core.daemon as daemon
+        sched, mock_sched = isolated_scheduler
+        calls = []
+        real_call = daemon.call
+        monkeypatch.setattr(daemon, "call", lambda op, *a, **kw: calls.append(op) or real_call(op, *a, **kw))
+
+        assert sched.add_scheduled_job("jd", "echo", "shell", "elke 1 minuut") == "jd"
+        assert sched.toggle_scheduled_job("jd", False) is True
+        mock_sched.get_job.return_value = None
+        assert sched.get_next_run("jd") is None
+        assert sched.get_job_stats("jd")["runs"] == 0
+        assert sched.remove_scheduled_job("jd") is True
+        assert calls == ["add", "toggle", "next_run", "job_stats", "remove"]
+
+    def test_unknown_op_raises(self, server):
+        import regian.core.daemon as daemon
+        with pytest.raises(RuntimeError):
+            daemon.call("bestaat_niet")
+
+    def test_hanging_daemon_outcome_unknown(self, sock_path):
+        import socket
+        import regian.core.daemon as daemon
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(sock_path))
+        listener.listen(1)
+        try:
+            with pytest.raises(daemon.DaemonOutcomeUnknown):
+                daemon.call("ping", timeout=0.1)
+        finally:
+            listener.close()
+
+    def test_falls_back_in_process_when_daemon_disappears(self, isolated_scheduler, monkeypatch):
+        import regian.core.daemon as daemon
+        sched, _ = isolated_scheduler
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: True)
+
+        def unavailable(*a, **kw):
+            raise daemon.DaemonUnavailable("weg")
+        monkeypatch.setattr(daemon, "call", unavailable)
+        assert sched.add_scheduled_job("jf", "echo", "shell", "elke 1 minuut") == "jf"
+        assert "jf" in sched.get_all_jobs()
+
+    def test_no_fallback_when_outcome_unknown(self, isolated_scheduler, monkeypatch):
+        import regian.core.daemon as daemon
+        sched, _ = isolated_scheduler
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: True)
+
+        def no_answer(*a, **kw):
+            raise daemon.DaemonOutcomeUnknown("geen antwoord")
+        monkeypatch.setattr(daemon, "call", no_answer)
+        with pytest.raises(RuntimeError):
+            sched.add_scheduled_job("ju", "echo", "shell", "elke 1 minuut")
+        assert "ju" not in sched.get_all_jobs()
+
+
+class TestInProcessScheduler:
+    def test_ensure_scheduler_skipped_when_daemon_runs(self, isolated_scheduler, monkeypatch):
+        import regian.core.daemon as daemon
+        sched, mock_sched = isolated_scheduler
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: True)
+        assert sched.ensure_scheduler() is None
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: False)
+        assert sched.ensure_scheduler() is mock_sched
+
+    def test_fire_skips_when_daemon_runs(self, monkeypatch):
+        import regian.core.daemon as daemon
+        import regian.core.scheduler as sched
+        executed = []
+        monkeypatch.setattr(sched, "_execute_job", lambda job_id, scheduled=False: executed.append(job_id))
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: True)
+        sched._fire("j1")
+        assert executed == []
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: False)
+        sched._fire("j1")
+        assert executed == ["j1"]
@@ -0,0 +1,170 @@
+# tests/test_core_jobstore.py
+"""Tests voor regian/core/jobstore.py — in-memory job-tabel met atomaire opslag."""
+import json
+import os
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    import regian.core.jobstore as js
+    monkeypatch.setattr(js, "_STATE_FLUSH_DELAY", 60.0)  # flush enkel expliciet in tests
+    return js.JobStore(tmp_path / "jobs.json")
+
+
+def _job(**extra):
+    return {"id": "j1", "task": "echo", "type": "shell", "schedule": "elke 1 minuut", "enabled": True, **extra}
+
+
+class TestDefinitionsAndState:
+    def test_put_writes_definition_without_run_state(self, store):
+        store.put("j1", _job(last_run=None, last_status=None, last_output=None))
+        on_disk = json.loads(store.path.read_text(encoding="utf-8"))
+        assert "last_run" not in on_disk["j1"]
+        assert store.get("j1")["last_run"] is None
+
+    def test_update_state_does_not_rewrite_definitions(self, store):
+        store.put("j1", _job())
+        before = store.path.stat().st_mtime_ns
+        store.update_state("j1", last_status="✅", last_run="2026-01-01T00:00:00")
+        assert store.path.stat().st_mtime_ns == before
+        assert store.get("j1")["last_status"] == "✅"
+
+    def test_state_is_coalesced_until_flush(self, store):
+        store.put("j1", _job())
+        store.flush()
+        for i in range(5):
+            store.update_state("j1", last_output=str(i))
+        assert json.loads(store.state_path.read_text(encoding="utf-8")) == {}
+        store.flush()
+        assert json.loads(store.state_path.read_text(encoding="utf-8"))["j1"]["last_output"] == "4"
+
+    def test_timer_flushes_state(self, tmp_path, monkeypatch):
+        import regian.core.jobstore as js
+        monkeypatch.setattr(js, "_STATE_FLUSH_DELAY", 0.01)
+        s = js.JobStore(tmp_path / "jobs.json")
+        s.put("j1", _job())
+        s.update_state("j1", last_status="❌")
+        s._timer.join(2)
+        assert json.loads(s.state_path.read_text(encoding="utf-8"))["j1"]["last_status"] == "❌"
+
+    def test_state_survives_reload(self, store, tmp_path):
+        import regian.core.jobstore as js
+        store.put("j1", _job())
+        store.update_state("j1", last_status="✅")
+        store.flush()
+        assert js.JobStore(tmp_path / "jobs.json").get("j1")["last_status"] == "✅"
+
+    def test_update_removes_field_with_none(self, store):
+        store.put("j1", _job(token_budget=10))
+        assert store.update("j1", token_budget=None) is True
+        assert "token_budget" not in store.get("j1")
+
+    def test_update_unknown_job(self, store):
+        assert store.update("nope", enabled=False) is False
+        assert store.update_state("nope", last_status="✅") is False
+
+    def test_remove(self, store):
+        store.put("j1", _job())
+        assert store.remove("j1") is True
+        assert store.get("j1") is None
+        assert store.remove("j1") is False
+
+    def test_returned_jobs_are_copies(self, store):
+        store.put("j1", _job())
+        store.all()["j1"]["task"] = "gewijzigd"
+        assert store.get("j1")["task"] == "echo"
+
+
+class TestDiskFormat:
+    def test_atomic_write_leaves_no_temp_files(self, store, tmp_path):
+        store.put("j1", _job())
+        store.flush()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["jobs.json", "jobs.state.json"]
+
+    def test_legacy_file_with_inline_state(self, tmp_path):
+        import regian.core.jobstore as js
+        path = tmp_path / "jobs.json"
+        path.write_text(json.dumps({"j1": _job(last_status="✅", last_run="x")}), encoding="utf-8")
+        s = js.JobStore(path)
+        assert s.get("j1")["last_status"] == "✅"
+        s.update("j1", enabled=False)
+        assert "last_status" not in json.loads(path.read_text(encoding="utf-8"))["j1"]
+
+    def test_corrupt_file_gives_empty_table(self, tmp_path):
+        import regian.core.jobstore as js
+        path = tmp_path / "jobs.json"
+        path.write_text("{ kapot", encoding="utf-8")
+        assert js.JobStore(path).all() == {}
+
+    def test_external_edit_is_picked_up(self, store):
+        store.put("j1", _job())
+        data = json.loads(store.path.read_text(encoding="utf-8"))
+        data["j2"] = _job(id="j2")
+        store.path.write_text(json.dumps(data), encoding="utf-8")
+        st = store.path.stat()
+        os.utime(store.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert set(store.all()) == {"j1", "j2"}
+
+
+
+class TestRunHistory:
+    def test_ring_buffer_keeps_last_n(self, store):
+        store.put("j1", _job())
+        dropped = []
+        for i in range(5):
+            dropped += store.record_run("j1", {"run_id": str(i), "duration": i}, size=3)
+        assert [r["run_id"] for r in store.history("j1")] == ["2", "3", "4"]
+        assert [r["run_id"] for r in dropped] == ["0", "1"]
+
+    def test_history_persisted_separately(self, store, tmp_path):
+        import regian.core.jobstore as js
+        store.put("j1", _job())
+        store.record_run("j1", {"run_id": "a", "duration": 1.0}, size=10)
+        store.flush()
+        assert "history" not in json.loads(store.path.read_text(encoding="utf-8"))["j1"]
+        reopened = js.JobStore(tmp_path / "jobs.json")
+        assert reopened.history("j1")[0]["run_id"] == "a"
+
+    def test_unknown_job_and_remove(self, store):
+        assert store.record_run("nope", {"run_id": "x"}, size=3) == []
+        store.put("j1", _job())
+        store.record_run("j1", {"run_id": "x"}, size=3)
+        store.remove("j1")
+        assert store.history("j1") == []
+
+class TestEvents:
+    def test_events_for_changes(self, store):
+        events = []
+        store.subscribe(lambda event, job_id: events.append((event, job_id)))
+        store.put("j1", _job())
+        store.update("j1", enabled=False)
+        store.update_state("j1", last_status="✅")
+        store.remove("j1")
+        assert events == [("added", "j1"), ("updated", "j1"), ("state", "j1"), ("removed", "j1")]
+
+    def test_unsubscribe(self, store):
+        events = []
+        unsubscribe = store.subscribe(lambda e, j: events.append(e))
+        unsubscribe()
+        store.put("j1", _job())
+        assert events == []
+
+    def test_failing_listener_does_not_break_store(self, store):
+        def boom(event, job_id):
+            raise RuntimeError("x")
+        store.subscribe(boom)
+        store.put("j1", _job())
+        assert store.get("j1") is not None
+
+    def test_version_increments(self, store):
+        v0 = store.version
+        store.put("j1", _job())
+        assert store.version > v0
+
+
+class TestGetStore:
+    def test_shared_per_path(self, tmp_path):
+        from regian.core.jobstore import get_store
+        assert get_store(tmp_path / "a.json") is get_store(tmp_path / "a.json")
+        assert get_store(tmp_path / "a.json") is not get_store(tmp_path / "b.json")
@@ -0,0 +1,150 @@
+# tests/test_core_leases.py
+"""Tests voor regian/core/leases.py — leases voor uitvoering over meerdere nodes."""
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "leases.db"
+
+
+def _db(path, node):
+    from regian.core.leases import LeaseDB
+    return LeaseDB(path, node)
+
+
+class TestLeaseDB:
+    def test_only_one_node_claims(self, db_path):
+        a, b = _db(db_path, "a"), _db(db_path, "b")
+        assert a.claim("j", ttl=60) is True
+        assert b.claim("j", ttl=60) is False
+
+    def test_expired_lease_taken_over(self, db_path):
+        a, b = _db(db_path, "a"), _db(db_path, "b")
+        assert a.claim("j", ttl=0.01) is True
+        time.sleep(0.05)
+        assert b.claim("j", ttl=60) is True
+        assert b.all()[0]["node"] == "b"
+
+    def test_min_gap_blocks_same_firing(self, db_path):
+        a, b = _db(db_path, "a"), _db(db_path, "b")
+        assert a.claim("j", ttl=60, min_gap=30) is True
+        a.release("j")
+        assert b.claim("j", ttl=60, min_gap=30) is False
+        assert b.claim("j", ttl=60, min_gap=0) is True
+
+    def test_same_firing_runs_once(self, db_path):
+        a, b = _db(db_path, "a"), _db(db_path, "b")
+        assert a.claim("j", ttl=60, firing="watch:f1") is True
+        a.release("j")
+        assert b.claim("j", ttl=60, firing="watch:f1") is False
+        assert b.claim("j", ttl=60, firing="watch:f2") is True
+        assert b.all()[0]["firing"] == "watch:f2"
+
+    def test_old_schema_gets_firing_column(self, db_path):
+        import sqlite3
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE job_leases (job_id TEXT PRIMARY KEY, node TEXT NOT NULL, "
+                     "acquired REAL NOT NULL, expires REAL NOT NULL, last_start REAL NOT NULL)")
+        conn.execute("INSERT INTO job_leases VALUES ('j', 'a', 0, 0, 0)")
+        conn.commit()
+        conn.close()
+        b = _db(db_path, "b")
+        assert b.all()[0]["firing"] == ""
+        assert b.claim("j", ttl=60, firing="after:p:1") is True
+
+    def test_renew_and_release(self, db_path):
+        a, b = _db(db_path, "a"), _db(db_path, "b")
+        a.claim("j", ttl=60)
+        assert a.renew("j", ttl=60) is True
+        assert b.renew("j", ttl=60) is False
+        a.release("j")
+        assert a.all()[0]["active"] is False
+
+    def test_lease_context_releases(self, db_path):
+        from regian.core.leases import Lease
+        a = _db(db_path, "a")
+        a.claim("j", ttl=60)
+        with Lease(a, "j", ttl=60):
+            assert a.all()[0]["active"] is True
+        assert a.all()[0]["active"] is False
+
+    def test_concurrent_processes_claim_once(self, db_path):
+        """Meerdere processen op één machine: precies één claim per firing."""
+        _db(db_path, "init")
+        code = (
+            "import sys; from regian.core.leases import LeaseDB; "
+            "print(LeaseDB(sys.argv[1], sys.argv[2]).claim('j', 60, 30))"
+        )
+        root = Path(__file__).parent.parent
+        procs = [
+            subprocess.Popen([sys.executable, "-c", code, str(db_path), f"node{i}"],
+                             stdout=subprocess.PIPE, text=True, cwd=str(root))
+            for i in range(4)
+        ]
+        results = [p.communicate(timeout=60)[0].strip() for p in procs]
+        assert results.count("True") == 1
+        assert results.count("False") == 3
+
+
+class TestSchedulerIntegration:
+    @pytest.fixture
+    def sched(self, tmp_path, monkeypatch):
+        from unittest.mock import MagicMock
+        import regian.core.scheduler as sched
+        import regian.core.action_log as al
+        monkeypatch.setattr(sched, "_get_jobs_file", lambda: tmp_path / "jobs.json")
+        monkeypatch.setattr(sched, "get_scheduler", lambda: MagicMock())
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        monkeypatch.setenv("SCHEDULER_LEASE_DB", str(tmp_path / "leases.db"))
+        return sched
+
+    def test_fire_runs_once_across_nodes(self, sched, monkeypatch):
+        sched.add_scheduled_job("jl", "/get_help", "command", "elke 5 minuten")
+        monkeypatch.setenv("REGIAN_NODE_ID", "node-a")
+        sched._fire("jl")
+        monkeypatch.setenv("REGIAN_NODE_ID", "node-b")
+        sched._fire("jl")
+        runs = sched.get_job_history("jl")
+        assert len(runs) == 1
+        assert runs[0]["node"] == "node-a"
+
+    def test_without_lease_db_runs_directly(self, sched, monkeypatch):
+        monkeypatch.delenv("SCHEDULER_LEASE_DB")
+        sched.add_scheduled_job("jn", "/get_help", "command", "elke 5 minuten")
+        sched._fire("jn")
+        sched._fire("jn")
+        runs = sched.get_job_history("jn")
+        assert len(runs) == 2
+        assert "node" not in runs[0]
+
+    def test_watch_batch_runs_once_across_nodes(self, sched, monkeypatch):
+        import regian.core.watch as watch
+        watcher = watch.get_watcher()
+        batch = ["b1"]
+        taken = []
+        monkeypatch.setattr(watcher, "batch_id", lambda job_id: batch[0])
+        monkeypatch.setattr(watcher, "take", lambda job_id: taken.append(job_id) or [])
+        sched.add_scheduled_job("jlw", "/get_help", "command", "elke 5 minuten")
+        monkeypatch.setattr(sched, "_min_gap", lambda job: 0.0)
+        monkeypatch.setenv("REGIAN_NODE_ID", "node-a")
+        sched._fire("jlw")
+        monkeypatch.setenv("REGIAN_NODE_ID", "node-b")
+        sched._fire("jlw")
+        assert len(sched.get_job_history("jlw")) == 1
+        # node-b laat de batch vallen in plaats van hem later opnieuw af te vuren
+        assert taken == ["jlw", "jlw"]
+        batch[0] = "b2"
+        sched._fire("jlw")
+        runs = sched.get_job_history("jlw")
+        assert [r["node"] for r in runs] == ["node-a", "node-b"]
+
+    def test_min_gap_from_schedule(self, sched):
+        assert sched._min_gap({"schedule": "elke 10 minuten"}) == 300
+        assert sched._min_gap({"schedule": "dagelijks om 09:00"}) == 43200
+        assert sched._min_gap({"schedule": "ongeldig"}) == 0.0
@@ -0,0 +1,155 @@
+# tests/test_core_metrics.py
+"""Tests voor regian/core/metrics.py — tellers, histogrammen, exposition en HTTP-endpoint."""
+import json
+import urllib.request
+import pytest
+from unittest.mock import MagicMock
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    from regian.core import metrics
+    metrics._reset()
+    yield
+    metrics._reset()
+    metrics.stop_metrics_server()
+
+
+class TestRender:
+    def test_counter_with_labels(self):
+        from regian.core import metrics
+        metrics.inc("regian_tool_calls_total", tool="read_file", status="ok")
+        metrics.inc("regian_tool_calls_total", tool="read_file", status="ok")
+        text = metrics.render()
+        assert "# TYPE regian_tool_calls_total counter" in text
+        assert 'regian_tool_calls_total{status="ok",tool="read_file"} 2' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        from regian.core import metrics
+        metrics.observe("regian_job_duration_seconds", 0.2, type="shell")
+        metrics.observe("regian_job_duration_seconds", 3.0, type="shell")
+        text = metrics.render()
+        assert 'regian_job_duration_seconds_bucket{type="shell",le="0.25"} 1' in text
+        assert 'regian_job_duration_seconds_bucket{type="shell",le="5.0"} 2' in text
+        assert 'regian_job_duration_seconds_bucket{type="shell",le="+Inf"} 2' in text
+        assert 'regian_job_duration_seconds_count{type="shell"} 2' in text
+        assert 'regian_job_duration_seconds_sum{type="shell"} 3.2' in text
+
+    def test_label_escaping(self):
+        from regian.core import metrics
+        metrics.inc("x_total", name='a"b\\c')
+        assert 'x_total{name="a\\"b\\\\c"} 1' in metrics.render()
+
+    def test_gauge_callback(self):
+        from regian.core import metrics
+        metrics.register_gauge("test_gauge", lambda: [({"k": "v"}, 3)], help="test")
+        text = metrics.render()
+        assert "# TYPE test_gauge gauge" in text
+        assert 'test_gauge{k="v"} 3' in text
+
+    def test_failing_gauge_is_skipped(self):
+        from regian.core import metrics
+        def boom():
+            raise RuntimeError("x")
+        metrics.register_gauge("broken_gauge", boom)
+        assert "broken_gauge" not in metrics.render()
+
+
+class TestInstrumentation:
+    def test_registry_call_counted(self):
+        from regian.core import metrics
+        from regian.core.agent import registry
+        registry.call("get_help", {"topic": ""})
+        registry.call("bestaat_niet", {})
+        text = metrics.render()
+        assert 'regian_tool_calls_total{status="ok",tool="get_help"} 1' in text
+        assert 'regian_tool_duration_seconds_count{tool="get_help"} 1' in text
+
+    def test_llm_call_counted(self):
+        from regian.core import metrics
+        from regian.core.usage import invoke_llm
+        llm = MagicMock()
+        llm.model = "m1"
+        resp = MagicMock()
+        resp.content = "ok"
+        resp.usage_metadata = {"input_tokens": 3, "output_tokens": 4}
+        llm.invoke.return_value = resp
+        invoke_llm(llm, ["x"])
+        text = metrics.render()
+        assert 'regian_llm_calls_total{model="m1",source="chat",status="ok"} 1' in text
+        assert 'regian_llm_tokens_total{direction="output",model="m1"} 4' in text
+
+    def test_llm_error_counted(self):
+        from regian.core import metrics
+        from regian.core.usage import invoke_llm
+        llm = MagicMock()
+        llm.model = "m1"
+        llm.invoke.side_effect = RuntimeError("offline")
+        with pytest.raises(RuntimeError):
+            invoke_llm(llm, ["x"])
+        assert 'regian_llm_calls_total{model="m1",source="chat",status="error"} 1' in metrics.render()
+
+    def test_action_log_writes(self, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        from regian.core import metrics
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        al.log_action("t", {}, "ok", source="cli")
+        text = metrics.render()
+        assert 'regian_action_log_writes_total{source="cli"} 1' in text
+        assert "regian_action_log_pending_writes 0" in text
+
+    def test_job_execution_and_misfire(self, tmp_path, monkeypatch):
+        import regian.core.scheduler as sched
+        import regian.core.action_log as al
+        from regian.core import metrics
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        monkeypatch.setattr(sched, "_get_jobs_file", lambda: tmp_path / "jobs.json")
+        sched._save_jobs({"j1": {"id": "j1", "type": "command", "task": "/get_help", "enabled": True}})
+        sched._execute_job("j1")
+        sched._on_job_missed(MagicMock(job_id="j1", scheduled_run_time="x"))
+        text = metrics.render()
+        assert 'regian_job_executions_total{job_id="j1",status="ok",type="command"} 1' in text
+        assert 'regian_job_misfires_total{job_id="j1"} 1' in text
+
+    def test_workflow_run_gauge(self, tmp_path, monkeypatch):
+        import regian.core.workflow as wf
+        from regian.core import metrics
+        monkeypatch.setattr(wf, "_state_dir", lambda project_path="": tmp_path / "state")
+        monkeypatch.setattr(wf, "_run_status", {})
+        monkeypatch.setattr(wf, "_status_seeded", True)
+        run = wf.WorkflowRun(
+            run_id="r1", workflow_id="w", workflow_name="W", started_at="", updated_at="",
+            status=wf.STATUS_WAITING, current_phase_index=0, artifacts={}, phase_log=[], input="",
+        )
+        wf.save_run(run)
+        assert 'regian_workflow_runs{status="waiting"} 1' in metrics.render()
+
+    def test_run_status_counts_seeds_from_disk(self, tmp_root, monkeypatch):
+        import regian.core.workflow as wf
+        monkeypatch.setattr(wf, "_run_status", {})
+        monkeypatch.setattr(wf, "_status_seeded", False)
+        state = tmp_root / "proj" / ".regian_workflow_state"
+        state.mkdir(parents=True)
+        (state / "r9.json").write_text(json.dumps({"run_id": "r9", "status": "error"}), encoding="utf-8")
+        assert wf.run_status_counts() == {"error": 1}
+
+
+class TestServer:
+    def test_serves_metrics_and_health(self):
+        from regian.core import metrics
+        metrics.inc("regian_job_misfires_total", job_id="a")
+        port = metrics.start_metrics_server(port=0, host="127.0.0.1")
+        assert port
+        body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+        assert 'regian_job_misfires_total{job_id="a"} 1' in body
+        assert urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=5).read() == b"ok\n"
+
+    def test_start_is_idempotent(self):
+        from regian.core import metrics
+        p1 = metrics.start_metrics_server(port=0, host="127.0.0.1")
+        p2 = metrics.start_metrics_server(port=0, host="127.0.0.1")
+        assert p1 == p2
+
+    def test_disabled_by_default(self):
+        from regian.core import metrics
+        assert metrics.start_metrics_server() is None
@@ -0,0 +1,141 @@
+# tests/test_core_profiling.py
+"""Tests voor regian/core/profiling.py — CPU/geheugen-profielen van tools en fasen."""
+import json
+import tracemalloc
+import pytest
+
+
+def _busy():
+    data = [list(range(200)) for _ in range(200)]
+    return sum(len(x) for x in data)
+
+
+class TestIsProfiled:
+    def test_off_by_default(self):
+        from regian.core.profiling import is_profiled
+        assert is_profiled("tool", "run_shell") is False
+
+    def test_tool_by_name(self, monkeypatch):
+        monkeypatch.setenv("PROFILE_TOOLS", "run_shell,write_file")
+        from regian.core.profiling import is_profiled
+        assert is_profiled("tool", "write_file") is True
+        assert is_profiled("tool", "read_file") is False
+
+    def test_wildcard(self, monkeypatch):
+        monkeypatch.setenv("PROFILE_TOOLS", "*")
+        from regian.core.profiling import is_profiled
+        assert is_profiled("tool", "anything") is True
+
+    def test_phase_with_workflow_prefix(self, monkeypatch):
+        monkeypatch.setenv("PROFILE_PHASES", "mvp:build")
+        from regian.core.profiling import is_profiled
+        assert is_profiled("phase", "build", "mvp") is True
+        assert is_profiled("phase", "build", "andere") is False
+
+
+class TestProfileScope:
+    def test_writes_profile_with_hotspots(self, tmp_path):
+        from regian.core.profiling import profile_scope, load_profile
+        with profile_scope("tool", "busy", run_id="r1") as holder:
+            _busy()
+        assert holder["id"]
+        profile = load_profile(holder["id"])
+        assert profile["kind"] == "tool"
+        assert profile["name"] == "busy"
+        assert profile["context"] == {"run_id": "r1"}
+        assert any("_busy" in h["function"] for h in profile["hotspots"])
+        assert profile["peak_kb"] > 0
+
+    def test_records_allocations(self):
+        from regian.core.profiling import profile_scope, load_profile
+        keep = []
+        with profile_scope("tool", "alloc") as holder:
+            keep.append(bytearray(512 * 1024))
+        profile = load_profile(holder["id"])
+        assert sum(a["size_kb"] for a in profile["allocations"]) >= 500
+
+    def test_stops_tracemalloc_afterwards(self):
+        from regian.core.profiling import profile_scope
+        with profile_scope("tool", "x"):
+            assert tracemalloc.is_tracing()
+        assert not tracemalloc.is_tracing()
+
+    def test_nested_scope_is_skipped(self):
+        from regian.core.profiling import profile_scope, list_profiles
+        with profile_scope("phase", "outer"):
+            with profile_scope("tool", "inner") as inner:
+                _busy()
+        assert inner["id"] is None
+        assert [p["name"] for p in list_profiles()] == ["outer"]
+
+    def test_error_is_recorded_and_reraised(self):
+        from regian.core.profiling import profile_scope, list_profiles
+        with pytest.raises(ValueError):
+            with profile_scope("tool", "kapot"):
+                raise ValueError("boem")
+        assert "boem" in list_profiles()[0]["error"]
+
+    def test_retention(self, monkeypatch):
+        import regian.core.profiling as prof
+        monkeypatch.setattr(prof, "_MAX_PROFILES", 3)
+        for i in range(5):
+            with prof.profile_scope("tool", f"t{i}"):
+                pass
+        assert len(list(prof._get_profile_dir().glob("*.json"))) == 3
+
+
+class TestPendingProfile:
+    def test_taken_once_for_matching_name(self):
+        from regian.core.profiling import profile_scope, take_pending_profile
+        with profile_scope("tool", "abc") as holder:
+            pass
+        assert take_pending_profile("tool", "abc") == holder["id"]
+        assert take_pending_profile("tool", "abc") is None
+
+    def test_other_name_does_not_match(self):
+        from regian.core.profiling import profile_scope, take_pending_profile
+        with profile_scope("tool", "abc"):
+            pass
+        assert take_pending_profile("tool", "xyz") is None
+
+    def test_log_action_attaches_profile_id(self, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        from regian.core.profiling import profile_scope
+        log_file = tmp_path / "log.jsonl"
+        monkeypatch.setattr(al, "_get_log_file", lambda: log_file)
+        with profile_scope("tool", "my_tool") as holder:
+            pass
+        al.log_action("my_tool", {}, "ok")
+        entry = json.loads(log_file.read_text(encoding="utf-8").splitlines()[0])
+        assert entry["profile_id"] == holder["id"]
+
+
+class TestRegistryIntegration:
+    def test_registry_call_profiles_selected_tool(self, monkeypatch):
+        monkeypatch.setenv("PROFILE_TOOLS", "get_help")
+        from regian.core.agent import registry
+        from regian.core.profiling import list_profiles
+        registry.call("get_help", {"topic": ""})
+        assert list_profiles()[0]["name"] == "get_help"
+
+    def test_registry_call_without_profiling(self):
+        from regian.core.agent import registry
+        from regian.core.profiling import list_profiles
+        registry.call("get_help", {"topic": ""})
+        assert list_profiles() == []
+
+
+class TestWorkflowIntegration:
+    def test_phase_profile_linked_in_phase_log(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PROFILE_PHASES", "wacht")
+        import regian.core.workflow as wf
+        wf_dir = tmp_path / "wf"
+        wf_dir.mkdir()
+        monkeypatch.setattr(wf, "_workflow_dir", lambda project_path="": wf_dir)
+        monkeypatch.setattr(wf, "_state_dir", lambda project_path="": tmp_path / "state")
+        (wf_dir / "demo.json").write_text(json.dumps({
+            "id": "demo", "name": "Demo",
+            "phases": [{"id": "wacht", "name": "Wacht", "type": "human_checkpoint", "message": "ok?"}],
+        }), encoding="utf-8")
+        run = wf.start_workflow("demo", "invoer")
+        assert run.phase_log[-1].get("profile_id")
@@ -0,0 +1,108 @@
+# tests/test_core_runindex.py
+"""Tests voor regian/core/runindex.py — compacte index van workflow-runs."""
+import json
+import os
+import time
+
+import pytest
+
+
+def _run(run_id, status="done", started="2026-01-01T10:00:00", project_path=""):
+    from regian.core.workflow import WorkflowRun
+    return WorkflowRun(
+        run_id=run_id, workflow_id="wf", workflow_name="Mijn Wf",
+        started_at=started, updated_at=started, status=status, current_phase_index=1,
+        artifacts={"groot": "x" * 1000}, phase_log=[], input="test", project_path=project_path,
+    )
+
+
+@pytest.fixture
+def wf(tmp_path, monkeypatch):
+    from regian.core import workflow as wf_mod
+    sdir = tmp_path / "state"
+    monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": sdir)
+    return wf_mod, sdir
+
+
+class TestRunIndex:
+    def test_save_run_records_summary(self, wf):
+        from regian.core.runindex import get_run_index
+        wf_mod, sdir = wf
+        wf_mod.save_run(_run("r1", status="waiting"))
+        [summary] = get_run_index().summaries([sdir])
+        assert summary.run_id == "r1" and summary.status == "waiting"
+        assert summary.current_phase_index == 1 and summary.workflow_name == "Mijn Wf"
+
+    def test_newest_first_and_status_filter(self, wf):
+        from regian.core.runindex import get_run_index
+        wf_mod, sdir = wf
+        wf_mod.save_run(_run("oud", started="2026-01-01T10:00:00"))
+        wf_mod.save_run(_run("nieuw", status="error", started="2026-02-01T10:00:00"))
+        assert [s.run_id for s in wf_mod.list_run_summaries()] == ["nieuw", "oud"]
+        assert [s.run_id for s in get_run_index().summaries([sdir], status="error")] == ["nieuw"]
+
+    def test_listing_does_not_parse_run_files(self, wf, monkeypatch):
+        import regian.core.runjournal as rj
+        wf_mod, sdir = wf
+        wf_mod.save_run(_run("r1"))
+        old = time.time() - 60
+        os.utime(sdir, (old, old))
+        wf_mod.list_run_summaries()
+
+        def boom(*args, **kwargs):
+            raise AssertionError("run-bestand geparst")
+        monkeypatch.setattr(rj, "_replay", boom)
+        assert [s.run_id for s in wf_mod.list_run_summaries()] == ["r1"]
+
+    def test_sync_picks_up_external_changes(self, wf):
+        wf_mod, sdir = wf
+        wf_mod.save_run(_run("weg"))
+        wf_mod.save_run(_run("blijft"))
+        wf_mod.list_run_summaries()
+        (sdir / "weg.json").unlink()
+        data = json.loads((sdir / "blijft.json").read_text(encoding="utf-8"))
+        data["status"] = "cancelled"
+        (sdir / "elders.json").write_text(json.dumps(data | {"run_id": "elders"}), encoding="utf-8")
+        summaries = {s.run_id: s.status for s in wf_mod.list_run_summaries()}
+        assert summaries == {"blijft": "done", "elders": "cancelled"}
+
+    def test_unchanged_dir_skips_sync(self, tmp_path):
+        from regian.core.runindex import RunIndex
+        index = RunIndex(tmp_path / "idx.db")
+        sdir = tmp_path / "state"
+        sdir.mkdir()
+        (sdir / "a.json").write_text(json.dumps({"run_id": "a", "status": "done"}), encoding="utf-8")
+        old = time.time() - 60
+        os.utime(sdir, (old, old))
+        index.sync(sdir)
+        (sdir / "a.json").write_text(json.dumps({"run_id": "a", "status": "error"}), encoding="utf-8")
+        os.utime(sdir, (old, old))
+        index.sync(sdir)
+        assert index.summaries([sdir])[0].status == "done"
+
+    def test_all_projects(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        root = tmp_path / "workspace"
+        monkeypatch.setenv("REGIAN_ROOT_DIR", str(root))
+        project = root / "proj"
+        project.mkdir(parents=True)
+        wf_mod.save_run(_run("werkmap_run"))
+        wf_mod.save_run(_run("project_run", project_path=str(project), started="2026-03-01T00:00:00"))
+        assert [s.run_id for s in wf_mod.list_run_summaries()] == ["werkmap_run"]
+        assert [s.run_id for s in wf_mod.list_run_summaries(str(project))] == ["project_run"]
+        both = wf_mod.list_run_summaries(all_projects=True)
+        assert [(s.run_id, s.project_path) for s in both] == [
+            ("project_run", str(project)), ("werkmap_run", ""),
+        ]
+
+    def test_index_error_does_not_break_save(self, wf, monkeypatch):
+        import sqlite3
+        import regian.core.runindex as ri
+        wf_mod, sdir = wf
+
+        def broken():
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(ri, "get_run_index", broken)
+        wf_mod.save_run(_run("r1"))
+        assert wf_mod.load_run("r1").run_id == "r1"
+        assert [s.run_id for s in wf_mod.list_run_summaries()] == ["r1"]
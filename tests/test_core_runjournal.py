@@ -0,0 +1,207 @@
+# tests/test_core_runjournal.py
+"""Tests voor regian/core/runjournal.py — append-only journaal van run-state."""
+import json
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def wf(tmp_path, monkeypatch):
+    from regian.core import workflow as wf_mod
+    sdir = tmp_path / "state"
+    monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": sdir)
+    return wf_mod, sdir
+
+
+def _run(wf_mod, run_id="r1"):
+    return wf_mod.WorkflowRun(
+        run_id=run_id, workflow_id="wf", workflow_name="Wf",
+        started_at="2026-01-01T10:00:00", updated_at="2026-01-01T10:00:00",
+        status="running", current_phase_index=0,
+        artifacts={"input": "idee"}, phase_log=[], input="idee", project_path="",
+    )
+
+
+def _finish_phase(run, index, output):
+    run.artifacts[f"out{index}"] = output
+    run.phase_log.append({"phase_id": f"p{index}", "status": "done", "output": output})
+    run.current_phase_index = index + 1
+
+
+def _events(sdir, run_id="r1"):
+    path = sdir / f"{run_id}.events.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestJournal:
+    def test_phase_appends_only_new_output(self, wf):
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        snapshot = (sdir / "r1.json").read_text(encoding="utf-8")
+        _finish_phase(run, 0, "eerste " * 500)
+        wf_mod.save_run(run)
+        _finish_phase(run, 1, "tweede")
+        wf_mod.save_run(run)
+        assert (sdir / "r1.json").read_text(encoding="utf-8") == snapshot
+        events = _events(sdir)
+        assert [e["e"] for e in events[-3:]] == ["artifact_set", "phase_finished", "status"]
+        assert "eerste" not in json.dumps(events[-3:])
+        assert [e["seq"] for e in events] == list(range(1, len(events) + 1))
+
+    def test_load_rebuilds_state(self, wf):
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        _finish_phase(run, 0, "a")
+        run.status = "waiting"
+        wf_mod.save_run(run)
+        run.phase_log[-1] = {"phase_id": "p0", "status": "waiting", "output": "b", "revised": True}
+        run.artifacts["out0"] = "b"
+        wf_mod.save_run(run)
+        assert "phase_revised" in [e["e"] for e in _events(sdir)]
+        assert wf_mod.load_run("r1").to_dict() == run.to_dict()
+        assert wf_mod.list_runs()[0].phase_log[-1]["output"] == "b"
+
+    def test_task_checkpoint_appends_one_event_per_task(self, wf):
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        run.task_state = {"phase_id": "impl", "input_hash": "h", "total": 3, "results": {}}
+        wf_mod.save_run(run)
+        run.task_state["results"]["0"] = "taak een " * 500
+        wf_mod.save_run(run)
+        run.task_state["results"]["1"] = "taak twee"
+        wf_mod.save_run(run)
+        events = _events(sdir)
+        assert [e["e"] for e in events] == ["task_done", "task_done"]
+        assert "$blob" in json.dumps(events[0]["value"])
+        assert wf_mod.load_run("r1").task_state["results"]["0"] == "taak een " * 500
+        run.task_state = {}
+        wf_mod.save_run(run)
+        assert _events(sdir)[-1] == {"seq": 3, "e": "task_state", "value": {}}
+        assert wf_mod.load_run("r1").task_state == {}
+
+    def test_finished_run_is_compacted(self, wf):
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        _finish_phase(run, 0, "a")
+        wf_mod.save_run(run)
+        run.status = "done"
+        wf_mod.save_run(run)
+        assert not (sdir / "r1.events.jsonl").exists()
+        data = json.loads((sdir / "r1.json").read_text(encoding="utf-8"))
+        assert data["status"] == "done" and data["artifacts"]["out0"] == "a"
+
+    def test_snapshot_after_many_events(self, wf, monkeypatch):
+        import regian.core.runjournal as rj
+        wf_mod, sdir = wf
+        monkeypatch.setattr(rj, "_SNAPSHOT_EVERY", 6)
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        for i in range(3):
+            _finish_phase(run, i, str(i))
+            wf_mod.save_run(run)
+        assert len(_events(sdir)) < 6
+        assert wf_mod.load_run("r1").to_dict() == run.to_dict()
+
+    def test_crash_between_snapshot_and_truncate(self, wf):
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        _finish_phase(run, 0, "a")
+        wf_mod.save_run(run)
+        stale = (sdir / "r1.events.jsonl").read_text(encoding="utf-8")
+        run.status = "done"
+        wf_mod.save_run(run)
+        # Journaal van vóór de snapshot + een afgebroken regel
+        (sdir / "r1.events.jsonl").write_text(stale + '{"seq": 99, "e": "artif', encoding="utf-8")
+        loaded = wf_mod.load_run("r1")
+        assert loaded.to_dict() == run.to_dict()
+
+    def test_other_process_starts_with_snapshot(self, wf):
+        import regian.core.runjournal as rj
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        _finish_phase(run, 0, "a")
+        wf_mod.save_run(run)
+        rj.forget(sdir, "r1")
+        _finish_phase(run, 1, "b")
+        wf_mod.save_run(run)
+        assert not (sdir / "r1.events.jsonl").exists()
+        assert json.loads((sdir / "r1.json").read_text(encoding="utf-8"))["_seq"] >= 3
+        assert wf_mod.load_run("r1").to_dict() == run.to_dict()
+
+    def test_second_writer_continues_from_disk(self, wf):
+        import copy
+        import regian.core.runjournal as rj
+        wf_mod, sdir = wf
+        run_a = _run(wf_mod)
+        wf_mod.save_run(run_a)
+        key = rj._key(sdir, "r1")
+        # Proces B heeft dezelfde run geladen vóór A verder schreef
+        shadow_b = copy.deepcopy(rj._shadows[key])
+        run_b = wf_mod.WorkflowRun.from_dict(run_a.to_dict())
+        run_a.artifacts["x"] = "van A"
+        wf_mod.save_run(run_a)
+        rj._shadows[key] = shadow_b
+        run_b.status = "waiting"
+        wf_mod.save_run(run_b)
+        seqs = [e["seq"] for e in _events(sdir)]
+        assert seqs == sorted(set(seqs))
+        # De state op schijf is die van de laatste schrijver, niet een mengvorm
+        assert wf_mod.load_run("r1").to_dict() == run_b.to_dict()
+
+    def test_expect_status_keeps_cancel_by_other_process(self, wf):
+        import copy
+        import regian.core.runjournal as rj
+        wf_mod, sdir = wf
+        worker = _run(wf_mod)
+        wf_mod.save_run(worker)
+        key = rj._key(sdir, "r1")
+        shadow_worker = copy.deepcopy(rj._shadows[key])
+        cancelled = wf_mod.load_run("r1")
+        cancelled.status = "cancelled"
+        wf_mod.save_run(cancelled)
+        rj._shadows[key] = shadow_worker
+        _finish_phase(worker, 0, "a")
+        assert wf_mod.save_run(worker, expect_status="running") is False
+        assert wf_mod.load_run("r1").status == "cancelled"
+
+    def test_index_follows_journal_of_active_run(self, wf):
+        wf_mod, sdir = wf
+        run = _run(wf_mod)
+        wf_mod.save_run(run)
+        _finish_phase(run, 0, "a")
+        wf_mod.save_run(run)
+        old = time.time() - 60
+        os.utime(sdir, (old, old))
+        wf_mod.list_run_summaries()
+        # Een ander proces schrijft een event; de map-mtime blijft gelijk
+        run.status = "waiting"
+        run.updated_at = "2026-01-01T11:00:00"
+        with open(sdir / "r1.events.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": 50, "e": "status", "status": "waiting",
+                                "current_phase_index": 1, "updated_at": run.updated_at}) + "\n")
+        os.utime(sdir, (old, old))
+        assert wf_mod.list_run_summaries()[0].status == "waiting"
+
+
+class TestAdvanceJournal:
+    def test_advance_saves_after_each_phase(self, wf, monkeypatch):
+        wf_mod, sdir = wf
+        saved = []
+        monkeypatch.setattr(wf_mod, "execute_phase", lambda run, phase: (phase["id"], False))
+        real_save = wf_mod.save_run
+        monkeypatch.setattr(wf_mod, "save_run",
+                            lambda run, **kw: saved.append(run.current_phase_index) or real_save(run, **kw))
+        template = {"id": "wf", "phases": [{"id": "a", "output_key": "a"}, {"id": "b", "output_key": "b"}]}
+        run = _run(wf_mod)
+        wf_mod._advance(run, template)
+        assert saved == [1, 2, 2]
+        assert wf_mod.load_run("r1").artifacts["b"] == "b"
@@ -0,0 +1,163 @@
+# tests/test_core_runqueue.py
+"""Tests voor regian/core/runqueue.py — wachtrij en achtergrondworkers voor workflow-runs."""
+import time
+
+import pytest
+
+
+_TEMPLATE = {"id": "wf", "name": "Wf", "phases": [
+    {"id": "a", "type": "llm_prompt", "output_key": "a"},
+    {"id": "b", "type": "llm_prompt", "output_key": "b"},
+    {"id": "ok", "type": "human_checkpoint", "prompt": "Klaar? {{b}}"},
+]}
+
+
+@pytest.fixture
+def wf(tmp_path, monkeypatch):
+    from regian.core import runqueue
+    from regian.core import workflow as wf_mod
+    monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+    monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": _TEMPLATE)
+    executed = []
+
+    def fake_dispatch(run, phase):
+        if phase["type"] == "human_checkpoint":
+            return "wacht", True
+        executed.append(phase["id"])
+        return f"uit {phase['id']}", False
+    monkeypatch.setattr(wf_mod, "_dispatch_phase", fake_dispatch)
+    yield wf_mod, executed
+    runqueue.stop_workers()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestRunQueue:
+    def test_claim_is_exclusive_until_lease_expires(self, tmp_path):
+        from regian.core.runqueue import RunQueue
+        a = RunQueue(tmp_path / "q.db", node="a")
+        b = RunQueue(tmp_path / "q.db", node="b")
+        a.enqueue("r1")
+        assert a.claim(ttl=60)["run_id"] == "r1"
+        assert b.claim(ttl=60) is None
+        assert not b.renew("r1", 60)
+        # Node a crasht: na het verlopen van de lease neemt b over
+        a.renew("r1", -1)
+        item = b.claim(ttl=60)
+        assert item["run_id"] == "r1" and item["attempts"] == 1
+
+    def test_release_does_not_count_as_attempt(self, tmp_path):
+        from regian.core.runqueue import RunQueue
+        q = RunQueue(tmp_path / "q.db", node="a")
+        q.enqueue("r1")
+        for _ in range(5):
+            assert q.claim(ttl=60)["attempts"] == 0
+            q.release("r1")
+        assert q.all()[0]["attempts"] == 0
+
+    def test_finish_keeps_requeued_run(self, tmp_path):
+        from regian.core.runqueue import RunQueue
+        q = RunQueue(tmp_path / "q.db", node="a")
+        q.enqueue("r1")
+        item = q.claim(ttl=60)
+        time.sleep(0.01)
+        q.enqueue("r1")   # bv. goedgekeurd terwijl de worker afrondde
+        assert not q.finish("r1", item["enqueued"])
+        q.release("r1")
+        assert q.claim(ttl=60)["run_id"] == "r1"
+        assert q.finish("r1", q.all()[0]["enqueued"])
+        assert q.all() == []
+
+
+class TestWorkers:
+    def test_run_next_runs_until_checkpoint(self, wf):
+        from regian.core import runqueue
+        wf_mod, executed = wf
+        run = wf_mod.create_run("wf", "idee")
+        runqueue.get_run_queue().enqueue(run.run_id)
+        assert runqueue.run_next()
+        loaded = wf_mod.load_run(run.run_id)
+        assert loaded.status == wf_mod.STATUS_WAITING and loaded.current_phase_index == 2
+        assert executed == ["a", "b"]
+        assert runqueue.get_run_queue().all() == []
+        assert not runqueue.run_next()
+
+    def test_resume_after_crash_skips_finished_phases(self, wf):
+        from regian.core import runqueue
+        from regian.core.runqueue import RunQueue
+        wf_mod, executed = wf
+        run = wf_mod.create_run("wf", "idee")
+        run.current_phase_index = 1
+        run.artifacts["a"] = "al klaar"
+        wf_mod.save_run(run)
+        dead = RunQueue(runqueue.get_run_queue().path, node="dood")
+        dead.enqueue(run.run_id)
+        dead.claim(ttl=-1)   # geclaimd door een gecrasht proces; lease al verlopen
+        assert runqueue.run_next()
+        assert executed == ["b"]
+        assert wf_mod.load_run(run.run_id).status == wf_mod.STATUS_WAITING
+
+    def test_too_many_attempts_marks_error(self, wf, monkeypatch):
+        from regian.core import runqueue
+        wf_mod, executed = wf
+        from regian.core.runqueue import RunQueue
+        monkeypatch.setattr(runqueue, "_MAX_ATTEMPTS", 0)
+        run = wf_mod.create_run("wf", "idee")
+        dead = RunQueue(runqueue.get_run_queue().path, node="dood")
+        dead.enqueue(run.run_id)
+        dead.claim(ttl=-1)
+        runqueue.run_next()
+        loaded = wf_mod.load_run(run.run_id)
+        assert loaded.status == wf_mod.STATUS_ERROR and "pogingen" in loaded.phase_log[-1]["output"]
+        assert executed == []
+
+    def test_cancel_during_phase_is_kept(self, wf, monkeypatch):
+        import threading
+        from regian.core import runqueue
+        wf_mod, executed = wf
+        started, release = threading.Event(), threading.Event()
+
+        def slow_dispatch(run, phase):
+            executed.append(phase["id"])
+            started.set()
+            release.wait(5)
+            return f"uit {phase['id']}", False
+        monkeypatch.setattr(wf_mod, "_dispatch_phase", slow_dispatch)
+        run = wf_mod.create_run("wf", "idee")
+        runqueue.get_run_queue().enqueue(run.run_id)
+        worker = threading.Thread(target=runqueue.run_next)
+        worker.start()
+        assert started.wait(5)
+        assert wf_mod.cancel_run(run.run_id).status == wf_mod.STATUS_CANCELLED
+        release.set()
+        worker.join(5)
+        loaded = wf_mod.load_run(run.run_id)
+        assert loaded.status == wf_mod.STATUS_CANCELLED
+        assert executed == ["a"] and "a" not in loaded.artifacts
+        assert runqueue.get_run_queue().all() == []
+
+    def test_background_start_and_approve(self, wf, monkeypatch):
+        wf_mod, executed = wf
+        monkeypatch.setenv("WORKFLOW_WORKERS", "2")
+        run = wf_mod.start_workflow("wf", "idee", background=True)
+        assert run.status == wf_mod.STATUS_RUNNING
+        assert _wait_for(lambda: wf_mod.load_run(run.run_id).status == wf_mod.STATUS_WAITING)
+        wf_mod.advance_run(run.run_id, "top", background=True)
+        assert _wait_for(lambda: wf_mod.load_run(run.run_id).status == wf_mod.STATUS_DONE)
+        assert wf_mod.load_run(run.run_id).artifacts["feedback_ok"] == "top"
+
+    def test_skill_returns_immediately(self, wf, monkeypatch, tmp_path):
+        import regian.skills.workflow as skill_wf
+        wf_mod, _ = wf
+        monkeypatch.setenv("WORKFLOW_WORKERS", "1")
+        monkeypatch.setattr(skill_wf, "_project_path", lambda: str(tmp_path))
+        monkeypatch.setattr(wf_mod, "_dispatch_phase", lambda run, phase: (time.sleep(0.2), ("x", False))[1])
+        result = skill_wf.start_workflow("wf", "idee")
+        assert "achtergrond" in result and "running" in result
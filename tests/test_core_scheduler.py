@@ -264,3 +264,504 @@ class TestGetNextRun:
         result = sched.get_next_run("job_x")
         assert "01/03/2026" in result
         assert "09:00:00" in result
+
+
+class TestUpdateScheduledJob:
+    def test_sets_and_removes_field(self, isolated_scheduler):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("ju", "echo", "shell", "elke 1 minuut")
+        assert sched.update_scheduled_job("ju", token_budget=100) is True
+        assert sched._load_jobs()["ju"]["token_budget"] == 100
+        sched.update_scheduled_job("ju", token_budget=None)
+        assert "token_budget" not in sched._load_jobs()["ju"]
+
+    def test_unknown_job(self, isolated_scheduler):
+        sched, _ = isolated_scheduler
+        assert sched.update_scheduled_job("nope", token_budget=1) is False
+
+
+class TestExecuteJobBudget:
+    def test_prompt_job_over_budget_marks_failure(self, isolated_scheduler, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jp", "doe iets", "prompt", "elke 1 minuut")
+        sched.update_scheduled_job("jp", token_budget=10)
+
+        from unittest.mock import MagicMock, patch
+        from regian.core.usage import invoke_llm
+        llm = MagicMock()
+        resp = MagicMock()
+        resp.content = "[]"
+        resp.usage_metadata = {"input_tokens": 50, "output_tokens": 50}
+        llm.invoke.return_value = resp
+
+        class FakeOrch:
+            def run(self, prompt):
+                invoke_llm(llm, [prompt])   # verbruikt 100 tokens
+                invoke_llm(llm, [prompt])   # moet geblokkeerd worden
+                return "klaar"
+
+        with patch("regian.core.agent.OrchestratorAgent", FakeOrch):
+            sched._execute_job("jp")
+        job = sched._load_jobs()["jp"]
+        assert job["last_status"] == "❌"
+        assert "Tokenbudget" in job["last_output"]
+        assert llm.invoke.call_count == 1
+
+
+class TestExecuteJobRunState:
+    def test_run_state_kept_out_of_definitions(self, isolated_scheduler, tmp_path, monkeypatch):
+        import json
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jr", "/get_help", "command", "elke 1 minuut")
+        sched._execute_job("jr")
+        assert sched.get_all_jobs()["jr"]["last_status"] == "✅"
+        on_disk = json.loads(sched._get_jobs_file().read_text(encoding="utf-8"))
+        assert "last_status" not in on_disk["jr"]
+
+
+class TestJobConcurrency:
+    def test_job_registered_in_pool_of_its_type(self, isolated_scheduler):
+        sched, mock_sched = isolated_scheduler
+        sched.add_scheduled_job("jc", "doe iets", "prompt", "elke 1 minuut")
+        kwargs = mock_sched.add_job.call_args.kwargs
+        assert kwargs["executor"] == "prompt"
+        assert kwargs["max_instances"] == 1
+        assert kwargs["coalesce"] is True
+        assert kwargs["misfire_grace_time"] == 60
+
+    def test_update_scheduling_field_reregisters(self, isolated_scheduler):
+        sched, mock_sched = isolated_scheduler
+        sched.add_scheduled_job("jc2", "echo", "shell", "elke 1 minuut")
+        mock_sched.add_job.reset_mock()
+        sched.update_scheduled_job("jc2", max_instances=3, coalesce=False)
+        kwargs = mock_sched.add_job.call_args.kwargs
+        assert kwargs["max_instances"] == 3
+        assert kwargs["coalesce"] is False
+        mock_sched.add_job.reset_mock()
+        sched.update_scheduled_job("jc2", token_budget=5)
+        mock_sched.add_job.assert_not_called()
+
+    def test_invalid_scheduling_option_not_stored(self, isolated_scheduler):
+        sched, mock_sched = isolated_scheduler
+        sched.add_scheduled_job("jg", "echo", "shell", "elke 1 minuut")
+        with pytest.raises(ValueError):
+            sched.update_scheduled_job("jg", misfire_grace_time=0)
+        mock_sched.add_job.side_effect = ValueError("weigert")
+        with pytest.raises(ValueError):
+            sched.update_scheduled_job("jg", max_instances=3)
+        job = sched.get_all_jobs()["jg"]
+        assert "misfire_grace_time" not in job and "max_instances" not in job
+
+    def test_pool_sizes_from_settings(self, monkeypatch):
+        import regian.core.scheduler as sched
+        monkeypatch.setenv("SCHEDULER_POOL_SIZES", '{"shell": 7}')
+        executors = sched._build_executors()
+        assert set(executors) == {"default", "shell", "command", "prompt"}
+        assert executors["shell"]._pool._max_workers == 7
+        assert executors["prompt"]._pool._max_workers == 4
+
+    def test_wait_time_and_skips_recorded(self, isolated_scheduler, tmp_path, monkeypatch):
+        from types import SimpleNamespace
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jw", "/get_help", "command", "elke 1 minuut")
+        sched._on_job_submitted(SimpleNamespace(job_id="jw"))
+        assert sched.get_job_stats("jw")["pending"] == 1
+        assert sched.get_queue_depth()["command"] == 1
+        sched._execute_job("jw")
+        sched._on_job_max_instances(SimpleNamespace(job_id="jw"))
+        stats = sched.get_job_stats("jw")
+        assert stats["pending"] == 0
+        assert stats["running"] == 0
+        assert stats["runs"] == 1
+        assert stats["skipped"] == 1
+        assert stats["last_wait"] >= 0
+
+    def test_run_started_before_submit_event(self, isolated_scheduler, tmp_path, monkeypatch):
+        from types import SimpleNamespace
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("je", "/get_help", "command", "elke 1 minuut")
+        sched._execute_job("je", scheduled=True)
+        sched._on_job_submitted(SimpleNamespace(job_id="je"))
+        assert sched.get_job_stats("je")["pending"] == 0
+        sched._execute_job("je")
+        sched._on_job_submitted(SimpleNamespace(job_id="je"))
+        assert sched.get_job_stats("je")["pending"] == 1
+
+    def test_skipped_firings_leave_no_pending(self, isolated_scheduler, tmp_path, monkeypatch):
+        from types import SimpleNamespace
+        import regian.core.daemon as daemon
+        import regian.core.leases as leases
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("js", "/get_help", "command", "elke 1 minuut")
+        depth = sched.get_queue_depth()["command"]
+        monkeypatch.setenv("SCHEDULER_LEASE_DB", str(tmp_path / "leases.db"))
+        monkeypatch.setattr(leases, "acquire", lambda job_id, **kw: None)
+        for _ in range(5):
+            sched._on_job_submitted(SimpleNamespace(job_id="js"))
+            sched._fire("js")
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: True)
+        sched._on_job_submitted(SimpleNamespace(job_id="js"))
+        sched._fire("js")
+        monkeypatch.setattr(daemon, "daemon_available", lambda refresh=False: False)
+        sched.update_scheduled_job("js", enabled=False)
+        sched._on_job_submitted(SimpleNamespace(job_id="js"))
+        sched._execute_job("js", scheduled=True)
+        assert sched.get_job_stats("js")["pending"] == 0
+        assert sched.get_queue_depth()["command"] == depth
+
+    def test_llm_slot_limits_concurrency(self, monkeypatch):
+        import threading
+        import regian.core.scheduler as sched
+        monkeypatch.setenv("LLM_JOB_CONCURRENCY", "1")
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work():
+            with sched._llm_slot():
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                threading.Event().wait(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 1
+
+
+class TestJobHistory:
+    def test_run_recorded_with_output(self, isolated_scheduler, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jh", "/get_help", "command", "elke 1 minuut")
+        sched._execute_job("jh")
+        sched._execute_job("jh")
+        runs = sched.get_job_history("jh")
+        assert len(runs) == 2
+        assert runs[0]["status"] == "✅"
+        assert runs[0]["duration"] >= 0
+        assert sched.get_run_output("jh", runs[-1]["run_id"])
+        assert sched.get_job_history("jh", limit=1) == runs[-1:]
+
+    def test_old_outputs_pruned(self, isolated_scheduler, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        monkeypatch.setenv("JOB_HISTORY_SIZE", "2")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jp2", "/get_help", "command", "elke 1 minuut")
+        for _ in range(4):
+            sched._execute_job("jp2")
+        assert len(sched.get_job_history("jp2")) == 2
+        assert len(list((sched._get_output_dir() / "jp2").iterdir())) == 2
+        sched.remove_scheduled_job("jp2")
+        assert not (sched._get_output_dir() / "jp2").exists()
+
+    def test_summarize_and_sparkline(self):
+        import regian.core.scheduler as sched
+        runs = [{"duration": d, "status": "✅"} for d in (1.0, 1.0, 2.0, 4.0)]
+        runs.append({"duration": 3.0, "status": "❌"})
+        stats = sched.summarize_history(runs)
+        assert stats["count"] == 5
+        assert stats["failures"] == 1
+        assert stats["failure_rate"] == pytest.approx(0.2)
+        assert stats["mean"] == pytest.approx(2.2)
+        assert stats["p95"] == 4.0
+        assert stats["trend"] > 0
+        line = sched.sparkline(runs)
+        assert line[0] == "▁" and line[3] == "█" and line[4] == "✗"
+
+    def test_summarize_empty(self):
+        import regian.core.scheduler as sched
+        assert sched.summarize_history([])["count"] == 0
+        assert sched.sparkline([]) == ""
+
+
+class TestShellJobLog:
+    def test_shell_job_streams_to_job_log(self, isolated_scheduler, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        from regian.core.shell import job_log_path
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("js", "echo uit_de_job", "shell", "elke 1 minuut")
+        sched._execute_job("js")
+        assert sched.get_all_jobs()["js"]["last_output"] == "uit_de_job"
+        assert "uit_de_job" in job_log_path("js").read_text(encoding="utf-8")
+        sched.remove_scheduled_job("js")
+        assert not job_log_path("js").exists()
+
+
+class TestFrozenPlan:
+    @pytest.fixture
+    def fake_orch(self, monkeypatch, tmp_path):
+        import regian.core.action_log as al
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        calls = {"plan": 0, "run": 0, "answer": 0}
+
+        class FakeOrch:
+            steps = [{"tool": "get_help", "args": {}}]
+
+            def plan(self, prompt):
+                calls["plan"] += 1
+                return list(self.steps)
+
+            def run(self, prompt):
+                calls["run"] += 1
+                return "via run"
+
+            def answer(self, prompt):
+                calls["answer"] += 1
+                return "antwoord"
+
+        monkeypatch.setattr("regian.core.agent.OrchestratorAgent", FakeOrch)
+        return FakeOrch, calls
+
+    def test_plans_once_and_reuses(self, isolated_scheduler, fake_orch):
+        sched, _ = isolated_scheduler
+        _, calls = fake_orch
+        sched.add_scheduled_job("jf", "toon hulp", "prompt", "elke 1 minuut")
+        sched.update_scheduled_job("jf", frozen_plan=True)
+        sched._execute_job("jf")
+        sched._execute_job("jf")
+        sched._execute_job("jf")
+        job = sched.get_all_jobs()["jf"]
+        assert calls == {"plan": 1, "run": 0, "answer": 0}
+        assert job["plan"] == [{"tool": "get_help", "args": {}}]
+        assert job["last_status"] == "✅"
+        assert "get_help" in job["last_output"]
+
+    def test_replans_when_fingerprint_changes(self, isolated_scheduler, fake_orch, monkeypatch):
+        import regian.core.agent as agent
+        sched, _ = isolated_scheduler
+        _, calls = fake_orch
+        sched.add_scheduled_job("jf", "toon hulp", "prompt", "elke 1 minuut")
+        sched.update_scheduled_job("jf", frozen_plan=True)
+        sched._execute_job("jf")
+        monkeypatch.setattr(agent, "plan_fingerprint", lambda prompt: "ander")
+        sched._execute_job("jf")
+        sched._execute_job("jf")
+        assert calls["plan"] == 2
+        assert sched.get_all_jobs()["jf"]["plan_fingerprint"] == "ander"
+
+    def test_changed_files_do_not_replan(self, isolated_scheduler, fake_orch, monkeypatch):
+        import regian.core.watch as watch
+        import regian.core.agent as agent
+        sched, _ = isolated_scheduler
+        orch, calls = fake_orch
+        orch.steps = [{"tool": "read_file", "args": {"path": "{files}"}}]
+        executed = []
+        monkeypatch.setattr(agent, "execute_plan", lambda steps, source: executed.append(steps) or "ok")
+        sched.add_scheduled_job("jf", "verwerk", "prompt", "elke 1 minuut")
+        sched.update_scheduled_job("jf", frozen_plan=True)
+        for batch in (["a.csv"], ["b.csv", "c.csv"]):
+            monkeypatch.setattr(watch.get_watcher(), "take", lambda job_id, batch=batch: list(batch))
+            sched._execute_job("jf")
+        assert calls["plan"] == 1
+        assert [s[0]["args"]["path"] for s in executed] == ["a.csv", "b.csv,c.csv"]
+        assert sched.get_all_jobs()["jf"]["plan"] == orch.steps
+
+    def test_empty_plan_skips_planning_round(self, isolated_scheduler, fake_orch):
+        sched, _ = isolated_scheduler
+        orch, calls = fake_orch
+        orch.steps = []
+        sched.add_scheduled_job("jf", "zeg hallo", "prompt", "elke 1 minuut")
+        sched.update_scheduled_job("jf", frozen_plan=True)
+        sched._execute_job("jf")
+        sched._execute_job("jf")
+        assert calls == {"plan": 1, "run": 0, "answer": 2}
+        assert sched.get_all_jobs()["jf"]["last_output"] == "antwoord"
+
+    def test_without_frozen_plan_runs_orchestrator(self, isolated_scheduler, fake_orch):
+        sched, _ = isolated_scheduler
+        _, calls = fake_orch
+        sched.add_scheduled_job("jn", "toon hulp", "prompt", "elke 1 minuut")
+        sched._execute_job("jn")
+        assert calls["run"] == 1 and calls["plan"] == 0
+        assert "plan" not in sched.get_all_jobs()["jn"]
+
+    def test_replan_prompt_job(self, isolated_scheduler, fake_orch):
+        sched, _ = isolated_scheduler
+        _, calls = fake_orch
+        sched.add_scheduled_job("jf", "toon hulp", "prompt", "elke 1 minuut")
+        assert sched.replan_prompt_job("jf") == [{"tool": "get_help", "args": {}}]
+        job = sched.get_all_jobs()["jf"]
+        assert job["frozen_plan"] is True and job["planned_at"]
+        sched._execute_job("jf")
+        assert calls["plan"] == 1
+
+    def test_replan_rejects_other_types(self, isolated_scheduler):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("js", "echo", "shell", "elke 1 minuut")
+        assert sched.replan_prompt_job("js") is None
+        assert sched.replan_prompt_job("bestaat_niet") is None
+
+
+class TestOnlyOnChange:
+    @pytest.fixture
+    def log_file(self, tmp_path, monkeypatch):
+        import regian.core.action_log as al
+        path = tmp_path / "log.jsonl"
+        monkeypatch.setattr(al, "_get_log_file", lambda: path)
+        return path
+
+    def _log_lines(self, path):
+        return [l for l in path.read_text(encoding="utf-8").splitlines() if l.strip()] if path.exists() else []
+
+    def test_unchanged_runs_only_bump_counter(self, isolated_scheduler, log_file):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jo", "echo zelfde", "shell", "elke 1 minuut")
+        sched.update_scheduled_job("jo", only_on_change=True)
+        for _ in range(4):
+            sched._execute_job("jo")
+        job = sched.get_all_jobs()["jo"]
+        assert job["unchanged_runs"] == 3
+        assert job["last_output"] == "zelfde"
+        assert len(self._log_lines(log_file)) == 1
+        runs = sched.get_job_history("jo")
+        assert len(runs) == 4
+        assert [bool(r.get("unchanged")) for r in runs] == [False, True, True, True]
+        assert runs[-1]["output_ref"] is None
+        assert len(list((sched._get_output_dir() / "jo").iterdir())) == 1
+
+    def test_changed_output_resets_counter(self, isolated_scheduler, log_file, tmp_path):
+        sched, _ = isolated_scheduler
+        counter = tmp_path / "n.txt"
+        counter.write_text("a", encoding="utf-8")
+        sched.add_scheduled_job("jo", f"cat {counter}", "shell", "elke 1 minuut")
+        sched.update_scheduled_job("jo", only_on_change=True)
+        sched._execute_job("jo")
+        sched._execute_job("jo")
+        counter.write_text("b", encoding="utf-8")
+        sched._execute_job("jo")
+        job = sched.get_all_jobs()["jo"]
+        assert job["unchanged_runs"] == 0
+        assert job["last_output"] == "b"
+        assert len(self._log_lines(log_file)) == 2
+
+    def test_without_option_every_run_is_logged(self, isolated_scheduler, log_file):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jn", "echo zelfde", "shell", "elke 1 minuut")
+        sched._execute_job("jn")
+        sched._execute_job("jn")
+        assert len(self._log_lines(log_file)) == 2
+
+    def test_follow_up_only_on_change(self, isolated_scheduler, log_file, tmp_root):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jo", "echo zelfde", "shell", "elke 1 minuut")
+        sched.update_scheduled_job("jo", only_on_change=True, on_change='/write_file {"path": "gevolgd.txt", "content": "{job_id}: {output}"}')
+        sched._execute_job("jo")
+        assert (tmp_root / "gevolgd.txt").read_text(encoding="utf-8") == "jo: zelfde"
+        (tmp_root / "gevolgd.txt").unlink()
+        sched._execute_job("jo")
+        assert not (tmp_root / "gevolgd.txt").exists()
+
+    def test_state_fields_stay_out_of_definitions(self, isolated_scheduler, log_file):
+        import json
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("jo", "echo x", "shell", "elke 1 minuut")
+        sched.update_scheduled_job("jo", only_on_change=True)
+        sched._execute_job("jo")
+        sched._get_store().flush()
+        definition = json.loads(sched._get_jobs_file().read_text(encoding="utf-8"))["jo"]
+        assert "last_output_hash" not in definition
+        assert "unchanged_runs" not in definition
+
+
+class TestSpreading:
+    def test_offset_trigger_shifts_fire_times(self):
+        from datetime import datetime, timedelta
+        import regian.core.scheduler as sched
+        base = sched.parse_schedule("elk uur")
+        shifted = sched.OffsetTrigger(base, 90)
+        first = base.get_next_fire_time(None, datetime.now(base.timezone))
+        fire = shifted.get_next_fire_time(None, first)
+        assert fire - first == timedelta(seconds=90)
+        assert shifted.get_next_fire_time(fire, fire) - fire == timedelta(hours=1)
+
+    def test_jitter_is_deterministic_and_bounded(self, monkeypatch):
+        import regian.core.scheduler as sched
+        monkeypatch.setenv("JOB_JITTER_SECONDS", "45")
+        trigger = sched.parse_schedule("elk uur")
+        offsets = {jid: sched._job_offset(jid, {}, trigger) for jid in ("a", "b", "c", "d")}
+        assert offsets == {jid: sched._job_offset(jid, {}, trigger) for jid in offsets}
+        assert all(0 <= o < 45 for o in offsets.values())
+        assert len(set(offsets.values())) > 1
+
+    def test_jitter_window_capped_and_disabled(self, monkeypatch):
+        import regian.core.scheduler as sched
+        monkeypatch.setenv("JOB_JITTER_SECONDS", "3600")
+        trigger = sched.parse_schedule("elke 1 minuut")
+        assert sched._job_offset("a", {}, trigger) < 30
+        assert sched._job_offset("a", {"jitter": 0}, trigger) == 0
+        assert sched._effective_trigger("a", {"schedule": "elke 1 minuut", "jitter": 0}) is not None
+        assert not isinstance(
+            sched._effective_trigger("a", {"schedule": "elke 1 minuut", "jitter": 0}), sched.OffsetTrigger
+        )
+
+    def test_spread_peers_evenly(self, isolated_scheduler):
+        sched, _ = isolated_scheduler
+        for jid in ("s1", "s2", "s3", "s4"):
+            sched.add_scheduled_job(jid, "echo", "shell", "elk uur")
+            sched.update_scheduled_job(jid, spread=True)
+        jobs = sched.get_all_jobs()
+        offsets = [sched.schedule_preview(jid, jobs)["offset"] for jid in ("s1", "s2", "s3", "s4")]
+        assert offsets == [0, 900, 1800, 2700]
+
+    def test_spread_interval_is_anchored(self, isolated_scheduler):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("s1", "echo", "shell", "elke 10 minuten")
+        sched.add_scheduled_job("s2", "echo", "shell", "elke 10 minuten")
+        sched.update_scheduled_job("s1", spread=True)
+        sched.update_scheduled_job("s2", spread=True)
+        preview = sched.schedule_preview("s2", sched.get_all_jobs())
+        assert preview["offset"] == 300
+        assert [t.minute % 10 for t in preview["times"]] == [5, 5, 5]
+        assert all(t.second == 0 for t in preview["times"])
+
+    def test_removing_peer_respreads(self, isolated_scheduler):
+        sched, mock_sched = isolated_scheduler
+        for jid in ("s1", "s2"):
+            sched.add_scheduled_job(jid, "echo", "shell", "elk uur")
+            sched.update_scheduled_job(jid, spread=True)
+        mock_sched.add_job.reset_mock()
+        sched.remove_scheduled_job("s1")
+        registered = [c.kwargs.get("id") for c in mock_sched.add_job.call_args_list]
+        assert registered == ["s2"]
+        assert sched.schedule_preview("s2", sched.get_all_jobs())["offset"] == 0
+
+    def test_preview_for_plain_interval_and_watch(self, isolated_scheduler):
+        sched, _ = isolated_scheduler
+        sched.add_scheduled_job("i1", "echo", "shell", "elke 5 minuten")
+        sched.add_scheduled_job("w1", "echo", "shell", "bij wijziging van *.txt")
+        jobs = sched.get_all_jobs()
+        assert sched.schedule_preview("i1", jobs)["times"] == []
+        assert sched.schedule_preview("w1", jobs) == {"offset": 0.0, "times": []}
+
+
+class TestJobPriority:
+    def test_job_runs_in_its_priority_class(self, isolated_scheduler, tmp_path, monkeypatch):
+        import regian.core.shell as shell
+        import regian.core.action_log as al
+        from regian.core.admission import current_class
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        sched, _ = isolated_scheduler
+        seen = []
+        real = shell.run_streaming
+        monkeypatch.setattr(shell, "run_streaming", lambda *a, **kw: seen.append(current_class()) or real(*a, **kw))
+        sched.add_scheduled_job("jp", "echo x", "shell", "elke 1 minuut")
+        sched._execute_job("jp")
+        sched.update_scheduled_job("jp", priority="maintenance")
+        sched._execute_job("jp")
+        assert seen == ["cron", "maintenance"]
@@ -0,0 +1,75 @@
+# tests/test_core_shell.py
+"""Tests voor regian/core/shell.py — streaming shell-uitvoering met roterende logs."""
+import time
+
+
+class TestRunStreaming:
+    def test_output_and_log(self, tmp_path):
+        from regian.core.shell import run_streaming
+        log = tmp_path / "x.log"
+        result = run_streaming("echo hallo; echo fout >&2", str(tmp_path), 10, log, header="$ test\n")
+        assert result.returncode == 0
+        assert result.stdout.strip() == "hallo"
+        assert result.stderr.strip() == "fout"
+        content = log.read_text(encoding="utf-8")
+        assert content.startswith("$ test\n")
+        assert "hallo" in content and "fout" in content
+
+    def test_tail_is_bounded(self, tmp_path, monkeypatch):
+        import regian.core.shell as shell
+        monkeypatch.setattr(shell, "_TAIL_BYTES", 100)
+        result = shell.run_streaming("seq 1 5000", str(tmp_path), 10, tmp_path / "big.log")
+        assert result.truncated is True
+        assert len(result.stdout) <= 100
+        assert result.stdout.strip().endswith("5000")
+        assert "\n1\n" in "\n" + (tmp_path / "big.log").read_text(encoding="utf-8")
+
+    def test_log_rotates(self, tmp_path, monkeypatch):
+        from regian.core.shell import run_streaming
+        monkeypatch.setenv("SHELL_LOG_MAX_BYTES", "2048")
+        monkeypatch.setenv("SHELL_LOG_BACKUPS", "2")
+        log = tmp_path / "r.log"
+        for _ in range(4):
+            run_streaming("seq 1 400", str(tmp_path), 10, log)
+        names = sorted(p.name for p in tmp_path.glob("r.log*"))
+        assert names == ["r.log", "r.log.1", "r.log.2"]
+        assert all(p.stat().st_size <= 2048 for p in tmp_path.glob("r.log*"))
+
+    def test_timeout_kills_process(self, tmp_path):
+        from regian.core.shell import run_streaming
+        start = time.monotonic()
+        result = run_streaming("echo begin; sleep 30", str(tmp_path), 0.5, tmp_path / "t.log")
+        assert result.timed_out is True
+        assert time.monotonic() - start < 10
+        assert "begin" in (tmp_path / "t.log").read_text(encoding="utf-8")
+
+    def test_without_log(self, tmp_path):
+        from regian.core.shell import run_streaming
+        result = run_streaming("exit 3", str(tmp_path), 10)
+        assert result.returncode == 3
+        assert result.log_path is None
+
+
+class TestLogHelpers:
+    def test_tail_log(self, tmp_path):
+        from regian.core.shell import tail_log
+        path = tmp_path / "a.log"
+        path.write_text("x" * 100 + "einde", encoding="utf-8")
+        assert tail_log(path, 5) == "einde"
+        assert tail_log(tmp_path / "bestaat_niet.log") == ""
+
+    def test_call_logs_pruned(self, monkeypatch):
+        import regian.core.shell as shell
+        monkeypatch.setattr(shell, "_MAX_CALL_LOGS", 3)
+        for _ in range(6):
+            shell.new_call_log_path().write_text("x", encoding="utf-8")
+        assert len(list((shell._get_log_dir() / "calls").glob("*.log"))) <= 4
+
+    def test_remove_job_logs(self):
+        import regian.core.shell as shell
+        path = shell.job_log_path("j1")
+        path.parent.mkdir(parents=True)
+        path.write_text("a", encoding="utf-8")
+        path.with_name("j1.log.1").write_text("b", encoding="utf-8")
+        shell.remove_job_logs("j1")
+        assert list(path.parent.iterdir()) == []
@@ -0,0 +1,184 @@
+# tests/test_core_usage.py
+"""Tests voor regian/core/usage.py — tokenboekhouding en budgetten (zonder echte LLM)."""
+import json
+import pytest
+from unittest.mock import MagicMock
+
+
+def _response(content="antwoord", usage=None):
+    resp = MagicMock()
+    resp.content = content
+    resp.usage_metadata = usage
+    return resp
+
+
+def _read_entries(tmp_path):
+    path = tmp_path / "usage.jsonl"
+    return [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+
+
+# ── estimate_tokens ───────────────────────────────────────────────────────────
+
+class TestEstimateTokens:
+    def test_empty_is_zero(self):
+        from regian.core.usage import estimate_tokens
+        assert estimate_tokens("") == 0
+        assert estimate_tokens(None) == 0
+
+    def test_short_text_is_at_least_one(self):
+        from regian.core.usage import estimate_tokens
+        assert estimate_tokens("a") == 1
+
+    def test_four_chars_per_token(self):
+        from regian.core.usage import estimate_tokens
+        assert estimate_tokens("x" * 400) == 100
+
+    def test_message_list(self):
+        from regian.core.usage import estimate_tokens
+        from langchain_core.messages import HumanMessage, SystemMessage
+        msgs = [SystemMessage(content="x" * 40), HumanMessage(content="y" * 40)]
+        assert estimate_tokens(msgs) == 20
+
+
+# ── invoke_llm ────────────────────────────────────────────────────────────────
+
+class TestInvokeLlm:
+    def test_uses_provider_metadata(self, tmp_path):
+        from regian.core.usage import invoke_llm
+        llm = MagicMock()
+        llm.model = "gemini-2.5-flash"
+        llm.invoke.return_value = _response(usage={"input_tokens": 12, "output_tokens": 30, "total_tokens": 42})
+        invoke_llm(llm, ["hallo"])
+        entry = _read_entries(tmp_path)[0]
+        assert entry["input_tokens"] == 12
+        assert entry["output_tokens"] == 30
+        assert entry["total_tokens"] == 42
+        assert entry["estimated"] is False
+        assert entry["model"] == "gemini-2.5-flash"
+
+    def test_falls_back_to_estimator(self, tmp_path):
+        from regian.core.usage import invoke_llm
+        llm = MagicMock()
+        llm.invoke.return_value = _response(content="y" * 80)
+        invoke_llm(llm, ["x" * 40])
+        entry = _read_entries(tmp_path)[0]
+        assert entry["input_tokens"] == 10
+        assert entry["output_tokens"] == 20
+        assert entry["estimated"] is True
+
+    def test_returns_response(self):
+        from regian.core.usage import invoke_llm
+        llm = MagicMock()
+        resp = _response()
+        llm.invoke.return_value = resp
+        assert invoke_llm(llm, ["x"]) is resp
+
+    def test_attribution_from_scope(self, tmp_path):
+        from regian.core.usage import invoke_llm, usage_scope
+        llm = MagicMock()
+        llm.invoke.return_value = _response()
+        with usage_scope(source="workflow", project="proj_a", run_id="run1"):
+            with usage_scope(job_id="job1"):
+                invoke_llm(llm, ["x"])
+        entry = _read_entries(tmp_path)[0]
+        assert entry["source"] == "workflow"
+        assert entry["project"] == "proj_a"
+        assert entry["run_id"] == "run1"
+        assert entry["job_id"] == "job1"
+
+    def test_default_source_is_chat(self, tmp_path, monkeypatch):
+        from regian.core.usage import invoke_llm
+        monkeypatch.setenv("ACTIVE_PROJECT", "actief")
+        llm = MagicMock()
+        llm.invoke.return_value = _response()
+        invoke_llm(llm, ["x"])
+        entry = _read_entries(tmp_path)[0]
+        assert entry["source"] == "chat"
+        assert entry["project"] == "actief"
+
+    def test_cost_from_prices(self, tmp_path, monkeypatch):
+        from regian.core.usage import invoke_llm
+        monkeypatch.setenv("TOKEN_PRICES", json.dumps({"m1": {"input": 1.0, "output": 2.0}}))
+        llm = MagicMock()
+        llm.model = "m1"
+        llm.invoke.return_value = _response(usage={"input_tokens": 1_000_000, "output_tokens": 1_000_000})
+        invoke_llm(llm, ["x"])
+        assert _read_entries(tmp_path)[0]["cost"] == pytest.approx(3.0)
+
+
+# ── Budgetten ─────────────────────────────────────────────────────────────────
+
+class TestBudgets:
+    def test_scope_budget_blocks_next_call(self):
+        from regian.core.usage import invoke_llm, usage_scope, TokenBudgetExceeded
+        llm = MagicMock()
+        llm.invoke.return_value = _response(usage={"input_tokens": 60, "output_tokens": 60})
+        with usage_scope(source="cron", job_id="j", budget=100) as scope:
+            invoke_llm(llm, ["x"])
+            with pytest.raises(TokenBudgetExceeded):
+                invoke_llm(llm, ["x"])
+        assert scope["exceeded"] is True
+        assert llm.invoke.call_count == 1
+
+    def test_usage_propagates_to_parent_scope(self):
+        from regian.core.usage import invoke_llm, usage_scope
+        llm = MagicMock()
+        llm.invoke.return_value = _response(usage={"input_tokens": 5, "output_tokens": 5})
+        with usage_scope(source="workflow") as outer:
+            with usage_scope(budget=1000) as inner:
+                invoke_llm(llm, ["x"])
+        assert inner["used"] == 10
+        assert outer["used"] == 10
+
+    def test_project_daily_budget(self, monkeypatch):
+        from regian.core.usage import invoke_llm, usage_scope, TokenBudgetExceeded
+        monkeypatch.setenv("TOKEN_BUDGET_DAILY", "50")
+        llm = MagicMock()
+        llm.invoke.return_value = _response(usage={"input_tokens": 40, "output_tokens": 20})
+        with usage_scope(project="p1"):
+            invoke_llm(llm, ["x"])
+            with pytest.raises(TokenBudgetExceeded, match="p1"):
+                invoke_llm(llm, ["x"])
+        # Een ander project heeft zijn eigen budget
+        with usage_scope(project="p2"):
+            invoke_llm(llm, ["x"])
+
+    def test_manifest_budget_overrides_default(self, tmp_root, monkeypatch):
+        from regian.core.usage import project_budget
+        monkeypatch.setenv("TOKEN_BUDGET_DAILY", "50")
+        proj = tmp_root / "proj_b"
+        proj.mkdir()
+        (proj / ".regian_project.json").write_text(
+            json.dumps({"name": "proj_b", "path": str(proj), "token_budget": 999}), encoding="utf-8"
+        )
+        assert project_budget("proj_b") == 999
+        assert project_budget("onbekend") == 50
+
+    def test_project_usage_today_is_incremental(self):
+        from regian.core.usage import record_usage, project_usage_today, usage_scope
+        with usage_scope(project="inc"):
+            record_usage(10, 5)
+            assert project_usage_today("inc") == 15
+            record_usage(1, 1)
+            assert project_usage_today("inc") == 17
+
+
+# ── Rapportering ──────────────────────────────────────────────────────────────
+
+class TestSummarize:
+    def test_groups_by_source(self):
+        from regian.core.usage import record_usage, summarize_usage, usage_scope
+        with usage_scope(source="cron"):
+            record_usage(10, 10)
+            record_usage(5, 5)
+        with usage_scope(source="chat"):
+            record_usage(1, 1)
+        rows = summarize_usage(group_by="source")
+        assert rows[0]["key"] == "cron"
+        assert rows[0]["calls"] == 2
+        assert rows[0]["total_tokens"] == 30
+        assert rows[1]["key"] == "chat"
+
+    def test_empty_when_no_file(self):
+        from regian.core.usage import summarize_usage
+        assert summarize_usage() == []
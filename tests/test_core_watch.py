@@ -0,0 +1,165 @@
+# tests/test_core_watch.py
+"""Tests voor regian/core/watch.py — bestandstriggers met debounce en batching."""
+import os
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def watcher():
+    from regian.core.watch import Watcher
+    fired = []
+    return Watcher(fired.append), fired
+
+
+def _touch(path, content="x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+class TestParse:
+    def test_parse_schedule_keeps_case(self, tmp_path):
+        from regian.core.scheduler import parse_schedule
+        from regian.core.watch import WatchTrigger
+        trigger = parse_schedule("bij wijziging van Uploads/*.CSV", tmp_path)
+        assert isinstance(trigger, WatchTrigger)
+        assert trigger.glob == str(tmp_path / "Uploads" / "*.CSV")
+
+    def test_english_and_absolute(self, tmp_path):
+        from regian.core.scheduler import parse_schedule
+        trigger = parse_schedule(f"on change of {tmp_path}/*.md")
+        assert trigger.glob == f"{tmp_path}/*.md"
+
+    def test_relative_without_root_uses_workspace(self, monkeypatch, tmp_path):
+        from regian.core.watch import WatchTrigger
+        monkeypatch.setenv("REGIAN_ROOT_DIR", str(tmp_path))
+        assert WatchTrigger("in/*.txt").glob == str(tmp_path / "in" / "*.txt")
+
+
+class TestWatcher:
+    def test_existing_files_do_not_fire(self, watcher, tmp_path):
+        from regian.core.watch import WatchTrigger
+        w, fired = watcher
+        _touch(tmp_path / "a.csv")
+        w.add("j", WatchTrigger("*.csv", tmp_path))
+        assert w.check(now=100.0) == []
+        assert fired == []
+
+    def test_debounce_and_batch(self, watcher, tmp_path, monkeypatch):
+        from regian.core.watch import WatchTrigger
+        monkeypatch.setenv("WATCH_DEBOUNCE_SECONDS", "5")
+        w, fired = watcher
+        w.add("j", WatchTrigger("*.csv", tmp_path))
+        _touch(tmp_path / "a.csv")
+        assert w.check(now=100.0) == []          # wijziging gezien, nog niet stil
+        _touch(tmp_path / "b.csv")
+        _touch(tmp_path / "negeer.txt")
+        assert w.check(now=103.0) == []          # nieuwe wijziging verlengt de wachttijd
+        assert w.check(now=109.0) == ["j"]
+        assert fired == ["j"]
+        assert sorted(os.path.basename(p) for p in w.take("j")) == ["a.csv", "b.csv"]
+        assert w.take("j") == []
+
+    def test_modified_file_fires(self, watcher, tmp_path, monkeypatch):
+        from regian.core.watch import WatchTrigger
+        monkeypatch.setenv("WATCH_DEBOUNCE_SECONDS", "0")
+        w, fired = watcher
+        path = tmp_path / "a.csv"
+        _touch(path, "1")
+        w.add("j", WatchTrigger("*.csv", tmp_path))
+        _touch(path, "12")
+        assert w.check(now=1.0) == ["j"]
+        assert w.take("j") == [str(path)]
+
+    def test_untaken_batch_not_refired_immediately(self, watcher, tmp_path, monkeypatch):
+        from regian.core.watch import WatchTrigger, _REFIRE_AFTER
+        monkeypatch.setenv("WATCH_DEBOUNCE_SECONDS", "0")
+        w, fired = watcher
+        w.add("j", WatchTrigger("*.csv", tmp_path))
+        _touch(tmp_path / "a.csv")
+        w.check(now=1.0)
+        w.check(now=2.0)
+        assert fired == ["j"]
+        w.check(now=2.0 + _REFIRE_AFTER)
+        assert fired == ["j", "j"]
+
+    def test_recursive_glob(self, watcher, tmp_path, monkeypatch):
+        from regian.core.watch import WatchTrigger
+        monkeypatch.setenv("WATCH_DEBOUNCE_SECONDS", "0")
+        w, _ = watcher
+        w.add("j", WatchTrigger("docs/**/*.md", tmp_path))
+        _touch(tmp_path / "docs" / "a" / "b" / "x.md")
+        assert w.check(now=1.0) == ["j"]
+
+    def test_remove(self, watcher, tmp_path):
+        from regian.core.watch import WatchTrigger
+        w, _ = watcher
+        w.add("j", WatchTrigger("*.csv", tmp_path))
+        w.remove("j")
+        assert w.watched() == {}
+
+
+class TestWithAPScheduler:
+    def test_job_fires_on_demand_and_stays_scheduled(self, tmp_path):
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from regian.core.watch import WatchTrigger
+        ran = threading.Event()
+        sched = BackgroundScheduler()
+        sched.start()
+        try:
+            sched.add_job(ran.set, trigger=WatchTrigger("*.csv", tmp_path), id="w")
+            time.sleep(0.2)
+            assert not ran.is_set()
+            sched.modify_job("w", next_run_time=datetime.now(sched.timezone))
+            assert ran.wait(5)
+            time.sleep(0.2)
+            assert sched.get_job("w") is not None
+        finally:
+            sched.shutdown(wait=False)
+
+
+class TestSchedulerIntegration:
+    @pytest.fixture
+    def sched(self, tmp_path, monkeypatch):
+        import regian.core.scheduler as sched
+        import regian.core.action_log as al
+        monkeypatch.setattr(sched, "_get_jobs_file", lambda: tmp_path / "jobs.json")
+        monkeypatch.setattr(sched, "get_scheduler", lambda: MagicMock())
+        monkeypatch.setattr(al, "_get_log_file", lambda: tmp_path / "log.jsonl")
+        monkeypatch.setenv("WATCH_DEBOUNCE_SECONDS", "0")
+        return sched
+
+    def test_add_registers_watch_with_root(self, sched, tmp_root):
+        from regian.core.watch import get_watcher
+        sched.add_scheduled_job("jw", "echo", "shell", "bij wijziging van in/*.csv")
+        assert sched.get_all_jobs()["jw"]["watch_root"] == str(tmp_root)
+        assert get_watcher().watched() == {"jw": str(tmp_root / "in" / "*.csv")}
+        sched.remove_scheduled_job("jw")
+        assert get_watcher().watched() == {}
+
+    def test_shell_job_gets_changed_files(self, sched, tmp_root):
+        from regian.core.watch import get_watcher
+        sched.add_scheduled_job("jw", "echo {files}; echo \"$REGIAN_CHANGED_FILES\" | wc -l",
+                                "shell", "bij wijziging van *.csv")
+        _touch(tmp_root / "a b.csv")
+        _touch(tmp_root / "c.csv")
+        assert get_watcher().check(now=1.0) == ["jw"]
+        sched._execute_job("jw")
+        output = sched.get_all_jobs()["jw"]["last_output"]
+        assert "a b.csv" in output and "c.csv" in output
+        assert output.strip().endswith("2")
+
+    def test_toggle_off_stops_watching(self, sched, tmp_root):
+        from regian.core.watch import get_watcher
+        sched.add_scheduled_job("jw", "echo", "shell", "bij wijziging van *.csv")
+        sched.toggle_scheduled_job("jw", False)
+        assert "jw" not in get_watcher().watched()
+        sched.toggle_scheduled_job("jw", True)
+        assert "jw" in get_watcher().watched()
+
+    def test_min_gap_is_zero(self, sched):
+        assert sched._min_gap({"schedule": "bij wijziging van *.csv"}) == 0.0
@@ -124,6 +124,40 @@ class TestLoadWorkflow:
         ids = [w["id"] for w in items]
         assert "van_idee_tot_mvp" in ids
 
+    def test_cache_tot_bestand_wijzigt(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        wdir = tmp_path / ".regian_workflow"
+        wdir.mkdir()
+        path = wdir / "abc.json"
+        path.write_text(json.dumps({"id": "abc", "name": "Oud", "phases": []}), encoding="utf-8")
+        monkeypatch.setattr(wf_mod, "_workflow_dir", lambda pp="": wdir)
+        first = wf_mod.load_workflow("abc")
+        assert wf_mod.load_workflow("abc") is first
+        path.write_text(json.dumps({"id": "abc", "name": "Nieuwe naam", "phases": []}), encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert wf_mod.load_workflow("abc")["name"] == "Nieuwe naam"
+
+    def test_ongeldige_template_gooit_valueerror(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        wdir = tmp_path / ".regian_workflow"
+        wdir.mkdir()
+        tpl = {"id": "dubbel", "phases": [{"id": "a", "type": "llm_prompt"}, {"id": "a", "type": "tool_chain"}]}
+        (wdir / "dubbel.json").write_text(json.dumps(tpl), encoding="utf-8")
+        monkeypatch.setattr(wf_mod, "_workflow_dir", lambda pp="": wdir)
+        with pytest.raises(ValueError, match="'a'"):
+            wf_mod.load_workflow("dubbel")
+        run = wf_mod.WorkflowRun(
+            run_id="x", workflow_id="dubbel", workflow_name="D", started_at="", updated_at="",
+            status="running", current_phase_index=0, artifacts={}, phase_log=[], input="",
+        )
+        assert wf_mod._get_phases(run) == []
+
+    def test_ongeldige_parallelle_groep(self):
+        from regian.core.workflow import validate_workflow
+        with pytest.raises(ValueError, match="task_loop"):
+            validate_workflow({"phases": [{"id": "g", "type": "parallel", "phases": [{"id": "t", "type": "task_loop"}]}]})
+
 
 # ── State persistentie ────────────────────────────────────────────────────────
 
@@ -201,6 +235,15 @@ class TestRenderTemplate:
         from regian.core.workflow import _render_template
         assert _render_template("Gewone tekst", {"x": "y"}) == "Gewone tekst"
 
+    def test_template_wordt_één_keer_gecompileerd(self):
+        from regian.core.workflow import _compile_text, _render_template
+        text = "Uniek {{a}} en {{b}} — test_template_wordt_één_keer_gecompileerd"
+        assert _compile_text(text) == ("Uniek ", "a", " en ", "b", text[text.index(" —"):])
+        misses = _compile_text.cache_info().misses
+        for i in range(3):
+            assert _render_template(text, {"a": i, "b": None}).startswith(f"Uniek {i} en None")
+        assert _compile_text.cache_info().misses == misses
+
 
 # ── Human checkpoint fase ─────────────────────────────────────────────────────
 
@@ -404,8 +447,570 @@ class TestAdvanceFlow:
         assert "proj_wf" in ids
 
 
+# ── Parallelle groepen ────────────────────────────────────────────────────────
+
+def _parallel_template(require_approval: bool = False) -> dict:
+    return {
+        "id": "docs_wf", "name": "Documenten", "description": "", "version": "1.0",
+        "phases": [
+            {
+                "id": "docs", "name": "Documenten", "type": "parallel",
+                "require_approval": require_approval,
+                "phases": [
+                    {"id": "prd", "type": "llm_prompt", "prompt_template": "PRD voor {{input}}",
+                     "output_key": "prd"},
+                    {"id": "arch", "type": "llm_prompt", "prompt_template": "Architectuur voor {{input}}",
+                     "output_key": "architecture"},
+                    {"id": "tests", "type": "llm_prompt", "prompt_template": "Testplan voor {{prd}}",
+                     "output_key": "test_plan"},
+                ],
+            },
+            {"id": "check", "name": "Controle", "type": "human_checkpoint",
+             "prompt": "{{prd}} / {{architecture}} / {{test_plan}}"},
+        ],
+    }
+
+
+class _SlowLLM:
+    """Nep-LLM die elke aanroep even laat duren en het gelijktijdige maximum bijhoudt."""
+
+    def __init__(self, delay: float = 0.2):
+        import threading
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        import time
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return MagicMock(content=f"antwoord op {messages[-1].content}", usage_metadata=None)
+
+
+class TestParallelGroups:
+    def test_inputs_from_placeholders_or_field(self):
+        from regian.core.workflow import phase_inputs
+        assert phase_inputs({"prompt_template": "{{input}} en {{prd}} en {{input}}"}) == ["input", "prd"]
+        assert phase_inputs({"steps": [{"tool": "write_file", "args": {"content": "{{prd}}"}}]}) == ["prd"]
+        assert phase_inputs({"inputs": ["a"], "prompt_template": "{{b}}"}) == ["a"]
+
+    def test_plan_waves(self):
+        from regian.core.workflow import plan_parallel
+        branches = _parallel_template()["phases"][0]["phases"]
+        waves = plan_parallel(branches)
+        assert [[b["id"] for b in wave] for wave in waves] == [["prd", "arch"], ["tests"]]
+
+    def test_plan_rejects_cycle_and_checkpoint(self):
+        from regian.core.workflow import plan_parallel
+        with pytest.raises(ValueError, match="Cyclische"):
+            plan_parallel([
+                {"id": "a", "type": "llm_prompt", "inputs": ["y"], "output_key": "x"},
+                {"id": "b", "type": "llm_prompt", "inputs": ["x"], "output_key": "y"},
+            ])
+        with pytest.raises(ValueError, match="human_checkpoint"):
+            plan_parallel([{"id": "c", "type": "human_checkpoint"}])
+
+    def test_branches_run_concurrently_and_join(self, tmp_path, monkeypatch):
+        import time
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = _parallel_template()
+        tpl["phases"][0]["phases"] = tpl["phases"][0]["phases"][:2]
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        llm = _SlowLLM(delay=0.3)
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        t0 = time.perf_counter()
+        run = wf_mod.start_workflow("docs_wf", "een app")
+        assert time.perf_counter() - t0 < 0.55
+        assert llm.peak == 2
+        assert run.status == "waiting" and run.current_phase_index == 1
+        assert run.artifacts["prd"] == "antwoord op PRD voor een app"
+        assert run.artifacts["architecture"] == "antwoord op Architectuur voor een app"
+        group = run.phase_log[0]
+        assert group["phase_id"] == "docs" and group["status"] == "done"
+        assert [b["phase_id"] for b in group["branches"]] == ["prd", "arch"]
+
+    def test_dependent_branch_sees_joined_artifact(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = _parallel_template()
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: _SlowLLM(delay=0))
+        run = wf_mod.start_workflow("docs_wf", "x")
+        assert run.artifacts["test_plan"] == "antwoord op Testplan voor antwoord op PRD voor x"
+
+    def test_max_parallel_limits_threads(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        monkeypatch.setenv("WORKFLOW_MAX_PARALLEL", "1")
+        tpl = _parallel_template()
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        llm = _SlowLLM(delay=0.05)
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        wf_mod.start_workflow("docs_wf", "x")
+        assert llm.peak == 1
+
+    def test_failed_branch_sets_error_and_skips_later_waves(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = _parallel_template()
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        llm = _SlowLLM(delay=0)
+        real_invoke = llm.invoke
+
+        def invoke(messages):
+            if "Architectuur" in messages[-1].content:
+                raise RuntimeError("LLM kapot")
+            return real_invoke(messages)
+        llm.invoke = invoke
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        run = wf_mod.start_workflow("docs_wf", "x")
+        assert run.status == "error"
+        group = run.phase_log[-1]
+        assert "arch" in group["output"]
+        assert {b["phase_id"]: b["status"] for b in group["branches"]} == {
+            "prd": "done", "arch": "error", "tests": "skipped"}
+        assert run.artifacts["prd"].startswith("antwoord")
+        assert "architecture" not in run.artifacts
+
+    def test_group_approval_pauses_after_join(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = _parallel_template(require_approval=True)
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: _SlowLLM(delay=0))
+        run = wf_mod.create_run("docs_wf", "x")
+        run = wf_mod.advance_one_phase(run.run_id)
+        assert run.status == "waiting" and run.current_phase_index == 0
+        assert {"prd", "architecture", "test_plan"} <= set(run.artifacts)
+        assert len(run.phase_log) == 1 and len(run.phase_log[0]["branches"]) == 3
+        assert "### prd" in run.phase_log[0]["output"]
+
+    def test_branches_attributed_to_run(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        from regian.core.usage import current_attribution
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = _parallel_template()
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        seen = []
+
+        class _Recorder(_SlowLLM):
+            def invoke(self, messages):
+                seen.append(current_attribution())
+                return super().invoke(messages)
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: _Recorder(delay=0))
+        run = wf_mod.start_workflow("docs_wf", "x")
+        assert len(seen) == 3
+        assert all(a["source"] == "workflow" and a["run_id"] == run.run_id for a in seen)
+
+
 # ── Cancel run ────────────────────────────────────────────────────────────────
 
+class _FakeOrchestrator:
+    """Nep-OrchestratorAgent: plant write_file naar het pad in de taak ('taak:pad'), of niets."""
+
+    def __init__(self, delay: float = 0.1):
+        import threading
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.order = []
+        self._lock = threading.Lock()
+
+    def _busy(self, label):
+        import time
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.order.append(label)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+
+    def plan(self, task):
+        self._busy(f"plan {task}")
+        if ":" not in task:
+            return []
+        path = task.split(":", 1)[1]
+        tool = "run_shell" if path == "shell" else "write_file"
+        return [{"tool": tool, "args": {"path": path, "content": task}}]
+
+    def execute_plan(self, plan, source="chat", group_id=None):
+        self._busy(f"exec {plan[0]['args']['content']}")
+        return f"uitgevoerd {plan[0]['args']['content']}"
+
+    def answer(self, task):
+        return f"antwoord {task}"
+
+    def run(self, task):
+        return self.answer(task)
+
+
+class TestTaskLoopParallel:
+    def _run(self, wf_mod, tasks):
+        return wf_mod.WorkflowRun(
+            run_id="tl", workflow_id="wf", workflow_name="Wf",
+            started_at="2026-01-01T10:00:00", updated_at="2026-01-01T10:00:00",
+            status="running", current_phase_index=0,
+            artifacts={"task_list": "\n".join(f"{i}. {t}" for i, t in enumerate(tasks, 1))},
+            phase_log=[], input="", project_path="",
+        )
+
+    def test_plan_task_waves(self):
+        from regian.core.workflow import plan_task_waves
+        assert plan_task_waves([{"/a"}, {"/b"}, {"/a/x"}, set()]) == [[0, 1, 3], [2]]
+        assert plan_task_waves([{"/a"}, None, {"/b"}]) == [[0], [1], [2]]
+        assert plan_task_waves([None, None], independent=True) == [[0, 1]]
+
+    def test_plan_paths(self, tmp_path):
+        from regian.core.workflow import _plan_paths
+        base = str(tmp_path)
+        assert _plan_paths([{"tool": "write_file", "args": {"path": "a/b.txt"}}], base) == {str(tmp_path / "a" / "b.txt")}
+        assert _plan_paths([{"tool": "rename_file", "args": {"path": "a/b", "new_name": "c"}}], base) == {
+            str(tmp_path / "a" / "b"), str(tmp_path / "a" / "c")}
+        assert _plan_paths([{"tool": "list_projects", "args": {}}], base) is None
+        assert _plan_paths([{"tool": "run_shell", "args": {"command": "ls", "path": "x"}}], base) is None
+
+    def test_disjoint_tasks_run_concurrently_in_order(self, monkeypatch):
+        import regian.core.agent as agent_mod
+        from regian.core import workflow as wf_mod
+        orch = _FakeOrchestrator()
+        monkeypatch.setattr(agent_mod, "OrchestratorAgent", lambda: orch)
+        tasks = ["een:a.txt", "twee:b.txt", "drie:a.txt", "vraag"]
+        out = wf_mod._run_task_loop({"id": "impl", "parallel": True}, self._run(wf_mod, tasks).artifacts,
+                                    self._run(wf_mod, tasks))
+        blocks = out.split("\n\n---\n\n")
+        assert [b.splitlines()[0] for b in blocks] == [f"**Taak {i}/4:** {t}" for i, t in enumerate(tasks, 1)]
+        assert blocks[3].endswith("antwoord vraag")
+        assert orch.peak >= 2
+        # drie schrijft hetzelfde bestand als een en loopt daarom pas erna
+        assert orch.order.index("exec drie:a.txt") > orch.order.index("exec een:a.txt")
+        assert wf_mod.task_progress("tl") is None
+
+    def test_unknown_paths_serialize_and_limit_applies(self, monkeypatch):
+        import regian.core.agent as agent_mod
+        from regian.core import workflow as wf_mod
+        orch = _FakeOrchestrator(delay=0.05)
+        monkeypatch.setattr(agent_mod, "OrchestratorAgent", lambda: orch)
+        tasks = ["a:shell", "b:shell", "c:shell"]
+        run = self._run(wf_mod, tasks)
+        wf_mod._run_task_loop({"id": "impl", "parallel": True, "max_parallel": 2}, run.artifacts, run)
+        execs = [o for o in orch.order if o.startswith("exec")]
+        assert execs == ["exec a:shell", "exec b:shell", "exec c:shell"]
+        assert orch.peak <= 2
+
+    def test_progress_events(self, monkeypatch):
+        import regian.core.agent as agent_mod
+        from regian.core import workflow as wf_mod
+        seen = []
+        orch = _FakeOrchestrator(delay=0)
+        original = orch.execute_plan
+
+        def execute_plan(plan, **kw):
+            seen.append(wf_mod.task_progress("tl"))
+            return original(plan, **kw)
+        orch.execute_plan = execute_plan
+        monkeypatch.setattr(agent_mod, "OrchestratorAgent", lambda: orch)
+        run = self._run(wf_mod, ["een:a", "twee:b"])
+        wf_mod._run_task_loop({"id": "impl"}, run.artifacts, run)
+        assert seen[0] == {"phase_id": "impl", "total": 2, "done": 0, "running": [0]}
+        assert seen[1]["done"] == 1 and seen[1]["running"] == [1]
+
+
+class TestTaskCheckpoint:
+    """Per-taak checkpoints: een hervatte task_loop slaat afgewerkte taken over."""
+
+    @pytest.fixture
+    def setup(self, tmp_path, monkeypatch):
+        import regian.core.agent as agent_mod
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = {"id": "impl", "name": "Impl", "phases": [
+            {"id": "taken", "type": "tool_chain", "steps": [], "output_key": "task_list"},
+            {"id": "impl", "type": "task_loop", "output_key": "resultaat"},
+        ]}
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        orch = _FakeOrchestrator(delay=0)
+        monkeypatch.setattr(agent_mod, "OrchestratorAgent", lambda: orch)
+        return wf_mod, tpl, orch
+
+    def _crash_on(self, orch, content):
+        original = orch.execute_plan
+
+        def execute_plan(plan, **kw):
+            if plan[0]["args"]["content"] == content:
+                raise RuntimeError("proces gestopt")
+            return original(plan, **kw)
+        orch.execute_plan = execute_plan
+        return original
+
+    def _started(self, wf_mod, tasks):
+        run = wf_mod.create_run("impl", "x")
+        run.artifacts["task_list"] = "\n".join(f"- {t}" for t in tasks)
+        run.current_phase_index = 1
+        wf_mod.save_run(run)
+        return run
+
+    def test_resume_skips_finished_tasks(self, setup):
+        wf_mod, tpl, orch = setup
+        run = self._started(wf_mod, ["een:a", "twee:b", "drie:c", "vier:d"])
+        original = self._crash_on(orch, "drie:c")
+        crashed = wf_mod.advance_one_phase(run.run_id)
+        assert crashed.status == wf_mod.STATUS_ERROR
+        state = wf_mod.load_run(run.run_id).task_state
+        assert sorted(state["results"]) == ["0", "1"] and state["phase_id"] == "impl"
+
+        orch.execute_plan = original
+        orch.order.clear()
+        done = wf_mod.rerun_from(run.run_id, "impl")
+        assert done.status == wf_mod.STATUS_DONE
+        assert [o for o in orch.order if o.startswith("exec")] == ["exec drie:c", "exec vier:d"]
+        assert "uitgevoerd een:a" in done.artifacts["resultaat"]
+        assert wf_mod.load_run(run.run_id).task_state == {}
+
+    def test_advance_one_phase_resumes_mid_loop(self, setup):
+        wf_mod, tpl, orch = setup
+        run = self._started(wf_mod, ["een:a", "twee:b", "drie:c"])
+        original = orch.execute_plan
+
+        class Killed(BaseException):
+            pass
+
+        def execute_plan(plan, **kw):
+            if plan[0]["args"]["content"] == "twee:b":
+                raise Killed()   # het proces stopt: geen error-status, de run blijft 'running'
+            return original(plan, **kw)
+        orch.execute_plan = execute_plan
+        with pytest.raises(Killed):
+            wf_mod.advance_one_phase(run.run_id)
+        from regian.core import runjournal
+        runjournal.forget(wf_mod._state_dir(), run.run_id)   # nieuw proces: enkel wat op schijf staat
+        orch.execute_plan = original
+        orch.order.clear()
+        resumed = wf_mod.advance_one_phase(run.run_id)
+        assert resumed.status == wf_mod.STATUS_DONE
+        assert [o for o in orch.order if o.startswith("exec")] == ["exec twee:b", "exec drie:c"]
+
+    def test_changed_task_list_starts_over(self, setup):
+        wf_mod, tpl, orch = setup
+        run = self._started(wf_mod, ["een:a", "twee:b"])
+        original = self._crash_on(orch, "twee:b")
+        wf_mod.advance_one_phase(run.run_id)
+        orch.execute_plan = original
+        wf_mod.set_artifact(run.run_id, "task_list", "- een:a\n- drie:c")
+        orch.order.clear()
+        wf_mod.rerun_from(run.run_id, "impl")
+        assert [o for o in orch.order if o.startswith("exec")] == ["exec een:a", "exec drie:c"]
+
+    def test_parallel_resume(self, setup):
+        wf_mod, tpl, orch = setup
+        tpl["phases"][1]["parallel"] = True
+        run = self._started(wf_mod, ["een:a", "twee:b", "drie:a"])
+        original = self._crash_on(orch, "drie:a")
+        wf_mod.advance_one_phase(run.run_id)
+        assert sorted(wf_mod.load_run(run.run_id).task_state["results"]) == ["0", "1"]
+        orch.execute_plan = original
+        orch.order.clear()
+        done = wf_mod.rerun_from(run.run_id, "impl")
+        assert orch.order == ["plan drie:a", "exec drie:a"]
+        assert done.artifacts["resultaat"].count("uitgevoerd") == 3
+
+
+class _ShortLLM:
+    """Nep-LLM die elke prompt bewaart en een kort vast antwoord geeft."""
+
+    def __init__(self):
+        import threading
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.prompts.append(messages[-1].content)
+        return MagicMock(content="kort " * 20, usage_metadata=None)
+
+
+class TestMapReduce:
+    def _run(self, wf_mod, source):
+        return wf_mod.WorkflowRun(
+            run_id="mr", workflow_id="wf", workflow_name="Wf",
+            started_at="2026-01-01T10:00:00", updated_at="2026-01-01T10:00:00",
+            status="running", current_phase_index=0,
+            artifacts={"input": source, "doel": "een verslag"}, phase_log=[], input="", project_path="",
+        )
+
+    def test_split_chunks(self):
+        from regian.core.workflow import split_chunks
+        paras = [f"alinea {i} " + "x" * 80 for i in range(10)]
+        chunks = split_chunks("\n\n".join(paras), max_tokens=50)
+        assert all(len(c) <= 200 for c in chunks)
+        assert len(chunks) == 5 and chunks[0] == "\n\n".join(paras[:2])
+        long_line = split_chunks("y" * 450, max_tokens=50)
+        assert [len(c) for c in long_line] == [200, 200, 50]
+        assert split_chunks("  \n ", max_tokens=50) == []
+
+    def test_map_runs_concurrently_then_reduces(self, monkeypatch):
+        from regian.core import workflow as wf_mod
+        llm = _SlowLLM(delay=0.1)
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        source = "\n\n".join(f"deel {i} " + "z" * 150 for i in range(6))
+        phase = {"id": "mr", "type": "map_reduce", "chunk_tokens": 50, "max_parallel": 3,
+                 "map_prompt": "Vat samen ({{chunk_index}}/{{chunk_count}}): {{chunk}}",
+                 "reduce_prompt": "Maak {{doel}} van:\n{{results}}"}
+        out, needs_approval = wf_mod.execute_phase(self._run(wf_mod, source), phase)
+        assert not needs_approval
+        assert 2 <= llm.peak <= 3
+        assert out.startswith("antwoord op Maak een verslag van:\n### Deel 1/")
+        assert "antwoord op Vat samen (6/6): deel 5" in out
+
+    def test_hierarchical_reduce(self, monkeypatch):
+        from regian.core import workflow as wf_mod
+        llm = _ShortLLM()
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        source = "\n\n".join("p" * 180 for _ in range(8))
+        phase = {"id": "mr", "type": "map_reduce", "chunk_tokens": 50,
+                 "map_prompt": "M:{{chunk}}", "reduce_prompt": "R:{{results}}"}
+        wf_mod._run_map_reduce(phase, self._run(wf_mod, source))
+        reduces = [p for p in llm.prompts if p.startswith("R:")]
+        assert len([p for p in llm.prompts if p.startswith("M:")]) == 8
+        # 8 → 4 → 2 → 1 deelresultaten, daarna de laatste reduce
+        assert len(reduces) == 8
+        assert reduces[-1].count("### Deel") == 1
+
+    def test_revision_only_in_final_reduce(self, monkeypatch):
+        from regian.core import workflow as wf_mod
+        llm = _ShortLLM()
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        source = "\n\n".join("p" * 180 for _ in range(8))
+        phase = {"id": "mr", "type": "map_reduce", "chunk_tokens": 50,
+                 "map_prompt": "M:{{chunk}}", "reduce_prompt": "R:{{results}}",
+                 "reduce_revision": "\n\nBijsturing: " + "b" * 400}
+        wf_mod._run_map_reduce(phase, self._run(wf_mod, source))
+        reduces = [p for p in llm.prompts if p.startswith("R:")]
+        assert len(reduces) == 8
+        assert [("Bijsturing" in p) for p in reduces] == [False] * 7 + [True]
+
+    def test_without_reduce_or_source(self, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: _ShortLLM())
+        run = self._run(wf_mod, "a\n\nb")
+        assert wf_mod._run_map_reduce({"id": "mr", "map_prompt": "{{chunk}}"}, run) == "kort " * 19 + "kort"
+        assert wf_mod._run_map_reduce({"id": "mr", "source_key": "leeg"}, run).startswith("⚠️")
+
+    def test_inputs_and_hash(self):
+        from regian.core.workflow import _hash_inputs, phase_inputs
+        phase = {"type": "map_reduce", "source_key": "transcript",
+                 "map_prompt": "{{chunk}} voor {{doel}}", "reduce_prompt": "{{results}} {{chunk_count}}"}
+        assert phase_inputs(phase) == ["doel"]
+        assert _hash_inputs(phase) == ["doel", "transcript"]
+
+
+class TestRerunFrom:
+    """rerun_from: enkel fasen met een gewijzigde input-hash lopen opnieuw."""
+
+    @pytest.fixture
+    def setup(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = {
+            "id": "inc", "name": "Incrementeel",
+            "phases": [
+                {"id": "a", "type": "llm_prompt", "prompt_template": "A: {{input}}", "output_key": "a_out"},
+                {"id": "b", "type": "llm_prompt", "prompt_template": "B: {{a_out}}", "output_key": "b_out"},
+                {"id": "c", "type": "llm_prompt", "prompt_template": "C: {{input}}", "output_key": "c_out"},
+            ],
+        }
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        prompts = []
+
+        def invoke(messages):
+            prompts.append(messages[-1].content)
+            return MagicMock(content=f"antwoord {len(prompts)} op {messages[-1].content}")
+        llm = MagicMock()
+        llm.invoke.side_effect = invoke
+        monkeypatch.setattr(wf_mod, "_get_llm", lambda: llm)
+        run = wf_mod.start_workflow("inc", "idee")
+        assert run.status == "done" and len(prompts) == 3
+        prompts.clear()
+        return wf_mod, tpl, run, prompts
+
+    def test_unchanged_run_reuses_everything(self, setup):
+        wf_mod, tpl, run, prompts = setup
+        rerun = wf_mod.rerun_from(run.run_id)
+        assert rerun.status == "done" and prompts == []
+        assert all(e.get("reused") for e in rerun.phase_log)
+        assert rerun.artifacts["b_out"] == run.artifacts["b_out"]
+        assert rerun.phase_cache == {}
+
+    def test_template_edit_recomputes_changed_phase_only(self, setup):
+        wf_mod, tpl, run, prompts = setup
+        tpl["phases"][1]["prompt_template"] = "B (kort): {{a_out}}"
+        tpl["phases"][2]["name"] = "Andere naam"
+        rerun = wf_mod.rerun_from(run.run_id)
+        assert len(prompts) == 1 and prompts[0].startswith("B (kort)")
+        assert [e["phase_id"] for e in rerun.phase_log if not e.get("reused")] == ["b"]
+
+    def test_edited_artifact_recomputes_dependents(self, setup):
+        wf_mod, tpl, run, prompts = setup
+        wf_mod.set_artifact(run.run_id, "a_out", "handmatig aangepast")
+        rerun = wf_mod.rerun_from(run.run_id, "b")
+        assert prompts == ["B: handmatig aangepast"]
+        assert rerun.artifacts["a_out"] == "handmatig aangepast"
+        assert [e["phase_id"] for e in rerun.phase_log] == ["a", "b", "c"]
+        assert rerun.phase_log[2].get("reused") and not rerun.phase_log[0].get("reused")
+
+    def test_full_rerun_from_phase(self, setup):
+        wf_mod, tpl, run, prompts = setup
+        wf_mod.rerun_from(run.run_id, "b", incremental=False)
+        assert [p[:2] for p in prompts] == ["B:", "C:"]
+
+    def test_model_change_recomputes(self, setup, monkeypatch):
+        wf_mod, tpl, run, prompts = setup
+        monkeypatch.setenv("LLM_MODEL", "ander-model")
+        wf_mod.rerun_from(run.run_id)
+        assert len(prompts) == 3
+
+    def test_background_rerun_clears_cache(self, setup, monkeypatch):
+        import regian.core.runqueue as runqueue
+        wf_mod, tpl, run, prompts = setup
+        monkeypatch.setattr(runqueue, "submit", lambda run_id, pp="": None)
+        rerun = wf_mod.rerun_from(run.run_id, background=True)
+        assert rerun.phase_cache
+        while rerun.status == "running":
+            rerun = wf_mod.advance_one_phase(rerun.run_id)
+        assert rerun.status == "done" and prompts == []
+        assert wf_mod.load_run(run.run_id).phase_cache == {}
+
+    def test_errors(self, setup):
+        wf_mod, tpl, run, prompts = setup
+        with pytest.raises(ValueError):
+            wf_mod.rerun_from(run.run_id, "bestaat_niet")
+        running = wf_mod.create_run("inc", "x")
+        with pytest.raises(ValueError):
+            wf_mod.rerun_from(running.run_id)
+
+    def test_approved_checkpoint_is_reused(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = {"id": "chk", "phases": [
+            {"id": "vraag", "type": "human_checkpoint", "prompt": "Keur goed: {{input}}"},
+            {"id": "tweede", "type": "human_checkpoint", "prompt": "Nog eens: {{input}}"},
+        ]}
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        run = wf_mod.start_workflow("chk", "idee")
+        run = wf_mod.advance_run(run.run_id)
+        assert run.status == "waiting" and run.current_phase_index == 1
+        # De eerste is goedgekeurd, de tweede (nog wachtend) niet
+        rerun = wf_mod.rerun_from(run.run_id)
+        assert rerun.status == "waiting" and rerun.current_phase_index == 1
+        assert rerun.phase_log[0].get("reused") and not rerun.phase_log[1].get("reused")
+
+
 class TestCancelRun:
     def test_cancel_zet_status_cancelled(self, tmp_path, monkeypatch):
         from regian.core import workflow as wf_mod
@@ -485,3 +485,241 @@ class TestAgentNameSettings:
         monkeypatch.setenv("AGENT_NAME", "")
         from regian.settings import get_agent_name
         assert get_agent_name() == "Reggy"
+
+
+# ── Token budget settings ──────────────────────────────────────────────────────
+
+class TestTokenBudgetSettings:
+    def test_budget_default_zero(self, monkeypatch):
+        monkeypatch.delenv("TOKEN_BUDGET_DAILY", raising=False)
+        from regian.settings import get_token_budget_daily
+        assert get_token_budget_daily() == 0
+
+    def test_budget_invalid_falls_back(self, monkeypatch):
+        monkeypatch.setenv("TOKEN_BUDGET_DAILY", "veel")
+        from regian.settings import get_token_budget_daily
+        assert get_token_budget_daily() == 0
+
+    def test_set_budget(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_token_budget_daily(2000)
+        assert s.get_token_budget_daily() == 2000
+
+    def test_prices_roundtrip(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_token_prices({"m": {"input": 1, "output": 2}})
+        assert s.get_token_prices() == {"m": {"input": 1, "output": 2}}
+
+    def test_prices_invalid_json(self, monkeypatch):
+        monkeypatch.setenv("TOKEN_PRICES", "{kapot")
+        from regian.settings import get_token_prices
+        assert get_token_prices() == {}
+
+
+# ── Profiling settings ─────────────────────────────────────────────────────────
+
+class TestProfilingSettings:
+    def test_defaults_empty(self):
+        from regian.settings import get_profile_tools, get_profile_phases
+        assert get_profile_tools() == set()
+        assert get_profile_phases() == set()
+
+    def test_set_tools_and_phases(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_profile_tools({"b", "a"})
+        s.set_profile_phases({"mvp:build"})
+        assert s.get_profile_tools() == {"a", "b"}
+        assert s.get_profile_phases() == {"mvp:build"}
+
+    def test_top_n(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        assert s.get_profile_top_n() == 20
+        s.set_profile_top_n(5)
+        assert s.get_profile_top_n() == 5
+        monkeypatch.setenv("PROFILE_TOP_N", "x")
+        assert s.get_profile_top_n() == 20
+
+
+# ── Metrics settings ───────────────────────────────────────────────────────────
+
+class TestMetricsSettings:
+    def test_defaults(self):
+        from regian.settings import get_metrics_port, get_metrics_host
+        assert get_metrics_port() == 0
+        assert get_metrics_host() == "127.0.0.1"
+
+    def test_set_port_and_host(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_metrics_port(9464)
+        s.set_metrics_host("0.0.0.0")
+        assert s.get_metrics_port() == 9464
+        assert s.get_metrics_host() == "0.0.0.0"
+
+
+# ── Scheduler concurrency settings ─────────────────────────────────────────────
+
+class TestSchedulerConcurrencySettings:
+    def test_defaults(self):
+        from regian.settings import get_scheduler_pool_sizes, get_llm_job_concurrency
+        assert get_scheduler_pool_sizes() == {"shell": 4, "command": 4, "prompt": 4}
+        assert get_llm_job_concurrency() == 2
+
+    def test_partial_pool_sizes_merged(self, monkeypatch):
+        monkeypatch.setenv("SCHEDULER_POOL_SIZES", '{"prompt": 1, "onbekend": 9}')
+        from regian.settings import get_scheduler_pool_sizes
+        assert get_scheduler_pool_sizes() == {"shell": 4, "command": 4, "prompt": 1}
+
+    def test_invalid_values_fall_back(self, monkeypatch):
+        monkeypatch.setenv("SCHEDULER_POOL_SIZES", "geen json")
+        monkeypatch.setenv("LLM_JOB_CONCURRENCY", "veel")
+        from regian.settings import get_scheduler_pool_sizes, get_llm_job_concurrency
+        assert get_scheduler_pool_sizes()["shell"] == 4
+        assert get_llm_job_concurrency() == 2
+
+    def test_set_roundtrip(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_scheduler_pool_sizes({"shell": 2, "command": 3, "prompt": 1})
+        s.set_llm_job_concurrency(3)
+        assert s.get_scheduler_pool_sizes() == {"shell": 2, "command": 3, "prompt": 1}
+        assert s.get_llm_job_concurrency() == 3
+
+
+class TestJobHistorySettings:
+    def test_default(self):
+        from regian.settings import get_job_history_size
+        assert get_job_history_size() == 50
+
+    def test_set(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_job_history_size(10)
+        assert s.get_job_history_size() == 10
+
+
+class TestAdmissionSettings:
+    def test_defaults(self):
+        from regian.settings import get_admission_llm_slots, get_admission_exec_slots
+        assert get_admission_llm_slots() == 4
+        assert get_admission_exec_slots() == 4
+
+    def test_set_and_minimum(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_admission_llm_slots(8)
+        s.set_admission_exec_slots(0)
+        assert s.get_admission_llm_slots() == 8
+        assert s.get_admission_exec_slots() == 1
+
+
+class TestJobJitterSettings:
+    def test_default(self):
+        from regian.settings import get_job_jitter_seconds
+        assert get_job_jitter_seconds() == 30
+
+    def test_set_and_clamp(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_job_jitter_seconds(120)
+        assert s.get_job_jitter_seconds() == 120
+        s.set_job_jitter_seconds(-5)
+        assert s.get_job_jitter_seconds() == 0
+
+    def test_invalid_falls_back(self, monkeypatch):
+        from regian.settings import get_job_jitter_seconds
+        monkeypatch.setenv("JOB_JITTER_SECONDS", "veel")
+        assert get_job_jitter_seconds() == 30
+
+
+class TestSchedulerSocketSettings:
+    def test_default_empty(self):
+        from regian.settings import get_scheduler_socket
+        assert get_scheduler_socket() == ""
+
+    def test_set(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_scheduler_socket("/tmp/regian.sock")
+        assert s.get_scheduler_socket() == "/tmp/regian.sock"
+
+
+class TestLeaseSettings:
+    def test_defaults(self):
+        from regian.settings import get_scheduler_lease_db, get_lease_ttl
+        assert get_scheduler_lease_db() == ""
+        assert get_lease_ttl() == 60
+
+    def test_set(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_scheduler_lease_db("/gedeeld/leases.db")
+        s.set_lease_ttl(30)
+        assert s.get_scheduler_lease_db() == "/gedeeld/leases.db"
+        assert s.get_lease_ttl() == 30
+
+
+class TestShellLogSettings:
+    def test_defaults(self):
+        from regian.settings import get_shell_log_max_bytes, get_shell_log_backups
+        assert get_shell_log_max_bytes() == 1_048_576
+        assert get_shell_log_backups() == 3
+
+    def test_set(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_shell_log_max_bytes(4096)
+        s.set_shell_log_backups(1)
+        assert s.get_shell_log_max_bytes() == 4096
+        assert s.get_shell_log_backups() == 1
+
+
+class TestWatchSettings:
+    def test_defaults(self):
+        from regian.settings import get_watch_poll_seconds, get_watch_debounce_seconds
+        assert get_watch_poll_seconds() == 2.0
+        assert get_watch_debounce_seconds() == 2.0
+
+    def test_set_and_bounds(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_watch_poll_seconds(0.01)
+        s.set_watch_debounce_seconds(10)
+        assert s.get_watch_poll_seconds() == 0.2
+        assert s.get_watch_debounce_seconds() == 10.0
+
+    def test_invalid_falls_back(self, monkeypatch):
+        from regian.settings import get_watch_poll_seconds
+        monkeypatch.setenv("WATCH_POLL_SECONDS", "snel")
+        assert get_watch_poll_seconds() == 2.0
+
+
+class TestWorkflowMaxParallelSettings:
+    def test_default(self):
+        from regian.settings import get_workflow_max_parallel
+        assert get_workflow_max_parallel() == 4
+
+    def test_set_and_minimum(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_workflow_max_parallel(6)
+        assert s.get_workflow_max_parallel() == 6
+        s.set_workflow_max_parallel(0)
+        assert s.get_workflow_max_parallel() == 1
+
+
+class TestWorkflowWorkersSettings:
+    def test_default(self, monkeypatch):
+        from regian.settings import get_workflow_workers
+        monkeypatch.delenv("WORKFLOW_WORKERS", raising=False)
+        assert get_workflow_workers() == 2
+
+    def test_set_and_minimum(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_workflow_workers(5)
+        assert s.get_workflow_workers() == 5
+        s.set_workflow_workers(-1)
+        assert s.get_workflow_workers() == 0
+
+
+class TestWorkflowChunkTokensSettings:
+    def test_default(self):
+        from regian.settings import get_workflow_chunk_tokens
+        assert get_workflow_chunk_tokens() == 3000
+
+    def test_set_and_minimum(self, monkeypatch, tmp_env_file):
+        s = _patch_env_file(tmp_env_file, monkeypatch)
+        s.set_workflow_chunk_tokens(8000)
+        assert s.get_workflow_chunk_tokens() == 8000
+        s.set_workflow_chunk_tokens(5)
+        assert s.get_workflow_chunk_tokens() == 100
@@ -95,6 +95,43 @@ class TestSchedulePrompt:
             schedule_prompt("j", "doe iets", "elke 5 minuten")
         assert captured["type"] == "prompt"
 
+    def test_frozen_sets_flag(self):
+        from regian.skills.cron import schedule_prompt
+        with patch("regian.core.scheduler.add_scheduled_job", side_effect=_mock_add_job), \
+             patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = schedule_prompt("j", "doe iets", "elke 5 minuten", frozen=True)
+        assert "bevroren" in result
+        upd.assert_called_once_with("j", frozen_plan=True)
+
+
+# ── replan_job ─────────────────────────────────────────────────────────────────
+
+class TestReplanJob:
+    def test_shows_plan(self):
+        from regian.skills.cron import replan_job
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {"type": "prompt"}}), \
+             patch("regian.core.scheduler.replan_prompt_job",
+                   return_value=[{"tool": "repo_list", "args": {}}, {"tool": "write_file", "args": {}}]):
+            result = replan_job("j")
+        assert "✅" in result
+        assert "repo_list → write_file" in result
+
+    def test_not_a_prompt_job(self):
+        from regian.skills.cron import replan_job
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {"type": "shell"}}):
+            assert "❌" in replan_job("j")
+
+    def test_unknown_job(self):
+        from regian.skills.cron import replan_job
+        with patch("regian.core.scheduler.get_all_jobs", return_value={}):
+            assert "❌" in replan_job("nope")
+
+    def test_planning_error(self):
+        from regian.skills.cron import replan_job
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {"type": "prompt"}}), \
+             patch("regian.core.scheduler.replan_prompt_job", side_effect=RuntimeError("LLM weg")):
+            assert "LLM weg" in replan_job("j")
+
 
 # ── remove_job ─────────────────────────────────────────────────────────────────
 
@@ -172,3 +209,267 @@ class TestListJobs:
             with patch("regian.core.scheduler.get_next_run", return_value="morgen"):
                 result = list_jobs()
         assert "job1" in result
+
+    def test_shows_queue_stats(self):
+        from regian.skills.cron import list_jobs
+        jobs = {"job1": {"type": "prompt", "task": "x", "enabled": True, "schedule": "elk uur"}}
+        stats = {"pending": 2, "running": 1, "runs": 4, "last_wait": 0.5,
+                 "avg_wait": 1.25, "max_wait": 3.0, "skipped": 1}
+        with patch("regian.core.scheduler.get_all_jobs", return_value=jobs), \
+             patch("regian.core.scheduler.get_next_run", return_value="morgen"), \
+             patch("regian.core.scheduler.get_job_stats", return_value=stats):
+            result = list_jobs()
+        assert "Wachtrij: 2" in result
+        assert "actief: 1" in result
+        assert "1.2s" in result or "1.3s" in result
+        assert "overgeslagen: 1" in result
+
+    def test_shows_spread_preview(self):
+        from regian.skills.cron import list_jobs
+        jobs = {
+            "a": {"type": "shell", "task": "x", "enabled": True, "schedule": "elk uur", "spread": True},
+            "b": {"type": "shell", "task": "y", "enabled": True, "schedule": "elk uur", "spread": True},
+        }
+        with patch("regian.core.scheduler.get_all_jobs", return_value=jobs), \
+             patch("regian.core.scheduler.get_next_run", return_value="morgen"):
+            result = list_jobs()
+        assert "🎯 Gespreid +0s" in result
+        assert "🎯 Gespreid +1800s" in result
+        assert ":30:00" in result
+
+
+# ── set_job_budget ─────────────────────────────────────────────────────────────
+
+class TestSetJobBudget:
+    def test_sets_budget(self):
+        from regian.skills.cron import set_job_budget
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = set_job_budget("j1", 500)
+        assert "✅" in result
+        upd.assert_called_once_with("j1", token_budget=500)
+
+    def test_zero_removes_budget(self):
+        from regian.skills.cron import set_job_budget
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = set_job_budget("j1", 0)
+        assert "verwijderd" in result
+        upd.assert_called_once_with("j1", token_budget=None)
+
+    def test_unknown_job(self):
+        from regian.skills.cron import set_job_budget
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=False):
+            assert "❌" in set_job_budget("nope", 10)
+
+
+# ── configure_job ──────────────────────────────────────────────────────────────
+
+class TestConfigureJob:
+    def test_sets_options(self):
+        from regian.skills.cron import configure_job
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = configure_job("j1", max_instances=2, coalesce="nee", misfire_grace_seconds=30)
+        assert "✅" in result
+        upd.assert_called_once_with("j1", max_instances=2, coalesce=False, misfire_grace_time=30)
+
+    def test_defaults_leave_options_unchanged(self):
+        from regian.skills.cron import configure_job
+        with patch("regian.core.scheduler.update_scheduled_job") as upd:
+            result = configure_job("j1")
+        assert "❌" in result
+        upd.assert_not_called()
+
+    def test_invalid_coalesce(self):
+        from regian.skills.cron import configure_job
+        assert "❌" in configure_job("j1", coalesce="misschien")
+
+    def test_zero_misfire_grace_rejected(self):
+        from regian.skills.cron import configure_job
+        with patch("regian.core.scheduler.update_scheduled_job") as upd:
+            assert "❌" in configure_job("j1", misfire_grace_seconds=0)
+        upd.assert_not_called()
+
+    def test_register_failure_reported(self):
+        from regian.skills.cron import configure_job
+        error = ValueError("Kon taak 'j1' niet opnieuw inplannen: fout")
+        with patch("regian.core.scheduler.update_scheduled_job", side_effect=error):
+            result = configure_job("j1", max_instances=2)
+        assert result.startswith("❌") and "inplannen" in result
+
+    def test_frozen_plan_off_clears_plan(self):
+        from regian.skills.cron import configure_job
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = configure_job("j1", frozen_plan="nee")
+        assert "frozen_plan=False" in result
+        upd.assert_called_once_with("j1", frozen_plan=None, plan=None, plan_fingerprint=None, planned_at=None)
+
+    def test_priority(self):
+        from regian.skills.cron import configure_job
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            assert "✅" in configure_job("j1", priority="Maintenance")
+            assert "✅" in configure_job("j1", priority="cron")
+        assert upd.call_args_list[0].kwargs == {"priority": "maintenance"}
+        assert upd.call_args_list[1].kwargs == {"priority": None}
+        assert "❌" in configure_job("j1", priority="dringend")
+
+    def test_unknown_job(self):
+        from regian.skills.cron import configure_job
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=False):
+            assert "❌" in configure_job("nope", max_instances=2)
+
+
+# ── job_history ────────────────────────────────────────────────────────────────
+
+class TestJobHistory:
+    def test_shows_stats(self):
+        from regian.skills.cron import job_history
+        runs = [
+            {"run_id": "r1", "start": "2026-01-01T10:00:00", "duration": 1.0, "wait": 0.0, "status": "✅"},
+            {"run_id": "r2", "start": "2026-01-01T10:01:00", "duration": 3.0, "wait": 0.5, "status": "❌"},
+        ]
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {}}), \
+             patch("regian.core.scheduler.get_job_history", return_value=runs):
+            result = job_history("j")
+        assert "2 run(s)" in result
+        assert "50%" in result
+        assert "r2" in result
+
+    def test_no_runs(self):
+        from regian.skills.cron import job_history
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {}}), \
+             patch("regian.core.scheduler.get_job_history", return_value=[]):
+            assert "📭" in job_history("j")
+
+    def test_unknown_job(self):
+        from regian.skills.cron import job_history
+        with patch("regian.core.scheduler.get_all_jobs", return_value={}):
+            assert "❌" in job_history("nope")
+
+    def test_job_output_for_specific_run(self):
+        from regian.skills.cron import job_output
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {"task": "x"}}), \
+             patch("regian.core.scheduler.get_run_output", return_value="volledige output"):
+            assert "volledige output" in job_output("j", run_id="r1")
+        with patch("regian.core.scheduler.get_all_jobs", return_value={"j": {"task": "x"}}), \
+             patch("regian.core.scheduler.get_run_output", return_value=None):
+            assert "❌" in job_output("j", run_id="r9")
+
+
+# ── job_leases ─────────────────────────────────────────────────────────────────
+
+class TestJobLeases:
+    def test_disabled(self):
+        from regian.skills.cron import job_leases
+        assert "uit" in job_leases()
+
+    def test_lists_leases(self, tmp_path, monkeypatch):
+        from regian.skills.cron import job_leases
+        from regian.core.leases import get_lease_db
+        monkeypatch.setenv("SCHEDULER_LEASE_DB", str(tmp_path / "leases.db"))
+        get_lease_db().claim("backup", ttl=60)
+        result = job_leases()
+        assert "backup" in result
+        assert "loopt" in result
+
+
+# ── set_only_on_change ─────────────────────────────────────────────────────────
+
+class TestSetOnlyOnChange:
+    def test_enable_with_follow_up(self):
+        from regian.skills.cron import set_only_on_change
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = set_only_on_change("j1", "ja", "/write_file x.txt {output}")
+        assert "✅" in result and "/write_file" in result
+        upd.assert_called_once_with("j1", only_on_change=True, on_change="/write_file x.txt {output}")
+
+    def test_disable(self):
+        from regian.skills.cron import set_only_on_change
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            assert "✅" in set_only_on_change("j1", "nee")
+        upd.assert_called_once_with("j1", only_on_change=None, on_change=None)
+
+    def test_invalid_value(self):
+        from regian.skills.cron import set_only_on_change
+        assert "❌" in set_only_on_change("j1", "misschien")
+
+    def test_unknown_job(self):
+        from regian.skills.cron import set_only_on_change
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=False):
+            assert "❌" in set_only_on_change("nope")
+
+
+# ── set_job_spread ─────────────────────────────────────────────────────────────
+
+class TestSetJobSpread:
+    def test_enable_with_jitter(self):
+        from regian.skills.cron import set_job_spread
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd, \
+             patch("regian.core.scheduler.get_all_jobs",
+                   return_value={"j1": {"schedule": "elk uur", "spread": True}}):
+            result = set_job_spread("j1", "ja", 10)
+        assert "✅" in result and "gespreid" in result
+        upd.assert_called_once_with("j1", spread=True, jitter=10)
+
+    def test_disable_keeps_jitter(self):
+        from regian.skills.cron import set_job_spread
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd, \
+             patch("regian.core.scheduler.get_all_jobs", return_value={"j1": {"schedule": "elk uur"}}):
+            assert "niet gespreid" in set_job_spread("j1", "nee")
+        upd.assert_called_once_with("j1", spread=None)
+
+    def test_invalid_values(self):
+        from regian.skills.cron import set_job_spread
+        assert "❌" in set_job_spread("j1", "misschien")
+        assert "❌" in set_job_spread("j1", "ja", "veel")
+
+    def test_unknown_job(self):
+        from regian.skills.cron import set_job_spread
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=False):
+            assert "❌" in set_job_spread("nope")
+
+
+# ── chain_job ──────────────────────────────────────────────────────────────────
+
+class TestChainJob:
+    def test_success_edges(self):
+        from regian.skills.cron import chain_job
+        with patch("regian.core.scheduler.check_dependencies", return_value=None), \
+             patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            result = chain_job("push", "backup, lint")
+        assert "✅" in result and "backup, lint" in result
+        upd.assert_called_once_with("push", after=["backup", "lint"])
+
+    def test_failure_edge(self):
+        from regian.skills.cron import chain_job
+        with patch("regian.core.scheduler.check_dependencies", return_value=None), \
+             patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            assert "faalt" in chain_job("alarm", "backup", "mislukking")
+        upd.assert_called_once_with("alarm", after_failure=["backup"])
+
+    def test_clear(self):
+        from regian.skills.cron import chain_job
+        with patch("regian.core.scheduler.update_scheduled_job", return_value=True) as upd:
+            assert "gewist" in chain_job("push", "")
+        upd.assert_called_once_with("push", after=None)
+
+    def test_cycle_rejected(self):
+        from regian.skills.cron import chain_job
+        with patch("regian.core.scheduler.check_dependencies", return_value="❌ cyclus"), \
+             patch("regian.core.scheduler.update_scheduled_job") as upd:
+            assert "❌" in chain_job("a", "b")
+        upd.assert_not_called()
+
+    def test_invalid_kind(self):
+        from regian.skills.cron import chain_job
+        assert "❌" in chain_job("a", "b", "soms")
+
+    def test_list_jobs_shows_edges(self):
+        from regian.skills.cron import list_jobs
+        jobs = {
+            "backup": {"type": "shell", "task": "x", "enabled": True, "schedule": "dagelijks om 02:00"},
+            "push": {"type": "shell", "task": "y", "enabled": True, "schedule": "na backup",
+                     "after": ["backup"], "after_failure": ["weg"]},
+        }
+        with patch("regian.core.scheduler.get_all_jobs", return_value=jobs), \
+             patch("regian.core.scheduler.get_next_run", return_value="na backup"):
+            result = list_jobs()
+        assert "🔗 Start na backup · na mislukking van weg ⚠️" in result
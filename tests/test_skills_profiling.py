@@ -0,0 +1,67 @@
+# tests/test_skills_profiling.py
+"""Tests voor regian/skills/profiling.py — profilering aan/uit en profielen bekijken."""
+import pytest
+
+
+@pytest.fixture
+def env_file(tmp_env_file, monkeypatch):
+    import regian.settings as s
+    monkeypatch.setattr(s, "ENV_FILE", tmp_env_file)
+    return tmp_env_file
+
+
+class TestEnableDisable:
+    def test_enable_tool(self, env_file):
+        from regian.skills.profiling import enable_profiling
+        from regian.settings import get_profile_tools
+        assert "🔬" in enable_profiling("run_shell")
+        assert get_profile_tools() == {"run_shell"}
+
+    def test_enable_phase(self, env_file):
+        from regian.skills.profiling import enable_profiling
+        from regian.settings import get_profile_phases
+        enable_profiling("mvp:build", kind="phase")
+        assert get_profile_phases() == {"mvp:build"}
+
+    def test_invalid_kind(self, env_file):
+        from regian.skills.profiling import enable_profiling
+        assert "❌" in enable_profiling("x", kind="onzin")
+
+    def test_disable_one(self, env_file):
+        from regian.skills.profiling import enable_profiling, disable_profiling
+        from regian.settings import get_profile_tools
+        enable_profiling("a")
+        enable_profiling("b")
+        assert "✅" in disable_profiling("a")
+        assert get_profile_tools() == {"b"}
+
+    def test_disable_unknown(self, env_file):
+        from regian.skills.profiling import disable_profiling
+        assert "❌" in disable_profiling("nope")
+
+    def test_disable_all(self, env_file):
+        from regian.skills.profiling import enable_profiling, disable_profiling
+        from regian.settings import get_profile_tools
+        enable_profiling("a")
+        disable_profiling()
+        assert get_profile_tools() == set()
+
+
+class TestListAndShow:
+    def test_list_empty(self):
+        from regian.skills.profiling import list_profiles
+        assert "📭" in list_profiles()
+
+    def test_list_and_show(self):
+        from regian.core.profiling import profile_scope
+        from regian.skills.profiling import list_profiles, show_profile
+        with profile_scope("tool", "demo") as holder:
+            sum(range(1000))
+        assert holder["id"] in list_profiles()
+        detail = show_profile(holder["id"])
+        assert "Hotspots" in detail
+        assert "demo" in detail
+
+    def test_show_unknown(self):
+        from regian.skills.profiling import show_profile
+        assert "❌" in show_profile("bestaat_niet")
@@ -291,3 +291,26 @@ class TestIsDestructivePythonCode:
 
     def test_lege_code(self):
         assert not self._check("")
+
+
+class TestRunShellStreaming:
+    def test_output_written_to_call_log(self, tmp_root):
+        import regian.core.shell as shell
+        from regian.skills.terminal import run_shell
+        run_shell("echo gelogd")
+        logs = list((shell._get_log_dir() / "calls").glob("*.log"))
+        assert len(logs) == 1
+        assert "gelogd" in logs[0].read_text(encoding="utf-8")
+
+    def test_truncated_output_mentions_log(self, tmp_root, monkeypatch):
+        import regian.core.shell as shell
+        from regian.skills.terminal import run_shell
+        monkeypatch.setattr(shell, "_TAIL_BYTES", 50)
+        result = run_shell("seq 1 1000")
+        assert "ingekort" in result
+        assert "1000" in result
+
+    def test_timeout(self, tmp_root, monkeypatch):
+        from regian.skills.terminal import run_shell
+        monkeypatch.setenv("SHELL_TIMEOUT", "1")
+        assert "Timeout" in run_shell("sleep 10")
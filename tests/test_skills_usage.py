@@ -0,0 +1,74 @@
+# tests/test_skills_usage.py
+"""Tests voor regian/skills/usage.py — tokenverbruik en budgetten."""
+import json
+import pytest
+
+
+class TestTokenUsage:
+    def test_empty(self):
+        from regian.skills.usage import token_usage
+        assert "📭" in token_usage()
+
+    def test_invalid_group(self):
+        from regian.skills.usage import token_usage
+        assert "❌" in token_usage(group_by="onzin")
+
+    def test_lists_projects(self):
+        from regian.core.usage import record_usage, usage_scope
+        from regian.skills.usage import token_usage
+        with usage_scope(project="alpha"):
+            record_usage(100, 50)
+        result = token_usage()
+        assert "alpha" in result
+        assert "150 tokens" in result
+
+
+class TestSetTokenBudget:
+    def test_default_budget(self, tmp_env_file, monkeypatch):
+        import regian.settings as s
+        monkeypatch.setattr(s, "ENV_FILE", tmp_env_file)
+        from regian.skills.usage import set_token_budget
+        result = set_token_budget(5000)
+        assert "✅" in result
+        assert s.get_token_budget_daily() == 5000
+
+    def test_project_budget_in_manifest(self, tmp_root):
+        proj = tmp_root / "demo"
+        proj.mkdir()
+        (proj / ".regian_project.json").write_text(
+            json.dumps({"name": "demo", "path": str(proj)}), encoding="utf-8"
+        )
+        from regian.skills.usage import set_token_budget
+        result = set_token_budget(1234, project="demo")
+        assert "✅" in result
+        manifest = json.loads((proj / ".regian_project.json").read_text(encoding="utf-8"))
+        assert manifest["token_budget"] == 1234
+
+    def test_unknown_project(self, tmp_root):
+        from regian.skills.usage import set_token_budget
+        assert "❌" in set_token_budget(10, project="bestaat_niet")
+
+
+class TestTokenBudgetStatus:
+    def test_without_budget(self):
+        from regian.skills.usage import token_budget_status
+        assert "geen dagbudget" in token_budget_status("x")
+
+    def test_with_budget(self, monkeypatch):
+        monkeypatch.setenv("TOKEN_BUDGET_DAILY", "100")
+        from regian.core.usage import record_usage, usage_scope
+        from regian.skills.usage import token_budget_status
+        with usage_scope(project="x"):
+            record_usage(25, 25)
+        assert "50/100" in token_budget_status("x")
+
+
+class TestAdmissionStatus:
+    def test_shows_gates_and_active_classes(self):
+        from regian.core.admission import admit
+        from regian.skills.usage import admission_status
+        with admit("llm", "cron"):
+            result = admission_status()
+        assert "LLM-aanroepen" in result and "1/4 bezet" in result
+        assert "cron: 1 actief" in result
+        assert "Shell/Python" in result
@@ -46,6 +46,23 @@ class TestListWorkflowRuns:
         result = list_workflow_runs()
         assert "run_vis1" in result
 
+    def test_alle_projecten_toont_project(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        from regian.skills.workflow import list_workflow_runs
+        project = tmp_path / "workspace" / "webshop"
+        project.mkdir(parents=True)
+        monkeypatch.setenv("REGIAN_ROOT_DIR", str(tmp_path / "workspace"))
+        run = wf_mod.WorkflowRun(
+            run_id="run_proj", workflow_id="wf", workflow_name="Mijn Wf",
+            started_at="2026-01-01T10:00:00", updated_at="2026-01-01T10:00:00",
+            status="done", current_phase_index=2,
+            artifacts={}, phase_log=[], input="test", project_path=str(project),
+        )
+        wf_mod.save_run(run)
+        assert "run_proj" not in list_workflow_runs()
+        assert "run_proj" in list_workflow_runs(all_projects=True)
+        assert "[webshop]" in list_workflow_runs(all_projects=True)
+
 
 # ── start_workflow — auto-project aanmaken ─────────────────────────────────────
 
@@ -214,6 +231,115 @@ class TestImportBpmn:
         # moet JSON-bestand aangemaakt hebben of melden dat het geslaagd is
         assert "test_import_wf" in result or "geïmporteerd" in result.lower() or "import" in result.lower()
 
+    def test_parallelle_groep_roundtrip(self, tmp_path, monkeypatch):
+        import regian.settings as settings_mod
+        from regian.core import workflow as wf_mod
+        from regian.skills.workflow import export_bpmn, import_bpmn
+        wdir = tmp_path / ".regian_workflow"
+        wdir.mkdir()
+        monkeypatch.setattr(wf_mod, "_workflow_dir", lambda pp="": wdir)
+        monkeypatch.setattr(settings_mod, "get_root_dir", lambda: str(tmp_path))
+        monkeypatch.setattr(settings_mod, "get_active_project", lambda: "")
+        tpl = {"id": "par_wf", "name": "Par WF", "phases": [
+            {"id": "docs", "name": "Documenten", "type": "parallel", "phases": [
+                {"id": "prd", "name": "PRD", "type": "llm_prompt", "prompt_template": "{{input}}"},
+                {"id": "bouw", "name": "Bouw", "type": "tool_chain", "steps": []},
+            ]},
+        ]}
+        (wdir / "par_wf.json").write_text(json.dumps(tpl), encoding="utf-8")
+        assert "✅" in export_bpmn("par_wf")
+        xml = (tmp_path / "par_wf.bpmn").read_text(encoding="utf-8")
+        assert '<bpmn:subProcess id="docs"' in xml
+        (wdir / "par_wf.json").unlink()
+        assert "✅" in import_bpmn(str(tmp_path / "par_wf.bpmn"))
+        group = json.loads((wdir / "par_wf.json").read_text(encoding="utf-8"))["phases"][0]
+        assert group["type"] == "parallel"
+        assert [b["type"] for b in group["phases"]] == ["llm_prompt", "tool_chain"]
+
+    def test_map_reduce_roundtrip(self, tmp_path, monkeypatch):
+        import regian.settings as settings_mod
+        from regian.core import workflow as wf_mod
+        from regian.skills.workflow import export_bpmn, import_bpmn
+        wdir = tmp_path / ".regian_workflow"
+        wdir.mkdir()
+        monkeypatch.setattr(wf_mod, "_workflow_dir", lambda pp="": wdir)
+        monkeypatch.setattr(settings_mod, "get_root_dir", lambda: str(tmp_path))
+        monkeypatch.setattr(settings_mod, "get_active_project", lambda: "")
+        tpl = {"id": "mr_wf", "name": "MR WF", "phases": [
+            {"id": "verslag", "name": "Verslag", "type": "map_reduce",
+             "map_prompt": "Vat samen: {{chunk}}", "reduce_prompt": "{{results}}"},
+        ]}
+        (wdir / "mr_wf.json").write_text(json.dumps(tpl), encoding="utf-8")
+        assert "✅" in export_bpmn("mr_wf")
+        xml = (tmp_path / "mr_wf.bpmn").read_text(encoding="utf-8")
+        assert "<bpmn:multiInstanceLoopCharacteristics" in xml
+        (wdir / "mr_wf.json").unlink()
+        assert "✅" in import_bpmn(str(tmp_path / "mr_wf.bpmn"))
+        phase = json.loads((wdir / "mr_wf.json").read_text(encoding="utf-8"))["phases"][0]
+        assert phase["type"] == "map_reduce" and phase["map_prompt"] == "Vat samen: {{chunk}}"
+        assert "{{results}}" in phase["reduce_prompt"]
+
+    def _import_subprocess(self, tmp_path, monkeypatch, inner: str):
+        from regian.core import workflow as wf_mod
+        from regian.skills.workflow import import_bpmn
+        wdir = tmp_path / ".regian_workflow"
+        monkeypatch.setattr(wf_mod, "_workflow_dir", lambda pp="": wdir)
+        xml_path = tmp_path / "sub.bpmn"
+        xml_path.write_text(f"""<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://www.omg.org/spec/BPMN/20100524/MODEL">
+  <process id="sub_wf" name="Sub WF">
+    <startEvent id="start"/>
+    <subProcess id="docs" name="Documenten">
+      <serviceTask id="b" name="Ontwerp"/>
+      <serviceTask id="a" name="Analyse"/>
+      {inner}
+    </subProcess>
+    <endEvent id="einde"/>
+    <sequenceFlow id="f1" sourceRef="start" targetRef="docs"/>
+    <sequenceFlow id="f2" sourceRef="docs" targetRef="einde"/>
+  </process>
+</definitions>""", encoding="utf-8")
+        result = import_bpmn(str(xml_path))
+        if "✅" not in result:
+            return result
+        return json.loads((wdir / "sub_wf.json").read_text(encoding="utf-8"))["phases"]
+
+    def test_subproces_met_flows_blijft_sequentieel(self, tmp_path, monkeypatch):
+        phases = self._import_subprocess(tmp_path, monkeypatch, """
+      <startEvent id="s"/>
+      <sequenceFlow id="i1" sourceRef="s" targetRef="a"/>
+      <exclusiveGateway id="g"/>
+      <sequenceFlow id="i2" sourceRef="a" targetRef="g"/>
+      <sequenceFlow id="i3" sourceRef="g" targetRef="b"/>""")
+        assert [(p["id"], p["type"]) for p in phases] == [("analyse", "llm_prompt"), ("ontwerp", "llm_prompt")]
+
+    def test_subproces_met_enkel_splitsing_is_parallel(self, tmp_path, monkeypatch):
+        phases = self._import_subprocess(tmp_path, monkeypatch, """
+      <parallelGateway id="g"/>
+      <sequenceFlow id="i1" sourceRef="g" targetRef="a"/>
+      <sequenceFlow id="i2" sourceRef="g" targetRef="b"/>""")
+        assert len(phases) == 1 and phases[0]["type"] == "parallel"
+        assert [b["id"] for b in phases[0]["phases"]] == ["ontwerp", "analyse"]
+
+    def test_subproces_met_cyclus_geweigerd(self, tmp_path, monkeypatch):
+        result = self._import_subprocess(tmp_path, monkeypatch, """
+      <sequenceFlow id="i1" sourceRef="a" targetRef="b"/>
+      <sequenceFlow id="i2" sourceRef="b" targetRef="a"/>""")
+        assert result.startswith("❌") and "cyclus" in result
+
+    def test_multi_instance_taak_niet_in_parallelle_groep(self, tmp_path, monkeypatch):
+        from regian.core.workflow import load_workflow
+        phases = self._import_subprocess(tmp_path, monkeypatch, """
+      <serviceTask id="m" name="Per stuk"><multiInstanceLoopCharacteristics/></serviceTask>""")
+        assert [b["id"] for b in phases[0]["phases"]] == ["ontwerp", "analyse"]
+        assert load_workflow("sub_wf")["phases"][0]["type"] == "parallel"
+
+    def test_ongeldige_template_niet_geschreven(self, tmp_path, monkeypatch):
+        result = self._import_subprocess(tmp_path, monkeypatch, """
+      <serviceTask id="c" name="Analyse"/>""")
+        assert result.startswith("❌") and "meer dan één keer" in result
+        assert not (tmp_path / ".regian_workflow" / "sub_wf.json").exists()
+
     def test_import_bestaand_pad_niet_gevonden(self):
         from regian.skills.workflow import import_bpmn
         result = import_bpmn("/tmp/bestaat_nooit_xyz.bpmn")
@@ -255,6 +381,27 @@ class TestApproveWorkflow:
         assert "error" in result.lower() or "niet gevonden" in result.lower() or "❌" in result
 
 
+# ── rerun_workflow / set_workflow_artifact ─────────────────────────────────────
+
+class TestRerunWorkflow:
+    def test_rerun_en_artifact(self, tmp_path, monkeypatch):
+        from regian.core import workflow as wf_mod
+        from regian.skills.workflow import rerun_workflow, set_workflow_artifact
+        monkeypatch.setattr(wf_mod, "_state_dir", lambda pp="": tmp_path / "state")
+        tpl = {"id": "t", "name": "T", "phases": [
+            {"id": "a", "type": "human_checkpoint", "prompt": "OK? {{input}}"},
+            {"id": "b", "type": "human_checkpoint", "prompt": "Verder? {{notitie}}"},
+        ]}
+        monkeypatch.setattr(wf_mod, "load_workflow", lambda name, pp="": tpl)
+        run = wf_mod.start_workflow("t", "idee")
+        wf_mod.advance_run(run.run_id)
+        wf_mod.advance_run(run.run_id)
+        assert "✅" in set_workflow_artifact(run.run_id, "notitie", "nieuw")
+        result = rerun_workflow(run.run_id)
+        assert "1 fase(n) hergebruikt" in result and "Wacht op goedkeuring" in result
+        assert "❌" in rerun_workflow("bestaat_niet")
+
+
 # ── _xml_escape hulpfunctie ───────────────────────────────────────────────────
 
 class TestXmlEscapeSkill: